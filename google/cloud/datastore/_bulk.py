@@ -0,0 +1,632 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Send many datastore requests concurrently.
+
+These functions are not part of the API.
+"""
+
+import collections
+import copy
+import threading
+import time
+import weakref
+
+from six.moves import queue
+
+from google.cloud.datastore.batch import Batch
+from google.cloud.datastore.future import Future
+from google.cloud.exceptions import Conflict
+from google.cloud.exceptions import ServerError
+from google.cloud.exceptions import TooManyRequests
+
+
+DEFAULT_MAX_WORKERS = 8
+"""Default number of requests in flight at once."""
+
+_MAX_MUTATIONS = 500
+"""Maximum number of mutations the backend accepts in one commit."""
+
+_MAX_COMMIT_RETRIES = 3
+"""Number of times a failed commit is retried."""
+
+_RETRY_DELAY = 0.5
+"""Seconds to wait before the first retry;  doubled for each one after."""
+
+_TRANSIENT_ERRORS = (Conflict, ServerError, TooManyRequests)
+"""Errors after which a commit may succeed if sent again."""
+
+_BUFFER_SIZE = 1000
+"""Number of results workers may queue ahead of their consumer."""
+
+_POLL_INTERVAL = 0.1
+"""Seconds a worker waits on a full queue before checking if to stop."""
+
+_IDLE_TIMEOUT = 30
+"""Seconds an idle thread of :func:`call_async` waits before exiting."""
+
+
+def _chunks(items, size):
+    """Split a sequence into lists of at most ``size`` items.
+
+    :type items: sequence
+    :param items: The items to split.
+
+    :type size: integer
+    :param size: The length of each list (the last may be shorter).
+
+    :rtype: list of lists
+    :returns: Successive slices of ``items``.
+    """
+    return [list(items[start:start + size])
+            for start in range(0, len(items), size)]
+
+
+def _worker_connection(connection):
+    """Return a connection a worker thread may use on its own.
+
+    :class:`httplib2.Http` instances are not thread-safe, so each worker
+    gets a connection with the same credentials but its own transport.
+
+    :type connection: :class:`google.cloud.datastore.connection.Connection`
+    :param connection: The client's connection.
+
+    :rtype: :class:`google.cloud.datastore.connection.Connection`
+    :returns: A new connection of the same class.
+    """
+    return type(connection)(credentials=connection.credentials)
+
+
+def map_concurrently(connection, func, tasks,
+                     max_workers=DEFAULT_MAX_WORKERS):
+    """Apply a function to each task, on several threads at once.
+
+    :type connection: :class:`google.cloud.datastore.connection.Connection`
+    :param connection: The client's connection.
+
+    :type func: callable, taking ``(connection, task)``
+    :param func: Runs one task, sending requests through the given
+                 connection (each worker thread has its own).
+
+    :type tasks: list
+    :param tasks: The tasks to run.
+
+    :type max_workers: integer
+    :param max_workers: The number of tasks to run at once.  A single task,
+                        or a connection without credentials (e.g., one
+                        with a custom ``http``, which cannot be
+                        duplicated), is run on the calling thread.
+
+    :rtype: list
+    :returns: The result of each task, in the order of ``tasks``.
+    :raises: :class:`ValueError` if ``max_workers`` is less than 1;  else
+             the first exception raised by a task, after the workers stop.
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    if len(tasks) < 2 or connection.credentials is None:
+        return [func(connection, task) for task in tasks]
+
+    results = [None] * len(tasks)
+    errors = []
+    pending = queue.Queue()
+    for index, task in enumerate(tasks):
+        pending.put((index, task))
+
+    def _work():
+        try:
+            worker_connection = _worker_connection(connection)
+            while not errors:
+                try:
+                    index, task = pending.get_nowait()
+                except queue.Empty:
+                    return
+                results[index] = func(worker_connection, task)
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    workers = [threading.Thread(target=_work)
+               for _ in range(min(max_workers, len(tasks)))]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+class BackgroundCall(Future):
+    """Call a function on a thread of its own.
+
+    :type func: callable
+    :param func: The function to call.
+
+    :type args: tuple
+    :param args: Positional arguments passed to ``func``.
+
+    :type kwargs: dict
+    :param kwargs: Keyword arguments passed to ``func``.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        super(BackgroundCall, self).__init__()
+        thread = threading.Thread(target=self._run,
+                                  args=(func, args, kwargs))
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, func, args, kwargs):
+        """Call the function, setting its return value or exception."""
+        try:
+            value = func(*args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            self.set_exception(exc)
+        else:
+            self.set_result(value)
+
+
+class _AsyncPool(object):
+    """Run calls on a bounded set of threads, shared by all clients.
+
+    Threads are started as calls are submitted, while none is idle, up to
+    ``max_workers``, and exit once idle for ``idle_timeout`` seconds.
+    Each thread makes a client, and so a connection, of its own for each
+    client it runs calls for, and reuses it until that client is freed.
+
+    :type max_workers: integer
+    :param max_workers: (Optional) The number of threads.
+
+    :type idle_timeout: number
+    :param idle_timeout: (Optional) Seconds an idle thread waits for a call
+                         before exiting.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS,
+                 idle_timeout=_IDLE_TIMEOUT):
+        self.max_workers = max_workers
+        self.idle_timeout = idle_timeout
+        self._calls = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._idle = 0
+
+    def submit(self, client, func, *args, **kwargs):
+        """Queue a call to ``func(worker_client, *args, **kwargs)``.
+
+        :type client: :class:`google.cloud.datastore.client.Client`
+        :param client: The client ``worker_client`` is copied from.
+
+        :type func: callable
+        :param func: The function to call.
+
+        :type args: tuple
+        :param args: Further positional arguments passed to ``func``.
+
+        :type kwargs: dict
+        :param kwargs: Keyword arguments passed to ``func``.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future for the value returned by ``func``.
+        """
+        future = Future()
+        with self._lock:
+            self._calls.put((future, client, func, args, kwargs))
+            if self._idle:
+                self._idle -= 1
+            elif self._workers < self.max_workers:
+                self._workers += 1
+                thread = threading.Thread(target=self._run)
+                thread.daemon = True
+                thread.start()
+        return future
+
+    def _next_call(self):
+        """Wait for a call, or return ``None`` once idle for too long."""
+        while True:
+            try:
+                return self._calls.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # If no idle thread is left, this one has been counted
+                    # on for a call already queued.
+                    if self._idle:
+                        self._idle -= 1
+                        self._workers -= 1
+                        return None
+
+    def _run(self):
+        """Run queued calls, until idle for too long."""
+        worker_clients = weakref.WeakKeyDictionary()
+        while True:
+            call = self._next_call()
+            if call is None:
+                return
+            future, client, func, args, kwargs = call
+            # Drop the references while idle, so the client may be freed.
+            del call
+            try:
+                worker_client = worker_clients.get(client)
+                if worker_client is None:
+                    worker_client = copy.copy(client)
+                    worker_client.connection = _worker_connection(
+                        client.connection)
+                    worker_clients[client] = worker_client
+                value = func(worker_client, *args, **kwargs)
+            except Exception as exc:  # pylint: disable=broad-except
+                finish, value = future.set_exception, exc
+            else:
+                finish = future.set_result
+            client = worker_client = func = args = kwargs = None
+            # Idle before the caller hears back, so a call it then submits
+            # reuses this thread.
+            with self._lock:
+                self._idle += 1
+            finish(value)
+            future = finish = value = None
+
+
+_POOL = _AsyncPool()
+"""The threads :func:`call_async` runs calls on."""
+
+
+def call_async(client, func, *args, **kwargs):
+    """Call a function on one of the shared worker threads.
+
+    Calls from all clients share a pool of at most
+    :data:`DEFAULT_MAX_WORKERS` threads, which exit once idle;  further
+    calls wait in a queue.  Each thread's connections are reused from one
+    call to the next.
+
+    The call is made on the calling thread instead, and the future
+    returned is already done, within a batch or transaction (whose
+    mutations and reads belong to that thread), or if the client's
+    connection has no credentials (e.g., one with a custom ``http``,
+    which cannot be duplicated).
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The caller's client.
+
+    :type func: callable, taking ``(client, *args, **kwargs)``
+    :param func: The function to call.
+
+    :type args: tuple
+    :param args: Further positional arguments passed to ``func``.
+
+    :type kwargs: dict
+    :param kwargs: Keyword arguments passed to ``func``.
+
+    :rtype: :class:`google.cloud.datastore.future.Future`
+    :returns: A future for the value returned by ``func``.
+    """
+    if (client.current_batch is not None or
+            client.connection.credentials is None):
+        future = Future()
+        try:
+            value = func(client, *args, **kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            future.set_exception(exc)
+        else:
+            future.set_result(value)
+        return future
+
+    return _POOL.submit(client, func, *args, **kwargs)
+
+
+def iterate_concurrently(connection, func, tasks,
+                         max_workers=DEFAULT_MAX_WORKERS):
+    """Iterate the results of several tasks, run on threads at once.
+
+    Workers run ahead of the consumer by at most :data:`_BUFFER_SIZE`
+    results;  they stop once the returned generator is closed.
+
+    :type connection: :class:`google.cloud.datastore.connection.Connection`
+    :param connection: The client's connection.
+
+    :type func: callable, taking ``(connection, task)``
+    :param func: Returns an iterable of results for one task, sending
+                 requests through the given connection.
+
+    :type tasks: list
+    :param tasks: The tasks to run.
+
+    :type max_workers: integer
+    :param max_workers: The number of tasks to run at once, as for
+                        :func:`map_concurrently`.
+
+    :rtype: generator
+    :returns: The results of all tasks, in the order they are produced.
+    :raises: :class:`ValueError` if ``max_workers`` is less than 1;  else
+             the first exception raised by a task.
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    if len(tasks) < 2 or connection.credentials is None:
+        return _iterate_sequentially(connection, func, tasks)
+    return _iterate_threaded(connection, func, tasks, max_workers)
+
+
+def _iterate_sequentially(connection, func, tasks):
+    """Iterate the results of several tasks, one task after the other.
+
+    Helper for :func:`iterate_concurrently`.
+
+    :type connection: :class:`google.cloud.datastore.connection.Connection`
+    :param connection: The connection used by every task.
+
+    :type func: callable, taking ``(connection, task)``
+    :param func: Returns an iterable of results for one task.
+
+    :type tasks: list
+    :param tasks: The tasks to run.
+
+    :rtype: generator
+    :returns: The results of each task in turn.
+    """
+    for task in tasks:
+        for result in func(connection, task):
+            yield result
+
+
+def _iterate_threaded(connection, func, tasks, max_workers):
+    """Iterate the results of several tasks, run by worker threads.
+
+    Helper for :func:`iterate_concurrently`.
+
+    :type connection: :class:`google.cloud.datastore.connection.Connection`
+    :param connection: The client's connection.
+
+    :type func: callable, taking ``(connection, task)``
+    :param func: Returns an iterable of results for one task.
+
+    :type tasks: list
+    :param tasks: The tasks to run.
+
+    :type max_workers: integer
+    :param max_workers: The number of worker threads.
+
+    :rtype: generator
+    :returns: The results of all tasks, in the order they are produced.
+    """
+    results = queue.Queue(maxsize=_BUFFER_SIZE)
+    pending = queue.Queue()
+    for task in tasks:
+        pending.put(task)
+    stopped = threading.Event()
+    done = object()
+
+    def _send(error, result):
+        while not stopped.is_set():
+            try:
+                results.put((error, result), timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _work():
+        try:
+            worker_connection = _worker_connection(connection)
+            while True:
+                try:
+                    task = pending.get_nowait()
+                except queue.Empty:
+                    break
+                for result in func(worker_connection, task):
+                    if not _send(None, result):
+                        return
+        except Exception as exc:  # pylint: disable=broad-except
+            _send(exc, None)
+        _send(None, done)
+
+    workers = [threading.Thread(target=_work)
+               for _ in range(min(max_workers, len(tasks)))]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+
+    running = len(workers)
+    try:
+        while running:
+            error, result = results.get()
+            if error is not None:
+                raise error
+            if result is done:
+                running -= 1
+            else:
+                yield result
+    finally:
+        stopped.set()
+
+
+class _ChunkBatch(Batch):
+    """A batch of mutations, committed through a given connection.
+
+    The connection is set by the worker thread committing the batch.
+    """
+
+    connection = None
+
+
+def _entity_group(key):
+    """Identify the entity group of a key.
+
+    :type key: :class:`google.cloud.datastore.key.Key`
+    :param key: The key of an entity to be written.
+
+    :rtype: tuple or ``NoneType``
+    :returns: The namespace and path of the group's root, or ``None`` for
+              a partial key without parent, whose entity will be the root
+              of a new group.
+    """
+    if key.is_partial and len(key.flat_path) < 3:
+        return None
+    return key.namespace, key.flat_path[:2]
+
+
+def _plan_commits(items, keys, limit):
+    """Split items into commits, keeping each entity group in one thread.
+
+    Entity groups are packed whole into commits of at most ``limit``
+    items, unless larger than that:  the commits of such a group form a
+    sequence, to be sent one after the other.
+
+    :type items: list
+    :param items: The items to commit.
+
+    :type keys: list of :class:`google.cloud.datastore.key.Key`
+    :param keys: The key of each item.
+
+    :type limit: integer
+    :param limit: The maximum number of items per commit.
+
+    :rtype: list of lists of lists
+    :returns: Sequences of commits;  each commit is a list of items.  No
+              entity group appears in more than one sequence, so sequences
+              may be sent concurrently.
+    """
+    groups = collections.OrderedDict()
+    for index, (item, key) in enumerate(zip(items, keys)):
+        group = None if key is None else _entity_group(key)
+        if group is None:
+            group = index  # A new group, of one.
+        groups.setdefault(group, []).append(item)
+
+    sequences = []
+    commit = None
+    for members in groups.values():
+        if (commit is not None and len(members) <= limit and
+                len(commit) + len(members) > limit):
+            commit = None  # Full:  start another.
+        if commit is None:
+            commit = []
+            sequence = [commit]
+            sequences.append(sequence)
+        while len(commit) + len(members) > limit:
+            room = limit - len(commit)
+            commit.extend(members[:room])
+            members = members[room:]
+            commit = []
+            sequence.append(commit)
+        commit.extend(members)
+    return sequences
+
+
+def _make_batch(client, items, mutate):
+    """Build the batch committing some items.
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client whose project and namespace to use.
+
+    :type items: list
+    :param items: The items to commit.
+
+    :type mutate: callable, taking ``(batch, item)``
+    :param mutate: Adds the mutation for one item to a batch, e.g.
+                   :meth:`Batch.put`.
+
+    :rtype: :class:`_ChunkBatch`
+    :returns: A batch in progress, holding a mutation for each item.
+    """
+    batch = _ChunkBatch(client)
+    batch.begin()
+    for item in items:
+        mutate(batch, item)
+    return batch
+
+
+def _commit_with_retries(connection, batch, items, mutate):
+    """Commit a batch of mutations, retrying it if it fails transiently.
+
+    Commits which the backend aborted (e.g., due to contention) are
+    always retried;  those which failed with a server error are only
+    retried if they insert no entities, since they may have been applied.
+
+    :type connection: :class:`google.cloud.datastore.connection.Connection`
+    :param connection: The connection used to commit.
+
+    :type batch: :class:`_ChunkBatch`
+    :param batch: The batch to commit first.
+
+    :type items: list
+    :param items: The items in ``batch``, from which to rebuild it.
+
+    :type mutate: callable, taking ``(batch, item)``
+    :param mutate: Adds the mutation for one item to a batch.
+
+    :rtype: list of tuples
+    :returns: ``(items, exception)`` if the commit failed with a transient
+              error, and was not retried successfully;  else nothing.
+    """
+    inserts = bool(batch._partial_key_entities)
+    delay = _RETRY_DELAY
+    attempt = 0
+    while True:
+        batch.connection = connection
+        try:
+            batch.commit()
+        except _TRANSIENT_ERRORS as exc:
+            if (attempt == _MAX_COMMIT_RETRIES or
+                    inserts and not isinstance(exc, Conflict)):
+                return [(items, exc)]
+            attempt += 1
+            time.sleep(delay)
+            delay *= 2
+            batch = _make_batch(batch._client, items, mutate)
+        else:
+            return []
+
+
+def commit_concurrently(client, items, keys, mutate,
+                        max_workers=DEFAULT_MAX_WORKERS):
+    """Write items in concurrent commits of a backend-acceptable size.
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client used to commit.
+
+    :type items: list
+    :param items: The items to commit.
+
+    :type keys: list of :class:`google.cloud.datastore.key.Key`
+    :param keys: The key of each item.
+
+    :type mutate: callable, taking ``(batch, item)``
+    :param mutate: Adds the mutation for one item to a batch, e.g.
+                   :meth:`Batch.put`.
+
+    :type max_workers: integer
+    :param max_workers: The number of commits to send at once.
+
+    :rtype: list of tuples
+    :returns: ``(items, exception)`` for each commit which failed, after
+              retries, with a transient error.
+    :raises: :class:`ValueError` if an item is invalid, before any commit
+             is sent;  else the first other error raised by a commit.
+    """
+    # Build every batch first, so that invalid items fail early.
+    sequences = [[(_make_batch(client, commit, mutate), commit)
+                  for commit in sequence]
+                 for sequence in _plan_commits(items, keys, _MAX_MUTATIONS)]
+
+    def _commit_sequence(connection, sequence):
+        failures = []
+        for batch, commit in sequence:
+            failures.extend(
+                _commit_with_retries(connection, batch, commit, mutate))
+        return failures
+
+    results = map_concurrently(client.connection, _commit_sequence,
+                               sequences, max_workers)
+    return [failure for failures in results for failure in failures]
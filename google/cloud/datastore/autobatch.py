@@ -0,0 +1,339 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Combine single-entity operations from many threads into bulk requests.
+
+An :class:`AutoBatcher` collects the lookups and writes issued within a
+short window, from any thread, and sends them as one ``lookup`` and one
+``commit`` request::
+
+  >>> from google.cloud import datastore
+  >>> from google.cloud.datastore.autobatch import AutoBatcher
+  >>> client = datastore.Client()
+  >>> with AutoBatcher(client) as batcher:
+  ...     futures = [batcher.get(key) for key in keys]  # From any thread.
+  ...     entities = [future.result() for future in futures]
+"""
+
+import collections
+import copy
+import threading
+import time
+
+from google.cloud.datastore._bulk import _MAX_MUTATIONS
+from google.cloud.datastore._bulk import _chunks
+from google.cloud.datastore._bulk import _worker_connection
+from google.cloud.datastore.batch import Batch
+from google.cloud.datastore.future import Future
+
+
+class AutoBatcher(object):
+    """Send single-entity operations in bulk requests.
+
+    Operations are sent by a background thread, with a connection of its
+    own, once ``max_delay`` has passed since the first of them was issued,
+    or as soon as ``max_batch_size`` lookups or writes are pending.  Within
+    a window, writes are sent before lookups, and several writes of one
+    key are combined into the last.
+
+    Operations are not part of any batch or transaction active on the
+    calling thread.
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client used to connect to datastore.
+
+    :type max_batch_size: integer
+    :param max_batch_size: (Optional) The number of pending lookups, or of
+                           pending writes, which are sent without waiting
+                           for the end of the window.
+
+    :type max_delay: float
+    :param max_delay: (Optional) The number of seconds an operation waits
+                      for others to be issued.
+
+    :raises: :class:`ValueError` if ``max_batch_size`` is less than 1.
+    """
+
+    def __init__(self, client, max_batch_size=_MAX_MUTATIONS,
+                 max_delay=0.01):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self._client = client
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._condition = threading.Condition()
+        # Futures waiting for each key looked up.
+        self._lookups = collections.OrderedDict()
+        # ``(mutate, item, futures)`` for each key written.
+        self._writes = collections.OrderedDict()
+        self._opened = None
+        self._flushing = False
+        self._closed = False
+        self._sender = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def get(self, key):
+        """Look up an entity.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future whose result is the entity, or ``None`` if it
+                  does not exist.
+        :raises: :class:`ValueError` if the batcher is closed.
+        """
+        future = Future()
+        with self._condition:
+            self._check_open()
+            self._lookups.setdefault(key, []).append(future)
+            self._queued(len(self._lookups))
+        return future
+
+    def put(self, entity):
+        """Save an entity.
+
+        As with :meth:`google.cloud.datastore.client.Client.put`, a partial
+        key is completed once the entity is saved.
+
+        :type entity: :class:`google.cloud.datastore.entity.Entity`
+        :param entity: The entity to be saved.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future whose result is ``None`` once the entity is saved.
+        :raises: :class:`ValueError` if the batcher is closed.
+        """
+        key = entity.key
+        if key is None or key.is_partial:
+            slot = id(entity)  # Each insert is distinct.
+        else:
+            slot = key
+        return self._write(slot, Batch.put, entity)
+
+    def delete(self, key):
+        """Delete an entity.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future whose result is ``None`` once the entity is
+                  deleted.
+        :raises: :class:`ValueError` if the batcher is closed.
+        """
+        return self._write(key, Batch.delete, key)
+
+    def flush(self):
+        """Send the pending operations now, and wait for them to complete.
+
+        Errors are set on the operations' futures, not raised.
+        """
+        with self._condition:
+            futures = [future
+                       for waiting in self._lookups.values()
+                       for future in waiting]
+            futures.extend(future
+                           for _, _, waiting in self._writes.values()
+                           for future in waiting)
+            if futures:
+                self._flushing = True
+                self._condition.notify()
+        for future in futures:
+            future.exception()
+
+    def close(self):
+        """Send the pending operations, and stop the background thread.
+
+        Further operations are refused.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            sender = self._sender
+        if sender is not None:
+            sender.join()
+
+    def _check_open(self):
+        """Refuse operations once closed.
+
+        :raises: :class:`ValueError` if the batcher is closed.
+        """
+        if self._closed:
+            raise ValueError('AutoBatcher is closed')
+
+    def _write(self, slot, mutate, item):
+        """Queue a write, replacing any pending write of the same key.
+
+        :type slot: object
+        :param slot: Identifies the entity written.
+
+        :type mutate: callable, taking ``(batch, item)``
+        :param mutate: Adds the mutation for the item to a batch.
+
+        :type item: object
+        :param item: The entity saved, or the key deleted.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future whose result is ``None`` once written.
+        """
+        future = Future()
+        with self._condition:
+            self._check_open()
+            _, _, futures = self._writes.pop(slot, (None, None, []))
+            futures.append(future)
+            self._writes[slot] = (mutate, item, futures)
+            self._queued(len(self._writes))
+        return future
+
+    def _queued(self, num_pending):
+        """Wake the sender for an operation just queued.
+
+        Called with the lock held.
+
+        :type num_pending: integer
+        :param num_pending: The number of pending operations of its kind.
+        """
+        if self._opened is None:
+            self._opened = time.time()
+        if num_pending >= self.max_batch_size:
+            self._flushing = True
+        if self._sender is None:
+            self._sender = threading.Thread(target=self._run)
+            self._sender.daemon = True
+            self._sender.start()
+        self._condition.notify()
+
+    def _take(self):
+        """Wait for the end of a window, and take its operations.
+
+        Called with the lock held.
+
+        :rtype: tuple
+        :returns: The pending lookups and writes, or ``(None, None)`` once
+                  closed with nothing pending.
+        """
+        while True:
+            if not self._lookups and not self._writes:
+                if self._closed:
+                    return None, None
+                self._condition.wait()
+                continue
+            if self._flushing or self._closed:
+                break
+            remaining = self._opened + self.max_delay - time.time()
+            if remaining <= 0:
+                break
+            self._condition.wait(remaining)
+        lookups, self._lookups = self._lookups, collections.OrderedDict()
+        writes, self._writes = self._writes, collections.OrderedDict()
+        self._opened = None
+        self._flushing = False
+        return lookups, writes
+
+    def _run(self):
+        """Send operations until closed."""
+        client = copy.copy(self._client)
+        if client.connection.credentials is not None:
+            client.connection = _worker_connection(client.connection)
+        while True:
+            with self._condition:
+                lookups, writes = self._take()
+            if lookups is None:
+                return
+            _send_writes(client, writes)
+            _send_lookups(client, lookups)
+
+
+def _send_writes(client, writes):
+    """Commit pending writes, and complete their futures.
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client used to commit.
+
+    :type writes: :class:`collections.OrderedDict`
+    :param writes: ``(mutate, item, futures)`` for each entity written.
+    """
+    for chunk in _chunks(list(writes.values()), _MAX_MUTATIONS):
+        batch = Batch(client)
+        batch.begin()
+        sent = []
+        for mutate, item, futures in chunk:
+            try:
+                mutate(batch, item)
+            except ValueError as exc:
+                _complete(futures, error=exc)
+            else:
+                sent.extend(futures)
+        if not sent:
+            continue
+        try:
+            batch.commit()
+        except Exception as exc:  # pylint: disable=broad-except
+            _complete(sent, error=exc)
+        else:
+            _complete(sent)
+
+
+def _send_lookups(client, lookups):
+    """Look up pending keys, and complete their futures.
+
+    :type client: :class:`google.cloud.datastore.client.Client`
+    :param client: The client used to look up keys.
+
+    :type lookups: :class:`collections.OrderedDict`
+    :param lookups: The futures waiting for each key.
+    """
+    keys = []
+    for key, futures in lookups.items():
+        if key.project != client.project:
+            _complete(futures, error=ValueError('Key does not match project'))
+        else:
+            keys.append(key)
+    if not keys:
+        return
+    try:
+        entities = client.get_multi(keys)
+    except Exception as exc:  # pylint: disable=broad-except
+        _complete([future for key in keys for future in lookups[key]],
+                  error=exc)
+        return
+    found = dict((entity.key, entity) for entity in entities)
+    for key in keys:
+        entity = found.get(key)
+        futures = lookups[key]
+        futures[0].set_result(entity)
+        for future in futures[1:]:
+            # Each caller may change the entity it gets.
+            future.set_result(copy.deepcopy(entity))
+
+
+def _complete(futures, error=None):
+    """Complete futures without a result.
+
+    :type futures: list of :class:`google.cloud.datastore.future.Future`
+    :param futures: The futures to complete.
+
+    :type error: :class:`Exception`
+    :param error: (Optional) The exception to set on each future.
+    """
+    for future in futures:
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
@@ -79,6 +79,7 @@ class Batch(object):
         self._client = client
         self._commit_request = _datastore_pb2.CommitRequest()
         self._partial_key_entities = []
+        self._written_keys = []
         self._status = self._INITIAL
 
     def current(self):
@@ -201,6 +202,7 @@ class Batch(object):
             self._partial_key_entities.append(entity)
         else:
             entity_pb = self._add_complete_key_entity_pb()
+            self._written_keys.append(entity.key)
 
         _assign_entity_to_pb(entity_pb, entity)
 
@@ -223,8 +225,9 @@ class Batch(object):
         if self.project != key.project:
             raise ValueError("Key must be from same project as batch")
 
-        key_pb = key.to_protobuf()
+        key_pb = key._cached_protobuf()
         self._add_delete_key_pb().CopyFrom(key_pb)
+        self._written_keys.append(key)
 
     def begin(self):
         """Begins a batch.
@@ -264,6 +267,9 @@ class Batch(object):
         however it can be called explicitly if you don't want to use a
         context manager.
 
+        The entities written are dropped from the client's cache, if any,
+        even if the commit fails (it may have been applied).
+
         :raises: :class:`~exceptions.ValueError` if the batch is not
                  in progress.
         """
@@ -274,6 +280,9 @@ class Batch(object):
             self._commit()
         finally:
             self._status = self._FINISHED
+            cache = self._client.cache
+            if cache is not None:
+                cache.invalidate(self._written_keys)
 
     def rollback(self):
         """Rolls back the current batch.
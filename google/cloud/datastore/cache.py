@@ -0,0 +1,171 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process cache of Cloud Datastore entities.
+
+Pass an :class:`EntityCache` to a client to serve repeated lookups of the
+same keys from memory::
+
+  >>> from google.cloud import datastore
+  >>> from google.cloud.datastore.cache import EntityCache
+  >>> client = datastore.Client(cache=EntityCache(max_size=500, ttl=60))
+  >>> client.get(key)  # Sends a lookup request.
+  <Entity[{'kind': 'Config', 'name': 'site'}] {'theme': 'dark'}>
+  >>> client.get(key)  # Served from the cache.
+  <Entity[{'kind': 'Config', 'name': 'site'}] {'theme': 'dark'}>
+
+The client fills the cache with the entities returned by lookups and by
+ancestor queries (other than projection queries), and drops the keys
+written by each batch or transaction it commits.  A read which was sent
+before a commit dropped one of its keys, and returns after, does not
+cache the entity it read.  Reads within a transaction neither use nor
+fill the cache;  nor do other queries, whose results are only eventually
+consistent.
+
+Writes made by other processes are not seen until an entry expires:  set
+``ttl`` to bound how stale a cached entity may be.
+"""
+
+import collections
+import copy
+import threading
+import time
+
+
+class EntityCache(object):
+    """A thread-safe cache of entities by key, evicting the least recently
+    used entries.
+
+    Cached entities are copies:  changing an entity returned by the cache,
+    or stored in it, does not change the cached copy.
+
+    :type max_size: integer
+    :param max_size: (Optional) The number of entities kept.
+
+    :type ttl: float
+    :param ttl: (Optional) The number of seconds after which a cached entity
+                expires.  If not passed, entities are kept until evicted.
+
+    :raises: :class:`ValueError` if ``max_size`` is less than 1.
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # The generation of each recent invalidation, by key:  older ones
+        # are forgotten, up to the generation in ``_forgotten``.
+        self._generation = 0
+        self._invalidated = collections.OrderedDict()
+        self._forgotten = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return '<EntityCache %d/%d entities, %d hits, %d misses>' % (
+            len(self), self.max_size, self.hits, self.misses)
+
+    def get(self, key):
+        """Look up the entity with a key.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key of the entity.
+
+        :rtype: :class:`google.cloud.datastore.entity.Entity` or
+                ``NoneType``
+        :returns: A copy of the cached entity, or ``None`` if it is not
+                  cached or has expired.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                expires, entity = entry
+                if expires is None or expires > time.time():
+                    # Re-inserted last, as the most recently used.
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return copy.deepcopy(entity)
+            self.misses += 1
+
+    def read_token(self):
+        """Return a token for a read about to be sent.
+
+        Pass it to :meth:`set` with the entities read, so that those
+        whose keys are invalidated meanwhile are not cached.
+
+        :rtype: integer
+        :returns: The number of invalidations so far.
+        """
+        with self._lock:
+            return self._generation
+
+    def set(self, entity, token=None):
+        """Cache an entity, replacing any cached for its key.
+
+        :type entity: :class:`google.cloud.datastore.entity.Entity`
+        :param entity: An entity with a complete key.
+
+        :type token: integer
+        :param token: (Optional) The value of :meth:`read_token` before
+                      the entity was read.  If passed, the entity is not
+                      cached if its key was invalidated since.
+
+        :raises: :class:`ValueError` if the entity's key is missing or
+                 partial.
+        """
+        key = entity.key
+        if key is None or key.is_partial:
+            raise ValueError('Only entities with a complete key are cached')
+        expires = None
+        if self.ttl is not None:
+            expires = time.time() + self.ttl
+        entry = (expires, copy.deepcopy(entity))
+        with self._lock:
+            if token is not None and (
+                    token < self._forgotten or
+                    self._invalidated.get(key, token) > token):
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys):
+        """Drop the entities with the given keys, if cached.
+
+        :type keys: list of :class:`google.cloud.datastore.key.Key`
+        :param keys: The keys of the entities.
+        """
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+                self._invalidated.pop(key, None)
+                self._invalidated[key] = self._generation
+            while len(self._invalidated) > self.max_size:
+                _, self._forgotten = self._invalidated.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached entity."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidated.clear()
+            self._forgotten = self._generation
@@ -14,6 +14,8 @@
 """Convenience wrapper for invoking APIs/factories w/ a project."""
 
 import os
+import random
+import time
 
 from google.cloud._helpers import _LocalStack
 from google.cloud._helpers import (
@@ -21,6 +23,11 @@ from google.cloud._helpers import (
 from google.cloud.client import _ClientProjectMixin
 from google.cloud.client import Client as _BaseClient
 from google.cloud.datastore import helpers
+from google.cloud.datastore._bulk import DEFAULT_MAX_WORKERS
+from google.cloud.datastore._bulk import _chunks
+from google.cloud.datastore._bulk import call_async
+from google.cloud.datastore._bulk import commit_concurrently
+from google.cloud.datastore._bulk import map_concurrently
 from google.cloud.datastore.connection import Connection
 from google.cloud.datastore.batch import Batch
 from google.cloud.datastore.entity import Entity
@@ -28,11 +35,22 @@ from google.cloud.datastore.key import Key
 from google.cloud.datastore.query import Query
 from google.cloud.datastore.transaction import Transaction
 from google.cloud.environment_vars import GCD_DATASET
+from google.cloud.exceptions import Conflict
 
 
 _MAX_LOOPS = 128
 """Maximum number of iterations to wait for deferred keys."""
 
+_MAX_LOOKUP_KEYS = 1000
+"""Maximum number of keys the backend accepts in one lookup request."""
+
+_TRANSACTION_RETRIES = 3
+"""Default number of times a transaction aborted by contention is rerun."""
+
+_TRANSACTION_BACKOFF = 0.1
+"""Default longest wait, in seconds, before the first rerun of a transaction;
+doubled for each one after."""
+
 
 def _get_gcd_project():
     """Gets the GCD application ID if it can be inferred."""
@@ -102,15 +120,7 @@ def _extended_lookup(connection, project, key_pbs,
 
     :rtype: list of :class:`._generated.entity_pb2.Entity`
     :returns: The requested entities.
-    :raises: :class:`ValueError` if missing / deferred are not null or
-             empty list.
     """
-    if missing is not None and missing != []:
-        raise ValueError('missing must be None or an empty list')
-
-    if deferred is not None and deferred != []:
-        raise ValueError('deferred must be None or an empty list')
-
     results = []
 
     loop_num = 0
@@ -143,6 +153,76 @@ def _extended_lookup(connection, project, key_pbs,
     return results
 
 
+def _get_cached(cache, keys):
+    """Look up keys in an entity cache.
+
+    Helper for :meth:`Client.get_multi`.
+
+    :type cache: :class:`google.cloud.datastore.cache.EntityCache` or
+                 ``NoneType``
+    :param cache: The cache to use, if any.
+
+    :type keys: list of :class:`google.cloud.datastore.key.Key`
+    :param keys: The keys to look up.
+
+    :rtype: tuple
+    :returns: The entities found in the cache, and the keys of those not
+              found.
+    """
+    if cache is None:
+        return [], keys
+    found, uncached = [], []
+    for key in keys:
+        entity = cache.get(key)
+        if entity is None:
+            uncached.append(key)
+        else:
+            found.append(entity)
+    return found, uncached
+
+
+def _report_failures(found, failures):
+    """Pass on the failed commits of a bulk write.
+
+    Helper for :meth:`Client.put_multi` and :meth:`Client.delete_multi`.
+
+    :type found: list of tuples
+    :param found: ``(items, exception)`` for each failed commit.
+
+    :type failures: list
+    :param failures: (Optional) If a list is passed, ``found`` is copied
+                     into it.
+
+    :raises: the first exception in ``found``, if ``failures`` is None.
+    """
+    if failures is not None:
+        failures.extend(found)
+    elif found:
+        raise found[0][1]
+
+
+def _input_order(keys):
+    """Make a sort key putting results in the order of the keys requested.
+
+    Keys are matched by path rather than by equality, since partial keys
+    never compare equal.
+
+    :type keys: list of :class:`google.cloud.datastore.key.Key`
+    :param keys: The keys requested.
+
+    :rtype: callable
+    :returns: A function mapping a result's key to its position in ``keys``.
+              Keys which were not requested sort last.
+    """
+    def _path(key):
+        return key.project, key.namespace, key.flat_path
+
+    positions = {}
+    for index, key in enumerate(keys):
+        positions.setdefault(_path(key), index)
+    return lambda key: positions.get(_path(key), len(keys))
+
+
 class Client(_BaseClient, _ClientProjectMixin):
     """Convenience wrapper for invoking APIs/factories w/ a project.
 
@@ -163,13 +243,19 @@ class Client(_BaseClient, _ClientProjectMixin):
     :param http: An optional HTTP object to make requests. If not passed, an
                  ``http`` object is created that is bound to the
                  ``credentials`` for the current object.
+
+    :type cache: :class:`google.cloud.datastore.cache.EntityCache`
+    :param cache: (optional) cache of the entities looked up, or read by
+                  ancestor queries, through this client, outside
+                  transactions.
     """
     _connection_class = Connection
 
     def __init__(self, project=None, namespace=None,
-                 credentials=None, http=None):
+                 credentials=None, http=None, cache=None):
         _ClientProjectMixin.__init__(self, project=project)
         self.namespace = namespace
+        self.cache = cache
         self._batch_stack = _LocalStack()
         super(Client, self).__init__(credentials, http)
 
@@ -257,9 +343,14 @@ class Client(_BaseClient, _ClientProjectMixin):
         if entities:
             return entities[0]
 
-    def get_multi(self, keys, missing=None, deferred=None, transaction=None):
+    def get_multi(self, keys, missing=None, deferred=None, transaction=None,
+                  max_workers=DEFAULT_MAX_WORKERS, lazy=False):
         """Retrieve entities, along with their attributes.
 
+        Keys are looked up in requests of at most 1000 keys, up to
+        ``max_workers`` of which (each with any follow-up requests for
+        keys the backend deferred) are sent at once.
+
         :type keys: list of :class:`google.cloud.datastore.key.Key`
         :param keys: The keys to be retrieved from the datastore.
 
@@ -277,11 +368,28 @@ class Client(_BaseClient, _ClientProjectMixin):
         :param transaction: (Optional) Transaction to use for read consistency.
                             If not passed, uses current transaction, if set.
 
+        :type max_workers: integer
+        :param max_workers: (Optional) The number of lookup requests to send
+                            at once.
+
+        :type lazy: boolean
+        :param lazy: (Optional) If true, the entities returned are
+                     :class:`~google.cloud.datastore.entity.LazyEntity`
+                     instances, which decode each property when first
+                     accessed.
+
         :rtype: list of :class:`google.cloud.datastore.entity.Entity`
-        :returns: The requested entities.
+        :returns: The requested entities, in the order of ``keys``.
         :raises: :class:`ValueError` if one or more of ``keys`` has a project
-                 which does not match our project.
+                 which does not match our project, or if missing / deferred
+                 are not null or empty list.
         """
+        if missing is not None and missing != []:
+            raise ValueError('missing must be None or an empty list')
+
+        if deferred is not None and deferred != []:
+            raise ValueError('deferred must be None or an empty list')
+
         if not keys:
             return []
 
@@ -292,28 +400,83 @@ class Client(_BaseClient, _ClientProjectMixin):
 
         if transaction is None:
             transaction = self.current_transaction
+        transaction_id = transaction and transaction.id
+        cache = self.cache if transaction is None else None
+        entities, lookup_keys = _get_cached(cache, keys)
+        token = None if cache is None else cache.read_token()
+
+        entity_pbs = self._lookup_concurrently(
+            lookup_keys, missing, deferred, transaction_id, max_workers)
+
+        for entity_pb in entity_pbs:
+            entity = helpers.entity_from_protobuf(entity_pb, lazy=lazy)
+            if cache is not None and not lazy:
+                cache.set(entity, token)
+            entities.append(entity)
+
+        # The backend returns results in no particular order.
+        position = _input_order(keys)
+        entities.sort(key=lambda entity: position(entity.key))
+        if missing:
+            missing.sort(key=lambda entity: position(entity.key))
+        if deferred:
+            deferred.sort(key=position)
+        return entities
+
+    def _lookup_concurrently(self, keys, missing, deferred, transaction_id,
+                             max_workers):
+        """Look up keys in concurrent requests.
+
+        Helper for :meth:`get_multi`.
 
-        entity_pbs = _extended_lookup(
-            connection=self.connection,
-            project=self.project,
-            key_pbs=[k.to_protobuf() for k in keys],
-            missing=missing,
-            deferred=deferred,
-            transaction_id=transaction and transaction.id,
-        )
+        :type keys: list of :class:`google.cloud.datastore.key.Key`
+        :param keys: The keys to be retrieved from the datastore.
 
-        if missing is not None:
-            missing[:] = [
-                helpers.entity_from_protobuf(missed_pb)
-                for missed_pb in missing]
+        :type missing: list
+        :param missing: (Optional) If a list is passed, the key-only entities
+                        returned by the backend as "missing" are added to it.
 
-        if deferred is not None:
-            deferred[:] = [
-                helpers.key_from_protobuf(deferred_pb)
-                for deferred_pb in deferred]
+        :type deferred: list
+        :param deferred: (Optional) If a list is passed, the keys returned
+                         by the backend as "deferred" are added to it.
+
+        :type transaction_id: string
+        :param transaction_id: (Optional) The transaction to read in.
 
-        return [helpers.entity_from_protobuf(entity_pb)
-                for entity_pb in entity_pbs]
+        :type max_workers: integer
+        :param max_workers: The number of lookup requests to send at once.
+
+        :rtype: list of :class:`._generated.entity_pb2.Entity`
+        :returns: The entities found, in no particular order.
+        """
+        def _lookup(connection, key_pbs):
+            chunk_missing = None if missing is None else []
+            chunk_deferred = None if deferred is None else []
+            found = _extended_lookup(
+                connection=connection,
+                project=self.project,
+                key_pbs=key_pbs,
+                missing=chunk_missing,
+                deferred=chunk_deferred,
+                transaction_id=transaction_id,
+            )
+            return found, chunk_missing or (), chunk_deferred or ()
+
+        entity_pbs = []
+        results = map_concurrently(
+            self.connection, _lookup,
+            _chunks([key._cached_protobuf() for key in keys],
+                    _MAX_LOOKUP_KEYS),
+            max_workers)
+        for found, missing_pbs, deferred_pbs in results:
+            entity_pbs.extend(found)
+            if missing is not None:
+                missing.extend(helpers.entity_from_protobuf(missed_pb)
+                               for missed_pb in missing_pbs)
+            if deferred is not None:
+                deferred.extend(helpers.key_from_protobuf(deferred_pb)
+                                for deferred_pb in deferred_pbs)
+        return entity_pbs
 
     def put(self, entity):
         """Save an entity in the Cloud Datastore.
@@ -329,12 +492,41 @@ class Client(_BaseClient, _ClientProjectMixin):
         """
         self.put_multi(entities=[entity])
 
-    def put_multi(self, entities):
+    def put_multi(self, entities, bulk=False, max_workers=DEFAULT_MAX_WORKERS,
+                  failures=None):
         """Save entities in the Cloud Datastore.
 
+        By default, the entities are saved in a single commit (or added to
+        the current batch or transaction), so that they are saved
+        atomically, and any error is raised at once.
+
+        Bulk writes are opt-in:  with ``bulk=True``, outside a batch or
+        transaction, the entities are instead saved in commits of at most
+        500 mutations, up to ``max_workers`` of which are sent at once,
+        each on a connection of its own.  Entities of one entity group are
+        never in concurrent commits, so that they do not contend, and
+        commits which fail transiently (e.g. with 409, 429 or 5xx errors)
+        are retried, after a pause.  A bulk write is not atomic:  some
+        commits may be saved while others fail.
+
         :type entities: list of :class:`google.cloud.datastore.entity.Entity`
         :param entities: The entities to be saved to the datastore.
 
+        :type bulk: bool
+        :param bulk: (Optional) Save the entities in concurrent, retried
+                     commits, as above.  Defaults to False.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) With ``bulk``, the number of commits
+                            to send at once.
+
+        :type failures: list
+        :param failures: (Optional) With ``bulk``, if a list is passed,
+                         ``(entities, exception)`` for each commit which
+                         failed transiently, even when retried, will be
+                         copied into it, rather than the first exception
+                         raised.
+
         :raises: :class:`ValueError` if ``entities`` is a single entity.
         """
         if isinstance(entities, Entity):
@@ -346,6 +538,13 @@ class Client(_BaseClient, _ClientProjectMixin):
         current = self.current_batch
         in_batch = current is not None
 
+        if bulk and not in_batch:
+            found = commit_concurrently(
+                self, entities, [entity.key for entity in entities],
+                Batch.put, max_workers)
+            _report_failures(found, failures)
+            return
+
         if not in_batch:
             current = self.batch()
             current.begin()
@@ -370,11 +569,31 @@ class Client(_BaseClient, _ClientProjectMixin):
         """
         self.delete_multi(keys=[key])
 
-    def delete_multi(self, keys):
+    def delete_multi(self, keys, bulk=False, max_workers=DEFAULT_MAX_WORKERS,
+                     failures=None):
         """Delete keys from the Cloud Datastore.
 
+        By default, the keys are deleted in a single commit (or added to
+        the current batch or transaction).  With ``bulk=True``, outside a
+        batch or transaction, they are instead deleted in concurrent,
+        retried commits, as by :meth:`put_multi`.
+
         :type keys: list of :class:`google.cloud.datastore.key.Key`
         :param keys: The keys to be deleted from the Datastore.
+
+        :type bulk: bool
+        :param bulk: (Optional) Delete the keys in concurrent, retried
+                     commits.  Defaults to False.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) With ``bulk``, the number of commits
+                            to send at once.
+
+        :type failures: list
+        :param failures: (Optional) With ``bulk``, if a list is passed,
+                         ``(keys, exception)`` for each commit which failed
+                         transiently, even when retried, will be copied
+                         into it, rather than the first exception raised.
         """
         if not keys:
             return
@@ -383,6 +602,12 @@ class Client(_BaseClient, _ClientProjectMixin):
         current = self.current_batch
         in_batch = current is not None
 
+        if bulk and not in_batch:
+            found = commit_concurrently(self, keys, keys, Batch.delete,
+                                        max_workers)
+            _report_failures(found, failures)
+            return
+
         if not in_batch:
             current = self.batch()
             current.begin()
@@ -393,6 +618,109 @@ class Client(_BaseClient, _ClientProjectMixin):
         if not in_batch:
             current.commit()
 
+    def get_async(self, key, transaction=None):
+        """Retrieve an entity on a background thread.
+
+        As :meth:`get`, except that the lookup is sent by one of the
+        worker threads shared by all clients (at most eight, each with a
+        connection of its own), so that the caller may send other requests
+        meanwhile.
+        Within a batch or transaction, or if the connection uses a custom
+        ``http`` object (which cannot be shared between threads), the
+        lookup is sent at once, on the calling thread.
+
+        :type key: :class:`google.cloud.datastore.key.Key`
+        :param key: The key to be retrieved from the datastore.
+
+        :type transaction: :class:`~.transaction.Transaction`
+        :param transaction: (Optional) Transaction to use for read consistency.
+                            If not passed, uses current transaction, if set.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future for the entity, or for ``None`` if it does not
+                  exist.
+        """
+        return call_async(self, Client.get, key, transaction=transaction)
+
+    def get_multi_async(self, keys, transaction=None,
+                        max_workers=DEFAULT_MAX_WORKERS, lazy=False):
+        """Retrieve entities on a background thread.
+
+        As :meth:`get_multi`, but returns at once:  see :meth:`get_async`.
+
+        :type keys: list of :class:`google.cloud.datastore.key.Key`
+        :param keys: The keys to be retrieved from the datastore.
+
+        :type transaction: :class:`~.transaction.Transaction`
+        :param transaction: (Optional) Transaction to use for read consistency.
+                            If not passed, uses current transaction, if set.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) The number of lookup requests to send
+                            at once.
+
+        :type lazy: boolean
+        :param lazy: (Optional) If true, the entities are
+                     :class:`~google.cloud.datastore.entity.LazyEntity`
+                     instances.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future for the list of entities found, in the order of
+                  ``keys``.
+        """
+        return call_async(self, Client.get_multi, keys,
+                          transaction=transaction, max_workers=max_workers,
+                          lazy=lazy)
+
+    def put_multi_async(self, entities, bulk=False,
+                        max_workers=DEFAULT_MAX_WORKERS):
+        """Save entities on a background thread.
+
+        As :meth:`put_multi`, but returns at once:  see :meth:`get_async`.
+        Within a batch or transaction, the entities are added to it, and
+        the future returned is already done.
+
+        :type entities: list of :class:`google.cloud.datastore.entity.Entity`
+        :param entities: The entities to be saved to the datastore.
+
+        :type bulk: bool
+        :param bulk: (Optional) Save the entities in concurrent, retried
+                     commits, as by :meth:`put_multi`.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) With ``bulk``, the number of commits
+                            to send at once.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future for ``None``, done once the entities are saved.
+        """
+        return call_async(self, Client.put_multi, entities, bulk=bulk,
+                          max_workers=max_workers)
+
+    def delete_multi_async(self, keys, bulk=False,
+                           max_workers=DEFAULT_MAX_WORKERS):
+        """Delete keys on a background thread.
+
+        As :meth:`delete_multi`, but returns at once:  see
+        :meth:`put_multi_async`.
+
+        :type keys: list of :class:`google.cloud.datastore.key.Key`
+        :param keys: The keys to be deleted from the Datastore.
+
+        :type bulk: bool
+        :param bulk: (Optional) Delete the keys in concurrent, retried
+                     commits, as by :meth:`delete_multi`.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) With ``bulk``, the number of commits
+                            to send at once.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future for ``None``, done once the keys are deleted.
+        """
+        return call_async(self, Client.delete_multi, keys, bulk=bulk,
+                          max_workers=max_workers)
+
     def allocate_ids(self, incomplete_key, num_ids):
         """Allocate a list of IDs from a partial key.
 
@@ -411,7 +739,7 @@ class Client(_BaseClient, _ClientProjectMixin):
         if not incomplete_key.is_partial:
             raise ValueError(('Key is not partial.', incomplete_key))
 
-        incomplete_key_pb = incomplete_key.to_protobuf()
+        incomplete_key_pb = incomplete_key._cached_protobuf()
         incomplete_key_pbs = [incomplete_key_pb] * num_ids
 
         conn = self.connection
@@ -442,6 +770,84 @@ class Client(_BaseClient, _ClientProjectMixin):
         """Proxy to :class:`google.cloud.datastore.transaction.Transaction`."""
         return Transaction(self)
 
+    def run_in_transaction(self, func, retries=_TRANSACTION_RETRIES,
+                           backoff=_TRANSACTION_BACKOFF, timeout=None,
+                           attempts=None):
+        """Call a function in a transaction, rerunning it on contention.
+
+        ``func`` is called with a new transaction, which is committed once
+        it returns.  If the backend aborts the transaction (raising
+        :class:`~google.cloud.exceptions.Conflict`), e.g., because another
+        transaction changed the same entity group, ``func`` is called
+        again in a new transaction, after a random wait of up to
+        ``backoff`` seconds, doubled for each rerun::
+
+          >>> def transfer(transaction):
+          ...     source, dest = client.get_multi([source_key, dest_key])
+          ...     source['balance'] -= 10
+          ...     dest['balance'] += 10
+          ...     client.put_multi([source, dest])
+          >>> client.run_in_transaction(transfer, retries=5)
+
+        ``func`` may be called several times, so should have no effects
+        outside the transaction.
+
+        :type func: callable, taking the transaction
+        :param func: The function to call.
+
+        :type retries: integer
+        :param retries: (Optional) The number of times ``func`` is rerun.
+
+        :type backoff: float
+        :param backoff: (Optional) The longest wait, in seconds, before the
+                        first rerun.
+
+        :type timeout: float
+        :param timeout: (Optional) The number of seconds after the first
+                        call past which ``func`` is not rerun.  If not
+                        passed, only ``retries`` limits the reruns.
+
+        :type attempts: list
+        :param attempts: (Optional) If a list is passed, ``(seconds,
+                         exception)`` for each call of ``func`` and commit
+                         will be copied into it:  its duration, and the
+                         exception raised, or ``None`` for the one that
+                         succeeded.
+
+        :rtype: object
+        :returns: The value returned by ``func``.
+        :raises: :class:`ValueError` if called within a transaction;  else
+                 the exception raised by the last call of ``func`` or
+                 commit, if none succeeded.
+        """
+        if self.current_transaction is not None:
+            raise ValueError('Transactions cannot be nested')
+
+        started = time.time()
+        delay = backoff
+        attempt = 0
+        while True:
+            attempt_started = time.time()
+            try:
+                with self.transaction() as transaction:
+                    result = func(transaction)
+            except Exception as exc:  # pylint: disable=broad-except
+                if attempts is not None:
+                    attempts.append((time.time() - attempt_started, exc))
+                if not isinstance(exc, Conflict) or attempt == retries:
+                    raise
+                wait = random.uniform(0, delay)
+                if (timeout is not None and
+                        time.time() + wait - started > timeout):
+                    raise
+                time.sleep(wait)
+                delay *= 2
+                attempt += 1
+            else:
+                if attempts is not None:
+                    attempts.append((time.time() - attempt_started, None))
+                return result
+
     def query(self, **kwargs):
         """Proxy to :class:`google.cloud.datastore.query.Query`.
 
@@ -141,3 +141,160 @@ class Entity(dict):
                                       super(Entity, self).__repr__())
         else:
             return '<Entity %s>' % (super(Entity, self).__repr__())
+
+
+class LazyEntity(Entity):
+    """An entity whose properties are decoded from protobuf on first access.
+
+    Returned by :meth:`google.cloud.datastore.client.Client.get_multi` and
+    :meth:`google.cloud.datastore.query.Query.fetch` when passed
+    ``lazy=True``:  reading a few properties of a wide entity then costs
+    no more than decoding those.
+
+    Looking up a property by name (``entity[name]``, :meth:`get`, ``in``)
+    decodes only that property;  other operations on the entity as a
+    whole (iterating, comparing, :meth:`items`, saving it) decode every
+    property first.
+
+    .. note::
+
+       Code which reads the underlying ``dict`` directly, rather than
+       through its methods, sees only the properties already decoded:
+       for instance :func:`json.dumps`, or ``dict(entity)`` under
+       Python 2.  Pass it the result of :meth:`to_entity` instead.
+       Pickling or copying a lazy entity gives a plain :class:`Entity`.
+
+    :type key: :class:`google.cloud.datastore.key.Key`
+    :param key: Optional key to be set on entity.
+
+    :type value_pbs: dict
+    :param value_pbs: The protobuf of each property's value, by name.
+    """
+
+    def __init__(self, key=None, value_pbs=None):
+        super(LazyEntity, self).__init__(key=key)
+        self._value_pbs = dict(value_pbs or {})
+
+    def _decode(self, name):
+        """Decode a property, if not yet done.
+
+        :type name: string
+        :param name: The name of the property.
+        """
+        value_pb = self._value_pbs.pop(name, None)
+        if value_pb is None:
+            return
+        from google.cloud.datastore.helpers import _decode_property
+        value, meaning, excluded = _decode_property(value_pb)
+        if meaning is not None:
+            self._meanings[name] = (meaning, value)
+        if excluded:
+            self._exclude_from_indexes.add(name)
+        super(LazyEntity, self).__setitem__(name, value)
+
+    def _decode_all(self):
+        """Decode every property not yet decoded."""
+        for name in list(self._value_pbs):
+            self._decode(name)
+
+    def to_entity(self):
+        """Decode every property into a plain entity.
+
+        :rtype: :class:`Entity`
+        :returns: A new entity, with the same key and properties.
+        """
+        self._decode_all()
+        entity = Entity(key=self.key,
+                        exclude_from_indexes=tuple(self._exclude_from_indexes))
+        entity._meanings = dict(self._meanings)
+        entity.update(self.items())
+        return entity
+
+    def __reduce__(self):
+        # The default would restore the properties decoded so far, via
+        # __setitem__, before the protobufs of the others.
+        entity = self.to_entity()
+        return Entity, (), entity.__dict__, None, iter(entity.items())
+
+    def __getitem__(self, name):
+        self._decode(name)
+        return super(LazyEntity, self).__getitem__(name)
+
+    def get(self, name, default=None):
+        self._decode(name)
+        return super(LazyEntity, self).get(name, default)
+
+    def __contains__(self, name):
+        return (name in self._value_pbs or
+                super(LazyEntity, self).__contains__(name))
+
+    def __len__(self):
+        return super(LazyEntity, self).__len__() + len(self._value_pbs)
+
+    def __setitem__(self, name, value):
+        self._decode(name)
+        super(LazyEntity, self).__setitem__(name, value)
+
+    def __delitem__(self, name):
+        self._decode(name)
+        super(LazyEntity, self).__delitem__(name)
+
+    def setdefault(self, name, default=None):
+        self._decode(name)
+        return super(LazyEntity, self).setdefault(name, default)
+
+    def pop(self, name, *default):
+        self._decode(name)
+        return super(LazyEntity, self).pop(name, *default)
+
+    def popitem(self):
+        self._decode_all()
+        return super(LazyEntity, self).popitem()
+
+    def update(self, *args, **kwargs):
+        self._decode_all()
+        super(LazyEntity, self).update(*args, **kwargs)
+
+    def clear(self):
+        self._value_pbs.clear()
+        super(LazyEntity, self).clear()
+
+    def copy(self):
+        self._decode_all()
+        return super(LazyEntity, self).copy()
+
+    def __iter__(self):
+        self._decode_all()
+        return super(LazyEntity, self).__iter__()
+
+    def keys(self):
+        self._decode_all()
+        return super(LazyEntity, self).keys()
+
+    def values(self):
+        self._decode_all()
+        return super(LazyEntity, self).values()
+
+    def items(self):
+        self._decode_all()
+        return super(LazyEntity, self).items()
+
+    def __eq__(self, other):
+        self._decode_all()
+        if isinstance(other, LazyEntity):
+            other._decode_all()
+        return super(LazyEntity, self).__eq__(other)
+
+    @property
+    def exclude_from_indexes(self):
+        """Names of fields which are *not* to be indexed for this entity.
+
+        :rtype: sequence of field names
+        :returns: The set of fields excluded from indexes.
+        """
+        self._decode_all()
+        return super(LazyEntity, self).exclude_from_indexes
+
+    def __repr__(self):
+        self._decode_all()
+        return super(LazyEntity, self).__repr__()
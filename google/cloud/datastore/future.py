@@ -0,0 +1,150 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Results of Cloud Datastore operations running in the background."""
+
+import threading
+
+
+class TimeoutError(Exception):  # pylint: disable=redefined-builtin
+    """Raised when a future is not done within the time given."""
+
+
+class Future(object):
+    """The result of an operation which may not have completed yet.
+
+    Modelled on :class:`concurrent.futures.Future`, which is not available
+    under Python 2.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._done = False
+        self._value = None
+        self._error = None
+        self._callbacks = []
+
+    def __repr__(self):
+        if not self._done:
+            state = 'pending'
+        elif self._error is not None:
+            state = 'raised %r' % (self._error,)
+        else:
+            state = 'returned %r' % (self._value,)
+        return '<Future %s>' % (state,)
+
+    def done(self):
+        """Has the operation completed?
+
+        :rtype: boolean
+        :returns: True once a result or an exception is set.
+        """
+        return self._done
+
+    def _wait(self, timeout):
+        """Wait for the operation to complete.
+
+        :type timeout: float
+        :param timeout: The number of seconds to wait, or ``None`` to wait
+                        as long as it takes.
+
+        :raises: :class:`TimeoutError` if not done in time.
+        """
+        with self._condition:
+            if not self._done:
+                self._condition.wait(timeout)
+            if not self._done:
+                raise TimeoutError('Not done after %s seconds' % (timeout,))
+
+    def result(self, timeout=None):
+        """Wait for the operation's result.
+
+        :type timeout: float
+        :param timeout: (Optional) The number of seconds to wait.  If not
+                        passed, waits as long as it takes.
+
+        :rtype: object
+        :returns: The result of the operation.
+        :raises: the exception raised by the operation, if any, or
+                 :class:`TimeoutError` if not done in time.
+        """
+        self._wait(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def exception(self, timeout=None):
+        """Wait for the operation, and return the exception it raised.
+
+        :type timeout: float
+        :param timeout: (Optional) The number of seconds to wait.  If not
+                        passed, waits as long as it takes.
+
+        :rtype: :class:`Exception` or ``NoneType``
+        :returns: The exception raised by the operation, if any.
+        :raises: :class:`TimeoutError` if not done in time.
+        """
+        self._wait(timeout)
+        return self._error
+
+    def add_done_callback(self, callback):
+        """Call a function once the operation completes.
+
+        :type callback: callable, taking the future
+        :param callback: The function to call:  at once if the operation
+                         is already done, else on the thread completing it.
+        """
+        with self._condition:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, value, error):
+        """Set the outcome of the operation, and wake up its waiters.
+
+        :type value: object
+        :param value: The result of the operation.
+
+        :type error: :class:`Exception` or ``NoneType``
+        :param error: The exception raised by the operation, if any.
+
+        :raises: :class:`ValueError` if the outcome was already set.
+        """
+        with self._condition:
+            if self._done:
+                raise ValueError('Future is already done')
+            self._value = value
+            self._error = error
+            self._done = True
+            self._condition.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def set_result(self, value):
+        """Complete the operation with a result.
+
+        :type value: object
+        :param value: The result of the operation.
+        """
+        self._finish(value, None)
+
+    def set_exception(self, error):
+        """Complete the operation with an exception.
+
+        :type error: :class:`Exception`
+        :param error: The exception raised by the operation.
+        """
+        self._finish(None, error)
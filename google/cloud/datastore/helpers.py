@@ -29,6 +29,7 @@ from google.cloud._helpers import _datetime_to_pb_timestamp
 from google.cloud._helpers import _pb_timestamp_to_datetime
 from google.cloud.datastore._generated import entity_pb2 as _entity_pb2
 from google.cloud.datastore.entity import Entity
+from google.cloud.datastore.entity import LazyEntity
 from google.cloud.datastore.key import Key
 # pylint: enable=ungrouped-imports
 
@@ -104,7 +105,42 @@ def _property_tuples(entity_pb):
     return six.iteritems(entity_pb.properties)
 
 
-def entity_from_protobuf(pb):
+def _decode_property(value_pb):
+    """Decode the value of an entity property from its protobuf.
+
+    :type value_pb: :class:`google.cloud.datastore._generated.entity_pb2.Value`
+    :param value_pb: The protobuf of the property's value.
+
+    :rtype: tuple
+    :returns: The value, its meaning (or ``None``), and whether it is
+              excluded from indexes.
+    :raises: :class:`ValueError` if an array value's items are not all
+             indexed, or all excluded from indexes.
+    """
+    value = _get_value_from_value_pb(value_pb)
+
+    # Check if the property has an associated meaning.
+    is_list = isinstance(value, list)
+    meaning = _get_meaning(value_pb, is_list=is_list)
+
+    # Check if ``value_pb`` was excluded from index. Lists need to be
+    # special-cased and we require all ``exclude_from_indexes`` values
+    # in a list agree.
+    if is_list:
+        exclude_values = set(value_pb.exclude_from_indexes
+                             for value_pb in value_pb.array_value.values)
+        if len(exclude_values) != 1:
+            raise ValueError('For an array_value, subvalues must either '
+                             'all be indexed or all excluded from '
+                             'indexes.')
+        excluded = exclude_values.pop()
+    else:
+        excluded = value_pb.exclude_from_indexes
+
+    return value, meaning, excluded
+
+
+def entity_from_protobuf(pb, lazy=False):
     """Factory method for creating an entity based on a protobuf.
 
     The protobuf should be one returned from the Cloud Datastore
@@ -113,6 +149,11 @@ def entity_from_protobuf(pb):
     :type pb: :class:`google.cloud.datastore._generated.entity_pb2.Entity`
     :param pb: The Protobuf representing the entity.
 
+    :type lazy: boolean
+    :param lazy: (Optional) If true, return a
+                 :class:`~google.cloud.datastore.entity.LazyEntity`, whose
+                 properties are decoded when first accessed.
+
     :rtype: :class:`google.cloud.datastore.entity.Entity`
     :returns: The entity derived from the protobuf.
     """
@@ -120,36 +161,20 @@ def entity_from_protobuf(pb):
     if pb.HasField('key'):  # Message field (Key)
         key = key_from_protobuf(pb.key)
 
+    if lazy:
+        return LazyEntity(key=key, value_pbs=dict(_property_tuples(pb)))
+
     entity_props = {}
     entity_meanings = {}
     exclude_from_indexes = []
 
     for prop_name, value_pb in _property_tuples(pb):
-        value = _get_value_from_value_pb(value_pb)
+        value, meaning, excluded = _decode_property(value_pb)
         entity_props[prop_name] = value
-
-        # Check if the property has an associated meaning.
-        is_list = isinstance(value, list)
-        meaning = _get_meaning(value_pb, is_list=is_list)
         if meaning is not None:
             entity_meanings[prop_name] = (meaning, value)
-
-        # Check if ``value_pb`` was excluded from index. Lists need to be
-        # special-cased and we require all ``exclude_from_indexes`` values
-        # in a list agree.
-        if is_list:
-            exclude_values = set(value_pb.exclude_from_indexes
-                                 for value_pb in value_pb.array_value.values)
-            if len(exclude_values) != 1:
-                raise ValueError('For an array_value, subvalues must either '
-                                 'all be indexed or all excluded from '
-                                 'indexes.')
-
-            if exclude_values.pop():
-                exclude_from_indexes.append(prop_name)
-        else:
-            if value_pb.exclude_from_indexes:
-                exclude_from_indexes.append(prop_name)
+        if excluded:
+            exclude_from_indexes.append(prop_name)
 
     entity = Entity(key=key, exclude_from_indexes=exclude_from_indexes)
     entity.update(entity_props)
@@ -210,7 +235,7 @@ def entity_to_protobuf(entity):
     """
     entity_pb = _entity_pb2.Entity()
     if entity.key is not None:
-        key_pb = entity.key.to_protobuf()
+        key_pb = entity.key._cached_protobuf()
         entity_pb.key.CopyFrom(key_pb)
 
     for name, value in entity.items():
@@ -306,7 +331,7 @@ def _pb_attr_value(val):
         name = 'timestamp'
         value = _datetime_to_pb_timestamp(val)
     elif isinstance(val, Key):
-        name, value = 'key', val.to_protobuf()
+        name, value = 'key', val._cached_protobuf()
     elif isinstance(val, bool):
         name, value = 'boolean', val
     elif isinstance(val, float):
@@ -14,12 +14,17 @@
 
 """Create / interact with Google Cloud Datastore keys."""
 
-import copy
 import six
 
 from google.cloud.datastore._generated import entity_pb2 as _entity_pb2
 
 
+_ID_OR_NAME_TYPES = six.string_types + six.integer_types
+
+_INTERNED = {}
+"""The shared copy of each string interned by keys."""
+
+
 class Key(object):
     """An immutable representation of a datastore Key.
 
@@ -56,6 +61,20 @@ class Key(object):
     * parent (:class:`google.cloud.datastore.key.Key`): The parent of the key.
 
     The project argument is required unless it has been set implicitly.
+
+    Keys store only their flat path, and compute their hash and protobuf
+    once.  Set :attr:`intern_strings` to share one copy of each kind and
+    namespace among keys, e.g., when holding millions of decoded keys.
+    """
+
+    __slots__ = ('_flat_path', '_parent', '_namespace', '_project',
+                 '_hash', '_pb')
+
+    intern_strings = False
+    """If true, keys created share one copy of each kind and namespace.
+
+    Interned strings are kept for the life of the process, so enable this
+    only when the number of distinct kinds and namespaces is bounded.
     """
 
     def __init__(self, *path_args, **kwargs):
@@ -64,9 +83,16 @@ class Key(object):
         self._namespace = kwargs.get('namespace')
         project = kwargs.get('project')
         self._project = _validate_project(project, parent)
+        self._hash = None
+        self._pb = None
         # _flat_path, _parent, _namespace and _project must be set before
         # _combine_args() is called.
-        self._path = self._combine_args()
+        self._combine_args()
+        if self.intern_strings:
+            self._flat_path = tuple(
+                _intern(part) if index % 2 == 0 else part
+                for index, part in enumerate(self._flat_path))
+            self._namespace = _intern(self._namespace)
 
     def __eq__(self, other):
         """Compare two keys for equality.
@@ -85,9 +111,9 @@ class Key(object):
         if self.is_partial or other.is_partial:
             return False
 
-        return (self.flat_path == other.flat_path and
-                self.project == other.project and
-                self.namespace == other.namespace)
+        return (self._flat_path == other._flat_path and
+                self._project == other._project and
+                self._namespace == other._namespace)
 
     def __ne__(self, other):
         """Compare two keys for inequality.
@@ -108,21 +134,62 @@ class Key(object):
         :rtype: integer
         :returns: a hash of the key's state.
         """
-        return (hash(self.flat_path) +
-                hash(self.project) +
-                hash(self.namespace))
+        if self._hash is None:
+            self._hash = (hash(self._flat_path) +
+                          hash(self._project) +
+                          hash(self._namespace))
+        return self._hash
+
+    def __copy__(self):
+        """Keys are immutable:  a copy is the key itself.
+
+        :rtype: :class:`Key`
+        :returns: This key.
+        """
+        return self
+
+    def __deepcopy__(self, memo):
+        """Keys are immutable:  a copy is the key itself.
+
+        :type memo: dict
+        :param memo: Objects already copied.
+
+        :rtype: :class:`Key`
+        :returns: This key.
+        """
+        return self
+
+    def __getstate__(self):
+        """Pickle the key's data, but not its cached values.
+
+        String hashes differ between processes, so are not kept.
+
+        :rtype: tuple
+        :returns: The flat path, parent, namespace and project.
+        """
+        return (self._flat_path, self._parent, self._namespace,
+                self._project)
+
+    def __setstate__(self, state):
+        """Restore a pickled key.
+
+        :type state: tuple
+        :param state: The value returned by :meth:`__getstate__`.
+        """
+        (self._flat_path, self._parent, self._namespace,
+         self._project) = state
+        self._hash = None
+        self._pb = None
 
     @staticmethod
-    def _parse_path(path_args):
-        """Parses positional arguments into key path with kinds and IDs.
+    def _validate_path(path_args):
+        """Check the positional arguments of a key path.
 
         :type path_args: tuple
         :param path_args: A tuple from positional arguments. Should be
                           alternating list of kinds (string) and ID/name
                           parts (int or string).
 
-        :rtype: :class:`list` of :class:`dict`
-        :returns: A list of key parts with kind and ID or name set.
         :raises: :class:`ValueError` if there are no ``path_args``, if one of
                  the kinds is not a string or if one of the IDs/names is not
                  a string or an integer.
@@ -130,29 +197,41 @@ class Key(object):
         if len(path_args) == 0:
             raise ValueError('Key path must not be empty.')
 
-        kind_list = path_args[::2]
-        id_or_name_list = path_args[1::2]
-        # Dummy sentinel value to pad incomplete key to even length path.
-        partial_ending = object()
-        if len(path_args) % 2 == 1:
-            id_or_name_list += (partial_ending,)
-
-        result = []
-        for kind, id_or_name in zip(kind_list, id_or_name_list):
-            curr_key_part = {}
-            if isinstance(kind, six.string_types):
-                curr_key_part['kind'] = kind
-            else:
+        for kind in path_args[::2]:
+            if not isinstance(kind, six.string_types):
                 raise ValueError(kind, 'Kind was not a string.')
 
-            if isinstance(id_or_name, six.string_types):
-                curr_key_part['name'] = id_or_name
-            elif isinstance(id_or_name, six.integer_types):
-                curr_key_part['id'] = id_or_name
-            elif id_or_name is not partial_ending:
+        for id_or_name in path_args[1::2]:
+            if not isinstance(id_or_name, _ID_OR_NAME_TYPES):
                 raise ValueError(id_or_name,
                                  'ID/name was not a string or integer.')
 
+    @staticmethod
+    def _parse_path(path_args):
+        """Parses positional arguments into key path with kinds and IDs.
+
+        :type path_args: tuple
+        :param path_args: A tuple from positional arguments. Should be
+                          alternating list of kinds (string) and ID/name
+                          parts (int or string).
+
+        :rtype: :class:`list` of :class:`dict`
+        :returns: A list of key parts with kind and ID or name set.
+        :raises: :class:`ValueError` if there are no ``path_args``, if one of
+                 the kinds is not a string or if one of the IDs/names is not
+                 a string or an integer.
+        """
+        Key._validate_path(path_args)
+
+        result = []
+        for index in range(0, len(path_args), 2):
+            curr_key_part = {'kind': path_args[index]}
+            if index + 1 < len(path_args):
+                id_or_name = path_args[index + 1]
+                if isinstance(id_or_name, six.string_types):
+                    curr_key_part['name'] = id_or_name
+                else:
+                    curr_key_part['id'] = id_or_name
             result.append(curr_key_part)
 
         return result
@@ -163,18 +242,15 @@ class Key(object):
         If a ``_parent`` is set, updates the ``_flat_path`` and sets the
         ``_namespace`` and ``_project`` if not already set.
 
-        :rtype: :class:`list` of :class:`dict`
-        :returns: A list of key parts with kind and ID or name set.
-        :raises: :class:`ValueError` if the parent key is not complete.
+        :raises: :class:`ValueError` if the path is invalid, or if the parent
+                 key is not complete.
         """
-        child_path = self._parse_path(self._flat_path)
+        self._validate_path(self._flat_path)
 
         if self._parent is not None:
             if self._parent.is_partial:
                 raise ValueError('Parent key must be complete.')
 
-            # We know that _parent.path() will return a copy.
-            child_path = self._parent.path + child_path
             self._flat_path = self._parent.flat_path + self._flat_path
             if (self._namespace is not None and
                     self._namespace != self._parent.namespace):
@@ -185,8 +261,6 @@ class Key(object):
                 raise ValueError('Child project must agree with parent\'s.')
             self._project = self._parent.project
 
-        return child_path
-
     def _clone(self):
         """Duplicates the Key.
 
@@ -219,19 +293,45 @@ class Key(object):
         if not self.is_partial:
             raise ValueError('Only a partial key can be completed.')
 
-        if isinstance(id_or_name, six.string_types):
-            id_or_name_key = 'name'
-        elif isinstance(id_or_name, six.integer_types):
-            id_or_name_key = 'id'
-        else:
+        if not isinstance(id_or_name, _ID_OR_NAME_TYPES):
             raise ValueError(id_or_name,
                              'ID/name was not a string or integer.')
 
-        new_key = self._clone()
-        new_key._path[-1][id_or_name_key] = id_or_name
-        new_key._flat_path += (id_or_name,)
+        new_key = self.__class__(*(self._flat_path + (id_or_name,)),
+                                 project=self.project,
+                                 namespace=self.namespace)
+        # The partial and the completed key have the same parent.
+        new_key._parent = self._parent
         return new_key
 
+    def _cached_protobuf(self):
+        """Return the key's protobuf, built once and shared.
+
+        Callers copy it into their requests, and must not change it.
+
+        :rtype: :class:`google.cloud.datastore._generated.entity_pb2.Key`
+        :returns: The protobuf representing the key.
+        """
+        if self._pb is None:
+            key = _entity_pb2.Key()
+            key.partition_id.project_id = self.project
+
+            if self.namespace:
+                key.partition_id.namespace_id = self.namespace
+
+            flat_path = self._flat_path
+            for index in range(0, len(flat_path), 2):
+                element = key.path.add()
+                element.kind = flat_path[index]
+                if index + 1 < len(flat_path):
+                    id_or_name = flat_path[index + 1]
+                    if isinstance(id_or_name, six.string_types):
+                        element.name = id_or_name
+                    else:
+                        element.id = id_or_name
+            self._pb = key
+        return self._pb
+
     def to_protobuf(self):
         """Return a protobuf corresponding to the key.
 
@@ -239,20 +339,7 @@ class Key(object):
         :returns: The protobuf representing the key.
         """
         key = _entity_pb2.Key()
-        key.partition_id.project_id = self.project
-
-        if self.namespace:
-            key.partition_id.namespace_id = self.namespace
-
-        for item in self.path:
-            element = key.path.add()
-            if 'kind' in item:
-                element.kind = item['kind']
-            if 'id' in item:
-                element.id = item['id']
-            if 'name' in item:
-                element.name = item['name']
-
+        key.CopyFrom(self._cached_protobuf())
         return key
 
     @property
@@ -278,12 +365,13 @@ class Key(object):
     def path(self):
         """Path getter.
 
-        Returns a copy so that the key remains immutable.
+        Built from :attr:`flat_path` on each call, so that the key remains
+        immutable.
 
         :rtype: :class:`list` of :class:`dict`
         :returns: The (key) path of the current key.
         """
-        return copy.deepcopy(self._path)
+        return self._parse_path(self._flat_path)
 
     @property
     def flat_path(self):
@@ -301,7 +389,9 @@ class Key(object):
         :rtype: string
         :returns: The kind of the current key.
         """
-        return self.path[-1]['kind']
+        if len(self._flat_path) % 2:
+            return self._flat_path[-1]
+        return self._flat_path[-2]
 
     @property
     def id(self):
@@ -310,7 +400,9 @@ class Key(object):
         :rtype: integer
         :returns: The (integer) ID of the key.
         """
-        return self.path[-1].get('id')
+        id_or_name = self._last_id_or_name()
+        if not isinstance(id_or_name, six.string_types):
+            return id_or_name
 
     @property
     def name(self):
@@ -319,7 +411,18 @@ class Key(object):
         :rtype: string
         :returns: The (string) name of the key.
         """
-        return self.path[-1].get('name')
+        id_or_name = self._last_id_or_name()
+        if isinstance(id_or_name, six.string_types):
+            return id_or_name
+
+    def _last_id_or_name(self):
+        """The ID or name of the last element of path, if any.
+
+        :rtype: integer, string or ``NoneType``
+        :returns: The last element of :attr:`flat_path`, unless it is a kind.
+        """
+        if len(self._flat_path) % 2 == 0:
+            return self._flat_path[-1]
 
     @property
     def id_or_name(self):
@@ -377,6 +480,20 @@ class Key(object):
         return '<Key%s, project=%s>' % (self.path, self.project)
 
 
+def _intern(value):
+    """Share one copy of equal strings.
+
+    :type value: string or ``NoneType``
+    :param value: The string to intern.
+
+    :rtype: string or ``NoneType``
+    :returns: The first string equal to ``value`` passed, or ``None``.
+    """
+    if value is None:
+        return None
+    return _INTERNED.setdefault(value, value)
+
+
 def _validate_project(project, parent):
     """Ensure the project is set appropriately.
 
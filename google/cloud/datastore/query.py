@@ -15,13 +15,23 @@
 """Create / interact with Google Cloud Datastore queries."""
 
 import base64
+import copy
 
 from google.cloud._helpers import _ensure_tuple_or_list
+from google.cloud.datastore._bulk import BackgroundCall
+from google.cloud.datastore._bulk import DEFAULT_MAX_WORKERS
+from google.cloud.datastore._bulk import _worker_connection
+from google.cloud.datastore._bulk import call_async
+from google.cloud.datastore._bulk import iterate_concurrently
 from google.cloud.datastore._generated import query_pb2 as _query_pb2
 from google.cloud.datastore import helpers
 from google.cloud.datastore.key import Key
 
 
+_SCATTER_OVERSAMPLING = 32
+"""Number of keys sampled for each split of a query."""
+
+
 class Query(object):
     """A Query against the Cloud Datastore.
 
@@ -313,7 +323,7 @@ class Query(object):
         self._distinct_on[:] = value
 
     def fetch(self, limit=None, offset=0, start_cursor=None, end_cursor=None,
-              client=None):
+              client=None, prefetch=False, lazy=False):
         """Execute the Query; return an iterator for the matching entities.
 
         For example::
@@ -343,6 +353,12 @@ class Query(object):
         :param client: client used to connect to datastore.
                        If not supplied, uses the query's value.
 
+        :type prefetch: boolean
+        :param prefetch: An optional flag passed through to the iterator.
+
+        :type lazy: boolean
+        :param lazy: An optional flag passed through to the iterator.
+
         :rtype: :class:`Iterator`
         :returns: The iterator for the query.
         :raises: ValueError if ``connection`` is not passed and no implicit
@@ -352,7 +368,191 @@ class Query(object):
             client = self._client
 
         return Iterator(
-            self, client, limit, offset, start_cursor, end_cursor)
+            self, client, limit, offset, start_cursor, end_cursor, prefetch,
+            lazy)
+
+    def fetch_async(self, limit=None, offset=0, start_cursor=None,
+                    end_cursor=None, client=None, lazy=False):
+        """Execute the Query on a background thread.
+
+        Every page of results is requested by one of the client's worker
+        threads, each with a connection of its own, so that the caller may
+        send other requests meanwhile::
+
+          >>> future = query.fetch_async(limit=10)
+          >>> entity = client.get(key)  # While the query runs.
+          >>> entities = future.result()
+
+        Within a batch or transaction, or if the client's connection uses a
+        custom ``http`` object (which cannot be shared between threads),
+        the query is run at once, on the calling thread.
+
+        :type limit: integer or None
+        :param limit: An optional limit passed through to the iterator.
+
+        :type offset: integer
+        :param offset: An optional offset passed through to the iterator.
+
+        :type start_cursor: bytes
+        :param start_cursor: An optional cursor passed through to the iterator.
+
+        :type end_cursor: bytes
+        :param end_cursor: An optional cursor passed through to the iterator.
+
+        :type client: :class:`google.cloud.datastore.client.Client`
+        :param client: client used to connect to datastore.
+                       If not supplied, uses the query's value.
+
+        :type lazy: boolean
+        :param lazy: An optional flag passed through to the iterator.
+
+        :rtype: :class:`google.cloud.datastore.future.Future`
+        :returns: A future for the list of matching entities.
+        """
+        if client is None:
+            client = self._client
+
+        def _fetch(worker_client):
+            return list(self.fetch(limit, offset, start_cursor, end_cursor,
+                                   client=worker_client, lazy=lazy))
+
+        return call_async(client, _fetch)
+
+    def _copy(self):
+        """Make a query with the same configuration.
+
+        :rtype: :class:`Query`
+        :returns: A query which may be changed without affecting this one.
+        """
+        return Query(self._client, kind=self._kind, project=self._project,
+                     namespace=self._namespace, ancestor=self._ancestor,
+                     filters=self._filters, projection=self._projection,
+                     order=self._order, distinct_on=self._distinct_on)
+
+    def split(self, num_splits, client=None):
+        """Divide the query into sub-queries over consecutive key ranges.
+
+        Split points are picked from a sample of keys ordered by the
+        ``__scatter__`` property, which the backend sets on a random few
+        entities of each kind:  each sub-query matches roughly as many
+        entities as the others, and together they match exactly the
+        entities matched by this query.
+
+        For example::
+
+          >>> query = client.query(kind='Person')
+          >>> for sub_query in query.split(16):
+          ...     process(sub_query.fetch())
+
+        :type num_splits: integer
+        :param num_splits: The number of sub-queries wanted.  Fewer are
+                           returned if the kind holds too few entities.
+
+        :type client: :class:`google.cloud.datastore.client.Client`
+        :param client: (Optional) client used to sample keys.  If not
+                       supplied, uses the query's value.
+
+        :rtype: list of :class:`Query`
+        :returns: The sub-queries, in the order of their key ranges.
+        :raises: :class:`ValueError` if ``num_splits`` is less than 1, or
+                 if the query has no kind, a sort order, or an inequality
+                 filter (which could not be combined with key ranges).
+        """
+        if num_splits < 1:
+            raise ValueError('num_splits must be at least 1')
+        if not self.kind:
+            raise ValueError('Only queries on a kind can be split')
+        if self.order or any(operator != '='
+                             for _, operator, _ in self.filters):
+            raise ValueError(
+                'Queries with a sort order or inequality filters '
+                'cannot be split')
+        if client is None:
+            client = self._client
+
+        keys = []
+        if num_splits > 1:
+            sample = Query(client, kind=self.kind, project=self.project,
+                           namespace=self.namespace, ancestor=self.ancestor,
+                           order=['__scatter__'])
+            sample.keys_only()
+            found = sample.fetch(limit=num_splits * _SCATTER_OVERSAMPLING,
+                                 client=client)
+            keys = sorted((entity.key for entity in found), key=_key_order)
+
+        positions = set(index * len(keys) // num_splits
+                        for index in range(1, num_splits))
+        positions.discard(0)
+        queries = []
+        lower = None
+        for upper in [keys[position] for position in sorted(positions)]:
+            queries.append(self._key_range(lower, upper))
+            lower = upper
+        queries.append(self._key_range(lower, None))
+        return queries
+
+    def _key_range(self, lower, upper):
+        """Restrict a copy of the query to a range of keys.
+
+        :type lower: :class:`google.cloud.datastore.key.Key` or None
+        :param lower: The first key in the range, if bounded.
+
+        :type upper: :class:`google.cloud.datastore.key.Key` or None
+        :param upper: The key after the range, if bounded.
+
+        :rtype: :class:`Query`
+        :returns: A query matching this one's entities, in the range.
+        """
+        query = self._copy()
+        if lower is not None:
+            query.key_filter(lower, '>=')
+        if upper is not None:
+            query.key_filter(upper, '<')
+        return query
+
+    def fetch_parallel(self, num_splits, max_workers=DEFAULT_MAX_WORKERS,
+                       client=None):
+        """Execute the query as concurrent scans of key ranges.
+
+        The query is divided by :meth:`split`, and the sub-queries run on
+        up to ``max_workers`` threads at once.  For example::
+
+          >>> query = client.query(kind='Person')
+          >>> for entity in query.fetch_parallel(32):
+          ...     process(entity)
+
+        :type num_splits: integer
+        :param num_splits: The number of sub-queries to run.
+
+        :type max_workers: integer
+        :param max_workers: (Optional) The number of sub-queries to run at
+                            once.
+
+        :type client: :class:`google.cloud.datastore.client.Client`
+        :param client: (Optional) client used to connect to datastore.  If
+                       not supplied, uses the query's value.
+
+        :rtype: generator
+        :returns: The matching entities, as each sub-query returns them:
+                  they are not ordered.
+        :raises: :class:`ValueError` if the query cannot be split (see
+                 :meth:`split`), or within a transaction, whose reads
+                 cannot be shared by threads.
+        """
+        if client is None:
+            client = self._client
+        if client.current_transaction is not None:
+            raise ValueError('Queries cannot be run in parallel within '
+                             'a transaction')
+        queries = self.split(num_splits, client=client)
+
+        def _fetch(connection, query):
+            worker_client = copy.copy(client)
+            worker_client.connection = connection
+            return query.fetch(client=worker_client)
+
+        return iterate_concurrently(client.connection, _fetch, queries,
+                                    max_workers)
 
 
 class Iterator(object):
@@ -379,6 +579,18 @@ class Iterator(object):
     :type end_cursor: bytes
     :param end_cursor: (Optional) Cursor to end paging through
                        query results.
+
+    :type prefetch: boolean
+    :param prefetch: (Optional) If true, iterating requests each page of
+                     results on a background thread, while the entities of
+                     the previous page are being processed.  Ignored if the
+                     client's connection uses a custom ``http`` object,
+                     which cannot be shared between threads.
+
+    :type lazy: boolean
+    :param lazy: (Optional) If true, the entities returned are
+                 :class:`~google.cloud.datastore.entity.LazyEntity`
+                 instances, which decode each property when first accessed.
     """
 
     _NOT_FINISHED = _query_pb2.QueryResultBatch.NOT_FINISHED
@@ -390,7 +602,8 @@ class Iterator(object):
     )
 
     def __init__(self, query, client, limit=None, offset=None,
-                 start_cursor=None, end_cursor=None):
+                 start_cursor=None, end_cursor=None, prefetch=False,
+                 lazy=False):
         self._query = query
         self._client = client
         self._limit = limit
@@ -399,15 +612,16 @@ class Iterator(object):
         self._end_cursor = end_cursor
         self._page = self._more_results = None
         self._skipped_results = None
+        self._prefetch = prefetch
+        self._prefetch_connection = None
+        self._lazy = lazy
+        self._cache_token = None
 
-    def next_page(self):
-        """Fetch a single "page" of query results.
-
-        Low-level API for fine control:  the more convenient API is
-        to iterate on the current Iterator.
+    def _next_request(self):
+        """Build the request for the next page of query results.
 
-        :rtype: tuple, (entities, more_results, cursor)
-        :returns: The next page of results.
+        :rtype: dict
+        :returns: Keyword arguments for :meth:`Connection.run_query`.
         """
         pb = _pb_from_query(self._query)
 
@@ -426,13 +640,27 @@ class Iterator(object):
             pb.offset = self._offset
 
         transaction = self._client.current_transaction
+        cache = self._client.cache
+        # Taken before each request, for the page it returns.
+        self._cache_token = None if cache is None else cache.read_token()
 
-        query_results = self._client.connection.run_query(
-            query_pb=pb,
-            project=self._query.project,
-            namespace=self._query.namespace,
-            transaction_id=transaction and transaction.id,
-            )
+        return {
+            'query_pb': pb,
+            'project': self._query.project,
+            'namespace': self._query.namespace,
+            'transaction_id': transaction and transaction.id,
+        }
+
+    def _process_page(self, query_results):
+        """Update the iterator's state from a page of query results.
+
+        :type query_results: tuple
+        :param query_results: The value returned by
+                              :meth:`Connection.run_query`.
+
+        :rtype: tuple, (entities, more_results, cursor)
+        :returns: The page of results.
+        """
         (entity_pbs, cursor_as_bytes,
          more_results_enum, self._skipped_results) = query_results
 
@@ -450,28 +678,100 @@ class Iterator(object):
             raise ValueError('Unexpected value returned for `more_results`.')
 
         self._page = [
-            helpers.entity_from_protobuf(entity)
+            helpers.entity_from_protobuf(entity, lazy=self._lazy)
             for entity in entity_pbs]
+        self._cache_page()
         return self._page, self._more_results, self._start_cursor
 
+    def _cache_page(self):
+        """Store the entities of the current page in the client's cache.
+
+        Entities are not cached if they were read in a transaction, if
+        they are lazy (caching them would decode them), if the query
+        is a projection (they are not whole), or if it has no ancestor
+        (they may be stale).
+        """
+        cache = self._client.cache
+        if (cache is None or self._lazy or self._query.projection or
+                self._query.ancestor is None or
+                self._client.current_transaction is not None):
+            return
+        for entity in self._page:
+            cache.set(entity, self._cache_token)
+
+    def next_page(self):
+        """Fetch a single "page" of query results.
+
+        Low-level API for fine control:  the more convenient API is
+        to iterate on the current Iterator.
+
+        :rtype: tuple, (entities, more_results, cursor)
+        :returns: The next page of results.
+        """
+        query_results = self._client.connection.run_query(
+            **self._next_request())
+        return self._process_page(query_results)
+
+    def _prefetch_page(self):
+        """Start fetching the next page of results on a background thread.
+
+        The request is sent through a connection of the iterator's own,
+        so that the client's connection stays free for the caller.
+
+        :rtype: :class:`google.cloud.datastore._bulk.BackgroundCall`
+        :returns: The call, whose result is the page fetched.
+        """
+        if self._prefetch_connection is None:
+            self._prefetch_connection = _worker_connection(
+                self._client.connection)
+        return BackgroundCall(self._prefetch_connection.run_query,
+                              **self._next_request())
+
     def __iter__(self):
         """Generator yielding all results matching our query.
 
         :rtype: sequence of :class:`google.cloud.datastore.entity.Entity`
         """
+        prefetch = (self._prefetch and
+                    self._client.connection.credentials is not None)
+        pending = None
         while True:
-            self.next_page()
-            for entity in self._page:
+            if pending is None:
+                self.next_page()
+            else:
+                self._process_page(pending.result())
+            page, more_results = self._page, self._more_results
+            if more_results:
+                num_results = len(page)
+                if self._limit is not None:
+                    self._limit -= num_results
+                if (self._offset is not None and
+                        self._skipped_results is not None):
+                    # NOTE: The offset goes down relative to the location
+                    #       because we are updating the cursor each time.
+                    self._offset -= self._skipped_results
+                if prefetch:
+                    # Request the next page while this one is processed.
+                    pending = self._prefetch_page()
+            for entity in page:
                 yield entity
-            if not self._more_results:
+            if not more_results:
                 break
-            num_results = len(self._page)
-            if self._limit is not None:
-                self._limit -= num_results
-            if self._offset is not None and self._skipped_results is not None:
-                # NOTE: The offset goes down relative to the location
-                #       because we are updating the cursor each time.
-                self._offset -= self._skipped_results
+
+
+def _key_order(key):
+    """Sort keys in the order the backend uses for key ranges.
+
+    :type key: :class:`google.cloud.datastore.key.Key`
+    :param key: A complete key.
+
+    :rtype: list of tuples
+    :returns: For each element of the key's path, its kind, then its ID
+              or name (IDs sort before names).
+    """
+    return [(element['kind'], 'name' in element,
+             element.get('id', element.get('name')))
+            for element in key.path]
 
 
 def _pb_from_query(query):
@@ -497,7 +797,7 @@ def _pb_from_query(query):
     composite_filter.op = _query_pb2.CompositeFilter.AND
 
     if query.ancestor:
-        ancestor_pb = query.ancestor.to_protobuf()
+        ancestor_pb = query.ancestor._cached_protobuf()
 
         # Filter on __key__ HAS_ANCESTOR == ancestor.
         ancestor_filter = composite_filter.filters.add().property_filter
@@ -515,7 +815,7 @@ def _pb_from_query(query):
 
         # Set the value to filter on based on the type.
         if property_name == '__key__':
-            key_pb = value.to_protobuf()
+            key_pb = value._cached_protobuf()
             property_filter.value.key_value.CopyFrom(key_pb)
         else:
             helpers._set_protobuf_value(property_filter.value, value)
@@ -44,6 +44,7 @@ from google.cloud.storage.blob import Blob
 from google.cloud.storage.bucket import Bucket
 from google.cloud.storage.client import Client
 from google.cloud.storage.connection import Connection
+from google.cloud.storage.transfer_manager import TransferManager
 
 
 SCOPE = Connection.SCOPE
@@ -0,0 +1,301 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run one operation over many items as concurrent batch requests.
+
+These functions are not part of the API.
+"""
+
+import itertools
+import threading
+
+from six.moves import queue
+
+from google.cloud.exceptions import GoogleCloudError
+from google.cloud.exceptions import make_exception
+from google.cloud.storage.batch import Batch
+from google.cloud.storage.connection import Connection
+
+
+DEFAULT_MAX_WORKERS = 8
+"""Default number of batch requests in flight at once."""
+
+
+def _chunks(items, size):
+    """Split an iterable into lists, without materializing it.
+
+    :type items: iterable
+    :param items: The items to split.
+
+    :type size: integer
+    :param size: The length of each list (the last may be shorter).
+
+    :rtype: iterator of lists
+    :returns: Successive lists of items.
+    """
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _worker_connection(connection):
+    """Return a connection a worker thread may use on its own.
+
+    :class:`httplib2.Http` instances are not thread-safe, so each worker
+    gets a connection with the same credentials but its own transport.
+
+    :type connection: :class:`google.cloud.storage.connection.Connection`
+    :param connection: The client's connection.
+
+    :rtype: :class:`google.cloud.storage.connection.Connection` or
+            ``NoneType``
+    :returns: A new connection, or ``None`` if ``connection`` has no
+              credentials (e.g., a custom ``http`` was passed), in which
+              case it cannot be duplicated.
+    """
+    if connection.credentials is None:
+        return None
+    return Connection(credentials=connection.credentials)
+
+
+def _send_batch(client, connection, items, request_func, response_func):
+    """Send one batch request covering ``items``.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to build the batch.
+
+    :type connection: :class:`google.cloud.storage.connection.Connection`
+    :param connection: The connection used to send the batch.
+
+    :type items: list
+    :param items: The items for this batch.
+
+    :type request_func: callable, taking ``(batch, item)``
+    :param request_func: Defers the request for one item on the batch.
+
+    :type response_func: callable, taking ``(item, payload)``
+    :param response_func: Applies a successful response to its item.
+
+    :rtype: list of tuples
+    :returns: ``(item, exception)`` for each item which failed.
+    """
+    batch = Batch(client)
+    for item in items:
+        request_func(batch, item)
+    try:
+        responses = batch._send(connection)
+    except Exception as exc:  # pylint: disable=broad-except
+        return [(item, exc) for item in items]
+    if len(responses) != len(items):
+        exc = ValueError('Expected a response for every request.')
+        return [(item, exc) for item in items]
+
+    failures = []
+    for item, (headers, payload) in zip(items, responses):
+        if 200 <= headers.status < 300:
+            response_func(item, payload)
+        else:
+            failures.append((item, make_exception(headers, payload)))
+    return failures
+
+
+def _worker_client(client):
+    """Return a client a worker thread may use on its own.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client to duplicate.
+
+    :rtype: :class:`google.cloud.storage.client.Client` or ``NoneType``
+    :returns: A new client with the same project and credentials, or
+              ``None`` if the client's connection cannot be duplicated
+              (see :func:`_worker_connection`).
+    """
+    credentials = client._connection.credentials
+    if credentials is None:
+        return None
+    return type(client)(project=client.project, credentials=credentials)
+
+
+def _run_workers(tasks, make_worker, max_workers):
+    """Run tasks on up to ``max_workers`` threads.
+
+    :type tasks: iterable
+    :param tasks: The tasks, consumed lazily;  at most ``max_workers`` are
+                  queued ahead of the workers.
+
+    :type make_worker: callable, taking no arguments
+    :param make_worker: Called once per worker, on its thread;  returns a
+                        callable which runs one task and returns a list of
+                        failures.
+
+    :type max_workers: integer
+    :param max_workers: The number of threads.  If 1, the tasks are run on
+                        the calling thread.
+
+    :rtype: list
+    :returns: The failures from all tasks.
+    :raises: the first exception raised by a task or by ``make_worker``,
+             after the workers stop.
+    """
+    failures = []
+    if max_workers == 1:
+        work = make_worker()
+        for task in tasks:
+            failures.extend(work(task))
+        return failures
+
+    pending = queue.Queue(maxsize=max_workers)
+    errors = []
+    lock = threading.Lock()
+
+    def _work():
+        try:
+            work = make_worker()
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+            work = None
+        while True:
+            task = pending.get()
+            if task is None:
+                return
+            if work is None:
+                # Keep draining, so that the producer never blocks.
+                continue
+            try:
+                result = work(task)
+            except Exception as exc:  # pylint: disable=broad-except
+                errors.append(exc)
+                result = []
+            with lock:
+                failures.extend(result)
+
+    workers = [threading.Thread(target=_work) for _ in range(max_workers)]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    try:
+        for task in tasks:
+            if errors:
+                break
+            pending.put(task)
+    finally:
+        for _ in workers:
+            pending.put(None)
+        for worker in workers:
+            worker.join()
+    if errors:
+        raise errors[0]
+    return failures
+
+
+def run_batches(client, items, request_func, response_func,
+                max_workers=DEFAULT_MAX_WORKERS):
+    """Apply an operation to each item via concurrent batch requests.
+
+    ``items`` is consumed lazily, in batches of up to
+    :attr:`Batch._MAX_BATCH_SIZE` requests;  at most ``max_workers``
+    batches are in flight, and as many more are queued.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to send the requests.
+
+    :type items: iterable
+    :param items: The items to operate on.
+
+    :type request_func: callable, taking ``(batch, item)``
+    :param request_func: Defers the request for one item on the batch,
+                         via ``batch.api_request``.
+
+    :type response_func: callable, taking ``(item, payload)``
+    :param response_func: Applies a successful response to its item.
+
+    :type max_workers: integer
+    :param max_workers: The number of batch requests to send at once.  If
+                        the client's connection has no credentials, it
+                        is used for every request, one at a time.
+
+    :rtype: list of tuples
+    :returns: ``(item, exception)`` for each item which failed, in the
+              order the batches completed.
+    """
+    connection = client._connection
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    if _worker_connection(connection) is None:
+        max_workers = 1
+
+    def _make_worker():
+        worker_connection = connection
+        if max_workers > 1:
+            worker_connection = _worker_connection(connection)
+
+        def _work(chunk):
+            return _send_batch(client, worker_connection, chunk,
+                               request_func, response_func)
+
+        return _work
+
+    return _run_workers(_chunks(items, Batch._MAX_BATCH_SIZE),
+                        _make_worker, max_workers)
+
+
+def run_concurrently(client, items, func, max_workers=DEFAULT_MAX_WORKERS):
+    """Apply an operation to each item, on several threads at once.
+
+    Use for operations which cannot be batched, e.g. those needing more
+    than one request per item.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to send the requests.
+
+    :type items: iterable
+    :param items: The items to operate on, consumed lazily.
+
+    :type func: callable, taking ``(item, client)``
+    :param func: Applies the operation to one item, using the given client
+                 (each worker thread has its own).
+
+    :type max_workers: integer
+    :param max_workers: The number of items to operate on at once.  If
+                        the client's connection has no credentials, the
+                        client is used for every item, one at a time.
+
+    :rtype: list of tuples
+    :returns: ``(item, exception)`` for each item for which ``func``
+              raised :class:`google.cloud.exceptions.GoogleCloudError`
+              or :class:`EnvironmentError` (e.g., a network or file error).
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    if client._connection.credentials is None:
+        max_workers = 1
+
+    def _make_worker():
+        worker_client = client
+        if max_workers > 1:
+            worker_client = _worker_client(client)
+
+        def _work(item):
+            try:
+                func(item, worker_client)
+            except (GoogleCloudError, EnvironmentError) as exc:
+                return [(item, exc)]
+            return []
+
+        return _work
+
+    return _run_workers(items, _make_worker, max_workers)
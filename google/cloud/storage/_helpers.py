@@ -19,6 +19,21 @@ These are *not* part of the API.
 
 import base64
 from hashlib import md5
+from hashlib import sha256
+from io import UnsupportedOperation
+import os
+import zlib
+
+import six
+
+try:
+    import crcmod.predefined
+except ImportError:  # pragma: NO COVER
+    crcmod = None
+
+from google.cloud._helpers import _bytes_to_unicode
+from google.cloud._helpers import _to_bytes
+from google.cloud.streaming.exceptions import ChecksumMismatchError
 
 
 class _PropertyMixin(object):
@@ -177,3 +192,491 @@ def _base64_md5hash(buffer_object):
     _write_buffer_to_hash(buffer_object, hash_obj)
     digest_bytes = hash_obj.digest()
     return base64.b64encode(digest_bytes)
+
+
+_CRC32C_POLYNOMIAL = 0x82F63B78
+"""Reversed Castagnoli polynomial, used by the CRC32C checksum."""
+
+
+def _make_crc32c_table():
+    """Build the 256-entry lookup table for :class:`_Crc32c`.
+
+    :rtype: list of integer
+    :returns: Table of CRC values for each possible byte.
+    """
+    table = []
+    for value in range(256):
+        for _ in range(8):
+            if value & 1:
+                value = (value >> 1) ^ _CRC32C_POLYNOMIAL
+            else:
+                value >>= 1
+        table.append(value)
+    return table
+
+
+_CRC32C_TABLE = _make_crc32c_table()
+
+
+class _Crc32c(object):
+    """Pure-Python CRC32C hash object, with a :mod:`hashlib`-like interface.
+
+    Used only when the C-accelerated ``crcmod`` extension is unavailable:
+    it is correct, but slow.
+
+    :type data: bytes
+    :param data: (Optional) Initial data to hash.
+    """
+
+    digest_size = 4
+
+    def __init__(self, data=b''):
+        self._crc = 0
+        self.update(data)
+
+    def update(self, data):
+        """Update the checksum with more bytes.
+
+        :type data: bytes
+        :param data: The bytes to add to the checksum.
+        """
+        crc = self._crc ^ 0xFFFFFFFF
+        table = _CRC32C_TABLE
+        for byte in six.iterbytes(data):
+            crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+        self._crc = crc ^ 0xFFFFFFFF
+
+    def digest(self):
+        """Return the checksum as big-endian bytes.
+
+        :rtype: bytes
+        :returns: The four-byte checksum.
+        """
+        return bytes(bytearray(
+            (self._crc >> shift) & 0xFF for shift in (24, 16, 8, 0)))
+
+
+def _has_fast_crc32c():
+    """Check if a C-accelerated CRC32C implementation is available.
+
+    :rtype: boolean
+    :returns: True if ``crcmod`` is installed with its C extension.
+    """
+    if crcmod is None:
+        return False
+    return getattr(crcmod.crcmod, '_usingExtension', False)
+
+
+def _crc32c_hash():
+    """Create a new CRC32C hash object, using ``crcmod`` if it is fast.
+
+    :rtype: object implementing ``update`` and ``digest``
+    :returns: An empty CRC32C hash object.
+    """
+    if _has_fast_crc32c():  # pragma: NO COVER
+        return crcmod.predefined.Crc('crc-32c')
+    return _Crc32c()
+
+
+class _HashingStream(object):
+    """Proxy a file-like object, hashing the bytes read from / written to it.
+
+    Bytes are hashed at most once and in stream order, so data which is
+    read again after seeking backwards (e.g., a chunk re-sent during a
+    resumable upload) does not disturb the hashes.  All other attributes
+    are delegated to the wrapped stream.
+
+    :type stream: file-like object
+    :param stream: The stream to wrap.
+
+    :type hash_objects: dict
+    :param hash_objects: Hash objects (each implementing ``update`` and
+                         ``digest``), keyed by name.
+    """
+
+    def __init__(self, stream, hash_objects):
+        self._stream = stream
+        self.hash_objects = hash_objects
+        try:
+            position = stream.tell()
+        except (AttributeError, IOError, OSError):
+            position = 0
+        self._position = self._hashed_position = position
+        self._complete = True
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    @property
+    def complete(self):
+        """Have the hashes seen every byte passing through the stream?
+
+        If the stream was seeked forwards past unhashed bytes, the hashes
+        cannot be used to check the transferred data.
+
+        :rtype: boolean
+        :returns: True if no bytes were skipped.
+        """
+        return self._complete
+
+    def _update(self, data):
+        """Update the hashes with bytes found at the current position.
+
+        :type data: bytes
+        :param data: Bytes just read or written.
+        """
+        end = self._position + len(data)
+        if self._position > self._hashed_position:
+            self._complete = False
+        elif end > self._hashed_position:
+            new_data = data[self._hashed_position - self._position:]
+            for hash_obj in self.hash_objects.values():
+                hash_obj.update(new_data)
+            self._hashed_position = end
+        self._position = end
+
+    def read(self, *args):
+        """Read bytes from the wrapped stream, updating the hashes.
+
+        :type args: tuple
+        :param args: Arguments passed through to the wrapped ``read``.
+
+        :rtype: bytes
+        :returns: The bytes read.
+        """
+        data = self._stream.read(*args)
+        self._update(data)
+        return data
+
+    def write(self, data):
+        """Write bytes to the wrapped stream, updating the hashes.
+
+        :type data: bytes
+        :param data: The bytes to write.
+        """
+        self._stream.write(data)
+        if data:
+            self._update(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """Seek the wrapped stream.
+
+        :type offset: integer
+        :param offset: Offset to seek to, relative to ``whence``.
+
+        :type whence: integer
+        :param whence: One of :data:`os.SEEK_SET`, :data:`os.SEEK_CUR` or
+                       :data:`os.SEEK_END`.
+        """
+        self._stream.seek(offset, whence)
+        self._position = self._stream.tell()
+
+    def b64_digests(self):
+        """Base64-encoded digests of the bytes hashed so far.
+
+        :rtype: dict
+        :returns: Digests (as text), keyed by the names of the hash objects.
+        """
+        return dict(
+            (name, base64.b64encode(hash_obj.digest()).decode('ascii'))
+            for name, hash_obj in self.hash_objects.items())
+
+
+def _parse_goog_hash(header_value):
+    """Parse an ``X-Goog-Hash`` header into its component hashes.
+
+    The header holds comma-separated ``type=value`` pairs, e.g.
+    ``crc32c=n03x6A==,md5=Ojk9c3dhfxgoKVVHYwFbHQ==``.
+
+    :type header_value: string or ``NoneType``
+    :param header_value: The value of the header, if any.
+
+    :rtype: dict
+    :returns: Base64-encoded hashes, keyed by hash type.
+    """
+    hashes = {}
+    if header_value:
+        for part in header_value.split(','):
+            name, _, value = part.strip().partition('=')
+            if value:
+                hashes[name] = value
+    return hashes
+
+
+def _make_hash_objects(checksum):
+    """Create the hash objects used to checksum a transfer.
+
+    :type checksum: string or ``NoneType``
+    :param checksum: One of ``'auto'``, ``'crc32c'``, ``'md5'`` or ``None``.
+
+    :rtype: dict
+    :returns: Empty hash objects, keyed by checksum name.
+    :raises: :class:`ValueError` if ``checksum`` is not recognized.
+    """
+    if checksum == 'auto':
+        checksum = 'crc32c' if _has_fast_crc32c() else 'md5'
+    if checksum is None:
+        return {}
+    elif checksum == 'crc32c':
+        return {'crc32c': _crc32c_hash()}
+    elif checksum == 'md5':
+        return {'md5': md5()}
+    raise ValueError('Invalid checksum: %r' % (checksum,))
+
+
+def _verify_checksums(hashing_stream, expected):
+    """Compare the checksums of transferred bytes with the expected ones.
+
+    Checksums with no expected value are not checked.
+
+    :type hashing_stream: :class:`~google.cloud.storage._helpers.\
+_HashingStream`
+    :param hashing_stream: The stream through which the bytes were sent.
+
+    :type expected: dict
+    :param expected: Base64-encoded checksums, keyed by checksum name.
+
+    :raises: :class:`~google.cloud.streaming.exceptions.\
+ChecksumMismatchError` if a checksum does not match.
+    """
+    if not hashing_stream.complete:
+        return
+    for name, actual in sorted(hashing_stream.b64_digests().items()):
+        expected_value = expected.get(name)
+        if expected_value is not None and expected_value != actual:
+            raise ChecksumMismatchError(name, expected_value, actual)
+
+
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+"""zlib ``wbits`` selecting the gzip container format."""
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+class _GzipStream(object):
+    """Proxy a file-like object, gzip-compressing the bytes read from it.
+
+    Reads return exactly the requested number of compressed bytes, except
+    at the end of the stream;  the compressed size is not known until
+    then.  The stream cannot seek.
+
+    :type stream: file-like object
+    :param stream: The stream of uncompressed data.
+
+    :type size: integer or ``NoneType``
+    :param size: Optional. The number of bytes to read from ``stream``;  by
+                 default, all of them.
+    """
+
+    _READ_SIZE = 64 << 10
+
+    def __init__(self, stream, size=None):
+        self._stream = stream
+        self._remaining = size
+        self._compressor = zlib.compressobj(
+            zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, _GZIP_WBITS)
+        self._buffer = b''
+        self._position = 0
+        self._finished = False
+
+    def _fill(self):
+        """Compress the next block of the wrapped stream into the buffer."""
+        read_size = self._READ_SIZE
+        if self._remaining is not None:
+            read_size = min(read_size, self._remaining)
+        data = self._stream.read(read_size) if read_size else b''
+        if data:
+            if self._remaining is not None:
+                self._remaining -= len(data)
+            self._buffer += self._compressor.compress(data)
+        else:
+            self._buffer += self._compressor.flush()
+            self._finished = True
+
+    def read(self, size=-1):
+        """Read compressed bytes.
+
+        :type size: integer
+        :param size: Optional. The number of bytes to read;  by default,
+                     all of them.
+
+        :rtype: bytes
+        :returns: The bytes read.
+        """
+        while not self._finished and (size < 0 or len(self._buffer) < size):
+            self._fill()
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        self._position += len(data)
+        return data
+
+    def tell(self):
+        """Return the number of compressed bytes read so far.
+
+        :rtype: integer
+        :returns: The position in the compressed stream.
+        """
+        return self._position
+
+    @staticmethod
+    def seekable():
+        """The stream cannot seek.
+
+        :rtype: boolean
+        :returns: False.
+        """
+        return False
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """Seek to the current position, the only one possible.
+
+        :type offset: integer
+        :param offset: Offset to seek to, relative to ``whence``.
+
+        :type whence: integer
+        :param whence: :data:`os.SEEK_SET` or :data:`os.SEEK_CUR`.
+
+        :raises: :class:`IOError` for any other position.
+        """
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        if whence not in (os.SEEK_SET, os.SEEK_CUR) or (
+                offset != self._position):
+            raise IOError('Cannot seek a compressing stream.')
+
+
+class _GunzipStream(object):
+    """Proxy a file-like object, decompressing gzip data written to it.
+
+    Data which does not start with the gzip magic number (e.g., because
+    it was already decompressed in transit) is written unchanged.
+    Concatenated gzip members are all decompressed.
+
+    :type stream: file-like object
+    :param stream: The stream to which to write the decompressed data.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._head = b''
+        self._decompressor = None
+        self._sniffed = False
+
+    def write(self, data):
+        """Decompress bytes, writing the result to the wrapped stream.
+
+        :type data: bytes
+        :param data: The (possibly) compressed bytes.
+
+        :raises: :class:`zlib.error` if the data is not valid gzip.
+        """
+        if not data:
+            return
+        if not self._sniffed:
+            data = self._head + data
+            if len(data) < len(_GZIP_MAGIC):
+                self._head = data
+                return
+            self._head = b''
+            self._sniffed = True
+            if data.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(_GZIP_WBITS)
+        while self._decompressor is not None and data:
+            self._stream.write(self._decompressor.decompress(data))
+            data = self._decompressor.unused_data
+            if data:  # Another gzip member follows.
+                self._decompressor = zlib.decompressobj(_GZIP_WBITS)
+        if self._decompressor is None:
+            self._stream.write(data)
+
+    def finish(self):
+        """Write any data held back, once all data has been written."""
+        if self._head:
+            self._stream.write(self._head)
+            self._head = b''
+        if self._decompressor is not None:
+            self._stream.write(self._decompressor.flush())
+
+
+def _get_file_size(file_obj):
+    """Find the size of a file on disk.
+
+    :type file_obj: file
+    :param file_obj: A file handle.
+
+    :rtype: integer or ``NoneType``
+    :returns: The size, or ``None`` if ``file_obj`` is not a file on disk.
+    """
+    if hasattr(file_obj, 'fileno'):
+        try:
+            return os.fstat(file_obj.fileno()).st_size
+        except (OSError, UnsupportedOperation):
+            pass  # Assuming fd is not an actual file (maybe socket).
+    return None
+
+
+def _set_encryption_headers(key, headers):
+    """Builds customer encryption key headers
+
+    :type key: str or bytes
+    :param key: 32 byte key to build request key and hash.
+
+    :type headers: dict
+    :param headers: dict of HTTP headers being sent in request.
+    """
+    key = _to_bytes(key)
+    sha256_key = sha256(key).digest()
+    key_hash = base64.b64encode(sha256_key).rstrip()
+    encoded_key = base64.b64encode(key).rstrip()
+    headers['X-Goog-Encryption-Algorithm'] = 'AES256'
+    headers['X-Goog-Encryption-Key'] = _bytes_to_unicode(encoded_key)
+    headers['X-Goog-Encryption-Key-Sha256'] = _bytes_to_unicode(key_hash)
+
+
+def _replace(source, destination):
+    """Atomically rename ``source`` over ``destination``.
+
+    :type source: string
+    :param source: The path to rename.
+
+    :type destination: string
+    :param destination: The path to replace.
+    """
+    replace = getattr(os, 'replace', None)
+    if replace is None:  # pragma: NO COVER  Python2
+        if os.name == 'nt' and os.path.exists(destination):
+            os.remove(destination)
+        replace = os.rename
+    replace(source, destination)
+
+
+def _rewrite_blob(source, destination, client, callback=None):
+    """Rewrite one blob into another, until the rewrite is done.
+
+    Helper for :meth:`Bucket.copy_blob
+    <google.cloud.storage.bucket.Bucket.copy_blob>` and
+    :meth:`Bucket.bulk_set_storage_class
+    <google.cloud.storage.bucket.Bucket.bulk_set_storage_class>`.
+
+    :type source: :class:`google.cloud.storage.blob.Blob`
+    :param source: The blob to be rewritten.
+
+    :type destination: :class:`google.cloud.storage.blob.Blob`
+    :param destination: The blob to be written.
+
+    :type client: :class:`~google.cloud.storage.client.Client`
+    :param client: The client to use.
+
+    :type callback: callable, taking ``(destination, bytes_rewritten,
+                    total_bytes)``, or ``NoneType``
+    :param callback: Optional. Called after each rewrite request.
+    """
+    token = None
+    while True:
+        token, rewritten, total = destination.rewrite(
+            source, token=token, client=client)
+        if callback is not None:
+            callback(destination, rewritten, total)
+        if token is None:
+            return
@@ -0,0 +1,267 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""List the blobs in a bucket as concurrently listed key range shards.
+
+Each shard is a half-open ``[start, end)`` range of blob names, listed
+via the ``startOffset`` / ``endOffset`` parameters.  The shards are
+contiguous and disjoint, so concatenating their (sorted) listings in
+order gives the same stream as a single listing.
+
+These functions are not part of the API.
+"""
+
+import threading
+
+from six.moves import queue
+
+from google.cloud.storage._bulk import _run_workers
+from google.cloud.storage._bulk import _worker_client
+
+
+SHARDS_PER_WORKER = 4
+"""Key ranges per worker when splitting a listing at discovered prefixes."""
+
+DISCOVERY_PAGES = 3
+"""Pages of the delimited listing read to discover split points."""
+
+_PAGES_BUFFERED = 2
+"""Pages each shard may list ahead of the consumer."""
+
+_POLL_INTERVAL = 0.1
+"""Seconds a worker waits on a full buffer before checking for a stop."""
+
+
+def discover_split_points(bucket, prefix, delimiter, max_points, client,
+                          max_pages=DISCOVERY_PAGES):
+    """Find split points from the "directories" just below a prefix.
+
+    Only the ``prefixes`` of the delimited listing are requested, but
+    its pages still cover the blobs at that level:  for key spaces
+    without the delimiter, pass explicit split points instead.
+
+    Discovery costs up to ``max_pages`` list requests, sent one after
+    the other before any shard is listed.  Later pages are not read, so
+    for a level with more entries than those pages hold, the last range
+    extends over the rest of the key space.
+
+    :type bucket: :class:`google.cloud.storage.bucket.Bucket`
+    :param bucket: The bucket to list.
+
+    :type prefix: string or ``NoneType``
+    :param prefix: The prefix being listed.
+
+    :type delimiter: string
+    :param delimiter: The hierarchy delimiter, e.g. ``'/'``.
+
+    :type max_points: integer
+    :param max_points: If more prefixes are found, an evenly spaced
+                       subset of this many is returned.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to list.
+
+    :type max_pages: integer
+    :param max_pages: The number of pages of the listing to read.
+
+    :rtype: list of strings
+    :returns: The sorted split points.
+    """
+    extra_params = {
+        'delimiter': delimiter,
+        'fields': 'prefixes,nextPageToken',
+    }
+    if prefix is not None:
+        extra_params['prefix'] = prefix
+    iterator = bucket._iterator_class(
+        bucket, extra_params=extra_params, client=client)
+    while iterator.page_number < max_pages and iterator.has_next_page():
+        response = iterator.get_next_page_response()
+        # Consume the page, to collect its prefixes.
+        list(iterator.get_items_from_response(response))
+    points = sorted(iterator.prefixes)
+    if len(points) > max_points:
+        step = len(points) / float(max_points)
+        points = [points[int(index * step)] for index in range(max_points)]
+    return points
+
+
+def split_ranges(split_points):
+    """Turn split points into contiguous ``(start, end)`` ranges.
+
+    :type split_points: list of strings
+    :param split_points: Strictly increasing blob names.
+
+    :rtype: list of tuples
+    :returns: The ranges, in order;  the first starts, and the last
+              ends, at ``None`` (unbounded).
+    :raises: :class:`ValueError` if the split points are not strictly
+             increasing.
+    """
+    bounds = [None] + list(split_points) + [None]
+    for lower, upper in zip(split_points, split_points[1:]):
+        if lower >= upper:
+            raise ValueError('Split points must be strictly increasing.')
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _shard_pages(bucket, shard, extra_params, client):
+    """List one shard, a page at a time.
+
+    :type bucket: :class:`google.cloud.storage.bucket.Bucket`
+    :param bucket: The bucket to list.
+
+    :type shard: tuple
+    :param shard: The ``(start, end)`` range of blob names to list.
+
+    :type extra_params: dict
+    :param extra_params: Query parameters shared by all shards.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to list.
+
+    :rtype: iterator of lists
+    :returns: The blobs of each page.
+    """
+    start, end = shard
+    extra_params = dict(extra_params)
+    if start is not None:
+        extra_params['startOffset'] = start
+    if end is not None:
+        extra_params['endOffset'] = end
+    iterator = bucket._iterator_class(
+        bucket, extra_params=extra_params, client=client)
+    while iterator.has_next_page():
+        response = iterator.get_next_page_response()
+        yield list(iterator.get_items_from_response(response))
+
+
+def iter_shards(bucket, shards, extra_params, ordered, max_workers, client):
+    """Yield the blobs of several shards, listing them concurrently.
+
+    :type bucket: :class:`google.cloud.storage.bucket.Bucket`
+    :param bucket: The bucket to list.
+
+    :type shards: list of tuples
+    :param shards: Contiguous ``(start, end)`` ranges, in order.
+
+    :type extra_params: dict
+    :param extra_params: Query parameters shared by all shards.
+
+    :type ordered: boolean
+    :param ordered: If true, yield the blobs in name order;  otherwise,
+                    yield each page as soon as it is listed.
+
+    :type max_workers: integer
+    :param max_workers: The number of shards to list at once.  If the
+                        client's connection has no credentials, the shards
+                        are listed one at a time, using the client.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to list.
+
+    :rtype: iterator of :class:`google.cloud.storage.blob.Blob`
+    :returns: The blobs in all shards.
+    :raises: the first error raised while listing a shard.
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+    if max_workers == 1 or client._connection.credentials is None:
+        return _iter_serial(bucket, shards, extra_params, client)
+    return _iter_concurrent(bucket, shards, extra_params, ordered,
+                            max_workers, client)
+
+
+def _iter_serial(bucket, shards, extra_params, client):
+    """Yield the blobs of several shards, listing one page at a time.
+
+    See :func:`iter_shards`.
+    """
+    for shard in shards:
+        for page in _shard_pages(bucket, shard, extra_params, client):
+            for blob in page:
+                yield blob
+
+
+def _iter_concurrent(bucket, shards, extra_params, ordered, max_workers,
+                     client):
+    """Yield the blobs of several shards, listed on worker threads.
+
+    See :func:`iter_shards`.
+    """
+    stopped = threading.Event()
+    if ordered:
+        channels = [queue.Queue(maxsize=_PAGES_BUFFERED) for _ in shards]
+    else:
+        shared = queue.Queue(maxsize=_PAGES_BUFFERED * max_workers)
+        channels = [shared] * len(shards)
+
+    def _put(channel, message):
+        while not stopped.is_set():
+            try:
+                channel.put(message, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _make_worker():
+        worker_client = _worker_client(client)
+
+        def _work(index):
+            if stopped.is_set():
+                return []
+            channel = channels[index]
+            try:
+                for page in _shard_pages(bucket, shards[index],
+                                         extra_params, worker_client):
+                    if not _put(channel, (page, None)):
+                        return []
+            except Exception as exc:  # pylint: disable=broad-except
+                _put(channel, (None, exc))
+            else:
+                _put(channel, (None, None))
+            ended.add(index)
+            return []
+
+        return _work
+
+    def _feed():
+        try:
+            _run_workers(range(len(shards)), _make_worker, max_workers)
+        except Exception as exc:  # pylint: disable=broad-except
+            # E.g. a worker's client could not be made:  end the shards
+            # not yet listed with the error, so that the reader sees it.
+            for index in range(len(shards)):
+                if index not in ended:
+                    _put(channels[index], (None, exc))
+
+    ended = set()
+    feeder = threading.Thread(target=_feed)
+    feeder.daemon = True
+    feeder.start()
+    try:
+        # Each shard ends with a ``(None, error)`` message:  in unordered
+        # mode, the shared channel is read until every shard has ended.
+        for channel in channels:
+            while True:
+                page, error = channel.get()
+                if page is None:
+                    if error is not None:
+                        raise error
+                    break
+                for blob in page:
+                    yield blob
+    finally:
+        stopped.set()
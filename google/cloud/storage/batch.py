@@ -16,12 +16,10 @@
 See: https://cloud.google.com/storage/docs/json_api/v1/how-tos/batch
 """
 from email.encoders import encode_noop
-from email.generator import Generator
 from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.parser import Parser
-import io
 import json
+import random
+import sys
 
 import httplib2
 import six
@@ -177,31 +175,21 @@ class Batch(Connection):
     def _prepare_batch_request(self):
         """Prepares headers and body for a batch request.
 
-        :rtype: tuple (dict, str)
+        :rtype: tuple (dict, bytes)
         :returns: The pair of headers and body of the batch request to be sent.
         :raises: :class:`ValueError` if no requests have been deferred.
         """
         if len(self._requests) == 0:
             raise ValueError("No deferred requests")
 
-        multi = MIMEMultipart()
-
-        for method, uri, headers, body in self._requests:
-            subrequest = MIMEApplicationHTTP(method, uri, headers, body)
-            multi.attach(subrequest)
-
-        # The `email` package expects to deal with "native" strings
-        if six.PY3:  # pragma: NO COVER  Python3
-            buf = io.StringIO()
-        else:
-            buf = io.BytesIO()
-        generator = Generator(buf, False, 0)
-        generator.flatten(multi)
-        payload = buf.getvalue()
-
-        # Strip off redundant header text
-        _, body = payload.split('\n\n', 1)
-        return dict(multi._headers), body
+        parts = [_encode_subrequest(method, uri, headers, body)
+                 for method, uri, headers, body in self._requests]
+        content_type, body = _encode_multipart(parts)
+        headers = {
+            'Content-Type': content_type,
+            'MIME-Version': '1.0',
+        }
+        return headers, body
 
     def _finish_futures(self, responses):
         """Apply all the batch responses to the futures created.
@@ -231,8 +219,12 @@ class Batch(Connection):
         if exception_args is not None:
             raise make_exception(*exception_args)
 
-    def finish(self):
-        """Submit a single `multipart/mixed` request with deferred requests.
+    def _send(self, connection=None):
+        """Submit the deferred requests, without applying the responses.
+
+        :type connection: :class:`google.cloud.storage.connection.Connection`
+        :param connection: Optional. The connection used to send the batch
+                           request.  Defaults to the client's connection.
 
         :rtype: list of tuples
         :returns: one ``(headers, payload)`` tuple per deferred request.
@@ -241,12 +233,22 @@ class Batch(Connection):
 
         url = '%s/batch' % self.API_BASE_URL
 
-        # Use the private ``_connection`` rather than the public
-        # ``.connection``, since the public connection may be this
-        # current batch.
-        response, content = self._client._connection._make_request(
+        if connection is None:
+            # Use the private ``_connection`` rather than the public
+            # ``.connection``, since the public connection may be this
+            # current batch.
+            connection = self._client._connection
+        response, content = connection._make_request(
             'POST', url, data=body, headers=headers)
-        responses = list(_unpack_batch_response(response, content))
+        return list(_unpack_batch_response(response, content))
+
+    def finish(self):
+        """Submit a single `multipart/mixed` request with deferred requests.
+
+        :rtype: list of tuples
+        :returns: one ``(headers, payload)`` tuple per deferred request.
+        """
+        responses = self._send()
         self._finish_futures(responses)
         return responses
 
@@ -266,30 +268,201 @@ class Batch(Connection):
             self._client._pop_batch()
 
 
-def _generate_faux_mime_message(parser, response, content):
-    """Convert response, content -> (multipart) email.message.
+_PART_HEADERS = b'Content-Type: application/http\r\nMIME-Version: 1.0\r\n\r\n'
+
+
+def _to_bytes(value):
+    """Encode text as UTF-8, passing bytes through.
+
+    Helper for the batch request encoder / response decoder.
+    """
+    if isinstance(value, six.text_type):
+        value = value.encode('utf-8')
+    return value
+
+
+def _encode_subrequest(method, uri, headers, body):
+    """Serialize one deferred request as an ``application/http`` payload.
+
+    :type method: str
+    :param method: HTTP method
+
+    :type uri: str
+    :param uri: URI for HTTP request
+
+    :type headers:  dict
+    :param headers: HTTP headers
+
+    :type body: str, bytes, dict or None
+    :param body: HTTP payload;  a dict is sent as JSON.
+
+    :rtype: bytes
+    :returns: The request line, headers and body of the sub-request.
+    """
+    if isinstance(body, dict):
+        body = json.dumps(body)
+        headers['Content-Type'] = 'application/json'
+        headers['Content-Length'] = len(body)
+    if body is None:
+        body = b''
+    lines = ['%s %s HTTP/1.1' % (method, uri)]
+    lines.extend(['%s: %s' % (key, value)
+                  for key, value in sorted(headers.items())])
+    lines.extend(['', ''])
+    return _to_bytes('\r\n'.join(lines)) + _to_bytes(body)
+
+
+def _make_boundary(parts):
+    """Choose a multipart boundary which occurs in none of ``parts``.
+
+    :type parts: list of bytes
+    :param parts: The payloads to be separated.
+
+    :rtype: str
+    :returns: A boundary in the style of :mod:`email.generator`.
+    """
+    while True:
+        boundary = '=' * 15 + '%019d' % (random.randrange(sys.maxsize),) + '=='
+        delimiter = _to_bytes('--' + boundary)
+        if not any(delimiter in part for part in parts):
+            return boundary
+
+
+def _encode_multipart(parts):
+    """Join sub-requests into a ``multipart/mixed`` body.
+
+    :type parts: list of bytes
+    :param parts: The serialized sub-requests.
 
-    Helper for _unpack_batch_response.
+    :rtype: tuple (str, bytes)
+    :returns: The content type (including the boundary) and the body.
     """
-    # We coerce to bytes to get consistent concat across
-    # Py2 and Py3. Percent formatting is insufficient since
-    # it includes the b in Py3.
-    if not isinstance(content, six.binary_type):
-        content = content.encode('utf-8')
-    content_type = response['content-type']
-    if not isinstance(content_type, six.binary_type):
-        content_type = content_type.encode('utf-8')
-    faux_message = b''.join([
-        b'Content-Type: ',
-        content_type,
-        b'\nMIME-Version: 1.0\n\n',
-        content,
-    ])
-
-    if six.PY2:
-        return parser.parsestr(faux_message)
-    else:  # pragma: NO COVER  Python3
-        return parser.parsestr(faux_message.decode('utf-8'))
+    boundary = _make_boundary(parts)
+    delimiter = _to_bytes('--' + boundary)
+    chunks = []
+    for part in parts:
+        chunks.extend([delimiter, b'\r\n', _PART_HEADERS, part, b'\r\n'])
+    chunks.extend([delimiter, b'--\r\n'])
+    content_type = 'multipart/mixed; boundary="%s"' % (boundary,)
+    return content_type, b''.join(chunks)
+
+
+def _get_boundary(content_type):
+    """Extract the boundary from a ``multipart/*`` content type.
+
+    :type content_type: str or bytes
+    :param content_type: The value of a ``Content-Type`` header.
+
+    :rtype: bytes
+    :returns: The boundary parameter.
+    :raises: :class:`ValueError` if the content type is not multipart, or
+             has no boundary.
+    """
+    if isinstance(content_type, six.binary_type):
+        content_type = content_type.decode('latin-1')
+    mime_type, _, params = content_type.partition(';')
+    if not mime_type.strip().lower().startswith('multipart/'):
+        raise ValueError('Bad response:  not multi-part')
+    for param in params.split(';'):
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'boundary':
+            return value.strip().strip('"').encode('latin-1')
+    raise ValueError('Bad response:  no multi-part boundary')
+
+
+def _split_multipart(content, boundary):
+    """Yield the parts of a multipart body, finding boundaries in one pass.
+
+    :type content: bytes
+    :param content: The multipart body.
+
+    :type boundary: bytes
+    :param boundary: The boundary separating the parts.
+
+    :rtype: iterator of bytes
+    :returns: Each part, from the end of its delimiter up to (but not
+              including) the line break before the next delimiter.
+    :raises: :class:`ValueError` if the body is not properly delimited.
+    """
+    delimiter = b'--' + boundary
+    start = content.find(delimiter)
+    if start == -1:
+        raise ValueError('Bad response:  no multi-part delimiter')
+    while True:
+        start += len(delimiter)
+        if content[start:start + 2] == b'--':
+            return
+        end = content.find(delimiter, start)
+        if end == -1:
+            raise ValueError('Bad response:  unterminated multi-part body')
+        stop = end
+        if content[stop - 1:stop] == b'\n':
+            stop -= 1
+            if content[stop - 1:stop] == b'\r':
+                stop -= 1
+        yield content[start:stop]
+        start = end
+
+
+def _parse_headers(data, pos):
+    """Parse header lines, up to an empty line or the end of ``data``.
+
+    :type data: bytes
+    :param data: The data containing the headers.
+
+    :type pos: int
+    :param pos: The offset of the first header line.
+
+    :rtype: tuple (dict, int)
+    :returns: The headers, and the offset just past the empty line.
+    """
+    headers = {}
+    name = None
+    while pos < len(data):
+        eol = data.find(b'\n', pos)
+        if eol == -1:
+            eol = len(data)
+        line = data[pos:eol].rstrip(b'\r').decode('latin-1')
+        pos = eol + 1
+        if not line:
+            break
+        if line[0] in ' \t' and name is not None:
+            headers[name] += ' ' + line.strip()
+        else:
+            name, _, value = line.partition(':')
+            name = name.strip()
+            headers[name] = value.strip()
+    return headers, pos
+
+
+def _parse_subresponse(part):
+    """Convert one ``application/http`` part -> (headers, payload).
+
+    :type part: bytes
+    :param part: A part of the batch response, as from
+                 :func:`_split_multipart`.
+
+    :rtype: tuple (:class:`httplib2.Response`, object)
+    :returns: The sub-response's headers (including its status), and its
+              payload, decoded from JSON if its type is
+              ``application/json``.
+    """
+    # Skip the rest of the delimiter line, then the part's own headers.
+    _, pos = _parse_headers(part, part.find(b'\n') + 1)
+    eol = part.find(b'\n', pos)
+    if eol == -1:
+        eol = len(part)
+    status_line = part[pos:eol].decode('latin-1')
+    _, status, _ = status_line.split(' ', 2)
+    msg_headers, pos = _parse_headers(part, eol + 1)
+    payload = part[pos:].decode('utf-8')
+    msg_headers['status'] = status
+    # Header names are case-insensitive:  these are lower-cased.
+    headers = httplib2.Response(msg_headers)
+    ctype = headers.get('content-type')
+    if ctype and ctype.startswith('application/json'):
+        payload = json.loads(payload)
+    return headers, payload
 
 
 def _unpack_batch_response(response, content):
@@ -297,28 +470,14 @@ def _unpack_batch_response(response, content):
 
     Creates a generator of tuples of emulating the responses to
     :meth:`httplib2.Http.request` (a pair of headers and payload).
+    Sub-responses are parsed as the generator is consumed.
 
     :type response: :class:`httplib2.Response`
     :param response: HTTP response / headers from a request.
 
-    :type content: str
+    :type content: str or bytes
     :param content: Response payload with a batch response.
     """
-    parser = Parser()
-    message = _generate_faux_mime_message(parser, response, content)
-
-    if not isinstance(message._payload, list):
-        raise ValueError('Bad response:  not multi-part')
-
-    for subrequest in message._payload:
-        status_line, rest = subrequest._payload.split('\n', 1)
-        _, status, _ = status_line.split(' ', 2)
-        sub_message = parser.parsestr(rest)
-        payload = sub_message._payload
-        ctype = sub_message['Content-Type']
-        msg_headers = dict(sub_message._headers)
-        msg_headers['status'] = status
-        headers = httplib2.Response(msg_headers)
-        if ctype and ctype.startswith('application/json'):
-            payload = json.loads(payload)
-        yield headers, payload
+    boundary = _get_boundary(response['content-type'])
+    for part in _split_multipart(_to_bytes(content), boundary):
+        yield _parse_subresponse(part)
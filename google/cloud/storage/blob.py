@@ -14,11 +14,9 @@
 
 """Create / interact with Google Cloud Storage blobs."""
 
-import base64
+from contextlib import closing
 import copy
-import hashlib
 from io import BytesIO
-from io import UnsupportedOperation
 import json
 import mimetypes
 import os
@@ -29,16 +27,24 @@ import six
 from six.moves.urllib.parse import quote
 
 from google.cloud._helpers import _rfc3339_to_datetime
-from google.cloud._helpers import _to_bytes
-from google.cloud._helpers import _bytes_to_unicode
 from google.cloud.credentials import generate_signed_url
 from google.cloud.exceptions import NotFound
 from google.cloud.exceptions import make_exception
+from google.cloud.storage._helpers import _GunzipStream
+from google.cloud.storage._helpers import _GzipStream
+from google.cloud.storage._helpers import _HashingStream
 from google.cloud.storage._helpers import _PropertyMixin
+from google.cloud.storage._helpers import _get_file_size
+from google.cloud.storage._helpers import _make_hash_objects
+from google.cloud.storage._helpers import _parse_goog_hash
 from google.cloud.storage._helpers import _scalar_property
+from google.cloud.storage._helpers import _set_encryption_headers
+from google.cloud.storage._helpers import _verify_checksums
 from google.cloud.storage.acl import ObjectACL
+from google.cloud.storage.resumable_state import _ResumableSession
 from google.cloud.streaming.http_wrapper import Request
 from google.cloud.streaming.http_wrapper import make_api_request
+from google.cloud.streaming.mapped_stream import map_file
 from google.cloud.streaming.transfer import Download
 from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
 from google.cloud.streaming.transfer import Upload
@@ -156,6 +162,17 @@ class Blob(_PropertyMixin):
             bucket_name=self.bucket.name,
             quoted_name=quote(self.name, safe=''))
 
+    @property
+    def _signed_resource(self):
+        """The resource named in signed URLs for this blob.
+
+        :rtype: str
+        :returns: The resource, ``/bucket-name/quoted-blob-name``.
+        """
+        return '/{bucket_name}/{quoted_name}'.format(
+            bucket_name=self.bucket.name,
+            quoted_name=quote(self.name, safe=''))
+
     def generate_signed_url(self, expiration, method='GET',
                             content_type=None,
                             generation=None, response_disposition=None,
@@ -223,16 +240,12 @@ class Blob(_PropertyMixin):
         :returns: A signed URL you can use to access the resource
                   until expiration.
         """
-        resource = '/{bucket_name}/{quoted_name}'.format(
-            bucket_name=self.bucket.name,
-            quoted_name=quote(self.name, safe=''))
-
         if credentials is None:
             client = self._require_client(client)
             credentials = client._connection.credentials
 
         return generate_signed_url(
-            credentials, resource=resource,
+            credentials, resource=self._signed_resource,
             api_access_endpoint=_API_ACCESS_ENDPOINT,
             expiration=expiration, method=method,
             content_type=content_type,
@@ -284,7 +297,8 @@ class Blob(_PropertyMixin):
         """
         return self.bucket.delete_blob(self.name, client=client)
 
-    def download_to_file(self, file_obj, encryption_key=None, client=None):
+    def download_to_file(self, file_obj, encryption_key=None, client=None,
+                         checksum='auto', decompress=False, observer=None):
         """Download the contents of this blob into a file-like object.
 
         .. note::
@@ -312,6 +326,12 @@ class Blob(_PropertyMixin):
         .. _customer-supplied: https://cloud.google.com/storage/docs/\
                                encryption#customer-supplied
 
+        The downloaded bytes are checksummed as they are written, and
+        compared with the ``X-Goog-Hash`` header sent by the server (or
+        with :attr:`crc32c` / :attr:`md5_hash`).  Objects stored with
+        ``Content-Encoding: gzip`` are not checked, since they may be
+        decompressed in transit.
+
         :type file_obj: file
         :param file_obj: A file handle to which to write the blob's data.
 
@@ -324,16 +344,38 @@ class Blob(_PropertyMixin):
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the blob's bucket.
 
-        :raises: :class:`google.cloud.exceptions.NotFound`
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum used to verify the data:
+                         one of ``'crc32c'``, ``'md5'`` or ``None`` (no
+                         verification).  The default, ``'auto'``, uses
+                         ``'crc32c'`` if a fast implementation (``crcmod``
+                         with its C extension) is installed, else ``'md5'``.
+
+        :type decompress: boolean
+        :param decompress: Optional. If true, gzip-compressed data (see
+                           :meth:`upload_from_file`) is decompressed as it
+                           is written to ``file_obj``.
+
+        :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+        :param observer: Optional. Notified of the download's progress, e.g.
+                         a :class:`~google.cloud.streaming.progress.\
+ProgressMonitor`.
+
+        :raises: :class:`google.cloud.exceptions.NotFound`;
+                 :class:`~google.cloud.streaming.exceptions.\
+ChecksumMismatchError` if the downloaded data is corrupted.
         """
         client = self._require_client(client)
         if self.media_link is None:  # not yet loaded
             self.reload()
 
         download_url = self.media_link
+        target = _GunzipStream(file_obj) if decompress else file_obj
+        hashing_stream = _HashingStream(target, _make_hash_objects(checksum))
 
         # Use apitools 'Download' facility.
-        download = Download.from_stream(file_obj)
+        download = Download.from_stream(hashing_stream, observer=observer)
 
         if self.chunk_size is not None:
             download.chunksize = self.chunk_size
@@ -351,8 +393,16 @@ class Blob(_PropertyMixin):
         # on the Batch class, but we just use the wrapped connection since
         # it has all three (http, API_BASE_URL and build_api_url).
         download.initialize_download(request, client._connection.http)
+        if decompress:
+            target.finish()
+
+        if self.content_encoding != 'gzip' and download.encoding is None:
+            expected = {'crc32c': self.crc32c, 'md5': self.md5_hash}
+            expected.update(_parse_goog_hash(download.hash_header))
+            _verify_checksums(hashing_stream, expected)
 
-    def download_to_filename(self, filename, encryption_key=None, client=None):
+    def download_to_filename(self, filename, encryption_key=None, client=None,
+                             checksum='auto', cache=None, observer=None):
         """Download the contents of this blob into a named file.
 
         :type filename: string
@@ -367,16 +417,42 @@ class Blob(_PropertyMixin):
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the blob's bucket.
 
-        :raises: :class:`google.cloud.exceptions.NotFound`
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum used to verify the data; see
+                         :meth:`download_to_file`.
+
+        :type cache: :class:`~google.cloud.storage.cache.BlobCache`
+        :param cache: Optional. A local cache to read the blob through:  the
+                      blob is downloaded (and verified with ``checksum``)
+                      only if its current generation is not cached.  Not
+                      supported with ``encryption_key``.
+
+        :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+        :param observer: Optional. Notified of the download's progress;  see
+                         :meth:`download_to_file`.  Not used with ``cache``.
+
+        :raises: :class:`google.cloud.exceptions.NotFound`;
+                 :class:`ValueError` if both ``cache`` and
+                 ``encryption_key`` are passed.
         """
+        if cache is not None:
+            if encryption_key:
+                raise ValueError('Encrypted blobs cannot be cached.')
+            cache.download_to_filename(self, filename, client=client,
+                                       checksum=checksum)
+            return
+
         with open(filename, 'wb') as file_obj:
             self.download_to_file(file_obj, encryption_key=encryption_key,
-                                  client=client)
+                                  client=client, checksum=checksum,
+                                  observer=observer)
 
         mtime = time.mktime(self.updated.timetuple())
         os.utime(file_obj.name, (mtime, mtime))
 
-    def download_as_string(self, encryption_key=None, client=None):
+    def download_as_string(self, encryption_key=None, client=None,
+                           checksum='auto', decompress=False, observer=None):
         """Download the contents of this blob as a string.
 
         :type encryption_key: str or bytes
@@ -388,13 +464,27 @@ class Blob(_PropertyMixin):
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the blob's bucket.
 
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum used to verify the data; see
+                         :meth:`download_to_file`.
+
+        :type decompress: boolean
+        :param decompress: Optional. If true, gzip-compressed data is
+                           decompressed;  see :meth:`download_to_file`.
+
+        :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+        :param observer: Optional. Notified of the download's progress;  see
+                         :meth:`download_to_file`.
+
         :rtype: bytes
         :returns: The data stored in this blob.
         :raises: :class:`google.cloud.exceptions.NotFound`
         """
         string_buffer = BytesIO()
         self.download_to_file(string_buffer, encryption_key=encryption_key,
-                              client=client)
+                              client=client, checksum=checksum,
+                              decompress=decompress, observer=observer)
         return string_buffer.getvalue()
 
     @staticmethod
@@ -407,10 +497,63 @@ class Blob(_PropertyMixin):
             raise make_exception(faux_response, http_response.content,
                                  error_info=request.url)
 
-    # pylint: disable=too-many-locals
+    def _start_upload(self, upload, connection, headers, session,
+                      metadata=None):
+        """Configure and initialize an upload, or resume its stored session.
+
+        Helper for :meth:`upload_from_file`.
+
+        :type upload: :class:`google.cloud.streaming.transfer.Upload`
+        :param upload: The upload to start.
+
+        :type connection: :class:`google.cloud.storage.connection.Connection`
+        :param connection: The connection used for the upload.
+
+        :type headers: dict
+        :param headers: HTTP headers for the initial request.
+
+        :type session: :class:`~google.cloud.storage.resumable_state.\
+_ResumableSession` or ``NoneType``
+        :param session: The persisted session to resume or record, if any.
+
+        :type metadata: dict or ``NoneType``
+        :param metadata: Properties of the new object, if any, sent in the
+                         body of the initial request.
+
+        :rtype: :class:`google.cloud.streaming.http_wrapper.Request`
+        :returns: The initial request (sent unless the upload is simple).
+        """
+        url_builder = _UrlBuilder(bucket_name=self.bucket.name,
+                                  object_name=self.name)
+        upload_config = _UploadConfig()
+
+        # Temporary URL, until we know simple vs. resumable.
+        base_url = connection.API_BASE_URL + '/upload'
+        upload_url = connection.build_api_url(api_base_url=base_url,
+                                              path=self.bucket.path + '/o')
+
+        # Use apitools 'Upload' facility.
+        request = Request(upload_url, 'POST', headers)
+        if metadata is not None:
+            request.body = json.dumps(metadata)
+            request.headers['Content-Type'] = 'application/json'
+
+        if session is None or not session.resume(upload, connection.http):
+            upload.configure_request(upload_config, request, url_builder)
+            query_params = url_builder.query_params
+            request.url = connection.build_api_url(
+                api_base_url=base_url, path=self.bucket.path + '/o',
+                query_params=query_params)
+            upload.initialize_upload(request, connection.http)
+            if session is not None:
+                session.start(upload)
+        return request
+
+    # pylint: disable=too-many-arguments,too-many-locals
     def upload_from_file(self, file_obj, rewind=False, size=None,
                          encryption_key=None, content_type=None, num_retries=6,
-                         client=None):
+                         client=None, checksum='auto', resumable_state=None,
+                         content_encoding=None, observer=None):
         """Upload the contents of this blob from a file-like object.
 
         The content type of the upload will either be
@@ -476,9 +619,46 @@ class Blob(_PropertyMixin):
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the blob's bucket.
 
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum computed while the data is
+                         sent, and compared with the one reported by the
+                         server for the new object: one of ``'crc32c'``,
+                         ``'md5'`` or ``None`` (no verification).  The
+                         default, ``'auto'``, uses ``'crc32c'`` if a fast
+                         implementation is installed, else ``'md5'``.
+                         Uploads resumed from ``resumable_state`` are not
+                         checked.
+
+        :type resumable_state: :class:`~google.cloud.storage.resumable_state.\
+SessionStore`
+        :param resumable_state: Optional. A store in which to persist the
+                                resumable upload session.  If it holds a
+                                session for this blob and the same,
+                                unchanged file, the upload continues from
+                                the last byte committed by the back-end.
+                                ``file_obj`` must be a file on disk.
+
+        :type content_encoding: string or ``NoneType``
+        :param content_encoding: Optional. If ``'gzip'``, the data is
+                                 compressed while it is sent, and stored
+                                 with ``Content-Encoding: gzip``.  The
+                                 upload is resumable, since the compressed
+                                 size is not known in advance.  Not
+                                 supported with ``resumable_state``.
+
+        :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+        :param observer: Optional. Notified of the upload's progress, e.g.
+                         a :class:`~google.cloud.streaming.progress.\
+ProgressMonitor`.
+
         :raises: :class:`ValueError` if size is not passed in and can not be
-                 determined; :class:`google.cloud.exceptions.GoogleCloudError`
-                 if the upload response returns an error status.
+                 determined, or for an unsupported ``content_encoding``;
+                 :class:`google.cloud.exceptions.GoogleCloudError`
+                 if the upload response returns an error status;
+                 :class:`~google.cloud.streaming.exceptions.\
+ChecksumMismatchError` if the stored object does not match the data sent
+                 (the object is *not* deleted).
         """
         client = self._require_client(client)
         # Use the private ``_connection`` rather than the public
@@ -497,12 +677,16 @@ class Blob(_PropertyMixin):
 
         # Get the basic stats about the file.
         total_bytes = size
-        if total_bytes is None:
-            if hasattr(file_obj, 'fileno'):
-                try:
-                    total_bytes = os.fstat(file_obj.fileno()).st_size
-                except (OSError, UnsupportedOperation):
-                    pass  # Assuming fd is not an actual file (maybe socket).
+        metadata = None
+        if content_encoding is not None:
+            if content_encoding != 'gzip' or resumable_state is not None:
+                raise ValueError('Only gzip content encoding is supported, '
+                                 'without resumable_state.')
+            file_obj = _GzipStream(file_obj, size)
+            total_bytes = None
+            metadata = {'contentEncoding': content_encoding}
+        elif total_bytes is None:
+            total_bytes = _get_file_size(file_obj)
 
         headers = {
             'Accept': 'application/json',
@@ -513,44 +697,39 @@ class Blob(_PropertyMixin):
         if encryption_key:
             _set_encryption_headers(encryption_key, headers)
 
-        upload = Upload(file_obj, content_type, total_bytes,
-                        auto_transfer=False)
+        hashing_stream = _HashingStream(
+            file_obj, _make_hash_objects(checksum))
+        upload = Upload(hashing_stream, content_type, total_bytes,
+                        auto_transfer=False, observer=observer)
 
         if self.chunk_size is not None:
             upload.chunksize = self.chunk_size
 
-            if total_bytes is None:
-                upload.strategy = RESUMABLE_UPLOAD
-        elif total_bytes is None:
-            raise ValueError('total bytes could not be determined. Please '
-                             'pass an explicit size, or supply a chunk size '
-                             'for a streaming transfer.')
-
-        url_builder = _UrlBuilder(bucket_name=self.bucket.name,
-                                  object_name=self.name)
-        upload_config = _UploadConfig()
-
-        # Temporary URL, until we know simple vs. resumable.
-        base_url = connection.API_BASE_URL + '/upload'
-        upload_url = connection.build_api_url(api_base_url=base_url,
-                                              path=self.bucket.path + '/o')
+        if total_bytes is None:
+            if self.chunk_size is None and metadata is None:
+                raise ValueError('total bytes could not be determined. '
+                                 'Please pass an explicit size, or supply a '
+                                 'chunk size for a streaming transfer.')
+            upload.strategy = RESUMABLE_UPLOAD
 
-        # Use apitools 'Upload' facility.
-        request = Request(upload_url, 'POST', headers)
+        session = None
+        if resumable_state is not None:
+            session = _ResumableSession(resumable_state, self, file_obj)
+            upload.strategy = RESUMABLE_UPLOAD
 
-        upload.configure_request(upload_config, request, url_builder)
-        query_params = url_builder.query_params
-        base_url = connection.API_BASE_URL + '/upload'
-        request.url = connection.build_api_url(api_base_url=base_url,
-                                               path=self.bucket.path + '/o',
-                                               query_params=query_params)
-        upload.initialize_upload(request, connection.http)
+        request = self._start_upload(upload, connection, headers, session,
+                                     metadata)
 
         if upload.strategy == RESUMABLE_UPLOAD:
-            http_response = upload.stream_file(use_chunks=True)
+            callback = session.record if session is not None else None
+            http_response = upload.stream_file(use_chunks=True,
+                                               callback=callback)
         else:
+            started = time.time()
             http_response = make_api_request(connection.http, request,
-                                             retries=num_retries)
+                                             retries=num_retries,
+                                             on_retry=upload._record_retry)
+            upload._record_chunk(total_bytes, started)
 
         self._check_response_error(request, http_response)
         response_content = http_response.content
@@ -559,10 +738,16 @@ class Blob(_PropertyMixin):
                           six.string_types):  # pragma: NO COVER  Python3
             response_content = response_content.decode('utf-8')
         self._set_properties(json.loads(response_content))
-    # pylint: enable=too-many-locals
+        _verify_checksums(hashing_stream, {
+            'crc32c': self.crc32c,
+            'md5': self.md5_hash,
+        })
+    # pylint: enable=too-many-arguments,too-many-locals
 
     def upload_from_filename(self, filename, content_type=None,
-                             encryption_key=None, client=None):
+                             encryption_key=None, client=None,
+                             checksum='auto', resumable_state=None,
+                             observer=None, memory_map=False):
         """Upload this blob's contents from the content of a named file.
 
         The content type of the upload will either be
@@ -595,17 +780,40 @@ class Blob(_PropertyMixin):
                       ``NoneType``
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the blob's bucket.
+
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. See :meth:`upload_from_file`.
+
+        :type resumable_state: :class:`~google.cloud.storage.resumable_state.\
+SessionStore`
+        :param resumable_state: Optional. See :meth:`upload_from_file`.
+
+        :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+        :param observer: Optional. See :meth:`upload_from_file`.
+
+        :type memory_map: boolean
+        :param memory_map: Optional. If true, the file is memory-mapped, and
+                           its bytes sent without copying.  The file must
+                           not be truncated meanwhile:  reading past its
+                           end through the map kills the process (SIGBUS).
         """
         content_type = content_type or self._properties.get('contentType')
         if content_type is None:
             content_type, _ = mimetypes.guess_type(filename)
 
         with open(filename, 'rb') as file_obj:
-            self.upload_from_file(file_obj, content_type=content_type,
-                                  encryption_key=encryption_key, client=client)
+            mapped = map_file(file_obj) if memory_map else None
+            with closing(mapped or file_obj) as stream:
+                self.upload_from_file(
+                    stream, content_type=content_type,
+                    encryption_key=encryption_key, client=client,
+                    checksum=checksum, resumable_state=resumable_state,
+                    observer=observer)
 
     def upload_from_string(self, data, content_type='text/plain',
-                           encryption_key=None, client=None):
+                           encryption_key=None, client=None,
+                           checksum='auto', observer=None):
         """Upload contents of this blob from the provided string.
 
         .. note::
@@ -635,6 +843,15 @@ class Blob(_PropertyMixin):
                       ``NoneType``
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the blob's bucket.
+
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum used to verify the upload;
+                         see :meth:`upload_from_file`.
+
+        :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+        :param observer: Optional. Notified of the upload's progress;  see
+                         :meth:`upload_from_file`.
         """
         if isinstance(data, six.text_type):
             data = data.encode('utf-8')
@@ -642,7 +859,8 @@ class Blob(_PropertyMixin):
         string_buffer.write(data)
         self.upload_from_file(file_obj=string_buffer, rewind=True,
                               size=len(data), content_type=content_type,
-                              encryption_key=encryption_key, client=client)
+                              encryption_key=encryption_key, client=client,
+                              checksum=checksum, observer=observer)
 
     def make_public(self, client=None):
         """Make this blob public giving all users read access.
@@ -655,6 +873,49 @@ class Blob(_PropertyMixin):
         self.acl.all().grant_read()
         self.acl.save(client=client)
 
+    def rewrite(self, source, token=None, client=None):
+        """Rewrite a source blob into this one, on the server.
+
+        Large objects, and copies across locations or storage classes, may
+        take several calls:  pass the returned token to the next call, until
+        it returns ``None``.  Each request is sent at once, even within a
+        batch.  This blob's properties (e.g., ``storageClass`` or
+        ``metadata``) are sent as those of the destination object.
+
+        See: https://cloud.google.com/storage/docs/json_api/v1/objects/rewrite
+
+        :type source: :class:`Blob`
+        :param source: The blob whose contents are rewritten into this blob.
+
+        :type token: string
+        :param token: Optional. The token returned by an earlier, unfinished
+                      call to rewrite the same source blob.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the blob's bucket.
+
+        :rtype: tuple
+        :returns: ``(token, bytes_rewritten, total_bytes)``, where ``token``
+                  is the token for the next call, or ``None`` once the
+                  rewrite is done (and this blob's properties are updated).
+        """
+        client = self._require_client(client)
+        query_params = {}
+        if token is not None:
+            query_params['rewriteToken'] = token
+        api_response = client._connection.api_request(
+            method='POST', path=source.path + '/rewriteTo' + self.path,
+            query_params=query_params, data=self._properties,
+            _target_object=None)
+        rewritten = int(api_response['totalBytesRewritten'])
+        size = int(api_response['objectSize'])
+        if api_response['done']:
+            self._set_properties(api_response['resource'])
+            return None, rewritten, size
+        return api_response['rewriteToken'], rewritten, size
+
     cache_control = _scalar_property('cacheControl')
     """HTTP 'Cache-Control' header for this object.
 
@@ -936,21 +1197,3 @@ class _UrlBuilder(object):
         self.query_params = {'name': object_name}
         self._bucket_name = bucket_name
         self._relative_path = ''
-
-
-def _set_encryption_headers(key, headers):
-    """Builds customer encryption key headers
-
-    :type key: str or bytes
-    :param key: 32 byte key to build request key and hash.
-
-    :type headers: dict
-    :param headers: dict of HTTP headers being sent in request.
-    """
-    key = _to_bytes(key)
-    sha256_key = hashlib.sha256(key).digest()
-    key_hash = base64.b64encode(sha256_key).rstrip()
-    encoded_key = base64.b64encode(key).rstrip()
-    headers['X-Goog-Encryption-Algorithm'] = 'AES256'
-    headers['X-Goog-Encryption-Key'] = _bytes_to_unicode(encoded_key)
-    headers['X-Goog-Encryption-Key-Sha256'] = _bytes_to_unicode(key_hash)
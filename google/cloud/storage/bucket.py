@@ -21,13 +21,28 @@ import six
 from google.cloud._helpers import _rfc3339_to_datetime
 from google.cloud.exceptions import NotFound
 from google.cloud.iterator import Iterator
+from google.cloud.storage._bulk import DEFAULT_MAX_WORKERS
+from google.cloud.storage._bulk import run_batches
+from google.cloud.storage._bulk import run_concurrently
 from google.cloud.storage._helpers import _PropertyMixin
+from google.cloud.storage._helpers import _rewrite_blob
 from google.cloud.storage._helpers import _scalar_property
+from google.cloud.storage._listing import SHARDS_PER_WORKER
+from google.cloud.storage._listing import discover_split_points
+from google.cloud.storage._listing import iter_shards
+from google.cloud.storage._listing import split_ranges
 from google.cloud.storage.acl import BucketACL
 from google.cloud.storage.acl import DefaultObjectACL
+from google.cloud.storage.acl import ObjectACL
 from google.cloud.storage.blob import Blob
 
 
+_REWRITTEN_PROPERTIES = ('cacheControl', 'contentDisposition',
+                         'contentEncoding', 'contentLanguage', 'contentType',
+                         'metadata')
+"""Writable blob properties kept by :meth:`Bucket.bulk_set_storage_class`."""
+
+
 class _BlobIterator(Iterator):
     """An iterator listing blobs in a bucket
 
@@ -313,6 +328,62 @@ class Bucket(_PropertyMixin):
             # pylint: enable=attribute-defined-outside-init
         return result
 
+    def list_blobs_parallel(self, prefix=None, split_points=None,
+                            delimiter='/', ordered=True, versions=None,
+                            projection='noAcl', fields=None,
+                            max_workers=DEFAULT_MAX_WORKERS, client=None):
+        """Find blobs in the bucket, listing several key ranges at once.
+
+        The names under ``prefix`` are split into contiguous ranges at
+        ``split_points``, each listed by a separate worker.  If none are
+        passed, the "directories" one ``delimiter`` below ``prefix`` are
+        used, as found in the first few pages of a delimited listing (sent
+        before the ranges are listed):  for flat key spaces, pass explicit
+        split points (e.g. ``['logs/2016-06', 'logs/2016-07']``).
+        ``versions``, ``projection`` and ``fields`` are as for
+        :meth:`list_blobs` (``fields`` must include ``nextPageToken`` and
+        ``items/name``).
+
+        :type prefix: string or ``NoneType``
+        :param prefix: optional prefix used to filter blobs.
+
+        :type split_points: list of strings or ``NoneType``
+        :param split_points: Strictly increasing blob names at which to
+                             split the listing.
+
+        :type delimiter: string
+        :param delimiter: The delimiter used to discover split points.
+
+        :type ordered: boolean
+        :param ordered: If true (the default), blobs are returned in name
+                        order, as by :meth:`list_blobs`;  otherwise, in
+                        whatever order their pages are listed (faster).
+
+        :type max_workers: integer
+        :param max_workers: The number of ranges to list at once.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the current bucket.
+
+        :rtype: iterator of :class:`google.cloud.storage.blob.Blob`
+        :returns: The blobs, listed lazily as the iterator is consumed.
+        :raises: :class:`ValueError` for unsorted ``split_points``.
+        """
+        client = self._require_client(client)
+        if split_points is None:
+            split_points = discover_split_points(
+                self, prefix, delimiter, max_workers * SHARDS_PER_WORKER,
+                client)
+        shards = split_ranges(split_points)
+        # Only used for its query parameters:  it makes no requests.
+        template = self.list_blobs(prefix=prefix, versions=versions,
+                                   projection=projection, fields=fields,
+                                   client=client)
+        return iter_shards(self, shards, template.extra_params, ordered,
+                           max_workers, client)
+
     def delete(self, force=False, client=None):
         """Delete this bucket.
 
@@ -440,10 +511,251 @@ class Bucket(_PropertyMixin):
                 else:
                     raise
 
+    def _bulk_blobs(self, blobs):
+        """Yield blobs from a mix of blob names and blobs.
+
+        Helper for the ``bulk_*`` methods.
+
+        :type blobs: iterable of string or
+                     :class:`google.cloud.storage.blob.Blob`
+        :param blobs: Blob names, or blobs in this bucket.
+
+        :rtype: iterator of :class:`google.cloud.storage.blob.Blob`
+        :returns: A blob for each item.
+        """
+        for blob in blobs:
+            if isinstance(blob, six.string_types):
+                blob = Blob(blob, bucket=self)
+            yield blob
+
+    def bulk_delete(self, blobs, max_workers=DEFAULT_MAX_WORKERS,
+                    client=None):
+        """Delete many blobs, using concurrent batch requests.
+
+        Unlike :meth:`delete_blobs`, deletes are sent up to 1000 to a batch
+        request, several batch requests at a time, and failures are
+        returned rather than raised.  ``blobs`` is consumed as the deletes
+        proceed, so it may be e.g. the iterator from :meth:`list_blobs`::
+
+          >>> failures = bucket.bulk_delete(bucket.list_blobs(prefix='tmp/'))
+          >>> for blob, exc in failures:
+          ...     print('Could not delete %s: %s' % (blob.name, exc))
+
+        :type blobs: iterable of string or
+                     :class:`google.cloud.storage.blob.Blob`
+        :param blobs: The blob names or blobs to delete.
+
+        :type max_workers: integer
+        :param max_workers: Optional. The number of batch requests sent at
+                            once.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the current bucket.
+
+        :rtype: list of tuples
+        :returns: ``(blob, exception)`` for each blob which could not be
+                  deleted.
+        """
+        client = self._require_client(client)
+
+        def _request(batch, blob):
+            batch.api_request(method='DELETE', path=blob.path,
+                              _target_object=None)
+
+        def _response(blob, payload):  # pylint: disable=unused-argument
+            """Nothing to apply:  a DELETE has no response body."""
+
+        return run_batches(client, self._bulk_blobs(blobs), _request,
+                           _response, max_workers=max_workers)
+
+    def bulk_patch(self, blobs, properties=None,
+                   max_workers=DEFAULT_MAX_WORKERS, client=None):
+        """Patch the properties of many blobs, using concurrent batch requests.
+
+        For example, to set the metadata of every blob under a prefix::
+
+          >>> bucket.bulk_patch(bucket.list_blobs(prefix='logs/'),
+          ...                   {'metadata': {'retain': 'false'}})
+
+        :type blobs: iterable of string or
+                     :class:`google.cloud.storage.blob.Blob`
+        :param blobs: The blob names or blobs to patch.
+
+        :type properties: dict
+        :param properties: Optional. The properties to send for every blob,
+                           in the API's JSON representation.  If not passed,
+                           each blob's own changed properties are sent, as
+                           by :meth:`~google.cloud.storage.blob.Blob.patch`.
+
+        :type max_workers: integer
+        :param max_workers: Optional. The number of batch requests sent at
+                            once.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the current bucket.
+
+        :rtype: list of tuples
+        :returns: ``(blob, exception)`` for each blob which could not be
+                  patched.  The other blobs' properties are updated from the
+                  responses.
+        """
+        client = self._require_client(client)
+
+        def _request(batch, blob):
+            data = properties
+            if data is None:
+                data = dict((key, blob._properties[key])
+                            for key in blob._changes)
+            # Pass '?projection=full' here because 'PATCH' documented not
+            # to work properly w/ 'noAcl'.
+            batch.api_request(method='PATCH', path=blob.path, data=data,
+                              query_params={'projection': 'full'},
+                              _target_object=None)
+
+        def _response(blob, payload):
+            blob._set_properties(payload)
+
+        return run_batches(client, self._bulk_blobs(blobs), _request,
+                           _response, max_workers=max_workers)
+
+    def bulk_save_acl(self, blobs, acl=None, predefined=None,
+                      max_workers=DEFAULT_MAX_WORKERS, client=None):
+        """Save the ACLs of many blobs, using concurrent batch requests.
+
+        For example, to make every blob in the bucket public::
+
+          >>> bucket.bulk_save_acl(bucket.list_blobs(),
+          ...                      predefined='publicRead')
+
+        :type blobs: iterable of string or
+                     :class:`google.cloud.storage.blob.Blob`
+        :param blobs: The blob names or blobs to update.
+
+        :type acl: :class:`google.cloud.storage.acl.ACL`, or a compatible list.
+        :param acl: Optional. The ACL to save for every blob.
+
+        :type predefined: string
+        :param predefined: Optional. A predefined ACL to save for every
+                           blob, as for
+                           :meth:`~google.cloud.storage.acl.ACL.\
+save_predefined`.  If neither ``acl`` nor ``predefined`` is
+                           passed, each blob's own ACL is saved.
+
+        :type max_workers: integer
+        :param max_workers: Optional. The number of batch requests sent at
+                            once.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the current bucket.
+
+        :rtype: list of tuples
+        :returns: ``(blob, exception)`` for each blob which could not be
+                  updated.  The other blobs' ACLs are updated from the
+                  responses.
+        :raises: :class:`ValueError` if both ``acl`` and ``predefined`` are
+                 passed, or ``predefined`` is not a known ACL.
+        """
+        client = self._require_client(client)
+        query_params = {'projection': 'full'}
+        if predefined is not None:
+            if acl is not None:
+                raise ValueError('Pass only one of acl and predefined')
+            predefined = ObjectACL.PREDEFINED_XML_ACLS.get(predefined,
+                                                           predefined)
+            if predefined not in ObjectACL.PREDEFINED_JSON_ACLS:
+                raise ValueError('Invalid predefined ACL: %s' % (predefined,))
+            query_params['predefinedAcl'] = predefined
+            acl = []
+        if acl is not None:
+            acl = list(acl)
+
+        def _request(batch, blob):
+            entries = acl
+            if entries is None:
+                entries = list(blob.acl)
+            batch.api_request(method='PATCH', path=blob.path,
+                              data={'acl': entries}, query_params=query_params,
+                              _target_object=None)
+
+        def _response(blob, payload):
+            blob.acl.entities.clear()
+            blob.acl.loaded = True
+            for entry in payload.get('acl', ()):
+                blob.acl.add_entity(blob.acl.entity_from_dict(entry))
+
+        return run_batches(client, self._bulk_blobs(blobs), _request,
+                           _response, max_workers=max_workers)
+
+    def bulk_set_storage_class(self, blobs, storage_class,
+                               max_workers=DEFAULT_MAX_WORKERS, client=None):
+        """Change the storage class of many blobs, several at once.
+
+        Each blob is rewritten onto itself with the new storage class, on
+        the server, as by :meth:`~google.cloud.storage.blob.Blob.rewrite`.
+        Its other writable properties (e.g., ``contentType`` or
+        ``metadata``) are sent unchanged;  blobs without a generation are
+        first reloaded to get them.
+
+        :type blobs: iterable of string or
+                     :class:`google.cloud.storage.blob.Blob`
+        :param blobs: The blob names or blobs to update.
+
+        :type storage_class: string
+        :param storage_class: One of "STANDARD", "NEARLINE", or
+                              "DURABLE_REDUCED_AVAILABILITY".
+
+        :type max_workers: integer
+        :param max_workers: Optional. The number of blobs rewritten at once.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the current bucket.
+
+        :rtype: list of tuples
+        :returns: ``(blob, exception)`` for each blob which could not be
+                  updated.  The other blobs' properties are updated from the
+                  responses.
+        :raises: :class:`ValueError` if ``storage_class`` is not valid.
+        """
+        if storage_class not in self._STORAGE_CLASSES:
+            raise ValueError('Invalid storage class: %s' % (storage_class,))
+        client = self._require_client(client)
+
+        def _rewrite(blob, worker_client):
+            if blob.generation is None:
+                blob.reload(client=worker_client)
+            new_blob = Blob(blob.name, bucket=self)
+            new_blob._set_properties(dict(
+                (name, blob._properties[name])
+                for name in _REWRITTEN_PROPERTIES if name in blob._properties))
+            new_blob._patch_property('storageClass', storage_class)
+            _rewrite_blob(blob, new_blob, worker_client)
+            blob._set_properties(new_blob._properties)
+
+        return run_concurrently(client, self._bulk_blobs(blobs), _rewrite,
+                                max_workers=max_workers)
+
     def copy_blob(self, blob, destination_bucket, new_name=None,
-                  client=None):
+                  client=None, callback=None):
         """Copy the given blob to the given bucket, optionally with a new name.
 
+        The copy is made on the server with :meth:`Blob.rewrite
+        <google.cloud.storage.blob.Blob.rewrite>`, repeating the request
+        until it is done, so large objects and copies across locations or
+        storage classes are supported.
+
+        Within a :class:`~google.cloud.storage.batch.Batch`, a single copy
+        request is deferred instead, as the rewrite tokens would not be
+        known until the batch is sent:  the copy must then complete in one
+        request, and ``callback`` is not called.
+
         :type blob: :class:`google.cloud.storage.blob.Blob`
         :param blob: The blob to be copied.
 
@@ -459,6 +771,11 @@ class Bucket(_PropertyMixin):
         :param client: Optional. The client to use.  If not passed, falls back
                        to the ``client`` stored on the current bucket.
 
+        :type callback: callable, taking ``(new_blob, bytes_rewritten,
+                        total_bytes)``
+        :param callback: Optional. Called after each rewrite request, to
+                         report progress.
+
         :rtype: :class:`google.cloud.storage.blob.Blob`
         :returns: The new Blob.
         """
@@ -466,12 +783,62 @@ class Bucket(_PropertyMixin):
         if new_name is None:
             new_name = blob.name
         new_blob = Blob(bucket=destination_bucket, name=new_name)
-        api_path = blob.path + '/copyTo' + new_blob.path
-        copy_result = client.connection.api_request(
-            method='POST', path=api_path, _target_object=new_blob)
-        new_blob._set_properties(copy_result)
+        if client.current_batch is not None:
+            api_path = blob.path + '/copyTo' + new_blob.path
+            copy_result = client.connection.api_request(
+                method='POST', path=api_path, _target_object=new_blob)
+            new_blob._set_properties(copy_result)
+        else:
+            _rewrite_blob(blob, new_blob, client, callback)
         return new_blob
 
+    def copy_blobs(self, blobs, destination_bucket,
+                   max_workers=DEFAULT_MAX_WORKERS, callback=None,
+                   client=None):
+        """Copy many blobs to the given bucket, several at once.
+
+        Each blob is copied, under the same name, as by :meth:`copy_blob`;
+        only requests and progress reports pass through this host.  For
+        example, to migrate every blob under a prefix::
+
+          >>> failures = bucket.copy_blobs(bucket.list_blobs(prefix='2015/'),
+          ...                              archive_bucket)
+
+        :type blobs: iterable of string or
+                     :class:`google.cloud.storage.blob.Blob`
+        :param blobs: The blob names or blobs in this bucket to copy.
+
+        :type destination_bucket: :class:`google.cloud.storage.bucket.Bucket`
+        :param destination_bucket: The bucket into which the blobs should be
+                                   copied.
+
+        :type max_workers: integer
+        :param max_workers: Optional. The number of blobs copied at once.
+
+        :type callback: callable, taking ``(new_blob, bytes_rewritten,
+                        total_bytes)``
+        :param callback: Optional. Called after each rewrite request, to
+                         report progress;  may be called from several
+                         threads at once.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the current bucket.
+
+        :rtype: list of tuples
+        :returns: ``(blob, exception)`` for each blob which could not be
+                  copied.
+        """
+        client = self._require_client(client)
+
+        def _copy(blob, worker_client):
+            self.copy_blob(blob, destination_bucket, client=worker_client,
+                           callback=callback)
+
+        return run_concurrently(client, self._bulk_blobs(blobs), _copy,
+                                max_workers=max_workers)
+
     def rename_blob(self, blob, new_name, client=None):
         """Rename the given blob using copy and delete operations.
 
@@ -787,7 +1154,8 @@ class Bucket(_PropertyMixin):
 
         If ``recursive=True`` and the bucket contains more than 256
         objects / blobs this will cowardly refuse to make the objects public.
-        This is to prevent extremely long runtime of this method.
+        This is to prevent extremely long runtime of this method.  To update
+        many objects, use :meth:`bulk_save_acl`.
 
         :type recursive: boolean
         :param recursive: If True, this will make all blobs inside the bucket
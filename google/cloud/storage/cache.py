@@ -0,0 +1,407 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A local disk cache of blob contents, keyed by generation.
+
+Every generation of an object is immutable, so a cached copy of one
+never goes stale:  a read only needs to find the object's current
+generation (a metadata request) to know whether the cached copy can be
+used.  With a ``ttl``, the generation last seen is trusted for that many
+seconds, so repeated reads make no requests at all::
+
+    >>> from google.cloud.storage.cache import BlobCache
+    >>> cache = BlobCache('/var/cache/models', max_bytes=10 << 30, ttl=300)
+    >>> blob = bucket.blob('models/latest.pb')
+    >>> blob.download_to_filename('/tmp/model.pb', cache=cache)
+
+Processes (and threads) sharing a cache directory download each
+generation once:  readers of an entry being downloaded wait for it,
+using file locks (``fcntl.flock``;  on platforms without it, concurrent
+downloads are not shared, but remain safe).
+"""
+
+import copy
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from six.moves.urllib.parse import parse_qsl
+from six.moves.urllib.parse import urlencode
+from six.moves.urllib.parse import urlsplit
+from six.moves.urllib.parse import urlunsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: NO COVER
+    fcntl = None
+
+from google.cloud.storage._helpers import _replace
+
+
+_DATA_SUFFIX = '.data'
+_LOCK_SUFFIX = '.lock'
+_REF_SUFFIX = '.ref'
+_TEMP_PREFIX = '.tmp-'
+
+
+def _cache_key(*parts):
+    """Make a file name for the given key parts.
+
+    :type parts: tuple of strings
+    :param parts: The parts of the key.
+
+    :rtype: string
+    :returns: A hex digest of the parts.
+    """
+    joined = u'\0'.join(parts).encode('utf-8')
+    return hashlib.sha1(joined).hexdigest()
+
+
+def _pinned(blob, generation):
+    """Return a copy of a blob which downloads only the given generation.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: The blob, whose properties are those of ``generation``.
+
+    :type generation: integer
+    :param generation: The generation to download.
+
+    :rtype: :class:`google.cloud.storage.blob.Blob`
+    :returns: A copy of ``blob``, whose media link names ``generation``.
+    """
+    scheme, netloc, path, query, fragment = urlsplit(blob.media_link)
+    params = [(name, value) for name, value in parse_qsl(query)
+              if name != 'generation']
+    params.append(('generation', str(generation)))
+    pinned = copy.copy(blob)
+    pinned._properties = dict(blob._properties)
+    pinned._properties['mediaLink'] = urlunsplit(
+        (scheme, netloc, path, urlencode(params), fragment))
+    return pinned
+
+
+class _FileLock(object):
+    """An advisory lock on a file, shared by processes and threads.
+
+    :type path: string
+    :param path: The lock file, created if needed.
+
+    :type shared: boolean
+    :param shared: If true, take a shared (read) lock;  otherwise, an
+                   exclusive (write) lock.
+    """
+
+    def __init__(self, path, shared=False):
+        self._path = path
+        self._shared = shared
+        self._file = None
+
+    def acquire(self, blocking=True):
+        """Take the lock.
+
+        If the lock file is removed (see :meth:`BlobCache._evict`) while
+        waiting for it, the file now at ``path`` is locked instead.
+
+        :type blocking: boolean
+        :param blocking: If false, give up if the lock is held elsewhere.
+
+        :rtype: boolean
+        :returns: True if the lock was taken.
+        """
+        while True:
+            self._file = open(self._path, 'a')
+            if fcntl is None:  # pragma: NO COVER
+                return True
+            flags = fcntl.LOCK_SH if self._shared else fcntl.LOCK_EX
+            if not blocking:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(self._file.fileno(), flags)
+            except (IOError, OSError):
+                self._file.close()
+                self._file = None
+                if blocking:
+                    raise
+                return False
+            if self._is_current():
+                return True
+            self._file.close()
+
+    def _is_current(self):
+        """Check that the locked file is still the one at ``path``.
+
+        :rtype: boolean
+        :returns: False if the lock file was removed, or replaced.
+        """
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return False
+        locked = os.fstat(self._file.fileno())
+        return (stat.st_dev, stat.st_ino) == (locked.st_dev, locked.st_ino)
+
+    def release(self):
+        """Release the lock, by closing the lock file."""
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class BlobCache(object):
+    """A read-through cache of blob contents, in a local directory.
+
+    :type directory: string
+    :param directory: The cache directory, created if needed.  It may be
+                      shared by several processes.
+
+    :type max_bytes: integer or ``NoneType``
+    :param max_bytes: Optional. Once the cached contents exceed this size,
+                      the least recently used entries are evicted.
+
+    :type ttl: number or ``NoneType``
+    :param ttl: Optional. For how many seconds the generation of an object
+                is trusted once checked, saving the metadata request on
+                reads within that time.  The default is to check the
+                generation on every read.
+    """
+
+    def __init__(self, directory, max_bytes=None, ttl=None):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    def _entry_paths(self, blob, generation):
+        """Return the data and lock paths for a generation of a blob."""
+        base = os.path.join(self.directory, _cache_key(
+            blob.bucket.name, blob.name, str(generation)))
+        return base + _DATA_SUFFIX, base + _LOCK_SUFFIX
+
+    def _ref_path(self, blob):
+        """Return the path recording a blob's last-checked generation."""
+        return os.path.join(self.directory, _cache_key(
+            blob.bucket.name, blob.name) + _REF_SUFFIX)
+
+    def _trusted_generation(self, blob):
+        """Return the generation checked within ``ttl``, if any.
+
+        :rtype: integer or ``NoneType``
+        :returns: The generation, or ``None`` if it must be checked.
+        """
+        if not self.ttl:
+            return None
+        try:
+            with open(self._ref_path(blob)) as file_obj:
+                ref = json.load(file_obj)
+        except (IOError, ValueError):
+            return None
+        if time.time() - ref['checked'] > self.ttl:
+            return None
+        return ref['generation']
+
+    def _check_generation(self, blob, client):
+        """Load the blob's current generation, recording it if trusted.
+
+        :rtype: integer
+        :returns: The generation.
+        :raises: :class:`google.cloud.exceptions.NotFound` if the blob
+                 does not exist.
+        """
+        blob.reload(client=client)
+        generation = blob.generation
+        if self.ttl:
+            self._write_atomically(self._ref_path(blob), json.dumps({
+                'generation': generation,
+                'checked': time.time(),
+            }).encode('utf-8'))
+        return generation
+
+    def _write_atomically(self, path, data):
+        """Write a cache file, so that readers never see it half-written."""
+        handle, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX,
+                                             dir=self.directory)
+        with os.fdopen(handle, 'wb') as file_obj:
+            file_obj.write(data)
+        _replace(temp_path, path)
+
+    def _download(self, blob, generation, data_path, client, checksum):
+        """Download a generation of a blob into the cache.
+
+        The download is pinned to ``generation``, so that its entry never
+        holds a later generation's contents, even if the object changed
+        since its generation was checked.  It is verified with
+        ``checksum`` (see :meth:`Blob.download_to_file
+        <google.cloud.storage.blob.Blob.download_to_file>`).
+        """
+        handle, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX,
+                                             dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as file_obj:
+                _pinned(blob, generation).download_to_file(
+                    file_obj, client=client, checksum=checksum)
+            _replace(temp_path, data_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _fetch(self, blob, client, checksum):
+        """Make sure the blob's current generation is cached.
+
+        :rtype: tuple
+        :returns: The entry's data and lock paths.
+        """
+        generation = self._trusted_generation(blob)
+        if (generation is None or
+                not os.path.exists(self._entry_paths(blob, generation)[0])):
+            generation = self._check_generation(blob, client)
+        data_path, lock_path = self._entry_paths(blob, generation)
+        if not os.path.exists(data_path):
+            with _FileLock(lock_path):
+                # Another reader may have downloaded it while we waited.
+                if not os.path.exists(data_path):
+                    self._download(blob, generation, data_path, client,
+                                   checksum)
+        return data_path, lock_path
+
+    def download_to_file(self, blob, file_obj, client=None, checksum='auto'):
+        """Copy a blob's contents to a file, via the cache.
+
+        :type blob: :class:`google.cloud.storage.blob.Blob`
+        :param blob: The blob to read.
+
+        :type file_obj: file
+        :param file_obj: A file handle to which to write the blob's data.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the blob's bucket.
+
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum used to verify the data, if
+                         it is downloaded;  see :meth:`Blob.download_to_file
+                         <google.cloud.storage.blob.Blob.download_to_file>`.
+
+        :raises: :class:`google.cloud.exceptions.NotFound`
+        """
+        while True:
+            data_path, lock_path = self._fetch(blob, client, checksum)
+            # The shared lock keeps the entry from being evicted mid-copy.
+            with _FileLock(lock_path, shared=True):
+                if os.path.exists(data_path):
+                    with open(data_path, 'rb') as cached:
+                        shutil.copyfileobj(cached, file_obj)
+                    os.utime(data_path, None)  # Most recently used.
+                    break
+        self._evict(keep=data_path)
+
+    def download_to_filename(self, blob, filename, client=None,
+                             checksum='auto'):
+        """Copy a blob's contents to a named file, via the cache.
+
+        :type blob: :class:`google.cloud.storage.blob.Blob`
+        :param blob: The blob to read.
+
+        :type filename: string
+        :param filename: A filename to be passed to ``open``.
+
+        :type client: :class:`~google.cloud.storage.client.Client` or
+                      ``NoneType``
+        :param client: Optional. The client to use.  If not passed, falls back
+                       to the ``client`` stored on the blob's bucket.
+
+        :type checksum: string or ``NoneType``
+        :param checksum: Optional. The checksum used to verify the data, if
+                         it is downloaded;  see :meth:`Blob.download_to_file
+                         <google.cloud.storage.blob.Blob.download_to_file>`.
+
+        :raises: :class:`google.cloud.exceptions.NotFound`
+        """
+        with open(filename, 'wb') as file_obj:
+            self.download_to_file(blob, file_obj, client=client,
+                                  checksum=checksum)
+
+        if blob.updated is not None:
+            mtime = time.mktime(blob.updated.timetuple())
+            os.utime(filename, (mtime, mtime))
+
+    def _evict(self, keep):
+        """Remove least recently used entries, until within ``max_bytes``.
+
+        Entries being read are skipped.  An evicted entry's lock file is
+        removed with it, as are the generations recorded for ``ttl`` once
+        they expire, so that the directory does not grow without bound.
+
+        :type keep: string
+        :param keep: The data path of an entry not to evict.
+        """
+        if self.max_bytes is None:
+            return
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(_DATA_SUFFIX):
+                try:
+                    stat = os.stat(path)
+                except OSError:  # Evicted by another reader.
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+            elif name.endswith(_REF_SUFFIX):
+                self._remove_expired_ref(path, now)
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            data_path = os.path.join(self.directory, name)
+            if data_path == keep:
+                continue
+            lock_path = data_path[:-len(_DATA_SUFFIX)] + _LOCK_SUFFIX
+            lock = _FileLock(lock_path)
+            if lock.acquire(blocking=False):
+                try:
+                    os.remove(data_path)
+                    # Removed while held:  readers waiting on it notice,
+                    # and lock the file created next instead.
+                    os.remove(lock_path)
+                except OSError:  # Evicted by another reader.
+                    pass
+                finally:
+                    lock.release()
+                total -= size
+
+    def _remove_expired_ref(self, path, now):
+        """Remove a recorded generation, if no longer trusted.
+
+        :type path: string
+        :param path: The ref file.
+
+        :type now: float
+        :param now: The current time.
+        """
+        try:
+            if not self.ttl or now - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+        except OSError:  # Removed by another reader.
+            pass
@@ -0,0 +1,320 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persist resumable upload sessions, so uploads survive process restarts.
+
+Pass a store as the ``resumable_state`` argument of
+:meth:`google.cloud.storage.blob.Blob.upload_from_filename`::
+
+  >>> from google.cloud import storage
+  >>> from google.cloud.storage.resumable_state import SQLiteSessionStore
+  >>> client = storage.Client()
+  >>> bucket = client.get_bucket('my-bucket')
+  >>> store = SQLiteSessionStore('/var/lib/my-app/uploads.db')
+  >>> blob = bucket.blob('huge-file.tar')
+  >>> blob.upload_from_filename('/data/huge-file.tar',
+  ...                           resumable_state=store)
+
+If the process dies part-way through, running the same upload again
+continues from the last byte committed by the back-end, rather than
+from byte zero.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from google.cloud.storage._helpers import _replace
+from google.cloud.streaming.exceptions import HttpError
+
+
+class SessionStore(object):
+    """Abstract storage for resumable upload session state.
+
+    Subclasses must implement :meth:`load`, :meth:`save` and
+    :meth:`delete`.  Each state is a JSON-compatible ``dict``.
+    """
+
+    def load(self, key):
+        """Load the state stored for a key.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+
+        :rtype: dict or ``NoneType``
+        :returns: The stored state, or ``None`` if there is none.
+        """
+        raise NotImplementedError
+
+    def save(self, key, state):
+        """Store the state for a key, replacing any earlier one.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+
+        :type state: dict
+        :param state: The session state.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove the state stored for a key, if any.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+        """
+        raise NotImplementedError
+
+
+class FileSessionStore(SessionStore):
+    """Store session state in a local JSON file.
+
+    The file is rewritten atomically on each change.  Access is serialized
+    within a process, but not across processes:  use
+    :class:`SQLiteSessionStore` to share a store between workers.
+
+    :type path: string
+    :param path: Path of the JSON file (created if needed).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        """Read all sessions from the file.
+
+        :rtype: dict
+        :returns: Session states, keyed by upload key.
+        """
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as file_obj:
+            return json.load(file_obj)
+
+    def _write(self, sessions):
+        """Replace the file with the given sessions.
+
+        :type sessions: dict
+        :param sessions: Session states, keyed by upload key.
+        """
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as file_obj:
+            json.dump(sessions, file_obj)
+        _replace(temp_path, self.path)
+
+    def load(self, key):
+        """Load the state stored for a key.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+
+        :rtype: dict or ``NoneType``
+        :returns: The stored state, or ``None`` if there is none.
+        """
+        with self._lock:
+            return self._read().get(key)
+
+    def save(self, key, state):
+        """Store the state for a key, replacing any earlier one.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+
+        :type state: dict
+        :param state: The session state.
+        """
+        with self._lock:
+            sessions = self._read()
+            sessions[key] = state
+            self._write(sessions)
+
+    def delete(self, key):
+        """Remove the state stored for a key, if any.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+        """
+        with self._lock:
+            sessions = self._read()
+            if sessions.pop(key, None) is not None:
+                self._write(sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Store session state in a SQLite database.
+
+    Safe to share between processes on the same host.
+
+    :type path: string
+    :param path: Path of the database file (created if needed).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._execute('CREATE TABLE IF NOT EXISTS upload_sessions '
+                      '(key TEXT PRIMARY KEY, state TEXT NOT NULL)')
+
+    def _execute(self, statement, parameters=()):
+        """Run one statement in its own transaction.
+
+        :type statement: string
+        :param statement: The SQL statement.
+
+        :type parameters: tuple
+        :param parameters: Values bound to the statement's placeholders.
+
+        :rtype: list of tuples
+        :returns: The rows returned by the statement.
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                return connection.execute(statement, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def load(self, key):
+        """Load the state stored for a key.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+
+        :rtype: dict or ``NoneType``
+        :returns: The stored state, or ``None`` if there is none.
+        """
+        rows = self._execute(
+            'SELECT state FROM upload_sessions WHERE key = ?', (key,))
+        if rows:
+            return json.loads(rows[0][0])
+
+    def save(self, key, state):
+        """Store the state for a key, replacing any earlier one.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+
+        :type state: dict
+        :param state: The session state.
+        """
+        self._execute(
+            'INSERT OR REPLACE INTO upload_sessions (key, state) '
+            'VALUES (?, ?)', (key, json.dumps(state)))
+
+    def delete(self, key):
+        """Remove the state stored for a key, if any.
+
+        :type key: string
+        :param key: Identifies the upload (bucket and object name).
+        """
+        self._execute('DELETE FROM upload_sessions WHERE key = ?', (key,))
+
+
+class _ResumableSession(object):
+    """Tie a blob upload from a local file to its stored session state.
+
+    The state records the session URL, the destination object, the
+    identity of the source file (path, size and modification time) and the
+    last offset confirmed by the back-end.  A stored session is only reused
+    for the same, unchanged file.
+
+    :type store: :class:`SessionStore`
+    :param store: Where the session state is kept.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: The blob being uploaded.
+
+    :type file_obj: file
+    :param file_obj: The file being uploaded;  must be a file on disk.
+
+    :raises: :class:`ValueError` if ``file_obj`` is not a file on disk.
+    """
+
+    def __init__(self, store, blob, file_obj):
+        try:
+            stat = os.fstat(file_obj.fileno())
+        except (AttributeError, OSError, ValueError):
+            raise ValueError('Resumable state requires a file on disk.')
+        filename = getattr(file_obj, 'name', None)
+        if filename is not None:
+            filename = os.path.abspath(filename)
+        self._store = store
+        self.key = '%s/%s' % (blob.bucket.name, blob.name)
+        self._identity = {
+            'bucket': blob.bucket.name,
+            'name': blob.name,
+            'filename': filename,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+        }
+        self._state = None
+
+    def resume(self, upload, http):
+        """Resume the stored session, if it is still usable.
+
+        Stale state (for a changed file, or a session the back-end has
+        discarded) is removed from the store.
+
+        :type upload: :class:`google.cloud.streaming.transfer.Upload`
+        :param upload: An uninitialized upload of the file.
+
+        :type http: :class:`httplib2.Http` (or workalike)
+        :param http: Http instance used to query the session.
+
+        :rtype: boolean
+        :returns: True if ``upload`` was resumed, else False.
+        """
+        state = self._store.load(self.key)
+        if state is None:
+            return False
+        for name, value in self._identity.items():
+            if state.get(name) != value:
+                self._store.delete(self.key)
+                return False
+        try:
+            upload.resume_upload(state['url'], http)
+        except HttpError:
+            self._store.delete(self.key)
+            return False
+        self._state = state
+        return True
+
+    def start(self, upload):
+        """Record a newly-initialized session.
+
+        :type upload: :class:`google.cloud.streaming.transfer.Upload`
+        :param upload: The initialized upload.
+        """
+        self._state = dict(self._identity, url=upload.url, offset=0)
+        self._store.save(self.key, self._state)
+
+    def record(self, response, upload):  # pylint: disable=unused-argument
+        """Record the offset confirmed by the back-end.
+
+        Intended as the ``callback`` of
+        :meth:`google.cloud.streaming.transfer.Upload.stream_file`.  The
+        state is removed once the upload completes.
+
+        :type response: :class:`google.cloud.streaming.http_wrapper.Response`
+        :param response: The response to the last chunk.
+
+        :type upload: :class:`google.cloud.streaming.transfer.Upload`
+        :param upload: The upload in progress.
+        """
+        if upload.complete:
+            self._store.delete(self.key)
+        else:
+            self._state['offset'] = upload.stream.tell()
+            self._store.save(self.key, self._state)
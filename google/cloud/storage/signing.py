@@ -0,0 +1,334 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Generate signed URLs in bulk.
+
+:meth:`Blob.generate_signed_url
+<google.cloud.storage.blob.Blob.generate_signed_url>` signs one URL per
+call.  A :class:`URLSigner` signs many, with one set of credentials:
+
+* Expirations may be rounded up to a ``granularity``, so that URLs for
+  the same resource within one time bucket are identical;  signed URLs
+  are memoized until they expire, so repeats cost no signature at all.
+* Signing may be spread across a pool of processes, each of which loads
+  the private key once.
+
+::
+
+    >>> import datetime
+    >>> from google.cloud.storage.signing import URLSigner
+    >>> signer = URLSigner(client._connection.credentials,
+    ...                    granularity=300, processes=4)
+    >>> an_hour = datetime.timedelta(hours=1)  # From now.
+    >>> urls = signer.sign_many(
+    ...     [(blob, an_hour) for blob in bucket.list_blobs()])
+    >>> signer.close()
+
+An integer expiration is a time in seconds since the epoch, not a
+duration.
+"""
+
+import multiprocessing
+import threading
+import time
+
+import six
+
+from google.cloud.credentials import _get_expiration_seconds
+from google.cloud.credentials import generate_signed_url
+from google.cloud.storage.blob import _API_ACCESS_ENDPOINT
+
+
+DEFAULT_MAX_CACHED = 100000
+"""Default number of signed URLs memoized by a signer."""
+
+_POOL_CHUNK_SIZE = 256
+"""URLs signed per task sent to a worker process;  smaller batches are
+signed in this process."""
+
+_Pool = multiprocessing.Pool
+
+_WORKER_CREDENTIALS = None
+"""The credentials loaded by :func:`_init_worker`, in a worker process."""
+
+
+class _KeyCredentials(object):
+    """Credentials which only sign, with a private key loaded once.
+
+    :type service_account_email: str
+    :param service_account_email: The account to which the key belongs.
+
+    :type private_key_pem: str
+    :param private_key_pem: The account's PEM encoded private key.
+    """
+
+    def __init__(self, service_account_email, private_key_pem):
+        from oauth2client import crypt
+        self.service_account_email = service_account_email
+        self._signer = crypt.Signer.from_string(private_key_pem)
+
+    def sign_blob(self, blob):
+        """Sign bytes, as :meth:`ServiceAccountCredentials.sign_blob`.
+
+        :type blob: bytes
+        :param blob: The bytes to sign.
+
+        :rtype: tuple
+        :returns: A pair of ``None`` (the key ID) and the signature.
+        """
+        return None, self._signer.sign(blob)
+
+
+def _init_worker(service_account_email, private_key_pem):
+    """Load the signing key, once per worker process.
+
+    :type service_account_email: str
+    :param service_account_email: The account to which the key belongs.
+
+    :type private_key_pem: str
+    :param private_key_pem: The account's PEM encoded private key.
+    """
+    global _WORKER_CREDENTIALS  # pylint: disable=global-statement
+    _WORKER_CREDENTIALS = _KeyCredentials(service_account_email,
+                                          private_key_pem)
+
+
+def _sign_in_worker(request):
+    """Sign a URL in a worker process.
+
+    :type request: tuple
+    :param request: The resource, expiration and options of the URL.
+
+    :rtype: str
+    :returns: The signed URL.
+    """
+    resource, expiration, options = request
+    return _sign(_WORKER_CREDENTIALS, resource, expiration, options)
+
+
+def _sign(credentials, resource, expiration, options):
+    """Sign a URL.
+
+    :type credentials: :class:`oauth2client.client.AssertionCredentials`
+    :param credentials: Credentials with a private key.
+
+    :type resource: str
+    :param resource: The resource, ``/bucket-name/quoted-blob-name``.
+
+    :type expiration: int
+    :param expiration: When the URL expires, in seconds since the epoch.
+
+    :type options: tuple
+    :param options: The method, content MD5 and type, response type and
+                    disposition, and generation of the URL.
+
+    :rtype: str
+    :returns: The signed URL.
+    """
+    (method, content_md5, content_type,
+     response_type, response_disposition, generation) = options
+    return generate_signed_url(
+        credentials, resource, expiration,
+        api_access_endpoint=_API_ACCESS_ENDPOINT,
+        method=method, content_md5=content_md5, content_type=content_type,
+        response_type=response_type,
+        response_disposition=response_disposition,
+        generation=generation)
+
+
+class URLSigner(object):
+    """Sign many URLs with one set of credentials.
+
+    :type credentials: :class:`oauth2client.client.AssertionCredentials`
+    :param credentials: Credentials with a private key, e.g. those of a
+                        service account.
+
+    :type granularity: int
+    :param granularity: (Optional) Round expirations up to a multiple of
+                        this many seconds, so that URLs within one such
+                        time bucket are shared.  URLs then remain valid
+                        for up to ``granularity`` seconds longer than
+                        asked.
+
+    :type processes: int
+    :param processes: (Optional) Sign large batches in a pool of this many
+                      processes.  Requires credentials loaded from a JSON
+                      key file.
+
+    :type max_cached: int
+    :param max_cached: (Optional) How many signed URLs to memoize.
+
+    :raises: :class:`ValueError` if ``processes`` is passed, but the private
+             key of ``credentials`` is unavailable.
+    """
+
+    def __init__(self, credentials, granularity=None, processes=None,
+                 max_cached=DEFAULT_MAX_CACHED):
+        self._credentials = credentials
+        self.granularity = granularity
+        self.processes = processes
+        self.max_cached = max_cached
+        self._pool = None
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        self._pool_args = None
+        if processes is not None:
+            private_key_pem = getattr(
+                credentials, '_private_key_pkcs8_pem', None)
+            if private_key_pem is None:
+                raise ValueError('Signing in processes needs credentials '
+                                 'loaded from a JSON key file.')
+            self._pool_args = (credentials.service_account_email,
+                               private_key_pem)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes, if any."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _expiration(self, expiration):
+        """Convert an expiration to a timestamp, rounded up if configured.
+
+        :type expiration: int, long, datetime.datetime, datetime.timedelta
+        :param expiration: When the signed URL should expire.
+
+        :rtype: int
+        :returns: The expiration, in seconds since the epoch.
+        """
+        expiration = _get_expiration_seconds(expiration)
+        if self.granularity:
+            expiration = -(-expiration // self.granularity) * self.granularity
+        return expiration
+
+    def _remember(self, signed):
+        """Memoize signed URLs, forgetting expired ones when full.
+
+        :type signed: dict
+        :param signed: Signed URLs, keyed by resource, expiration and
+                       options.
+        """
+        with self._cache_lock:
+            if len(self._cache) + len(signed) > self.max_cached:
+                now = time.time()
+                for key in [key for key in self._cache if key[1] <= now]:
+                    del self._cache[key]
+                if len(self._cache) + len(signed) > self.max_cached:
+                    self._cache.clear()
+            if len(signed) <= self.max_cached:
+                self._cache.update(signed)
+
+    def _sign_all(self, requests):
+        """Sign URLs, in the worker processes if worthwhile.
+
+        :type requests: list
+        :param requests: (resource, expiration, options) tuples.
+
+        :rtype: list
+        :returns: The signed URLs, in the order of ``requests``.
+        """
+        if self.processes is None or len(requests) < _POOL_CHUNK_SIZE:
+            return [_sign(self._credentials, *request)
+                    for request in requests]
+        if self._pool is None:
+            self._pool = _Pool(self.processes, _init_worker, self._pool_args)
+        return self._pool.map(_sign_in_worker, requests, _POOL_CHUNK_SIZE)
+
+    def sign_many(self, items, method='GET', content_md5=None,
+                  content_type=None, response_type=None,
+                  response_disposition=None, generation=None):
+        """Generate signed URLs for many resources.
+
+        The options apply to every URL;  see
+        :meth:`Blob.generate_signed_url
+        <google.cloud.storage.blob.Blob.generate_signed_url>` for their
+        meaning.
+
+        :type items: iterable
+        :param items: Pairs of a resource and an expiration.  Resources are
+                      :class:`~google.cloud.storage.blob.Blob` instances,
+                      or strings, ``/bucket-name/quoted-blob-name``.
+                      Expirations are as for
+                      :meth:`~google.cloud.storage.blob.Blob.generate_signed_url`.
+
+        :type method: str
+        :param method: The HTTP verb that will be used when requesting the URL.
+
+        :type content_md5: str
+        :param content_md5: (Optional) The MD5 hash of the object.
+
+        :type content_type: str
+        :param content_type: (Optional) The content type of the object.
+
+        :type response_type: str
+        :param response_type: (Optional) Content type of responses to
+                              requests for the signed URL.
+
+        :type response_disposition: str
+        :param response_disposition: (Optional) Content disposition of
+                                     responses to requests for the signed
+                                     URL.
+
+        :type generation: str
+        :param generation: (Optional) The generation of the object to fetch.
+
+        :rtype: list
+        :returns: The signed URLs, in the order of ``items``.
+        :raises: :class:`TypeError` for an invalid expiration.
+        """
+        options = (method, content_md5, content_type,
+                   response_type, response_disposition, generation)
+        keys = []
+        for resource, expiration in items:
+            if not isinstance(resource, six.string_types):
+                resource = resource._signed_resource
+            keys.append((resource, self._expiration(expiration), options))
+
+        found = {}
+        missing = []
+        with self._cache_lock:
+            for key in keys:
+                if key in self._cache:
+                    found[key] = self._cache[key]
+                elif key not in found:
+                    found[key] = None
+                    missing.append(key)
+        signed = dict(zip(missing, self._sign_all(missing)))
+        self._remember(signed)
+        found.update(signed)
+        return [found[key] for key in keys]
+
+    def sign(self, resource, expiration, **kwargs):
+        """Generate a signed URL for one resource.
+
+        :type resource: :class:`~google.cloud.storage.blob.Blob` or str
+        :param resource: The blob, or ``/bucket-name/quoted-blob-name``.
+
+        :type expiration: int, long, datetime.datetime, datetime.timedelta
+        :param expiration: When the signed URL should expire.
+
+        :type kwargs: dict
+        :param kwargs: Options, as for :meth:`sign_many`.
+
+        :rtype: str
+        :returns: The signed URL.
+        """
+        return self.sign_many([(resource, expiration)], **kwargs)[0]
@@ -0,0 +1,442 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Synchronize a local directory with the blobs under a bucket prefix.
+
+Like ``gsutil rsync``, only files which differ are transferred:  the
+local tree is compared with a single listing of the prefix, using sizes
+and modification times (or, optionally, checksums), and the changed files
+are then transferred several at once.
+
+.. code-block:: python
+
+  >>> from google.cloud import storage
+  >>> from google.cloud.storage.sync import sync_to_bucket
+  >>> bucket = storage.Client().bucket('my-bucket')
+  >>> actions, failures = sync_to_bucket('site/', bucket, prefix='www/',
+  ...                                    delete=True)
+"""
+
+import base64
+import collections
+import os
+import tempfile
+
+from google.cloud._helpers import _microseconds_from_datetime
+from google.cloud.storage._bulk import DEFAULT_MAX_WORKERS
+from google.cloud.storage._bulk import run_concurrently
+from google.cloud.storage._helpers import _base64_md5hash
+from google.cloud.storage._helpers import _crc32c_hash
+from google.cloud.storage._helpers import _replace
+from google.cloud.storage._helpers import _write_buffer_to_hash
+from google.cloud.storage.blob import Blob
+
+
+UPLOAD = 'upload'
+"""Action kind:  upload a local file to a blob."""
+
+DOWNLOAD = 'download'
+"""Action kind:  download a blob to a local file."""
+
+DELETE = 'delete'
+"""Action kind:  delete a blob, or a local file, absent from the source."""
+
+_TEMP_PREFIX = '.gcloud-sync-'
+"""Prefix of the temporary files written by downloads (never synced)."""
+
+
+class SyncAction(collections.namedtuple('SyncAction',
+                                        'kind name path size mtime')):
+    """A single step of a sync.
+
+    :type kind: string
+    :param kind: One of :data:`UPLOAD`, :data:`DOWNLOAD` or :data:`DELETE`.
+
+    :type name: string
+    :param name: The name of the blob.
+
+    :type path: string
+    :param path: The local path of the file.
+
+    :type size: integer
+    :param size: The number of bytes to transfer (0 for a delete).
+
+    :type mtime: float or ``NoneType``
+    :param mtime: The modification time of the source (``None`` for a
+                  delete), as a POSIX timestamp.
+    """
+    __slots__ = ()
+
+
+_LocalFile = collections.namedtuple('_LocalFile', 'path size mtime')
+
+
+def _normalize_prefix(prefix):
+    """Ensure a non-empty prefix names a "directory".
+
+    :type prefix: string
+    :param prefix: The blob name prefix.
+
+    :rtype: string
+    :returns: The prefix, ending in ``/`` unless empty.
+    """
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    return prefix
+
+
+def _local_files(local_dir):
+    """Find the files under a local directory.
+
+    :type local_dir: string
+    :param local_dir: The directory to search.
+
+    :rtype: dict
+    :returns: Maps the ``/``-separated path of each file, relative to
+              ``local_dir``, to its path, size and modification time.
+    """
+    found = {}
+    for dirpath, _, filenames in os.walk(local_dir):
+        for filename in filenames:
+            if filename.startswith(_TEMP_PREFIX):
+                continue
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            relative = os.path.relpath(path, local_dir).replace(os.sep, '/')
+            found[relative] = _LocalFile(path, stat.st_size, stat.st_mtime)
+    return found
+
+
+def _relative_name(blob, prefix):
+    """Return a blob's name relative to the prefix, if it can be synced.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: A blob under the prefix.
+
+    :type prefix: string
+    :param prefix: The (normalized) prefix.
+
+    :rtype: string or ``NoneType``
+    :returns: The relative name, or ``None`` for names which cannot be a
+              file under the local directory:  "directory" placeholders
+              ending in ``/``, and names with empty, ``.`` or ``..``
+              segments.
+    """
+    relative = blob.name[len(prefix):]
+    for segment in relative.split('/'):
+        if segment in ('', '.', '..'):
+            return None
+    return relative
+
+
+def _updated_timestamp(blob):
+    """Return a blob's update time as a POSIX timestamp.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: A blob loaded from a listing.
+
+    :rtype: float
+    :returns: Seconds since the epoch.
+    """
+    return _microseconds_from_datetime(blob.updated) / 1e6
+
+
+def _local_checksum(path, blob):
+    """Compute the checksum of a local file which the blob reports.
+
+    :type path: string
+    :param path: The path of the local file.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: The blob to compare with.
+
+    :rtype: string
+    :returns: The base64-encoded MD5 hash of the file, if the blob has one,
+              else its CRC32C checksum.
+    """
+    with open(path, 'rb') as file_obj:
+        if blob.md5_hash is not None:
+            return _base64_md5hash(file_obj).decode('ascii')
+        hash_obj = _crc32c_hash()
+        _write_buffer_to_hash(file_obj, hash_obj)
+    return base64.b64encode(hash_obj.digest()).decode('ascii')
+
+
+def _is_changed(local, blob, checksum, upload):
+    """Decide whether a file and blob differ.
+
+    :type local: :class:`_LocalFile`
+    :param local: The local file.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: The blob with the same relative name.
+
+    :type checksum: boolean
+    :param checksum: If True, compare checksums;  if False, modification
+                     times, to the second.
+
+    :type upload: boolean
+    :param upload: If True, the local file is the source, and changed if it
+                   is newer than the blob;  if False, the reverse.
+
+    :rtype: boolean
+    :returns: True if the file needs to be transferred.
+    """
+    if local.size != blob.size:
+        return True
+    if checksum:
+        remote = blob.md5_hash or blob.crc32c
+        return remote is None or _local_checksum(local.path, blob) != remote
+    local_mtime = int(local.mtime)
+    remote_mtime = int(_updated_timestamp(blob))
+    if upload:
+        return local_mtime > remote_mtime
+    return remote_mtime > local_mtime
+
+
+def _plan_upload(local_dir, bucket, prefix, delete, checksum, client):
+    """Compare a local tree with a prefix, for :func:`sync_to_bucket`.
+
+    :rtype: list of :class:`SyncAction`
+    :returns: The actions which make the prefix match the local tree.
+    """
+    local = _local_files(local_dir)
+    actions = []
+    for blob in bucket.list_blobs(prefix=prefix, client=client):
+        relative = _relative_name(blob, prefix)
+        if relative is None:
+            continue
+        found = local.pop(relative, None)
+        if found is None:
+            if delete:
+                actions.append(SyncAction(DELETE, blob.name, None, 0, None))
+        elif _is_changed(found, blob, checksum, upload=True):
+            actions.append(SyncAction(UPLOAD, blob.name, found.path,
+                                      found.size, found.mtime))
+    for relative in sorted(local):
+        found = local[relative]
+        actions.append(SyncAction(UPLOAD, prefix + relative, found.path,
+                                  found.size, found.mtime))
+    return actions
+
+
+def _plan_download(bucket, local_dir, prefix, delete, checksum, client):
+    """Compare a prefix with a local tree, for :func:`sync_from_bucket`.
+
+    :rtype: list of :class:`SyncAction`
+    :returns: The actions which make the local tree match the prefix.
+    """
+    local = _local_files(local_dir)
+    actions = []
+    for blob in bucket.list_blobs(prefix=prefix, client=client):
+        relative = _relative_name(blob, prefix)
+        if relative is None:
+            continue
+        found = local.pop(relative, None)
+        if found is None or _is_changed(found, blob, checksum, upload=False):
+            path = os.path.join(local_dir, *relative.split('/'))
+            actions.append(SyncAction(DOWNLOAD, blob.name, path, blob.size,
+                                      _updated_timestamp(blob)))
+    if delete:
+        for relative in sorted(local):
+            actions.append(SyncAction(DELETE, prefix + relative,
+                                      local[relative].path, 0, None))
+    return actions
+
+
+def _download(bucket, action, client):
+    """Download a blob to a temporary file, then move it into place.
+
+    Interrupted downloads thus never leave a partial file behind, which
+    would look newer than the blob.
+
+    :type bucket: :class:`google.cloud.storage.bucket.Bucket`
+    :param bucket: The bucket holding the blob.
+
+    :type action: :class:`SyncAction`
+    :param action: The download to perform.
+
+    :type client: :class:`~google.cloud.storage.client.Client`
+    :param client: The client to use.
+    """
+    directory = os.path.dirname(action.path)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+    handle, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX, dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as file_obj:
+            blob = Blob(action.name, bucket=bucket)
+            blob.download_to_file(file_obj, client=client)
+        os.utime(temp_path, (action.mtime, action.mtime))
+        _replace(temp_path, action.path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _execute(bucket, actions, max_workers, callback, client):
+    """Perform the planned actions:  transfers first, then deletes.
+
+    :rtype: list of tuples
+    :returns: ``(action, exception)`` for each action which failed.
+    """
+    def _transfer(action, worker_client):
+        if action.kind == UPLOAD:
+            blob = Blob(action.name, bucket=bucket)
+            blob.upload_from_filename(action.path, client=worker_client)
+        else:
+            _download(bucket, action, worker_client)
+        if callback is not None:
+            callback(action)
+
+    transfers = [action for action in actions if action.kind != DELETE]
+    failures = run_concurrently(client, transfers, _transfer,
+                                max_workers=max_workers)
+
+    deletes = [action for action in actions if action.kind == DELETE]
+    remote = dict((action.name, action) for action in deletes
+                  if action.path is None)
+    failed = set()
+    if remote:
+        for blob, exc in bucket.bulk_delete(sorted(remote),
+                                            max_workers=max_workers,
+                                            client=client):
+            failures.append((remote[blob.name], exc))
+            failed.add(blob.name)
+    for action in deletes:
+        if action.path is not None:
+            try:
+                os.remove(action.path)
+            except OSError as exc:
+                failures.append((action, exc))
+                failed.add(action.name)
+        if callback is not None and action.name not in failed:
+            callback(action)
+    return failures
+
+
+def sync_to_bucket(local_dir, bucket, prefix='', delete=False,
+                   checksum=False, dry_run=False,
+                   max_workers=DEFAULT_MAX_WORKERS, callback=None,
+                   client=None):
+    """Make the blobs under a prefix match the files in a local directory.
+
+    Files are uploaded if their blob is missing, differs in size, or (by
+    default) is older than the file.
+
+    :type local_dir: string
+    :param local_dir: The directory to upload from.
+
+    :type bucket: :class:`google.cloud.storage.bucket.Bucket`
+    :param bucket: The bucket to upload to.
+
+    :type prefix: string
+    :param prefix: Optional. The prefix under which files are stored;  a
+                   ``/`` is appended if missing.
+
+    :type delete: boolean
+    :param delete: Optional. If True, delete blobs under the prefix which
+                   have no local file.
+
+    :type checksum: boolean
+    :param checksum: Optional. If True, compare the MD5 (or CRC32C) checksum
+                     of each file with its blob's, instead of modification
+                     times.  Slower, since every file is read.
+
+    :type dry_run: boolean
+    :param dry_run: Optional. If True, only plan the actions.
+
+    :type max_workers: integer
+    :param max_workers: Optional. The number of transfers made at once.
+
+    :type callback: callable, taking a :class:`SyncAction`
+    :param callback: Optional. Called after each action succeeds;  may be
+                     called from several threads at once.
+
+    :type client: :class:`~google.cloud.storage.client.Client` or
+                  ``NoneType``
+    :param client: Optional. The client to use.  If not passed, falls back
+                   to the ``client`` stored on the bucket.
+
+    :rtype: tuple (list, list)
+    :returns: The planned :class:`SyncAction` instances, and an
+              ``(action, exception)`` pair for each action which failed.
+    """
+    client = bucket._require_client(client)
+    prefix = _normalize_prefix(prefix)
+    actions = _plan_upload(local_dir, bucket, prefix, delete, checksum,
+                           client)
+    if dry_run:
+        return actions, []
+    return actions, _execute(bucket, actions, max_workers, callback, client)
+
+
+def sync_from_bucket(bucket, local_dir, prefix='', delete=False,
+                     checksum=False, dry_run=False,
+                     max_workers=DEFAULT_MAX_WORKERS, callback=None,
+                     client=None):
+    """Make the files in a local directory match the blobs under a prefix.
+
+    Blobs are downloaded if their file is missing, differs in size, or (by
+    default) is older than the blob.  Downloaded files are given the
+    blob's update time as their modification time.
+
+    :type bucket: :class:`google.cloud.storage.bucket.Bucket`
+    :param bucket: The bucket to download from.
+
+    :type local_dir: string
+    :param local_dir: The directory to download to;  created if needed.
+
+    :type prefix: string
+    :param prefix: Optional. The prefix under which files are stored;  a
+                   ``/`` is appended if missing.
+
+    :type delete: boolean
+    :param delete: Optional. If True, delete local files which have no blob
+                   under the prefix.
+
+    :type checksum: boolean
+    :param checksum: Optional. If True, compare the MD5 (or CRC32C) checksum
+                     of each file with its blob's, instead of modification
+                     times.  Slower, since every file is read.
+
+    :type dry_run: boolean
+    :param dry_run: Optional. If True, only plan the actions.
+
+    :type max_workers: integer
+    :param max_workers: Optional. The number of transfers made at once.
+
+    :type callback: callable, taking a :class:`SyncAction`
+    :param callback: Optional. Called after each action succeeds;  may be
+                     called from several threads at once.
+
+    :type client: :class:`~google.cloud.storage.client.Client` or
+                  ``NoneType``
+    :param client: Optional. The client to use.  If not passed, falls back
+                   to the ``client`` stored on the bucket.
+
+    :rtype: tuple (list, list)
+    :returns: The planned :class:`SyncAction` instances, and an
+              ``(action, exception)`` pair for each action which failed.
+    """
+    client = bucket._require_client(client)
+    prefix = _normalize_prefix(prefix)
+    actions = _plan_download(bucket, local_dir, prefix, delete, checksum,
+                             client)
+    if dry_run:
+        return actions, []
+    return actions, _execute(bucket, actions, max_workers, callback, client)
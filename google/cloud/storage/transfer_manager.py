@@ -0,0 +1,592 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run many uploads and downloads concurrently.
+
+Queue the transfers on a :class:`TransferManager`, then run them all::
+
+    >>> from google.cloud import storage
+    >>> from google.cloud.storage.transfer_manager import TransferManager
+    >>> client = storage.Client()
+    >>> bucket = client.get_bucket('my-bucket')
+    >>> manager = TransferManager(client, max_workers=16,
+    ...                           max_bandwidth=50 << 20)
+    >>> for name in ['a.csv', 'b.csv', 'c.csv']:
+    ...     manager.upload(bucket.blob(name), '/data/' + name)
+    >>> failures = manager.run()
+
+Each worker thread uses its own client (and so its own HTTP transport).
+The transfer mode of each job is chosen from its size:  small uploads
+are sent in a single request, and larger ones as resumable uploads;
+large downloads are split into byte ranges ("slices") which are
+downloaded concurrently into the same file.
+"""
+
+import collections
+import math
+import mimetypes
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import httplib2
+from six.moves import http_client
+
+from google.cloud.exceptions import GoogleCloudError
+from google.cloud.storage._bulk import DEFAULT_MAX_WORKERS
+from google.cloud.storage._bulk import run_concurrently
+from google.cloud.storage._helpers import _HashingStream
+from google.cloud.storage._helpers import _make_hash_objects
+from google.cloud.storage._helpers import _replace
+from google.cloud.storage._helpers import _verify_checksums
+from google.cloud.streaming.exceptions import Error as TransferFailure
+from google.cloud.streaming.exceptions import HttpError
+from google.cloud.streaming.exceptions import TransferError
+from google.cloud.streaming.http_wrapper import Request
+from google.cloud.streaming.transfer import Download
+from google.cloud.streaming.transfer import RESUMABLE_UPLOAD_THRESHOLD
+from google.cloud.streaming.util import calculate_wait_for_retry
+
+
+UPLOAD = 'upload'
+"""Job kind:  upload a file to a blob."""
+
+DOWNLOAD = 'download'
+"""Job kind:  download a blob to a file."""
+
+SIMPLE = 'simple'
+"""Transfer mode:  a single request, or a single download stream."""
+
+RESUMABLE = 'resumable'
+"""Transfer mode:  a chunked, resumable upload."""
+
+SLICED = 'sliced'
+"""Transfer mode:  byte ranges of the blob, downloaded concurrently."""
+
+DEFAULT_SLICED_THRESHOLD = 128 << 20
+"""Downloads at least this large (in bytes) are sliced."""
+
+DEFAULT_SLICE_SIZE = 32 << 20
+"""Size (in bytes) of each slice of a sliced download."""
+
+_TEMP_PREFIX = '.gcloud-transfer-'
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+_FAILURES = (GoogleCloudError, EnvironmentError, TransferFailure)
+"""Errors which fail a job, rather than the whole run."""
+
+
+TransferProgress = collections.namedtuple(
+    'TransferProgress',
+    'bytes_transferred total_bytes jobs_completed jobs_total')
+"""A snapshot of the progress of a :class:`TransferManager` run."""
+
+
+def _is_retryable(exc):
+    """Might the operation which raised ``exc`` succeed if tried again?
+
+    :type exc: :class:`Exception`
+    :param exc: A job failure.
+
+    :rtype: boolean
+    :returns: True for server-side, network and data transfer errors;
+              False for client-side errors (e.g., ``404 Not Found``) and
+              errors reading or writing local files.
+    """
+    if isinstance(exc, GoogleCloudError):
+        return exc.code == 429 or exc.code >= 500
+    if isinstance(exc, HttpError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    if isinstance(exc, EnvironmentError):
+        # Errors opening local files name the file;  socket errors don't.
+        return getattr(exc, 'filename', None) is None
+    return isinstance(exc, (TransferError, socket.error,
+                            http_client.HTTPException,
+                            httplib2.HttpLib2Error))
+
+
+class _RateLimiter(object):
+    """Limit the rate at which bytes pass, across threads.
+
+    Bytes are allowed to pass immediately, as long as the average rate
+    over the last second stays within the limit;  beyond that, the
+    caller is made to wait until it would have.
+
+    :type rate: integer
+    :param rate: The limit, in bytes per second.
+    """
+
+    def __init__(self, rate):
+        if rate <= 0:
+            raise ValueError('Bandwidth limits must be positive.')
+        self.rate = float(rate)
+        self._allowance = self.rate
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def consume(self, num_bytes):
+        """Account for bytes passed, waiting if they exceed the limit.
+
+        :type num_bytes: integer
+        :param num_bytes: The number of bytes passed.
+        """
+        with self._lock:
+            now = time.time()
+            self._allowance = min(
+                self.rate, self._allowance + (now - self._last) * self.rate)
+            self._last = now
+            self._allowance -= num_bytes
+            wait = -self._allowance / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _ThrottledStream(object):
+    """Proxy a file-like object, limiting and reporting the bytes passed.
+
+    All attributes other than ``read`` and ``write`` are delegated to the
+    wrapped stream.
+
+    :type stream: file-like object
+    :param stream: The stream to wrap.
+
+    :type limiters: list of :class:`_RateLimiter`
+    :param limiters: The limits which apply to the stream.
+
+    :type record: callable, taking ``(num_bytes)``
+    :param record: Called with the size of each read / write.
+    """
+
+    def __init__(self, stream, limiters, record):
+        self._stream = stream
+        self._limiters = limiters
+        self._record = record
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def _account(self, num_bytes):
+        """Wait for the limiters, then record the bytes passed."""
+        for limiter in self._limiters:
+            limiter.consume(num_bytes)
+        self._record(num_bytes)
+
+    def read(self, *args):
+        """Read bytes from the wrapped stream.
+
+        :type args: tuple
+        :param args: Passed to the wrapped stream's ``read``.
+
+        :rtype: bytes
+        :returns: The bytes read.
+        """
+        data = self._stream.read(*args)
+        self._account(len(data))
+        return data
+
+    def write(self, data):
+        """Write bytes to the wrapped stream.
+
+        :type data: bytes
+        :param data: The bytes to write.
+        """
+        self._stream.write(data)
+        self._account(len(data))
+
+
+class TransferJob(object):
+    """An upload or download run by a :class:`TransferManager`.
+
+    :type kind: string
+    :param kind: :data:`UPLOAD` or :data:`DOWNLOAD`.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: The blob to upload to or download from.
+
+    :type filename: string
+    :param filename: The local file to upload from or download to.
+    """
+
+    def __init__(self, kind, blob, filename):
+        self.kind = kind
+        self.blob = blob
+        self.filename = filename
+        self.size = None
+        self.mode = None
+        self.attempts = 0
+        self.bytes_transferred = 0
+        self.error = None
+        self.done = False
+        self._pending = 0
+        self._temp_path = None
+
+    def __repr__(self):
+        return '<TransferJob: %s %s %s>' % (
+            self.kind, self.blob.name, self.filename)
+
+
+class TransferManager(object):
+    """Run many uploads and downloads on a bounded pool of threads.
+
+    :type client: :class:`google.cloud.storage.client.Client`
+    :param client: The client used to make requests.  If its connection
+                   has no credentials (e.g., a custom ``http`` was
+                   passed), transfers run one at a time.
+
+    :type max_workers: integer
+    :param max_workers: The number of transfers (or slices) to run at once.
+
+    :type max_bandwidth: integer or ``NoneType``
+    :param max_bandwidth: Optional. The limit, in bytes per second, for
+                          all transfers together.
+
+    :type job_bandwidth: integer or ``NoneType``
+    :param job_bandwidth: Optional. The limit, in bytes per second, for
+                          each job.
+
+    :type num_retries: integer
+    :param num_retries: The number of times a transfer (or slice) which
+                        failed with a retryable error is started again.
+
+    :type sliced_threshold: integer
+    :param sliced_threshold: Downloads at least this large are sliced.
+
+    :type slice_size: integer
+    :param slice_size: The size of each slice of a sliced download.
+
+    :type callback: callable, taking ``(progress)``
+    :param callback: Optional. Called with a :class:`TransferProgress`
+                     whenever bytes are transferred, from the worker
+                     threads.
+    """
+
+    def __init__(self, client, max_workers=DEFAULT_MAX_WORKERS,
+                 max_bandwidth=None, job_bandwidth=None, num_retries=3,
+                 sliced_threshold=DEFAULT_SLICED_THRESHOLD,
+                 slice_size=DEFAULT_SLICE_SIZE, callback=None):
+        self._client = client
+        self._max_workers = max_workers
+        self._limiter = None
+        if max_bandwidth is not None:
+            self._limiter = _RateLimiter(max_bandwidth)
+        self._job_bandwidth = job_bandwidth
+        self._num_retries = num_retries
+        self._sliced_threshold = sliced_threshold
+        self._slice_size = slice_size
+        self._callback = callback
+        self._jobs = []
+        self._job_limiters = {}
+        self._lock = threading.Lock()
+
+    @property
+    def jobs(self):
+        """The jobs queued on this manager.
+
+        :rtype: list of :class:`TransferJob`
+        :returns: The jobs, in the order they were queued.
+        """
+        return list(self._jobs)
+
+    @property
+    def progress(self):
+        """The progress of the queued jobs.
+
+        Sizes are known once :meth:`run` has started.
+
+        :rtype: :class:`TransferProgress`
+        :returns: A snapshot of the progress.
+        """
+        with self._lock:
+            return TransferProgress(
+                sum(job.bytes_transferred for job in self._jobs),
+                sum(job.size or 0 for job in self._jobs),
+                sum(1 for job in self._jobs if job.done),
+                len(self._jobs))
+
+    def _add(self, kind, blob, filename):
+        """Queue a job."""
+        job = TransferJob(kind, blob, filename)
+        self._jobs.append(job)
+        if self._job_bandwidth is not None:
+            self._job_limiters[job] = _RateLimiter(self._job_bandwidth)
+        return job
+
+    def upload(self, blob, filename):
+        """Queue an upload of a file's contents to a blob.
+
+        The content type is taken from the blob, or else guessed from the
+        filename.
+
+        :type blob: :class:`google.cloud.storage.blob.Blob`
+        :param blob: The blob to upload to.
+
+        :type filename: string
+        :param filename: The path of the file to upload.
+
+        :rtype: :class:`TransferJob`
+        :returns: The queued job.
+        """
+        return self._add(UPLOAD, blob, filename)
+
+    def download(self, blob, filename):
+        """Queue a download of a blob's contents to a file.
+
+        The file is replaced only once the download is complete.
+
+        :type blob: :class:`google.cloud.storage.blob.Blob`
+        :param blob: The blob to download.
+
+        :type filename: string
+        :param filename: The path of the file to download to.
+
+        :rtype: :class:`TransferJob`
+        :returns: The queued job.
+        """
+        return self._add(DOWNLOAD, blob, filename)
+
+    def run(self):
+        """Run all queued jobs which are not yet done.
+
+        Jobs which failed in an earlier run are tried again.
+
+        :rtype: list of tuples
+        :returns: ``(job, exception)`` for each job which failed.
+        """
+        jobs = [job for job in self._jobs if not job.done]
+        for job in jobs:
+            job.error = None
+        self._measure(jobs)
+
+        tasks = []
+        for job in jobs:
+            if job.error is None:
+                tasks.extend(self._plan(job))
+        run_concurrently(self._client, tasks, self._run_task,
+                         max_workers=self._max_workers)
+        return [(job, job.error) for job in jobs if job.error is not None]
+
+    def _measure(self, jobs):
+        """Find the size of each job, loading blob properties as needed."""
+        to_reload = []
+        for job in jobs:
+            if job.kind == UPLOAD:
+                try:
+                    job.size = os.path.getsize(job.filename)
+                except EnvironmentError as exc:
+                    job.error = exc
+            elif job.blob.size is None or job.blob.media_link is None:
+                to_reload.append(job)
+
+        def _reload(job, worker_client):
+            job.blob.reload(client=worker_client)
+
+        failures = run_concurrently(self._client, to_reload, _reload,
+                                    max_workers=self._max_workers)
+        for job, exc in failures:
+            job.error = exc
+        for job in jobs:
+            if job.kind == DOWNLOAD and job.error is None:
+                job.size = job.blob.size
+
+    def _plan(self, job):
+        """Choose a job's transfer mode, and split it into tasks.
+
+        :rtype: list of tuples
+        :returns: ``(job, byte_range)`` for each task;  ``byte_range``
+                  is ``None``, except for slices of a sliced download.
+        """
+        job.bytes_transferred = 0
+        if job.kind == UPLOAD:
+            if job.size > RESUMABLE_UPLOAD_THRESHOLD:
+                job.mode = RESUMABLE
+            else:
+                job.mode = SIMPLE
+        elif (job.size >= self._sliced_threshold and
+              job.blob.content_encoding != 'gzip'):
+            job.mode = SLICED
+        else:
+            job.mode = SIMPLE
+
+        if job.mode != SLICED:
+            job._pending = 1
+            return [(job, None)]
+
+        try:
+            job._temp_path = _make_temp_file(job.filename)
+            with open(job._temp_path, 'r+b') as file_obj:
+                file_obj.truncate(job.size)
+        except EnvironmentError as exc:
+            self._cleanup(job)
+            job.error = exc
+            return []
+        count = int(math.ceil(job.size / float(self._slice_size)))
+        job._pending = count
+        return [(job, (index * self._slice_size,
+                       min((index + 1) * self._slice_size, job.size) - 1))
+                for index in range(count)]
+
+    def _record(self, job, num_bytes):
+        """Account for bytes transferred by a job."""
+        with self._lock:
+            job.bytes_transferred += num_bytes
+        if self._callback is not None:
+            self._callback(self.progress)
+
+    def _throttle(self, stream, job, record):
+        """Wrap a job's stream in the applicable bandwidth limits."""
+        limiters = [limiter for limiter in (self._limiter,
+                                            self._job_limiters.get(job))
+                    if limiter is not None]
+        return _ThrottledStream(stream, limiters, record)
+
+    def _run_task(self, task, client):
+        """Run one task, retrying it as needed.
+
+        Failures are recorded on the job, rather than raised.
+        """
+        job, byte_range = task
+        try:
+            attempt = 0
+            while job.error is None:  # Skip slices once one has failed.
+                attempt += 1
+                exc = self._attempt(job, byte_range, client)
+                if exc is None:
+                    return
+                if attempt > self._num_retries or not _is_retryable(exc):
+                    job.error = exc
+                else:
+                    time.sleep(calculate_wait_for_retry(attempt))
+        finally:
+            self._finish_task(job)
+
+    def _attempt(self, job, byte_range, client):
+        """Transfer a job, or a slice of one, once.
+
+        :rtype: :class:`Exception` or ``NoneType``
+        :returns: The failure, if any;  the bytes transferred by a failed
+                  attempt are no longer counted.
+        """
+        transferred = [0]
+
+        def _record(num_bytes):
+            transferred[0] += num_bytes
+            self._record(job, num_bytes)
+
+        with self._lock:
+            job.attempts += 1
+        try:
+            self._transfer(job, byte_range, client, _record)
+        except _FAILURES as exc:
+            self._record(job, -transferred[0])
+            return exc
+
+    def _transfer(self, job, byte_range, client, record):
+        """Send the requests for one attempt of a task."""
+        if job.kind == UPLOAD:
+            content_type = (job.blob._properties.get('contentType') or
+                            mimetypes.guess_type(job.filename)[0])
+            with open(job.filename, 'rb') as file_obj:
+                job.blob.upload_from_file(
+                    self._throttle(file_obj, job, record), size=job.size,
+                    content_type=content_type, client=client)
+        elif byte_range is None:
+            if job._temp_path is None:
+                job._temp_path = _make_temp_file(job.filename)
+            with open(job._temp_path, 'wb') as file_obj:
+                job.blob.download_to_file(
+                    self._throttle(file_obj, job, record), client=client)
+        else:
+            start, end = byte_range
+            with open(job._temp_path, 'r+b') as file_obj:
+                file_obj.seek(start)
+                download = Download.from_stream(
+                    self._throttle(file_obj, job, record),
+                    auto_transfer=False, total_size=job.size)
+                download.initialize_download(
+                    Request(job.blob.media_link, 'GET', {}),
+                    client._connection.http)
+                download.get_range(start, end)
+
+    def _finish_task(self, job):
+        """Complete the job, if this was its last task."""
+        with self._lock:
+            job._pending -= 1
+            if job._pending:
+                return
+        if job.kind == DOWNLOAD and job.error is None:
+            try:
+                if job.mode == SLICED:
+                    _verify_file(job._temp_path, job.blob)
+                if job.blob.updated is not None:
+                    mtime = time.mktime(job.blob.updated.timetuple())
+                    os.utime(job._temp_path, (mtime, mtime))
+                _replace(job._temp_path, job.filename)
+            except _FAILURES as exc:
+                job.error = exc
+        self._cleanup(job)
+        if job.error is None:
+            with self._lock:
+                job.done = True
+            if self._callback is not None:
+                self._callback(self.progress)
+
+    @staticmethod
+    def _cleanup(job):
+        """Remove a download's temporary file, if it remains."""
+        if job._temp_path is not None:
+            if os.path.exists(job._temp_path):
+                os.remove(job._temp_path)
+            job._temp_path = None
+
+
+def _make_temp_file(filename):
+    """Create an empty temporary file, next to a download's destination.
+
+    :type filename: string
+    :param filename: The destination of the download.
+
+    :rtype: string
+    :returns: The path of the temporary file.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    handle, temp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX, dir=directory)
+    os.close(handle)
+    return temp_path
+
+
+def _verify_file(path, blob):
+    """Check a sliced download against the blob's checksums.
+
+    The slices arrive out of order, so the file is hashed once complete.
+
+    :type path: string
+    :param path: The downloaded file.
+
+    :type blob: :class:`google.cloud.storage.blob.Blob`
+    :param blob: The blob downloaded.
+
+    :raises: :class:`~google.cloud.streaming.exceptions.\
+ChecksumMismatchError` if the file does not match.
+    """
+    with open(path, 'rb') as file_obj:
+        hashing_stream = _HashingStream(file_obj, _make_hash_objects('auto'))
+        while hashing_stream.read(_HASH_BLOCK_SIZE):
+            pass
+    _verify_checksums(hashing_stream, {
+        'crc32c': blob.crc32c,
+        'md5': blob.md5_hash,
+    })
@@ -0,0 +1,117 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Small helper class to choose transfer chunk sizes as a transfer runs."""
+
+
+CHUNK_ALIGNMENT = 256 * 1024
+"""Chunk sizes are kept to multiples of this many bytes."""
+
+
+class AdaptiveChunkSizer(object):
+    """Grow or shrink the chunk size of a transfer from its measurements.
+
+    After each chunk, the size moves toward the one which would take
+    ``target_seconds`` at the throughput just measured, changing by at
+    most a factor of two at a time.  Each retried request halves the size,
+    and the chunk during which it happened does not grow it again.  Sizes
+    are kept within ``minimum`` and ``maximum``, as multiples of
+    :data:`CHUNK_ALIGNMENT`.
+
+    :type initial: integer
+    :param initial: the size of the first chunk.
+
+    :type minimum: integer
+    :param minimum: the smallest size chosen.
+
+    :type maximum: integer
+    :param maximum: the largest size chosen.
+
+    :type target_seconds: float
+    :param target_seconds: the time each chunk should take.
+
+    :raises: :exc:`ValueError` if the bounds are not positive multiples of
+             :data:`CHUNK_ALIGNMENT`, or ``minimum`` exceeds ``maximum``.
+    """
+    def __init__(self, initial=1 << 20, minimum=CHUNK_ALIGNMENT,
+                 maximum=64 << 20, target_seconds=2.0):
+        for bound in (minimum, maximum):
+            if bound <= 0 or bound % CHUNK_ALIGNMENT:
+                raise ValueError(
+                    'Chunk size bounds must be positive multiples of %d' %
+                    (CHUNK_ALIGNMENT,))
+        if minimum > maximum:
+            raise ValueError('Minimum chunk size exceeds maximum')
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.size = self._bound(initial)
+        self.chunks = 0
+        self.errors = 0
+        self._retried = False
+
+    def __repr__(self):
+        return 'Adaptive chunk size %d (%d-%d bytes)' % (
+            self.size, self.minimum, self.maximum)
+
+    def _bound(self, size):
+        """Align a size to :data:`CHUNK_ALIGNMENT` and keep it in bounds.
+
+        :type size: number
+        :param size: the proposed size.
+
+        :rtype: integer
+        :returns: the nearest allowed size at or below ``size``, or
+                  ``minimum``.
+        """
+        size = int(size) // CHUNK_ALIGNMENT * CHUNK_ALIGNMENT
+        return max(self.minimum, min(self.maximum, size))
+
+    @property
+    def error_rate(self):
+        """Fraction of requests which needed a retry.
+
+        :rtype: float
+        :returns: retries divided by all requests made, or 0.0 if none
+                  were made.
+        """
+        requests = self.chunks + self.errors
+        if requests == 0:
+            return 0.0
+        return float(self.errors) / requests
+
+    def record_chunk(self, num_bytes, elapsed):
+        """Adjust the size after a chunk has been transferred.
+
+        :type num_bytes: integer
+        :param num_bytes: the number of bytes transferred.
+
+        :type elapsed: float
+        :param elapsed: the time taken, in seconds, including retries.
+        """
+        self.chunks += 1
+        if self._retried:
+            self._retried = False
+            return
+        if num_bytes <= 0 or elapsed <= 0:
+            return
+        ideal = num_bytes / float(elapsed) * self.target_seconds
+        ideal = max(self.size / 2.0, min(self.size * 2.0, ideal))
+        self.size = self._bound(ideal)
+
+    def record_error(self):
+        """Shrink the size after a request has failed and is retried."""
+        self.errors += 1
+        self._retried = True
+        self.size = self._bound(self.size // 2)
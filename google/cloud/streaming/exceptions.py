@@ -81,6 +81,26 @@ class TransferInvalidError(TransferError):
     """The given transfer is invalid."""
 
 
+class ChecksumMismatchError(TransferError):
+    """The checksum of the transferred data does not match the expected one.
+
+    :type checksum: string
+    :param checksum: name of the mismatched checksum, e.g. ``crc32c``.
+
+    :type expected: string
+    :param expected: checksum reported by the server (base64-encoded).
+
+    :type actual: string
+    :param actual: checksum of the transferred bytes (base64-encoded).
+    """
+    def __init__(self, checksum, expected, actual):
+        super(ChecksumMismatchError, self).__init__(
+            '%s mismatch: expected %s, got %s' % (checksum, expected, actual))
+        self.checksum = checksum
+        self.expected = expected
+        self.actual = actual
+
+
 class RequestError(CommunicationError):
     """The request was not successful."""
 
@@ -354,7 +354,7 @@ def _make_api_request_no_retry(http, http_request, redirections=_REDIRECTIONS):
 
 
 def make_api_request(http, http_request, retries=7,
-                     redirections=_REDIRECTIONS):
+                     redirections=_REDIRECTIONS, on_retry=None):
     """Send an HTTP request via the given http, performing error/retry handling.
 
     :type http: :class:`httplib2.Http`
@@ -370,6 +370,10 @@ def make_api_request(http, http_request, retries=7,
     :type redirections: integer
     :param redirections: Number of redirects to follow.
 
+    :type on_retry: callable, taking an exception
+    :param on_retry: (Optional) called with the exception raised by a
+                     failed attempt, before the request is retried.
+
     :rtype: :class:`Response`
     :returns: an object representing the server's response.
 
@@ -385,6 +389,8 @@ def make_api_request(http, http_request, retries=7,
             retry += 1
             if retry >= retries:
                 raise
+            if on_retry is not None:
+                on_retry(exc)
             retry_after = getattr(exc, 'retry_after', None)
             if retry_after is None:
                 retry_after = calculate_wait_for_retry(retry)
@@ -0,0 +1,183 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Read a local file through a memory map, without copying its bytes.
+
+Reads from a :class:`MappedStream` return :class:`memoryview` slices of
+the mapping, which the transport writes straight to the socket:  chunks
+of an upload are neither copied into fresh ``bytes`` objects, nor held in
+memory beyond the pages the kernel keeps cached.
+
+Mapping is opt-in:  if the file is truncated while mapped, reading past
+its new end raises ``SIGBUS``, which kills the process.
+"""
+
+import mmap
+import os
+import stat
+
+
+def map_file(file_obj):
+    """Memory-map a file opened for reading, if possible.
+
+    :type file_obj: file-like object
+    :param file_obj: A file opened in binary mode.
+
+    :rtype: :class:`MappedStream` or ``NoneType``
+    :returns: A stream reading ``file_obj`` from its current position, or
+              ``None`` if it is not a non-empty regular file on disk (e.g.
+              an in-memory buffer, or a pipe).
+    """
+    try:
+        fileno = file_obj.fileno()
+        info = os.fstat(fileno)
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+    if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+        return None
+    mapping = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    try:
+        view = memoryview(mapping)
+    except TypeError:  # pragma: NO COVER  Python2 maps have no buffer API
+        mapping.close()
+        return None
+    return MappedStream(file_obj, mapping, view)
+
+
+class MappedStream(object):
+    """A read-only stream over a memory-mapped file.
+
+    Create instances with :func:`map_file`.  Attributes other than those
+    of a stream (e.g., ``name`` or ``fileno``) are delegated to the file.
+
+    :type file_obj: file-like object
+    :param file_obj: The mapped file;  its position is where reading
+                     starts.
+
+    :type mapping: :class:`mmap.mmap`
+    :param mapping: The map of the whole file.
+
+    :type view: :class:`memoryview`
+    :param view: A view of ``mapping``.
+    """
+
+    memory_mapped = True
+    """Reads return views, to be sent as they are."""
+
+    def __init__(self, file_obj, mapping, view):
+        self._file_obj = file_obj
+        self._mapping = mapping
+        self._view = view
+        self._position = file_obj.tell()
+
+    def __repr__(self):
+        return 'Memory map of %r at position %d/%d' % (
+            self._file_obj, self._position, self.length)
+
+    def __getattr__(self, name):
+        return getattr(self._file_obj, name)
+
+    @property
+    def length(self):
+        """The size of the mapped file.
+
+        :rtype: integer
+        :returns: The number of bytes mapped.
+        """
+        return len(self._mapping)
+
+    @property
+    def closed(self):
+        """Has the stream been closed?
+
+        :rtype: boolean
+        :returns: True after :meth:`close`.
+        """
+        return self._view is None
+
+    def read(self, size=None):
+        """Read bytes from the current position, without copying them.
+
+        :type size: integer or None
+        :param size: If provided, read no more than size bytes.
+
+        :rtype: :class:`memoryview`
+        :returns: A view of the bytes read;  empty at the end of the file.
+
+        :raises: :class:`ValueError` if the stream is closed.
+        """
+        if self._view is None:
+            raise ValueError('I/O operation on closed stream.')
+        start = min(self._position, self.length)
+        if size is None or size < 0:
+            end = self.length
+        else:
+            end = min(start + size, self.length)
+        self._position = end
+        return self._view[start:end]
+
+    def seekable(self):
+        """Can the stream be positioned?
+
+        :rtype: boolean
+        :returns: Always True.
+        """
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """Move the position from which the stream is read.
+
+        :type offset: integer
+        :param offset: Offset to seek to, relative to ``whence``.
+
+        :type whence: integer
+        :param whence: One of :data:`os.SEEK_SET`, :data:`os.SEEK_CUR` or
+                       :data:`os.SEEK_END`.
+
+        :rtype: integer
+        :returns: The new position.
+
+        :raises: :class:`ValueError` for a negative position.
+        """
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.length
+        if offset < 0:
+            raise ValueError('Negative seek position %d' % (offset,))
+        self._position = offset
+        return offset
+
+    def tell(self):
+        """The position from which the stream is read.
+
+        :rtype: integer
+        :returns: The offset in the file.
+        """
+        return self._position
+
+    def close(self):
+        """Release the mapping and close the file.
+
+        Views returned by :meth:`read` which are still referenced keep the
+        mapping alive until they are released.
+        """
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            try:
+                self._mapping.close()
+            except BufferError:
+                pass  # Unmapped once the last view is collected.
+        self._file_obj.close()
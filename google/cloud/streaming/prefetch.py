@@ -0,0 +1,109 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Small helper class to read chunks of a stream ahead of their use."""
+
+import threading
+
+from six.moves import queue
+
+
+class ChunkPrefetcher(object):
+    """Read successive chunks of a stream on a background thread.
+
+    At most ``depth`` chunks are held in memory ahead of the consumer, so
+    the reader blocks once the consumer falls behind.  While the prefetcher
+    is running, the stream must not be used by any other thread.
+
+    :type stream:  readable file-like object
+    :param stream:  the stream to be read, from its current position.
+
+    :type chunksize: integer
+    :param chunksize: the size of each chunk;  may be changed by setting
+                      :attr:`chunksize` while the prefetcher runs, which
+                      affects chunks not yet read.
+
+    :type depth: integer
+    :param depth: the maximum number of chunks buffered ahead.
+
+    :type limit: integer or None
+    :param limit: the stream position at which to stop reading;  if None,
+                  read until the stream is exhausted.
+    """
+    def __init__(self, stream, chunksize, depth, limit=None):
+        if depth < 1:
+            raise ValueError('Prefetch depth must be at least 1')
+        self._stream = stream
+        self.chunksize = chunksize
+        self._limit = limit
+        self._queue = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __repr__(self):
+        return 'Prefetcher of stream %s in chunks of %s bytes' % (
+            self._stream, self.chunksize)
+
+    def _run(self):
+        """Read chunks into the queue until the stream is done or stopped.
+
+        The last chunk read either ends at ``limit`` or is shorter than
+        ``chunksize`` (possibly empty).  An exception raised while reading
+        is passed on to the consumer.
+        """
+        try:
+            position = self._stream.tell()
+            while not self._stopped.is_set():
+                chunksize = self.chunksize
+                size = chunksize
+                if self._limit is not None:
+                    size = min(size, self._limit - position)
+                data = self._stream.read(size)
+                position += len(data)
+                last = len(data) < chunksize or position == self._limit
+                self._queue.put((data, last, None))
+                if last:
+                    return
+        except Exception as exc:  # pylint: disable=broad-except
+            self._queue.put((None, True, exc))
+
+    def get(self):
+        """Return the next chunk, waiting for it to be read if needed.
+
+        :rtype: tuple, (bytes, boolean)
+        :returns: the next chunk, and whether it is the last one.
+        :raises: any exception raised while reading the stream.
+        """
+        data, last, exc = self._queue.get()
+        if exc is not None:
+            raise exc
+        return data, last
+
+    def close(self):
+        """Stop reading and wait for the background thread to exit.
+
+        Chunks not yet consumed are discarded;  the stream is left
+        positioned after the last chunk read.  Safe to call more than once.
+        """
+        self._stopped.set()
+        # Unblock a pending ``put``:  once stopped, the reader makes at
+        # most one more, which the emptied queue can always accept.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
@@ -0,0 +1,172 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Observe the progress and throughput of transfers as they run."""
+
+import collections
+import time
+
+
+ChunkTiming = collections.namedtuple('ChunkTiming', ['num_bytes', 'elapsed'])
+"""The size of a transferred chunk, and the seconds it took."""
+
+
+class TransferObserver(object):
+    """Receive reports from a transfer as it runs.
+
+    Pass an instance as ``observer`` to a
+    :class:`~google.cloud.streaming.transfer.Download` or
+    :class:`~google.cloud.streaming.transfer.Upload`.  These methods do
+    nothing:  subclasses override the ones they need.  They are called on
+    the thread running the transfer.
+    """
+
+    def on_chunk(self, transfer, num_bytes, elapsed):
+        """Called after a chunk has been transferred.
+
+        :type transfer: :class:`~google.cloud.streaming.transfer._Transfer`
+        :param transfer: the transfer reporting.
+
+        :type num_bytes: integer
+        :param num_bytes: the number of bytes transferred.
+
+        :type elapsed: float
+        :param elapsed: the time taken, in seconds, including retries.
+        """
+
+    def on_retry(self, transfer, exc):
+        """Called when a request has failed, and is about to be retried.
+
+        :type transfer: :class:`~google.cloud.streaming.transfer._Transfer`
+        :param transfer: the transfer reporting.
+
+        :type exc: :class:`Exception`
+        :param exc: the error which caused the retry.
+        """
+
+
+class ProgressMonitor(TransferObserver):
+    """Measure the progress and throughput of a transfer.
+
+    :type callback: callable, taking the monitor
+    :param callback: (Optional) called after each chunk, e.g. to report
+                     progress, or to detect a degraded link from
+                     :attr:`rate`.
+
+    :type window: integer
+    :param window: the number of recent chunk timings kept in
+                   :attr:`chunks`.
+    """
+
+    def __init__(self, callback=None, window=16):
+        self.callback = callback
+        self.bytes_done = 0
+        self.total_bytes = None
+        self.retries = 0
+        self.chunks = collections.deque(maxlen=window)
+        self.started = None
+        self.updated = None
+
+    def __repr__(self):
+        return 'Progress %d/%s bytes, %d retries' % (
+            self.bytes_done, self.total_bytes or '???', self.retries)
+
+    def _touch(self, elapsed=0.0):
+        """Record the time of a report, and of the first one.
+
+        :type elapsed: float
+        :param elapsed: the seconds taken by the work reported.
+        """
+        self.updated = time.time()
+        if self.started is None:
+            self.started = self.updated - elapsed
+
+    def on_chunk(self, transfer, num_bytes, elapsed):
+        """Count the bytes of a transferred chunk.
+
+        :type transfer: :class:`~google.cloud.streaming.transfer._Transfer`
+        :param transfer: the transfer reporting.
+
+        :type num_bytes: integer
+        :param num_bytes: the number of bytes transferred.
+
+        :type elapsed: float
+        :param elapsed: the time taken, in seconds, including retries.
+        """
+        self._touch(elapsed)
+        self.bytes_done += num_bytes
+        self.total_bytes = transfer.total_size
+        self.chunks.append(ChunkTiming(num_bytes, elapsed))
+        if self.callback is not None:
+            self.callback(self)
+
+    def on_retry(self, transfer, exc):
+        """Count a retried request.
+
+        :type transfer: :class:`~google.cloud.streaming.transfer._Transfer`
+        :param transfer: the transfer reporting.
+
+        :type exc: :class:`Exception`
+        :param exc: the error which caused the retry.
+        """
+        self._touch()
+        self.retries += 1
+
+    @property
+    def rate(self):
+        """Instantaneous throughput, over the last chunk.
+
+        :rtype: float or ``NoneType``
+        :returns: bytes per second, or ``None`` before any chunk has been
+                  timed.
+        """
+        if self.chunks and self.chunks[-1].elapsed > 0:
+            last = self.chunks[-1]
+            return last.num_bytes / last.elapsed
+        return None
+
+    @property
+    def average_rate(self):
+        """Average throughput, since the first report.
+
+        :rtype: float or ``NoneType``
+        :returns: bytes per second, or ``None`` before any time has passed.
+        """
+        if self.started is None or self.updated <= self.started:
+            return None
+        return self.bytes_done / (self.updated - self.started)
+
+    @property
+    def eta(self):
+        """Estimated time to completion, at :attr:`average_rate`.
+
+        :rtype: float or ``NoneType``
+        :returns: seconds remaining, or ``None`` if the total size or the
+                  rate is not yet known.
+        """
+        rate = self.average_rate
+        if self.total_bytes is None or not rate:
+            return None
+        return max(self.total_bytes - self.bytes_done, 0) / rate
+
+    @property
+    def idle_seconds(self):
+        """Time since the last report:  a long one suggests a stall.
+
+        :rtype: float
+        :returns: seconds, or 0.0 before any report.
+        """
+        if self.updated is None:
+            return 0.0
+        return time.time() - self.updated
@@ -21,6 +21,7 @@ import email.mime.multipart as mime_multipart
 import email.mime.nonmultipart as mime_nonmultipart
 import mimetypes
 import os
+import time
 
 import httplib2
 import six
@@ -35,6 +36,8 @@ from google.cloud.streaming.exceptions import TransferRetryError
 from google.cloud.streaming.http_wrapper import make_api_request
 from google.cloud.streaming.http_wrapper import Request
 from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+from google.cloud.streaming.mapped_stream import map_file
+from google.cloud.streaming.prefetch import ChunkPrefetcher
 from google.cloud.streaming.stream_slice import StreamSlice
 from google.cloud.streaming.util import acceptable_mime_type
 
@@ -68,13 +71,23 @@ class _Transfer(object):
 
     :type num_retries: integer
     :param num_retries: how many retries should the transfer attempt
+
+    :type chunk_sizer: :class:`~google.cloud.streaming.adaptive.\
+AdaptiveChunkSizer`
+    :param chunk_sizer: (Optional) if passed, chooses :attr:`chunksize`
+                        as the transfer runs, overriding ``chunksize``.
+
+    :type observer: :class:`~google.cloud.streaming.progress.\
+TransferObserver`
+    :param observer: (Optional) if passed, notified of each chunk
+                     transferred and each request retried.
     """
 
     _num_retries = None
 
     def __init__(self, stream, close_stream=False,
                  chunksize=_DEFAULT_CHUNKSIZE, auto_transfer=True,
-                 http=None, num_retries=5):
+                 http=None, num_retries=5, chunk_sizer=None, observer=None):
         self._bytes_http = None
         self._close_stream = close_stream
         self._http = http
@@ -85,6 +98,10 @@ class _Transfer(object):
         self.num_retries = num_retries
 
         self.auto_transfer = auto_transfer
+        self.chunk_sizer = chunk_sizer
+        self.observer = observer
+        if chunk_sizer is not None:
+            chunksize = chunk_sizer.size
         self.chunksize = chunksize
 
     def __repr__(self):
@@ -217,6 +234,42 @@ class _Transfer(object):
             raise TransferInvalidError(
                 'Cannot re-initialize %s', type(self).__name__)
 
+    def _adapt_chunksize(self):
+        """Take :attr:`chunksize` from :attr:`chunk_sizer`."""
+        self.chunksize = self.chunk_sizer.size
+
+    def _record_chunk(self, num_bytes, started):
+        """Let the chunk sizer and observer, if any, measure a chunk.
+
+        :type num_bytes: integer
+        :param num_bytes: the number of bytes transferred.
+
+        :type started: float
+        :param started: when the chunk's request was started, as returned
+                        by :func:`time.time`.
+        """
+        elapsed = time.time() - started
+        if self.chunk_sizer is not None:
+            self.chunk_sizer.record_chunk(num_bytes, elapsed)
+            self._adapt_chunksize()
+        if self.observer is not None:
+            self.observer.on_chunk(self, num_bytes, elapsed)
+
+    def _record_retry(self, exc):
+        """Let the chunk sizer and observer, if any, know of a retry.
+
+        Passed as ``on_retry`` to
+        :func:`~google.cloud.streaming.http_wrapper.make_api_request`.
+
+        :type exc: :class:`Exception`
+        :param exc: the error which caused the retry.
+        """
+        if self.chunk_sizer is not None:
+            self.chunk_sizer.record_error()
+            self._adapt_chunksize()
+        if self.observer is not None:
+            self.observer.on_retry(self, exc)
+
     def __del__(self):
         if self._close_stream:
             self._stream.close()
@@ -243,9 +296,11 @@ class Download(_Transfer):
         total_size = kwds.pop('total_size', None)
         super(Download, self).__init__(stream, **kwds)
         self._initial_response = None
+        self._initial_started = None
         self._progress = 0
         self._total_size = total_size
         self._encoding = None
+        self._hash_header = None
 
     @classmethod
     def from_file(cls, filename, overwrite=False, auto_transfer=True, **kwds):
@@ -324,6 +379,15 @@ class Download(_Transfer):
         """
         return self._encoding
 
+    @property
+    def hash_header(self):
+        """'X-Goog-Hash' header describing the downloaded content
+
+        :rtype: string or None
+        :returns: The hashes of the content, as reported by the server.
+        """
+        return self._hash_header
+
     def __repr__(self):
         if not self.initialized:
             return 'Download (uninitialized)'
@@ -377,11 +441,14 @@ class Download(_Transfer):
         if self.auto_transfer:
             end_byte = self._compute_end_byte(0)
             self._set_range_header(http_request, 0, end_byte)
+            started = time.time()
             response = make_api_request(
-                self.bytes_http or http, http_request)
+                self.bytes_http or http, http_request,
+                on_retry=self._record_retry)
             if response.status_code not in self._ACCEPTABLE_STATUSES:
                 raise HttpError.from_response(response)
             self._initial_response = response
+            self._initial_started = started
             self._set_total(response.info)
             url = response.info.get('content-location', response.request_url)
         self._initialize(http, url)
@@ -504,7 +571,8 @@ class Download(_Transfer):
         request = Request(url=self.url)
         self._set_range_header(request, start, end=end)
         return make_api_request(
-            self.bytes_http, request, retries=self.num_retries)
+            self.bytes_http, request, retries=self.num_retries,
+            on_retry=self._record_retry)
 
     def _process_response(self, response):
         """Update attribtes and writing stream, based on response.
@@ -533,6 +601,8 @@ class Download(_Transfer):
             self._progress += response.length
             if response.info and 'content-encoding' in response.info:
                 self._encoding = response.info['content-encoding']
+            if response.info and 'x-goog-hash' in response.info:
+                self._hash_header = response.info['x-goog-hash']
         elif response.status_code == http_client.NO_CONTENT:
             # It's important to write something to the stream for the case
             # of a 0-byte download to a file, as otherwise python won't
@@ -577,6 +647,7 @@ class Download(_Transfer):
             end_byte = end
         while (not progress_end_normalized or end_byte is None or
                progress <= end_byte):
+            started = time.time()
             end_byte = self._compute_end_byte(progress, end=end_byte,
                                               use_chunks=use_chunks)
             response = self._get_chunk(progress, end_byte)
@@ -586,11 +657,12 @@ class Download(_Transfer):
                 progress_end_normalized = True
             response = self._process_response(response)
             progress += response.length
+            self._record_chunk(response.length, started)
             if response.length == 0:
                 raise TransferRetryError(
                     'Zero bytes unexpectedly returned in download response')
 
-    def stream_file(self, use_chunks=True):
+    def stream_file(self, use_chunks=True, callback=None):
         """Stream the entire download.
 
         Writes retrieved bytes into :attr:`stream`.
@@ -599,19 +671,30 @@ class Download(_Transfer):
         :param use_chunks: If False, ignore :attr:`chunksize`
                            and stream this download in a single request.
                            If True, streams via chunks.
+
+        :type callback: callable, taking ``(response, download)``
+        :param callback: (Optional) called after each response is written
+                         to :attr:`stream`.
         """
         self._ensure_initialized()
         while True:
+            start = self.progress
             if self._initial_response is not None:
+                # Measured from when :meth:`initialize_download` sent it.
                 response = self._initial_response
+                started = self._initial_started
                 self._initial_response = None
             else:
+                started = time.time()
                 end_byte = self._compute_end_byte(self.progress,
                                                   use_chunks=use_chunks)
                 response = self._get_chunk(self.progress, end_byte)
             if self.total_size is None:
                 self._set_total(response.info)
             response = self._process_response(response)
+            self._record_chunk(self.progress - start, started)
+            if callback is not None:
+                callback(response, self)
             if (response.status_code == http_client.OK or
                     self.progress >= self.total_size):
                 break
@@ -653,6 +736,7 @@ class Upload(_Transfer):
             stream, close_stream=close_stream, auto_transfer=auto_transfer,
             http=http, **kwds)
         self._final_response = None
+        self._prefetcher = None
         self._server_chunk_granularity = None
         self._complete = False
         self._mime_type = mime_type
@@ -661,7 +745,8 @@ class Upload(_Transfer):
         self._total_size = total_size
 
     @classmethod
-    def from_file(cls, filename, mime_type=None, auto_transfer=True, **kwds):
+    def from_file(cls, filename, mime_type=None, auto_transfer=True,
+                  memory_map=False, **kwds):
         """Create a new Upload object from a filename.
 
         :type filename: string
@@ -673,6 +758,12 @@ class Upload(_Transfer):
         :type auto_transfer: boolean or None
         :param auto_transfer: should the transfer be started immediately
 
+        :type memory_map: boolean
+        :param memory_map: (Optional) if True, read the file through a memory
+                           map, without copying its bytes.  The file must not
+                           be truncated meanwhile:  reading past its end
+                           through the map kills the process (SIGBUS).
+
         :type kwds: dict
         :param kwds:  keyword arguments:  passed
                       through to :meth:`_Transfer.__init__()`.
@@ -687,7 +778,10 @@ class Upload(_Transfer):
                 raise ValueError(
                     'Could not guess mime type for %s' % path)
         size = os.stat(path).st_size
-        return cls(open(path, 'rb'), mime_type, total_size=size,
+        stream = open(path, 'rb')
+        if memory_map:
+            stream = map_file(stream) or stream
+        return cls(stream, mime_type, total_size=size,
                    close_stream=True, auto_transfer=auto_transfer, **kwds)
 
     @classmethod
@@ -892,7 +986,10 @@ class Upload(_Transfer):
         # attach the media as the second part
         msg = mime_nonmultipart.MIMENonMultipart(*self.mime_type.split('/'))
         msg['Content-Transfer-Encoding'] = 'binary'
-        msg.set_payload(self.stream.read())
+        payload = self.stream.read()
+        if isinstance(payload, memoryview):
+            payload = payload.tobytes()
+        msg.set_payload(payload)
         msg_root.attach(msg)
 
         # NOTE: generate multipart message as bytes, not text
@@ -966,6 +1063,30 @@ class Upload(_Transfer):
         else:
             raise HttpError.from_response(refresh_response)
 
+    def resume_upload(self, url, http):
+        """Resume an interrupted resumable upload from its session URL.
+
+        Queries the back-end for the bytes it has already received, and
+        seeks :attr:`stream` past them, ready for :meth:`stream_file`.
+
+        :type url: string
+        :param url: The session URL returned when the upload was initialized.
+
+        :type http: :class:`httplib2.Http` (or workalike)
+        :param http: Http instance for this request.
+
+        :raises: :exc:`~.streaming.exceptions.HttpError` if the back-end
+                 no longer knows the session;  the instance is then left
+                 uninitialized.
+        """
+        self.strategy = RESUMABLE_UPLOAD
+        self._initialize(http, url)
+        try:
+            self.refresh_upload_state()
+        except HttpError:
+            self._url = None
+            raise
+
     @staticmethod
     def _get_range_header(response):
         """Return a 'Range' header from a response.
@@ -1063,13 +1184,24 @@ class Upload(_Transfer):
                 'Server requires chunksize to be a multiple of %d',
                 self._server_chunk_granularity)
 
-    def stream_file(self, use_chunks=True):
+    def stream_file(self, use_chunks=True, callback=None, prefetch_chunks=0):
         """Upload the stream.
 
         :type use_chunks: boolean
         :param use_chunks: If False, send the stream in a single request.
                            Otherwise, send it in chunks.
 
+        :type callback: callable, taking ``(response, upload)``
+        :param callback: (Optional) called after each request accepted by
+                         the back-end, including the final one.
+
+        :type prefetch_chunks: integer
+        :param prefetch_chunks: (Optional) when sending chunks, the number of
+                                chunks to read ahead on a background thread
+                                while the current one is in flight.  Chunks
+                                are still sent in order.  If 0 (the default),
+                                each chunk is read just before it is sent.
+
         :rtype: :class:`google.cloud.streaming.http_wrapper.Response`
         :returns: The response for the final request made.
         """
@@ -1082,17 +1214,65 @@ class Upload(_Transfer):
         if use_chunks:
             self._validate_chunksize(self.chunksize)
         self._ensure_initialized()
-        while not self.complete:
-            response = send_func(self.stream.tell())
-            if response.status_code in (http_client.OK, http_client.CREATED):
-                self._complete = True
-                break
-            self._progress = self._last_byte(response.info['range'])
-            if self.progress + 1 != self.stream.tell():
-                raise CommunicationError(
-                    'Failed to transfer all bytes in chunk, upload paused at '
-                    'byte %d' % self.progress)
-        if self.complete and hasattr(self.stream, 'seek'):
+        if use_chunks and prefetch_chunks and not self.complete:
+            position = self.stream.tell()
+            self._prefetcher = ChunkPrefetcher(
+                self.stream, self.chunksize, prefetch_chunks,
+                limit=self.total_size)
+        try:
+            while not self.complete:
+                started = time.time()
+                if self._prefetcher is None:
+                    start = self.stream.tell()
+                    response = send_func(start)
+                    position = self.stream.tell()
+                else:
+                    start = position
+                    response, position = self._send_prefetched_chunk(start)
+                self._record_chunk(position - start, started)
+                if response.status_code in (http_client.OK,
+                                            http_client.CREATED):
+                    self._complete = True
+                else:
+                    self._progress = self._last_byte(response.info['range'])
+                    if self.progress + 1 != position:
+                        raise CommunicationError(
+                            'Failed to transfer all bytes in chunk, upload '
+                            'paused at byte %d' % self.progress)
+                if callback is not None:
+                    callback(response, self)
+        finally:
+            self._stop_prefetch()
+        self._check_stream_consumed()
+        return response
+
+    def _adapt_chunksize(self):
+        """Take :attr:`chunksize` from :attr:`chunk_sizer`.
+
+        Chunks read ahead after the change use the new size.
+        """
+        super(Upload, self)._adapt_chunksize()
+        if self._prefetcher is not None:
+            self._prefetcher.chunksize = self.chunksize
+
+    def _stop_prefetch(self):
+        """Stop reading chunks ahead, if doing so.
+
+        Must be called before the stream is repositioned.
+        """
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def _check_stream_consumed(self):
+        """Ensure no bytes are left in a seekable stream.
+
+        Helper for :meth:`stream_file`.
+
+        :raises: :exc:`~.streaming.exceptions.TransferInvalidError` if the
+                 stream holds more bytes than were uploaded.
+        """
+        if hasattr(self.stream, 'seek'):
             if not hasattr(self.stream, 'seekable') or self.stream.seekable():
                 current_pos = self.stream.tell()
                 self.stream.seek(0, os.SEEK_END)
@@ -1103,7 +1283,6 @@ class Upload(_Transfer):
                         'Upload complete with %s '
                         'additional bytes left in stream' %
                         (int(end_pos) - int(current_pos)))
-        return response
 
     def _send_media_request(self, request, end):
         """Peform API upload request.
@@ -1122,17 +1301,23 @@ class Upload(_Transfer):
                  code from the response indicates an error.
         """
         response = make_api_request(
-            self.bytes_http, request, retries=self.num_retries)
+            self.bytes_http, request, retries=self.num_retries,
+            on_retry=self._record_retry)
         if response.status_code not in (http_client.OK, http_client.CREATED,
                                         RESUME_INCOMPLETE):
             # We want to reset our state to wherever the server left us
-            # before this failed request, and then raise.
-            self.refresh_upload_state()
+            # before this failed request, and then raise.  A stream which
+            # cannot seek (e.g., one compressed as it is read) cannot be
+            # reset, so the upload cannot be resumed.
+            self._stop_prefetch()
+            if not hasattr(self.stream, 'seekable') or self.stream.seekable():
+                self.refresh_upload_state()
             raise HttpError.from_response(response)
         if response.status_code == RESUME_INCOMPLETE:
             last_byte = self._last_byte(
                 self._get_range_header(response))
             if last_byte + 1 != end:
+                self._stop_prefetch()
                 self.stream.seek(last_byte)
         return response
 
@@ -1151,7 +1336,7 @@ class Upload(_Transfer):
         if self.total_size is None:
             raise TransferInvalidError(
                 'Total size must be known for SendMediaBody')
-        body_stream = StreamSlice(self.stream, self.total_size - start)
+        body_stream = self._slice_body(self.total_size - start)
 
         request = Request(url=self.url, http_method='PUT', body=body_stream)
         request.headers['Content-Type'] = self.mime_type
@@ -1194,8 +1379,73 @@ class Upload(_Transfer):
             body_stream = body_stream.read(self.chunksize)
         else:
             end = min(start + self.chunksize, self.total_size)
-            body_stream = StreamSlice(self.stream, end - start)
-        request = Request(url=self.url, http_method='PUT', body=body_stream)
+            body_stream = self._slice_body(end - start)
+        return self._send_chunk_body(start, end, body_stream, no_log_body)
+
+    def _slice_body(self, size):
+        """The body of a request sending the next bytes of the stream.
+
+        Helper for :meth:`_send_media_body` and :meth:`_send_chunk`.
+
+        A memory-mapped stream's bytes are sent from the map, in one write
+        and without copying;  other streams are read as they are sent.
+
+        :type size: integer
+        :param size: the number of bytes to send.
+
+        :rtype: :class:`memoryview` or :class:`StreamSlice`
+        :returns: The request body.
+
+        :raises: :exc:`IncompleteRead` if a mapped file is short.
+        """
+        if getattr(self.stream, 'memory_mapped', False):
+            body = self.stream.read(size)
+            if len(body) < size:
+                raise http_client.IncompleteRead(len(body), size)
+            return body
+        return StreamSlice(self.stream, size)
+
+    def _send_prefetched_chunk(self, start):
+        """Send the next chunk read ahead by the prefetcher.
+
+        Helper for :meth:`stream_file`:
+
+        :type start: integer
+        :param start: start byte of the range.
+
+        :rtype: tuple, (:class:`google.cloud.streaming.http_wrapper.Response`,
+                integer)
+        :returns: The response from the chunked upload request, and the
+                  end byte (exclusive) of the chunk sent.
+        """
+        no_log_body = self.total_size is None
+        body, last = self._prefetcher.get()
+        end = start + len(body)
+        if self.total_size is None and last:
+            self._total_size = end
+        return self._send_chunk_body(start, end, body, no_log_body), end
+
+    def _send_chunk_body(self, start, end, body, no_log_body):
+        """Send one chunk of the upload.
+
+        Helper for :meth:`_send_chunk` and :meth:`_send_prefetched_chunk`.
+
+        :type start: integer
+        :param start: start byte of the range.
+
+        :type end: integer
+        :param end: end byte (exclusive) of the range.
+
+        :type body: bytes, :class:`memoryview` or :class:`StreamSlice`
+        :param body: the chunk's data.
+
+        :type no_log_body: boolean
+        :param no_log_body: if True, the body is not logged.
+
+        :rtype: :class:`google.cloud.streaming.http_wrapper.Response`
+        :returns: The response from the chunked upload request.
+        """
+        request = Request(url=self.url, http_method='PUT', body=body)
         request.headers['Content-Type'] = self.mime_type
         if no_log_body:
             # Disable logging of streaming body.
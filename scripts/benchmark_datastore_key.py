@@ -0,0 +1,147 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark datastore key construction, hashing and serialization.
+
+Reports the throughput of each operation on :class:`Key`, for keys with
+a parent, and the memory held per decoded key, with and without string
+interning::
+
+    $ python scripts/benchmark_datastore_key.py --count 100000
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import timeit
+
+from google.cloud.datastore._generated import datastore_pb2
+from google.cloud.datastore._generated import entity_pb2
+from google.cloud.datastore.connection import _add_keys_to_request
+from google.cloud.datastore.helpers import key_from_protobuf
+from google.cloud.datastore.key import Key
+
+
+PROJECT = 'benchmark-project'
+NAMESPACE = 'benchmark-namespace'
+
+
+def make_keys(count):
+    """Build ``count`` two-element keys."""
+    return [Key('Parent', 'parent-%d' % (index % 100,), 'Child', index + 1,
+                project=PROJECT, namespace=NAMESPACE)
+            for index in range(count)]
+
+
+def make_key_pbs(count):
+    """Build ``count`` key protobufs, each parsed on its own, as in a
+    response."""
+    return [entity_pb2.Key.FromString(key.to_protobuf().SerializeToString())
+            for key in make_keys(count)]
+
+
+def decode_keys(key_pbs):
+    """Decode key protobufs, as lookups and queries do."""
+    return [key_from_protobuf(key_pb) for key_pb in key_pbs]
+
+
+def hash_keys(keys):
+    """Hash each key, as adding them to a dict or set does."""
+    return [hash(key) for key in keys]
+
+
+def serialize_keys(keys):
+    """Add the keys to a lookup request, as the client does."""
+    request = datastore_pb2.LookupRequest()
+    _add_keys_to_request(request.keys,
+                         [key._cached_protobuf() for key in keys])
+    return request
+
+
+def best_time(func, make_arg, repeat):
+    """Return the fastest of ``repeat`` calls of ``func(make_arg())``.
+
+    Only the call to ``func`` is timed.
+    """
+    times = []
+    for _ in range(repeat):
+        arg = make_arg()
+        start = timeit.default_timer()
+        func(arg)
+        times.append(timeit.default_timer() - start)
+    return min(times)
+
+
+def held_memory(serialized):
+    """Return the bytes held by keys decoded from a response, if
+    measurable.
+
+    The protobufs are parsed while measuring, and dropped once decoded.
+    """
+    try:
+        import tracemalloc
+    except ImportError:  # Python 2.
+        return None
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keys = [key_from_protobuf(entity_pb2.Key.FromString(data))
+            for data in serialized]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del keys
+    return held
+
+
+def main():
+    """Time each operation and report its throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--count', type=int, default=100000,
+                        help='Number of keys.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timing runs (the best is reported).')
+    args = parser.parse_args()
+
+    key_pbs = make_key_pbs(args.count)
+    keys = make_keys(args.count)
+    hash_keys(keys)
+    serialize_keys(keys)
+
+    def _fresh_keys():
+        return make_keys(args.count)
+
+    for label, func, make_arg in [
+            ('construct', make_keys, lambda: args.count),
+            ('decode', decode_keys, lambda: key_pbs),
+            ('hash (first)', hash_keys, _fresh_keys),
+            ('hash (cached)', hash_keys, lambda: keys),
+            ('serialize (first)', serialize_keys, _fresh_keys),
+            ('serialize (cached)', serialize_keys, lambda: keys),
+    ]:
+        elapsed = best_time(func, make_arg, args.repeat)
+        print('%-20s %10.0f keys/s' % (label, args.count / elapsed))
+
+    for interned in (False, True):
+        Key.intern_strings = interned
+        held = held_memory([key_pb.SerializeToString()
+                            for key_pb in key_pbs])
+        if held is not None:
+            print('memory (%s) %6.0f bytes/key' % (
+                'interned' if interned else 'plain   ', held / args.count))
+    Key.intern_strings = False
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the storage batch ``multipart/mixed`` codec.
+
+Compares :mod:`google.cloud.storage.batch`'s encoder and decoder against
+the :mod:`email` package based implementation they replaced, for a
+full (1000 request) batch::
+
+    $ python scripts/benchmark_storage_batch.py --repeat 5
+"""
+
+from __future__ import print_function
+
+import argparse
+from email.generator import Generator
+from email.mime.multipart import MIMEMultipart
+from email.parser import Parser
+import io
+import json
+import timeit
+
+import httplib2
+import six
+
+from google.cloud.storage.batch import Batch
+from google.cloud.storage.batch import MIMEApplicationHTTP
+from google.cloud.storage.batch import _unpack_batch_response
+
+
+BOUNDARY = 'batch_benchmark'
+BLOB_PATH = '/storage/v1/b/bucket/o/blob-%04d'
+BLOB_RESOURCE = {
+    'kind': 'storage#object',
+    'bucket': 'bucket',
+    'generation': '1477068385000000',
+    'metageneration': '2',
+    'contentType': 'text/plain',
+    'size': '1024',
+    'metadata': {'retain': 'false'},
+}
+
+
+def email_prepare(requests):
+    """Encode a batch request using the :mod:`email` package."""
+    multi = MIMEMultipart()
+    for method, uri, headers, body in requests:
+        multi.attach(MIMEApplicationHTTP(method, uri, dict(headers), body))
+    if six.PY3:
+        buf = io.StringIO()
+    else:
+        buf = io.BytesIO()
+    Generator(buf, False, 0).flatten(multi)
+    _, body = buf.getvalue().split('\n\n', 1)
+    return dict(multi._headers), body
+
+
+def email_unpack(response, content):
+    """Decode a batch response using the :mod:`email` package."""
+    parser = Parser()
+    faux_message = b''.join([
+        b'Content-Type: ', response['content-type'].encode('utf-8'),
+        b'\nMIME-Version: 1.0\n\n', content])
+    message = parser.parsestr(faux_message.decode('utf-8'))
+    result = []
+    for subrequest in message._payload:
+        status_line, rest = subrequest._payload.split('\n', 1)
+        _, status, _ = status_line.split(' ', 2)
+        sub_message = parser.parsestr(rest)
+        payload = sub_message._payload
+        msg_headers = dict(sub_message._headers)
+        msg_headers['status'] = status
+        ctype = sub_message['Content-Type']
+        if ctype and ctype.startswith('application/json'):
+            payload = json.loads(payload)
+        result.append((httplib2.Response(msg_headers), payload))
+    return result
+
+
+def make_requests(count):
+    """Build ``count`` deferred PATCH requests, as a batch holds them."""
+    return [('PATCH', 'https://www.googleapis.com' + BLOB_PATH % (index,),
+             {'Accept-Encoding': 'gzip', 'User-Agent': 'gcloud-python'},
+             {'metadata': {'retain': 'false'}})
+            for index in range(count)]
+
+
+def make_response(count):
+    """Build a ``count`` part batch response."""
+    lines = []
+    for index in range(count):
+        resource = dict(BLOB_RESOURCE, name='blob-%04d' % (index,))
+        body = json.dumps(resource)
+        lines.extend([
+            '--' + BOUNDARY,
+            'Content-Type: application/http',
+            'Content-ID: <response-%d>' % (index,),
+            '',
+            'HTTP/1.1 200 OK',
+            'Content-Type: application/json; charset=UTF-8',
+            'Content-Length: %d' % (len(body),),
+            '',
+            body,
+            '',
+        ])
+    lines.extend(['--%s--' % (BOUNDARY,), ''])
+    response = {'content-type': 'multipart/mixed; boundary=%s' % (BOUNDARY,)}
+    return response, '\r\n'.join(lines).encode('utf-8')
+
+
+def codec_prepare(requests):
+    """Encode a batch request using :class:`Batch`."""
+    batch = Batch(client=None)
+    batch._requests = [(method, uri, dict(headers), body)
+                       for method, uri, headers, body in requests]
+    return batch._prepare_batch_request()
+
+
+def codec_unpack(response, content):
+    """Decode a batch response using :class:`Batch`'s decoder."""
+    return list(_unpack_batch_response(response, content))
+
+
+def best_time(func, args, repeat):
+    """Return the fastest of ``repeat`` calls of ``func(*args)``."""
+    return min(timeit.repeat(lambda: func(*args), repeat=repeat, number=1))
+
+
+def main():
+    """Time both implementations and report the speedup."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--count', type=int, default=Batch._MAX_BATCH_SIZE,
+                        help='Number of requests in the batch.')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of timing runs (the best is reported).')
+    args = parser.parse_args()
+
+    requests = make_requests(args.count)
+    response, content = make_response(args.count)
+    if email_unpack(response, content) != codec_unpack(response, content):
+        raise AssertionError('Decoders disagree')
+
+    for label, old, new, func_args in [
+            ('encode', email_prepare, codec_prepare, (requests,)),
+            ('decode', email_unpack, codec_unpack, (response, content)),
+    ]:
+        old_time = best_time(old, func_args, args.repeat)
+        new_time = best_time(new, func_args, args.repeat)
+        print('%s %d requests:  email %.2fms, codec %.2fms (%.1fx)' % (
+            label, args.count, old_time * 1000, new_time * 1000,
+            old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
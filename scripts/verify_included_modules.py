@@ -47,9 +47,11 @@ IGNORED_MODULES = frozenset([
     'google.cloud.speech.__init__',
     'google.cloud.storage.__init__',
     'google.cloud.streaming.__init__',
+    'google.cloud.streaming.adaptive',
     'google.cloud.streaming.buffered_stream',
     'google.cloud.streaming.exceptions',
     'google.cloud.streaming.http_wrapper',
+    'google.cloud.streaming.prefetch',
     'google.cloud.streaming.stream_slice',
     'google.cloud.streaming.transfer',
     'google.cloud.streaming.util',
@@ -0,0 +1,621 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class Test__chunks(unittest.TestCase):
+
+    def _callFUT(self, items, size):
+        from google.cloud.datastore._bulk import _chunks
+        return _chunks(items, size)
+
+    def test_empty(self):
+        self.assertEqual(self._callFUT([], 3), [])
+
+    def test_exact(self):
+        self.assertEqual(self._callFUT(list(range(6)), 3),
+                         [[0, 1, 2], [3, 4, 5]])
+
+    def test_short_last(self):
+        self.assertEqual(self._callFUT(list(range(4)), 3),
+                         [[0, 1, 2], [3]])
+
+
+class Test__worker_connection(unittest.TestCase):
+
+    def _callFUT(self, connection):
+        from google.cloud.datastore._bulk import _worker_connection
+        return _worker_connection(connection)
+
+    def test_it(self):
+        credentials = object()
+        connection = _Connection(credentials=credentials)
+        worker_connection = self._callFUT(connection)
+        self.assertIsInstance(worker_connection, _Connection)
+        self.assertIsNot(worker_connection, connection)
+        self.assertIs(worker_connection.credentials, credentials)
+
+
+class Test_map_concurrently(unittest.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.datastore._bulk import map_concurrently
+        return map_concurrently(*args, **kw)
+
+    def test_bad_max_workers(self):
+        with self.assertRaises(ValueError):
+            self._callFUT(_Connection(), _echo, [1, 2], max_workers=0)
+
+    def test_wo_credentials(self):
+        connection = _Connection()
+        results = self._callFUT(connection, _echo, [1, 2, 3])
+        self.assertEqual(results, [(connection, 1), (connection, 2),
+                                   (connection, 3)])
+
+    def test_single_task(self):
+        connection = _Connection(credentials=object())
+        self.assertEqual(self._callFUT(connection, _echo, [1]),
+                         [(connection, 1)])
+
+    def test_concurrent(self):
+        import threading
+        connection = _Connection(credentials=object())
+        running = []
+        both_running = threading.Event()
+
+        def _func(worker_connection, task):
+            running.append(task)
+            if len(running) == 2:
+                both_running.set()
+            # Each task waits for the other:  only done if run at once.
+            both_running.wait(5)
+            return worker_connection, task * 10
+
+        results = self._callFUT(connection, _func, [1, 2], max_workers=4)
+        self.assertTrue(both_running.is_set())
+        self.assertEqual([task for _, task in results], [10, 20])
+        worker_connections = set(conn for conn, _ in results)
+        self.assertEqual(len(worker_connections), 2)
+        self.assertNotIn(connection, worker_connections)
+
+    def test_error(self):
+        connection = _Connection(credentials=object())
+
+        def _func(worker_connection, task):
+            if task == 3:
+                raise KeyError(task)
+            return task
+
+        with self.assertRaises(KeyError):
+            self._callFUT(connection, _func, [1, 2, 3, 4], max_workers=2)
+
+
+class TestBackgroundCall(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.datastore._bulk import BackgroundCall
+        return BackgroundCall
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_result(self):
+        import threading
+        threads = []
+
+        def _func(left, right=0):
+            threads.append(threading.current_thread())
+            return left + right
+
+        call = self._makeOne(_func, 1, right=2)
+        self.assertEqual(call.result(), 3)
+        self.assertNotEqual(threads, [threading.current_thread()])
+
+    def test_error(self):
+
+        def _func():
+            raise KeyError('oops')
+
+        call = self._makeOne(_func)
+        with self.assertRaises(KeyError):
+            call.result()
+
+
+class Test_call_async(unittest.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.datastore._bulk import call_async
+        return call_async(*args, **kw)
+
+    def test_wo_credentials(self):
+        import threading
+        client = _Client(_Connection())
+        calls = []
+
+        def _func(func_client, value, extra=None):
+            calls.append((func_client, threading.current_thread()))
+            return value, extra
+
+        future = self._callFUT(client, _func, 1, extra=2)
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), (1, 2))
+        self.assertEqual(calls, [(client, threading.current_thread())])
+
+    def test_in_batch(self):
+        client = _Client(_Connection(credentials=object()))
+        client.current_batch = object()
+
+        def _func(func_client):
+            self.assertIs(func_client, client)
+            raise KeyError('oops')
+
+        future = self._callFUT(client, _func)
+        self.assertTrue(future.done())
+        with self.assertRaises(KeyError):
+            future.result()
+
+    def test_background(self):
+        import threading
+        connection = _Connection(credentials=object())
+        client = _Client(connection)
+        calls = []
+
+        def _func(func_client, value):
+            calls.append((func_client, threading.current_thread()))
+            return value
+
+        future = self._callFUT(client, _func, 'value')
+        self.assertEqual(future.result(timeout=5), 'value')
+        (func_client, thread), = calls
+        self.assertIsNot(func_client, client)
+        self.assertIsNot(func_client.connection, connection)
+        self.assertIs(func_client.connection.credentials,
+                      connection.credentials)
+        self.assertIs(client.connection, connection)
+        self.assertIsNot(thread, threading.current_thread())
+
+    def test_background_reuses_pool(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk as MUT
+        client = _Client(_Connection(credentials=object()))
+        pool = MUT._AsyncPool()
+
+        def _func(func_client):
+            return func_client
+
+        with _Monkey(MUT, _POOL=pool):
+            first = self._callFUT(client, _func).result(timeout=5)
+            second = self._callFUT(client, _func).result(timeout=5)
+        # The idle worker, and so its connection, is reused.
+        self.assertIs(second, first)
+        self.assertEqual(pool._workers, 1)
+
+
+class Test__AsyncPool(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.datastore._bulk import _AsyncPool
+        return _AsyncPool
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_defaults(self):
+        from google.cloud.datastore._bulk import _IDLE_TIMEOUT
+        from google.cloud.datastore._bulk import DEFAULT_MAX_WORKERS
+        pool = self._makeOne()
+        self.assertEqual(pool.max_workers, DEFAULT_MAX_WORKERS)
+        self.assertEqual(pool.idle_timeout, _IDLE_TIMEOUT)
+
+    def test_bounded_across_clients(self):
+        import threading
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk as MUT
+        clients = [_Client(_Connection(credentials=object()))
+                   for _ in range(2)]
+        pool = self._makeOne(max_workers=3)
+        connections = []
+        lock = threading.Lock()
+        release = threading.Event()
+        running = []
+        peak = []
+
+        def _worker_connection(connection):
+            worker = _Connection(credentials=connection.credentials)
+            with lock:
+                connections.append(worker)
+            return worker
+
+        def _func(func_client, value):
+            with lock:
+                running.append(value)
+                peak.append(len(running))
+            release.wait(5)
+            with lock:
+                running.remove(value)
+            return func_client.connection, value
+
+        with _Monkey(MUT, _worker_connection=_worker_connection):
+            futures = [pool.submit(clients[value % 2], _func, value)
+                       for value in range(20)]
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual([value for _, value in results], list(range(20)))
+        self.assertEqual(pool._workers, 3)
+        self.assertTrue(max(peak) <= 3)
+        # At most one connection per thread and client.
+        self.assertTrue(len(connections) <= 6)
+        for connection, value in results:
+            self.assertIs(connection.credentials,
+                          clients[value % 2].connection.credentials)
+
+    def test_error(self):
+        client = _Client(_Connection(credentials=object()))
+        pool = self._makeOne()
+
+        def _func(func_client):
+            raise KeyError('oops')
+
+        future = pool.submit(client, _func)
+        with self.assertRaises(KeyError):
+            future.result(timeout=5)
+
+    def test_idle_workers_exit(self):
+        import gc
+        import weakref
+        client = _Client(_Connection(credentials=object()))
+        pool = self._makeOne(idle_timeout=0.01)
+
+        def _func(func_client, value):
+            return value
+
+        self.assertEqual(pool.submit(client, _func, 1).result(timeout=5), 1)
+        freed = weakref.ref(client)
+        del client
+        gc.collect()
+        self.assertIsNone(freed())
+        _wait_for(lambda: pool._workers == 0)
+        self.assertEqual(pool._idle, 0)
+
+        # A later call starts a new thread.
+        client = _Client(_Connection(credentials=object()))
+        self.assertEqual(pool.submit(client, _func, 2).result(timeout=5), 2)
+
+    def test_idle_worker_claimed(self):
+        from google.cloud.datastore._bulk import queue
+        client = _Client(_Connection(credentials=object()))
+        pool = self._makeOne(idle_timeout=0.01)
+        # As if a call were queued for this (idle) thread just as it timed
+        # out waiting for one:  it waits again rather than exit.
+        calls = [queue.Empty(), 'CALL']
+
+        class _Calls(object):
+
+            def get(self, timeout):
+                call = calls.pop(0)
+                if isinstance(call, Exception):
+                    raise call
+                return call
+
+        pool._calls = _Calls()
+        pool._workers = 1
+        self.assertEqual(pool._next_call(), 'CALL')
+        self.assertEqual(pool._workers, 1)
+
+
+def _wait_for(predicate, timeout=5):
+    import time
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+class Test_iterate_concurrently(unittest.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.datastore._bulk import iterate_concurrently
+        return iterate_concurrently(*args, **kw)
+
+    def test_bad_max_workers(self):
+        with self.assertRaises(ValueError):
+            self._callFUT(_Connection(), _repeat, [1, 2], max_workers=0)
+
+    def test_wo_credentials(self):
+        results = self._callFUT(_Connection(), _repeat, [1, 2])
+        self.assertEqual(list(results), [1, 1, 2, 2])
+
+    def test_concurrent(self):
+        import threading
+        connection = _Connection(credentials=object())
+        threads = set()
+
+        def _func(worker_connection, task):
+            threads.add(threading.current_thread())
+            self.assertIsNot(worker_connection, connection)
+            return _repeat(worker_connection, task)
+
+        results = self._callFUT(connection, _func, [1, 2, 3],
+                                max_workers=2)
+        self.assertEqual(sorted(results), [1, 1, 2, 2, 3, 3])
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_error(self):
+        connection = _Connection(credentials=object())
+
+        def _func(worker_connection, task):
+            yield task
+            if task == 2:
+                raise KeyError(task)
+
+        results = self._callFUT(connection, _func, [1, 2])
+        with self.assertRaises(KeyError):
+            list(results)
+
+    def test_closed_early(self):
+        import itertools
+        import time
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk as MUT
+        connection = _Connection(credentials=object())
+        stopped = []
+
+        def _func(worker_connection, task):
+            try:
+                for index in itertools.count():
+                    yield task, index
+            finally:
+                stopped.append(task)
+
+        with _Monkey(MUT, _BUFFER_SIZE=1, _POLL_INTERVAL=0.01):
+            results = self._callFUT(connection, _func, [1, 2])
+            self.assertEqual(len([next(results) for _ in range(3)]), 3)
+            results.close()
+            for _ in range(500):
+                if len(stopped) == 2:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(sorted(stopped), [1, 2])
+
+
+class Test__entity_group(unittest.TestCase):
+
+    def _callFUT(self, key):
+        from google.cloud.datastore._bulk import _entity_group
+        return _entity_group(key)
+
+    def test_root(self):
+        from google.cloud.datastore.key import Key
+        key = Key('Parent', 1, project='PROJECT', namespace='NS')
+        self.assertEqual(self._callFUT(key), ('NS', ('Parent', 1)))
+
+    def test_child(self):
+        from google.cloud.datastore.key import Key
+        key = Key('Parent', 1, 'Child', 'a', project='PROJECT')
+        self.assertEqual(self._callFUT(key), (None, ('Parent', 1)))
+        partial = Key('Parent', 1, 'Child', project='PROJECT')
+        self.assertEqual(self._callFUT(partial), (None, ('Parent', 1)))
+
+    def test_new_root(self):
+        from google.cloud.datastore.key import Key
+        self.assertIsNone(self._callFUT(Key('Parent', project='PROJECT')))
+
+
+class Test__plan_commits(unittest.TestCase):
+
+    def _callFUT(self, items, keys, limit):
+        from google.cloud.datastore._bulk import _plan_commits
+        return _plan_commits(items, keys, limit)
+
+    def _keys(self, items):
+        from google.cloud.datastore.key import Key
+        # Items are named for their group:  'b2' is in group 'b'.
+        return [Key('Root', item[0], 'Child', item, project='PROJECT')
+                for item in items]
+
+    def test_empty(self):
+        self.assertEqual(self._callFUT([], [], 3), [])
+
+    def test_groups_packed_whole(self):
+        items = ['a1', 'b1', 'a2', 'c1', 'c2', 'd1']
+        self.assertEqual(self._callFUT(items, self._keys(items), 3),
+                         [[['a1', 'a2', 'b1']], [['c1', 'c2', 'd1']]])
+
+    def test_large_group_in_sequence(self):
+        items = ['a1', 'b1', 'b2', 'b3', 'b4', 'b5', 'c1', 'c2']
+        self.assertEqual(self._callFUT(items, self._keys(items), 3),
+                         [[['a1', 'b1', 'b2'], ['b3', 'b4', 'b5']],
+                          [['c1', 'c2']]])
+
+    def test_large_group_after_full_commit(self):
+        items = ['a1', 'a2', 'b1', 'b2', 'b3']
+        self.assertEqual(self._callFUT(items, self._keys(items), 2),
+                         [[['a1', 'a2'], ['b1', 'b2'], ['b3']]])
+
+    def test_new_roots_and_keyless(self):
+        from google.cloud.datastore.key import Key
+        key = Key('Root', project='PROJECT')
+        self.assertEqual(self._callFUT(['x', 'y', 'z'], [key, key, None], 2),
+                         [[['x', 'y']], [['z']]])
+
+
+class Test__commit_with_retries(unittest.TestCase):
+
+    def _callFUT(self, connection, batch, items, mutate=None):
+        from google.cloud.datastore._bulk import _commit_with_retries
+        if mutate is None:
+            mutate = _put
+        return _commit_with_retries(connection, batch, items, mutate)
+
+    def _make_batch(self, client, items):
+        from google.cloud.datastore._bulk import _make_batch
+        return _make_batch(client, items, _put)
+
+    def _call_w_sleep(self, connection, items):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk as MUT
+        client = _Client(connection)
+        batch = self._make_batch(client, items)
+        sleeps = []
+        with _Monkey(MUT, time=_Clock(sleeps)):
+            found = self._callFUT(connection, batch, items)
+        return found, sleeps
+
+    def test_success(self):
+        connection = _Connection(credentials=object())
+        found, sleeps = self._call_w_sleep(connection, [_entity(1)])
+        self.assertEqual(found, [])
+        self.assertEqual(sleeps, [])
+        self.assertEqual(len(connection.committed), 1)
+
+    def test_retried(self):
+        from google.cloud.exceptions import Conflict
+        from google.cloud.exceptions import ServiceUnavailable
+        connection = _Connection(errors=[Conflict('contention'),
+                                         ServiceUnavailable('busy')])
+        found, sleeps = self._call_w_sleep(connection, [_entity(1)])
+        self.assertEqual(found, [])
+        self.assertEqual(sleeps, [0.5, 1.0])
+        self.assertEqual(len(connection.committed), 3)
+        # Each attempt sends a fresh request.
+        self.assertEqual(len(set(id(req) for req in connection.committed)),
+                         3)
+
+    def test_retries_exhausted(self):
+        from google.cloud.exceptions import Conflict
+        errors = [Conflict('contention') for _ in range(4)]
+        connection = _Connection(errors=list(errors))
+        items = [_entity(1)]
+        found, sleeps = self._call_w_sleep(connection, items)
+        self.assertEqual(found, [(items, errors[-1])])
+        self.assertEqual(sleeps, [0.5, 1.0, 2.0])
+
+    def test_insert_not_retried_after_server_error(self):
+        from google.cloud.exceptions import InternalServerError
+        error = InternalServerError('oops')
+        connection = _Connection(errors=[error])
+        items = [_entity(None)]
+        found, sleeps = self._call_w_sleep(connection, items)
+        self.assertEqual(found, [(items, error)])
+        self.assertEqual(sleeps, [])
+
+    def test_insert_retried_after_conflict(self):
+        from google.cloud.exceptions import Conflict
+        connection = _Connection(errors=[Conflict('contention')])
+        items = [_entity(None)]
+        found, _ = self._call_w_sleep(connection, items)
+        self.assertEqual(found, [])
+        self.assertEqual(items[0].key.id, 1234)
+
+    def test_other_error(self):
+        from google.cloud.exceptions import BadRequest
+        connection = _Connection(errors=[BadRequest('bad')])
+        with self.assertRaises(BadRequest):
+            self._call_w_sleep(connection, [_entity(1)])
+
+
+class Test_commit_concurrently(unittest.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.datastore._bulk import commit_concurrently
+        return commit_concurrently(*args, **kw)
+
+    def test_invalid_item(self):
+        from google.cloud.datastore.entity import Entity
+        connection = _Connection()
+        items = [_entity(1), Entity()]
+        with self.assertRaises(ValueError):
+            self._callFUT(_Client(connection), items,
+                          [item.key for item in items], _put)
+        self.assertEqual(connection.committed, [])
+
+    def test_concurrent(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk as MUT
+        from google.cloud.exceptions import Conflict
+        error = Conflict('contention')
+        connection = _Connection(credentials=object(),
+                                 errors=[error] * 4)
+        client = _Client(connection)
+        items = [_entity(id_) for id_ in range(1, 6)]
+        with _Monkey(MUT, _MAX_MUTATIONS=2, time=_Clock([]),
+                     _worker_connection=lambda conn: conn):
+            found = self._callFUT(client, items,
+                                  [item.key for item in items], _put,
+                                  max_workers=3)
+        # One commit failed four times;  the others were sent once.
+        self.assertEqual(found, [(items[:2], error)])
+        self.assertEqual(len(connection.committed), 6)
+
+
+def _put(batch, entity):
+    batch.put(entity)
+
+
+def _entity(id_):
+    from google.cloud.datastore.entity import Entity
+    from google.cloud.datastore.key import Key
+    if id_ is None:
+        return Entity(key=Key('Kind', project='PROJECT'))
+    return Entity(key=Key('Kind', id_, project='PROJECT'))
+
+
+class _Clock(object):
+
+    def __init__(self, sleeps):
+        self.sleeps = sleeps
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+
+
+class _Client(object):
+
+    project = 'PROJECT'
+    namespace = None
+    cache = None
+    current_batch = None
+
+    def __init__(self, connection):
+        self.connection = connection
+
+
+def _echo(connection, task):
+    return connection, task
+
+
+def _repeat(connection, task):
+    return [task, task]
+
+
+class _Connection(object):
+
+    def __init__(self, credentials=None, errors=()):
+        import threading
+        self.credentials = credentials
+        self.committed = []
+        self._errors = list(errors)
+        self._lock = threading.Lock()
+
+    def commit(self, project, request, transaction_id):
+        from google.cloud.datastore._generated import entity_pb2
+        with self._lock:
+            self.committed.append(request)
+            if self._errors:
+                raise self._errors.pop(0)
+        key_pb = entity_pb2.Key()
+        key_pb.path.add(kind='Kind', id=1234)
+        return 0, [key_pb]
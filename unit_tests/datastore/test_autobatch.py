@@ -0,0 +1,257 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class TestAutoBatcher(unittest.TestCase):
+
+    PROJECT = 'PROJECT'
+
+    def _getTargetClass(self):
+        from google.cloud.datastore.autobatch import AutoBatcher
+        return AutoBatcher
+
+    def _makeOne(self, client, **kw):
+        # A long window, so that tests decide when operations are sent.
+        kw.setdefault('max_delay', 60)
+        return self._getTargetClass()(client, **kw)
+
+    def _makeClient(self, credentials=None, **kw):
+        return _Client(self.PROJECT, _Connection(credentials, **kw))
+
+    def test_ctor_defaults(self):
+        from google.cloud.datastore._bulk import _MAX_MUTATIONS
+        client = self._makeClient()
+        batcher = self._getTargetClass()(client)
+        self.assertEqual(batcher.max_batch_size, _MAX_MUTATIONS)
+        self.assertEqual(batcher.max_delay, 0.01)
+        batcher.close()
+
+    def test_ctor_invalid_max_batch_size(self):
+        with self.assertRaises(ValueError):
+            self._makeOne(self._makeClient(), max_batch_size=0)
+
+    def test_close_unused(self):
+        batcher = self._makeOne(self._makeClient())
+        batcher.close()
+        batcher.flush()
+        with self.assertRaises(ValueError):
+            batcher.get(_key(1))
+        with self.assertRaises(ValueError):
+            batcher.put(_entity(1))
+        with self.assertRaises(ValueError):
+            batcher.delete(_key(1))
+
+    def test_get_coalesced(self):
+        client = self._makeClient()
+        client.stored[_key(1)] = _entity(1, name=u'one')
+        with self._makeOne(client) as batcher:
+            first = batcher.get(_key(1))
+            second = batcher.get(_key(2))
+            again = batcher.get(_key(1))
+            self.assertFalse(first.done())
+            batcher.flush()
+            self.assertTrue(first.done())
+
+        self.assertEqual(client.lookups, [[_key(1), _key(2)]])
+        self.assertEqual(first.result()['name'], u'one')
+        self.assertIsNone(second.result())
+        self.assertEqual(again.result(), first.result())
+        self.assertIsNot(again.result(), first.result())
+
+    def test_get_other_project(self):
+        from google.cloud.datastore.key import Key
+        client = self._makeClient()
+        with self._makeOne(client) as batcher:
+            future = batcher.get(Key('Kind', 1, project='OTHER'))
+        with self.assertRaises(ValueError):
+            future.result()
+        self.assertEqual(client.lookups, [])
+
+    def test_get_error(self):
+        client = self._makeClient()
+        client.lookup_error = KeyError('oops')
+        with self._makeOne(client) as batcher:
+            futures = [batcher.get(_key(1)), batcher.get(_key(1))]
+        for future in futures:
+            self.assertIs(future.exception(), client.lookup_error)
+
+    def test_put_and_delete_coalesced(self):
+        client = self._makeClient()
+        partial = _entity(None, name=u'new')
+        with self._makeOne(client) as batcher:
+            first = batcher.put(_entity(1, name=u'old'))
+            inserted = batcher.put(partial)
+            deleted = batcher.delete(_key(2))
+            last = batcher.put(_entity(1, name=u'new'))
+            batcher.flush()
+
+        commits = client.connection.commits
+        self.assertEqual(len(commits), 1)
+        self.assertEqual([_mutation(pb) for pb in commits[0]],
+                         [('insert', None), ('delete', 2), ('upsert', 1)])
+        self.assertIsNone(first.result())
+        self.assertIsNone(last.result())
+        self.assertIsNone(inserted.result())
+        self.assertIsNone(deleted.result())
+        self.assertEqual(partial.key.id, 1234)
+
+    def test_put_invalid(self):
+        from google.cloud.datastore.entity import Entity
+        from google.cloud.datastore.key import Key
+        client = self._makeClient()
+        with self._makeOne(client) as batcher:
+            no_key = batcher.put(Entity())
+            other = batcher.put(Entity(key=Key('Kind', 1, project='OTHER')))
+        with self.assertRaises(ValueError):
+            no_key.result()
+        with self.assertRaises(ValueError):
+            other.result()
+        self.assertEqual(client.connection.commits, [])
+
+    def test_put_commit_error(self):
+        client = self._makeClient(commit_error=KeyError('oops'))
+        with self._makeOne(client) as batcher:
+            futures = [batcher.put(_entity(1)), batcher.delete(_key(2))]
+        for future in futures:
+            with self.assertRaises(KeyError):
+                future.result()
+
+    def test_writes_before_lookups(self):
+        client = self._makeClient()
+        with self._makeOne(client) as batcher:
+            found = batcher.get(_key(1))
+            batcher.put(_entity(1, name=u'saved'))
+        self.assertEqual(found.result()['name'], u'saved')
+
+    def test_max_batch_size(self):
+        client = self._makeClient()
+        batcher = self._makeOne(client, max_batch_size=2)
+        first = batcher.get(_key(1))
+        batcher.get(_key(2))
+        first.result(timeout=5)
+        batcher.close()
+        self.assertEqual(client.lookups, [[_key(1), _key(2)]])
+
+    def test_max_delay(self):
+        client = self._makeClient()
+        batcher = self._makeOne(client, max_delay=0.01)
+        batcher.get(_key(1)).result(timeout=5)
+        batcher.get(_key(2)).result(timeout=5)
+        batcher.close()
+        self.assertEqual(client.lookups, [[_key(1)], [_key(2)]])
+
+    def test_worker_connection(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import autobatch as MUT
+        client = self._makeClient(credentials=object())
+        worker = _Connection(None)
+
+        with _Monkey(MUT, _worker_connection=lambda conn: worker):
+            with self._makeOne(client) as batcher:
+                batcher.delete(_key(1))
+        self.assertEqual(client.connection.commits, [])
+        self.assertEqual(len(worker.commits), 1)
+
+    def test_concurrent_callers(self):
+        import threading
+        client = self._makeClient()
+        batcher = self._makeOne(client, max_batch_size=10)
+        futures = {}
+
+        def _lookup(id_):
+            futures[id_] = batcher.get(_key(id_))
+
+        threads = [threading.Thread(target=_lookup, args=(id_,))
+                   for id_ in range(1, 11)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for future in futures.values():
+            self.assertIsNone(future.result(timeout=5))
+        batcher.close()
+        self.assertEqual(len(client.lookups), 1)
+        self.assertEqual(sorted(key.id for key in client.lookups[0]),
+                         list(range(1, 11)))
+
+
+def _key(id_):
+    from google.cloud.datastore.key import Key
+    if id_ is None:
+        return Key('Kind', project=TestAutoBatcher.PROJECT)
+    return Key('Kind', id_, project=TestAutoBatcher.PROJECT)
+
+
+def _entity(id_, **properties):
+    from google.cloud.datastore.entity import Entity
+    entity = Entity(key=_key(id_))
+    entity.update(properties)
+    return entity
+
+
+def _mutation(mutation_pb):
+    op = mutation_pb.WhichOneof('operation')
+    if op == 'delete':
+        return op, mutation_pb.delete.path[0].id
+    key_pb = getattr(mutation_pb, op).key
+    return op, key_pb.path[0].id or None
+
+
+class _Connection(object):
+
+    def __init__(self, credentials, commit_error=None):
+        self.credentials = credentials
+        self.commit_error = commit_error
+        self.commits = []
+        self.client = None
+
+    def commit(self, project, commit_request, transaction_id):
+        from google.cloud.datastore.helpers import entity_from_protobuf
+        if self.commit_error is not None:
+            raise self.commit_error
+        mutations = list(commit_request.mutations)
+        self.commits.append(mutations)
+        new_keys = []
+        for mutation_pb in mutations:
+            if mutation_pb.HasField('delete'):
+                continue
+            entity = entity_from_protobuf(
+                getattr(mutation_pb, mutation_pb.WhichOneof('operation')))
+            if entity.key.is_partial:
+                entity.key = entity.key.completed_key(1234)
+                new_keys.append(entity.key.to_protobuf())
+            self.client.stored[entity.key] = entity
+        return 0, new_keys
+
+
+class _Client(object):
+
+    lookup_error = None
+
+    def __init__(self, project, connection, namespace=None):
+        self.project = project
+        self.connection = connection
+        connection.client = self
+        self.namespace = namespace
+        self.cache = None
+        self.stored = {}
+        self.lookups = []
+
+    def get_multi(self, keys):
+        if self.lookup_error is not None:
+            raise self.lookup_error
+        self.lookups.append(list(keys))
+        return [self.stored[key] for key in keys if key in self.stored]
@@ -237,6 +237,44 @@ class TestBatch(unittest.TestCase):
         self.assertEqual(connection._committed,
                          [(_PROJECT, batch._commit_request, None)])
 
+    def test_commit_invalidates_cache(self):
+        _PROJECT = 'PROJECT'
+        client = _Client(_PROJECT, _Connection())
+        client.cache = _Cache()
+        batch = self._makeOne(client)
+        entity = _Entity()
+        entity.key = _Key(_PROJECT)
+        partial_entity = _Entity()
+        partial_entity.key = _Key(_PROJECT)
+        partial_entity.key._id = None
+        deleted_key = _Key(_PROJECT)
+
+        batch.begin()
+        batch.put(entity)
+        batch.put(partial_entity)
+        batch.delete(deleted_key)
+        self.assertEqual(client.cache.invalidated, [])
+        batch.commit()
+
+        self.assertEqual(client.cache.invalidated,
+                         [[entity.key, deleted_key]])
+
+    def test_commit_failed_invalidates_cache(self):
+        _PROJECT = 'PROJECT'
+        connection = _Connection()
+        connection._error = KeyError('oops')
+        client = _Client(_PROJECT, connection)
+        client.cache = _Cache()
+        batch = self._makeOne(client)
+        key = _Key(_PROJECT)
+
+        batch.begin()
+        batch.delete(key)
+        with self.assertRaises(KeyError):
+            batch.commit()
+
+        self.assertEqual(client.cache.invalidated, [[key]])
+
     def test_commit_wrong_status(self):
         _PROJECT = 'PROJECT'
         connection = _Connection()
@@ -382,6 +420,7 @@ class _KeyPB(object):
 class _Connection(object):
     _marker = object()
     _save_result = (False, None)
+    _error = None
 
     def __init__(self, *new_keys):
         self._completed_keys = [_KeyPB(key) for key in new_keys]
@@ -390,9 +429,20 @@ class _Connection(object):
 
     def commit(self, project, commit_request, transaction_id):
         self._committed.append((project, commit_request, transaction_id))
+        if self._error is not None:
+            raise self._error
         return self._index_updates, self._completed_keys
 
 
+class _Cache(object):
+
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, keys):
+        self.invalidated.append(list(keys))
+
+
 class _Entity(dict):
     key = None
     exclude_from_indexes = ()
@@ -427,6 +477,8 @@ class _Key(object):
 
         return key
 
+    _cached_protobuf = to_protobuf
+
     def completed_key(self, new_id):
         assert self.is_partial
         new_key = self.__class__(self.project)
@@ -440,6 +492,7 @@ class _Client(object):
         self.project = project
         self.connection = connection
         self.namespace = namespace
+        self.cache = None
         self._batches = []
 
     def _push_batch(self, batch):
@@ -0,0 +1,162 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class TestEntityCache(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.datastore.cache import EntityCache
+        return EntityCache
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_defaults(self):
+        cache = self._makeOne()
+        self.assertEqual(cache.max_size, 1000)
+        self.assertIsNone(cache.ttl)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(repr(cache),
+                         '<EntityCache 0/1000 entities, 0 hits, 0 misses>')
+
+    def test_ctor_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            self._makeOne(max_size=0)
+
+    def test_get_miss(self):
+        cache = self._makeOne()
+        self.assertIsNone(cache.get(_key(1)))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+    def test_set_and_get_copies(self):
+        cache = self._makeOne()
+        entity = _entity(1, tags=[u'a'])
+        cache.set(entity)
+        entity['tags'].append(u'b')
+
+        found = cache.get(_key(1))
+        self.assertEqual(found['tags'], [u'a'])
+        self.assertEqual(found.key, _key(1))
+        found['tags'].append(u'c')
+        self.assertEqual(cache.get(_key(1))['tags'], [u'a'])
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_set_invalid(self):
+        from google.cloud.datastore.entity import Entity
+        from google.cloud.datastore.key import Key
+        cache = self._makeOne()
+        with self.assertRaises(ValueError):
+            cache.set(Entity())
+        with self.assertRaises(ValueError):
+            cache.set(Entity(key=Key('Kind', project='PROJECT')))
+
+    def test_set_replaces(self):
+        cache = self._makeOne()
+        cache.set(_entity(1, value=1))
+        cache.set(_entity(1, value=2))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(_key(1))['value'], 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = self._makeOne(max_size=2)
+        cache.set(_entity(1))
+        cache.set(_entity(2))
+        cache.get(_key(1))
+        cache.set(_entity(3))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(_key(2)))
+        self.assertIsNotNone(cache.get(_key(1)))
+        self.assertIsNotNone(cache.get(_key(3)))
+
+    def test_ttl(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import cache as MUT
+        clock = _Clock(100.0)
+        cache = self._makeOne(ttl=10)
+        with _Monkey(MUT, time=clock):
+            cache.set(_entity(1))
+            clock.now = 109.0
+            self.assertIsNotNone(cache.get(_key(1)))
+            clock.now = 110.0
+            self.assertIsNone(cache.get(_key(1)))
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate(self):
+        cache = self._makeOne()
+        cache.set(_entity(1))
+        cache.set(_entity(2))
+        cache.invalidate([_key(1), _key(3)])
+        self.assertIsNone(cache.get(_key(1)))
+        self.assertIsNotNone(cache.get(_key(2)))
+
+    def test_clear(self):
+        cache = self._makeOne()
+        cache.set(_entity(1))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_set_w_token(self):
+        cache = self._makeOne()
+        token = cache.read_token()
+        cache.invalidate([_key(1)])
+        # Read before the invalidation:  possibly stale.
+        cache.set(_entity(1), token)
+        # Other keys, or reads since, are cached.
+        cache.set(_entity(2), token)
+        cache.set(_entity(1, value=2), cache.read_token())
+        self.assertEqual(cache.get(_key(1))['value'], 2)
+        self.assertIsNotNone(cache.get(_key(2)))
+
+    def test_set_w_token_invalidations_forgotten(self):
+        cache = self._makeOne(max_size=2)
+        token = cache.read_token()
+        cache.invalidate([_key(1)])
+        cache.invalidate([_key(2), _key(3)])
+        # Whether key 4 was invalidated since is no longer known.
+        cache.set(_entity(4), token)
+        self.assertEqual(len(cache), 0)
+        cache.set(_entity(4), cache.read_token())
+        self.assertEqual(len(cache), 1)
+
+    def test_set_w_token_cleared(self):
+        cache = self._makeOne()
+        token = cache.read_token()
+        cache.clear()
+        cache.set(_entity(1), token)
+        self.assertEqual(len(cache), 0)
+        cache.set(_entity(1), cache.read_token())
+        self.assertEqual(len(cache), 1)
+
+
+def _key(id_):
+    from google.cloud.datastore.key import Key
+    return Key('Kind', id_, project='PROJECT')
+
+
+def _entity(id_, **properties):
+    from google.cloud.datastore.entity import Entity
+    entity = Entity(key=_key(id_))
+    entity.update(properties)
+    return entity
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
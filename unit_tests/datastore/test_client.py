@@ -133,11 +133,12 @@ class TestClient(unittest.TestCase):
         return Client
 
     def _makeOne(self, project=PROJECT, namespace=None,
-                 credentials=None, http=None):
+                 credentials=None, http=None, cache=None):
         return self._getTargetClass()(project=project,
                                       namespace=namespace,
                                       credentials=credentials,
-                                      http=http)
+                                      http=http,
+                                      cache=cache)
 
     def test_ctor_w_project_no_environ(self):
         from unit_tests._testing import _Monkey
@@ -174,6 +175,7 @@ class TestClient(unittest.TestCase):
         self.assertIsNone(client.connection.http)
         self.assertIsNone(client.current_batch)
         self.assertIsNone(client.current_transaction)
+        self.assertIsNone(client.cache)
         self.assertEqual(default_called, [None])
 
     def test_ctor_w_explicit_inputs(self):
@@ -181,12 +183,15 @@ class TestClient(unittest.TestCase):
         NAMESPACE = 'namespace'
         creds = object()
         http = object()
+        cache = object()
         client = self._makeOne(project=OTHER,
                                namespace=NAMESPACE,
                                credentials=creds,
-                               http=http)
+                               http=http,
+                               cache=cache)
         self.assertEqual(client.project, OTHER)
         self.assertEqual(client.namespace, NAMESPACE)
+        self.assertIs(client.cache, cache)
         self.assertIsInstance(client.connection, _MockConnection)
         self.assertIs(client.connection.credentials, creds)
         self.assertIs(client.connection.http, http)
@@ -298,6 +303,49 @@ class TestClient(unittest.TestCase):
         self.assertEqual([missed.key.to_protobuf() for missed in missing],
                          [key.to_protobuf()])
 
+    def test_get_multi_miss_w_missing_in_input_order(self):
+        from google.cloud.datastore._generated import entity_pb2
+        from google.cloud.datastore.key import Key
+
+        key1 = Key('Kind', project=self.PROJECT)
+        key2 = Key('Kind', 2345, project=self.PROJECT)
+        key3 = Key('Kind', 3456, project=self.PROJECT)
+        missed_pbs = []
+        for key in (key3, key1, key2):
+            missed = entity_pb2.Entity()
+            missed.key.CopyFrom(key.to_protobuf())
+            missed_pbs.append(missed)
+
+        creds = object()
+        client = self._makeOne(credentials=creds)
+        client.connection._add_lookup_result(missing=missed_pbs)
+
+        missing = []
+        entities = client.get_multi([key1, key2, key3], missing=missing)
+        self.assertEqual(entities, [])
+        self.assertEqual([missed.key.to_protobuf() for missed in missing],
+                         [key1.to_protobuf(), key2.to_protobuf(),
+                          key3.to_protobuf()])
+
+    def test_get_multi_w_deferred_in_input_order(self):
+        from google.cloud.datastore.key import Key
+
+        key1 = Key('Kind', project=self.PROJECT)
+        key2 = Key('Kind', 2345, project=self.PROJECT)
+        key3 = Key('Kind', 3456, project=self.PROJECT)
+
+        creds = object()
+        client = self._makeOne(credentials=creds)
+        client.connection._add_lookup_result(
+            deferred=[key.to_protobuf() for key in (key2, key3, key1)])
+
+        deferred = []
+        entities = client.get_multi([key1, key2, key3], deferred=deferred)
+        self.assertEqual(entities, [])
+        self.assertEqual([def_key.to_protobuf() for def_key in deferred],
+                         [key1.to_protobuf(), key2.to_protobuf(),
+                          key3.to_protobuf()])
+
     def test_get_multi_w_missing_non_empty(self):
         from google.cloud.datastore.key import Key
 
@@ -415,6 +463,100 @@ class TestClient(unittest.TestCase):
         self.assertEqual(list(result), ['foo'])
         self.assertEqual(result['foo'], 'Foo')
 
+    def test_get_multi_hit_lazy(self):
+        from google.cloud.datastore.entity import LazyEntity
+        from google.cloud.datastore.key import Key
+
+        entity_pb = _make_entity_pb(self.PROJECT, 'Kind', 1234, 'foo', 'Foo')
+        client = self._makeOne(credentials=object())
+        client.connection._add_lookup_result([entity_pb])
+
+        key = Key('Kind', 1234, project=self.PROJECT)
+        result, = client.get_multi([key], lazy=True)
+        self.assertIsInstance(result, LazyEntity)
+        self.assertEqual(result.key, key)
+        self.assertEqual(result['foo'], 'Foo')
+
+    def _make_cached_client(self):
+        from google.cloud.datastore.cache import EntityCache
+        from google.cloud.datastore.entity import Entity
+        from google.cloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object(), cache=EntityCache())
+        cached = Entity(key=Key('Kind', 1, project=self.PROJECT))
+        cached['foo'] = 'Cached'
+        client.cache.set(cached)
+        return client
+
+    def test_get_multi_w_cache(self):
+        from google.cloud.datastore.key import Key
+
+        client = self._make_cached_client()
+        client.connection._add_lookup_result(
+            [_make_entity_pb(self.PROJECT, 'Kind', 2, 'foo', 'Foo')])
+        key1 = Key('Kind', 1, project=self.PROJECT)
+        key2 = Key('Kind', 2, project=self.PROJECT)
+
+        result = client.get_multi([key2, key1])
+
+        self.assertEqual([entity['foo'] for entity in result],
+                         ['Foo', 'Cached'])
+        (_, key_pbs, _, _), = client.connection._lookup_cw
+        self.assertEqual(key_pbs, [key2.to_protobuf()])
+        # Now both are served from the cache.
+        result = client.get_multi([key1, key2])
+        self.assertEqual([entity['foo'] for entity in result],
+                         ['Cached', 'Foo'])
+        self.assertEqual(len(client.connection._lookup_cw), 1)
+
+    def test_get_multi_w_cache_lazy(self):
+        from google.cloud.datastore.key import Key
+
+        client = self._make_cached_client()
+        client.connection._add_lookup_result(
+            [_make_entity_pb(self.PROJECT, 'Kind', 2, 'foo', 'Foo')])
+        key = Key('Kind', 2, project=self.PROJECT)
+
+        result, = client.get_multi([key], lazy=True)
+        self.assertEqual(result['foo'], 'Foo')
+        self.assertIsNone(client.cache.get(key))
+
+    def test_get_multi_w_cache_invalidated_during_lookup(self):
+        from google.cloud.datastore.key import Key
+
+        client = self._make_cached_client()
+        key = Key('Kind', 2, project=self.PROJECT)
+        connection = client.connection
+        connection._add_lookup_result(
+            [_make_entity_pb(self.PROJECT, 'Kind', 2, 'foo', 'Stale')])
+        lookup = connection.lookup
+
+        def _lookup(*args, **kwargs):
+            # As if another thread committed a new version meanwhile.
+            client.cache.invalidate([key])
+            return lookup(*args, **kwargs)
+
+        connection.lookup = _lookup
+        result, = client.get_multi([key])
+
+        self.assertEqual(result['foo'], 'Stale')
+        self.assertIsNone(client.cache.get(key))
+
+    def test_get_multi_w_cache_in_transaction(self):
+        from google.cloud.datastore.key import Key
+
+        client = self._make_cached_client()
+        client.connection._add_lookup_result(
+            [_make_entity_pb(self.PROJECT, 'Kind', 1, 'foo', 'Fresh')])
+        key = Key('Kind', 1, project=self.PROJECT)
+
+        with _NoCommitTransaction(client):
+            result, = client.get_multi([key])
+
+        self.assertEqual(result['foo'], 'Fresh')
+        self.assertEqual(len(client.connection._lookup_cw), 1)
+        self.assertEqual(client.cache.get(key)['foo'], 'Cached')
+
     def test_get_multi_hit_w_transaction(self):
         from google.cloud.datastore.key import Key
 
@@ -522,6 +664,51 @@ class TestClient(unittest.TestCase):
         self.assertEqual(missing, [])
         self.assertEqual(deferred, [])
 
+    def test_get_multi_chunked(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import client as _MUT
+        from google.cloud.datastore.key import Key
+
+        keys = [Key('Kind', id_, project=self.PROJECT)
+                for id_ in (5, 4, 3, 2, 1)]
+        client = self._makeOne(credentials=object())
+        client.connection = _LookupConnection(missing_ids=[4],
+                                              defer_ids=[2])
+
+        missing = []
+        with _Monkey(_MUT, _MAX_LOOKUP_KEYS=2):
+            found = client.get_multi(keys, missing=missing)
+
+        self.assertEqual([entity.key.id for entity in found], [5, 3, 2, 1])
+        self.assertEqual([entity.key.id for entity in missing], [4])
+        # Three chunks, and a follow-up for the deferred key.
+        self.assertEqual(sorted(client.connection.requested),
+                         [[1], [2], [3, 2], [5, 4]])
+
+    def test_get_multi_chunked_concurrent(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk
+        from google.cloud.datastore import client as _MUT
+        from google.cloud.datastore.key import Key
+
+        keys = [Key('Kind', id_, project=self.PROJECT)
+                for id_ in range(1, 8)]
+        client = self._makeOne(credentials=object())
+        client.connection = _LookupConnection(defer_ids=[6])
+        client.connection.credentials = object()
+
+        deferred = []
+        with _Monkey(_MUT, _MAX_LOOKUP_KEYS=3):
+            with _Monkey(_bulk, _worker_connection=lambda conn: conn):
+                found = client.get_multi(keys, deferred=deferred,
+                                         max_workers=2)
+
+        self.assertEqual([entity.key.id for entity in found],
+                         [1, 2, 3, 4, 5, 7])
+        self.assertEqual([key.id for key in deferred], [6])
+        self.assertEqual(sorted(client.connection.requested),
+                         [[1, 2, 3], [4, 5, 6], [7]])
+
     def test_put(self):
         _called_with = []
 
@@ -602,6 +789,101 @@ class TestClient(unittest.TestCase):
         self.assertEqual(name, 'foo')
         self.assertEqual(value_pb.string_value, u'bar')
 
+    def test_put_multi_chunked(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk
+        from google.cloud.datastore.entity import Entity
+        from google.cloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        entities = [Entity(key=Key('Kind', id_, project=self.PROJECT))
+                    for id_ in (1, 2, 3)]
+        client.connection._commit.extend([[], []])
+
+        with _Monkey(_bulk, _MAX_MUTATIONS=2,
+                     _worker_connection=lambda conn: conn):
+            client.put_multi(entities, bulk=True, max_workers=1)
+
+        self.assertEqual(
+            [len(commit_req.mutations)
+             for _, commit_req, _ in client.connection._commit_cw],
+            [2, 1])
+
+    def test_put_multi_wo_bulk_single_commit(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk
+        from google.cloud.datastore import client as MUT
+        from google.cloud.datastore.entity import Entity
+        from google.cloud.datastore.key import Key
+
+        client = self._makeOne(credentials=object())
+        entities = [Entity(key=Key('Kind', id_, project=self.PROJECT))
+                    for id_ in (1, 2, 3)]
+        client.connection._commit.append([])
+
+        def _commit_concurrently(*args):
+            self.fail('Bulk commit without bulk=True')
+
+        with _Monkey(_bulk, _MAX_MUTATIONS=2):
+            with _Monkey(MUT, commit_concurrently=_commit_concurrently):
+                client.put_multi(entities)
+
+        self.assertEqual(
+            [len(commit_req.mutations)
+             for _, commit_req, _ in client.connection._commit_cw],
+            [3])
+
+    def test_put_multi_wo_bulk_not_retried(self):
+        from google.cloud.exceptions import Conflict
+
+        entity = _Entity(foo=u'bar')
+        entity.key = _Key(self.PROJECT)
+        client = self._makeOne(credentials=object())
+        client.connection._commit_error = Conflict('contention')
+
+        with self.assertRaises(Conflict):
+            client.put_multi([entity], failures=[])
+
+        self.assertEqual(len(client.connection._commit_cw), 1)
+
+    def test_put_multi_bulk_w_existing_batch(self):
+        creds = object()
+        client = self._makeOne(credentials=creds)
+        entity = _Entity(foo=u'bar')
+        entity.key = _Key(self.PROJECT)
+
+        with _NoCommitBatch(client) as CURR_BATCH:
+            client.put_multi([entity], bulk=True)
+
+        self.assertEqual(len(CURR_BATCH.mutations), 1)
+        self.assertEqual(len(client.connection._commit_cw), 0)
+
+    def test_put_multi_w_failures(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import client as MUT
+        from google.cloud.exceptions import Conflict
+
+        entity = _Entity(foo=u'bar')
+        entity.key = _Key(self.PROJECT)
+        error = Conflict('contention')
+        calls = []
+
+        def _commit_concurrently(*args):
+            calls.append(args)
+            return [([entity], error)]
+
+        client = self._makeOne(credentials=object())
+        failures = []
+        with _Monkey(MUT, commit_concurrently=_commit_concurrently):
+            client.put_multi([entity], bulk=True, max_workers=3,
+                             failures=failures)
+            with self.assertRaises(Conflict):
+                client.put_multi([entity], bulk=True)
+
+        self.assertEqual(failures, [([entity], error)])
+        self.assertEqual(calls[0][1:3], ([entity], [entity.key]))
+        self.assertEqual(calls[0][4], 3)
+
     def test_delete(self):
         _called_with = []
 
@@ -643,6 +925,27 @@ class TestClient(unittest.TestCase):
         self.assertEqual(mutated_key, key.to_protobuf())
         self.assertIsNone(transaction_id)
 
+    def test_delete_multi_w_failures(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import client as MUT
+        from google.cloud.exceptions import ServiceUnavailable
+
+        key = _Key(self.PROJECT)
+        error = ServiceUnavailable('busy')
+
+        def _commit_concurrently(client, items, keys, mutate, max_workers):
+            self.assertEqual(keys, [key])
+            return [(items, error)]
+
+        client = self._makeOne(credentials=object())
+        failures = []
+        with _Monkey(MUT, commit_concurrently=_commit_concurrently):
+            client.delete_multi([key], bulk=True, failures=failures)
+            with self.assertRaises(ServiceUnavailable):
+                client.delete_multi([key], bulk=True)
+
+        self.assertEqual(failures, [([key], error)])
+
     def test_delete_multi_w_existing_batch(self):
         creds = object()
         client = self._makeOne(credentials=creds)
@@ -669,6 +972,87 @@ class TestClient(unittest.TestCase):
         self.assertEqual(mutated_key, key._key)
         self.assertEqual(len(client.connection._commit_cw), 0)
 
+    def test_get_async(self):
+        from google.cloud.datastore.key import Key
+
+        entity_pb = _make_entity_pb(self.PROJECT, 'Kind', 1234, 'foo', 'Foo')
+        client = self._makeOne(http=object())
+        client.connection._add_lookup_result([entity_pb])
+
+        future = client.get_async(Key('Kind', 1234, project=self.PROJECT))
+
+        self.assertTrue(future.done())
+        self.assertEqual(future.result()['foo'], 'Foo')
+
+    def _callAsync(self, method_name, *args, **kwargs):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import client as MUT
+        client = self._makeOne(credentials=object())
+        calls = []
+
+        def _call_async(call_client, func, *call_args, **call_kwargs):
+            calls.append((call_client, func, call_args, call_kwargs))
+            return 'FUTURE'
+
+        with _Monkey(MUT, call_async=_call_async):
+            future = getattr(client, method_name)(*args, **kwargs)
+
+        self.assertEqual(future, 'FUTURE')
+        (call_client, func, call_args, call_kwargs), = calls
+        self.assertIs(call_client, client)
+        return func, call_args, call_kwargs
+
+    def test_get_async_w_transaction(self):
+        klass = self._getTargetClass()
+        key, transaction = object(), object()
+        func, args, kwargs = self._callAsync('get_async', key,
+                                             transaction=transaction)
+        self.assertEqual(func, klass.get)
+        self.assertEqual(args, (key,))
+        self.assertEqual(kwargs, {'transaction': transaction})
+
+    def test_get_multi_async(self):
+        klass = self._getTargetClass()
+        keys = [object()]
+        func, args, kwargs = self._callAsync('get_multi_async', keys,
+                                             max_workers=2, lazy=True)
+        self.assertEqual(func, klass.get_multi)
+        self.assertEqual(args, (keys,))
+        self.assertEqual(kwargs, {'transaction': None, 'max_workers': 2,
+                                  'lazy': True})
+
+    def test_put_multi_async(self):
+        from google.cloud.datastore._bulk import DEFAULT_MAX_WORKERS
+        klass = self._getTargetClass()
+        entities = [_Entity()]
+        func, args, kwargs = self._callAsync('put_multi_async', entities)
+        self.assertEqual(func, klass.put_multi)
+        self.assertEqual(args, (entities,))
+        self.assertEqual(kwargs, {'bulk': False,
+                                  'max_workers': DEFAULT_MAX_WORKERS})
+
+    def test_delete_multi_async(self):
+        klass = self._getTargetClass()
+        keys = [_Key(self.PROJECT)]
+        func, args, kwargs = self._callAsync('delete_multi_async', keys,
+                                             bulk=True, max_workers=3)
+        self.assertEqual(func, klass.delete_multi)
+        self.assertEqual(args, (keys,))
+        self.assertEqual(kwargs, {'bulk': True, 'max_workers': 3})
+
+    def test_put_multi_async_w_existing_batch(self):
+        client = self._makeOne(credentials=object())
+        entity = _Entity(foo=u'bar')
+        entity.key = _Key(self.PROJECT)
+
+        with _NoCommitBatch(client) as CURR_BATCH:
+            future = client.put_multi_async([entity])
+
+        self.assertTrue(future.done())
+        self.assertIsNone(future.result())
+        self.assertEqual(len(CURR_BATCH.mutations), 1)
+        self.assertEqual(len(client.connection._commit_cw), 0)
+
     def test_allocate_ids_w_partial_key(self):
         NUM_IDS = 2
 
@@ -792,6 +1176,110 @@ class TestClient(unittest.TestCase):
         self.assertEqual(xact.args, (client,))
         self.assertEqual(xact.kwargs, {})
 
+    def _runInTransaction(self, func, commit_errors=(), clock=None, **kw):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import client as MUT
+
+        client = self._makeOne(credentials=object())
+        transactions = []
+
+        def _transaction():
+            errors = list(commit_errors)
+            transaction = _RetriedTransaction(
+                errors[len(transactions)] if len(transactions) < len(errors)
+                else None)
+            transactions.append(transaction)
+            return transaction
+
+        client.transaction = _transaction
+        if clock is None:
+            clock = _Clock()
+        with _Monkey(MUT, time=clock, random=_MaxRandom()):
+            try:
+                result = client.run_in_transaction(func, **kw)
+            except Exception as exc:
+                return exc, transactions, clock.sleeps
+        return result, transactions, clock.sleeps
+
+    def test_run_in_transaction(self):
+        attempts = []
+        result, transactions, sleeps = self._runInTransaction(
+            lambda transaction: transaction, attempts=attempts)
+        self.assertIs(result, transactions[0])
+        self.assertTrue(transactions[0].committed)
+        self.assertEqual(sleeps, [])
+        self.assertEqual(attempts, [(0.0, None)])
+
+    def test_run_in_transaction_retried(self):
+        from google.cloud.exceptions import Conflict
+        errors = [Conflict('busy'), Conflict('busy')]
+        attempts = []
+        result, transactions, sleeps = self._runInTransaction(
+            lambda transaction: 'done', commit_errors=errors,
+            backoff=0.5, attempts=attempts)
+        self.assertEqual(result, 'done')
+        self.assertEqual(len(transactions), 3)
+        self.assertEqual(sleeps, [0.5, 1.0])
+        self.assertEqual(attempts, [(0.0, errors[0]), (0.0, errors[1]),
+                                    (0.0, None)])
+
+    def test_run_in_transaction_retries_exhausted(self):
+        from google.cloud.exceptions import Conflict
+        errors = [Conflict('busy')] * 3
+        result, transactions, sleeps = self._runInTransaction(
+            lambda transaction: None, commit_errors=errors, retries=2)
+        self.assertIs(result, errors[2])
+        self.assertEqual(len(transactions), 3)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_run_in_transaction_w_timeout(self):
+        from google.cloud.exceptions import Conflict
+        errors = [Conflict('busy')] * 3
+        clock = _Clock(step=1.0)
+        result, transactions, sleeps = self._runInTransaction(
+            lambda transaction: None, commit_errors=errors, clock=clock,
+            backoff=1.0, timeout=5.0)
+        # The clock advances a second each time it is read:  the second
+        # rerun would start 7 seconds after the first call.
+        self.assertIs(result, errors[1])
+        self.assertEqual(len(transactions), 2)
+        self.assertEqual(sleeps, [1.0])
+
+    def test_run_in_transaction_func_error(self):
+        attempts = []
+
+        def _func(transaction):
+            raise KeyError('oops')
+
+        result, transactions, sleeps = self._runInTransaction(
+            _func, attempts=attempts)
+        self.assertIsInstance(result, KeyError)
+        self.assertEqual(len(transactions), 1)
+        self.assertFalse(transactions[0].committed)
+        self.assertEqual(sleeps, [])
+        self.assertEqual(attempts, [(0.0, result)])
+
+    def test_run_in_transaction_func_conflict(self):
+        from google.cloud.exceptions import Conflict
+        calls = []
+
+        def _func(transaction):
+            calls.append(transaction)
+            if len(calls) == 1:
+                raise Conflict('busy')
+
+        result, transactions, _ = self._runInTransaction(_func)
+        self.assertIsNone(result)
+        self.assertEqual(calls, transactions)
+        self.assertFalse(transactions[0].committed)
+        self.assertTrue(transactions[1].committed)
+
+    def test_run_in_transaction_nested(self):
+        client = self._makeOne(credentials=object())
+        with _NoCommitTransaction(client):
+            with self.assertRaises(ValueError):
+                client.run_in_transaction(lambda transaction: None)
+
     def test_query_w_client(self):
         KIND = 'KIND'
 
@@ -923,6 +1411,8 @@ class _Dummy(object):
 
 class _MockConnection(object):
 
+    _commit_error = None
+
     def __init__(self, credentials=None, http=None):
         self.credentials = credentials
         self.http = http
@@ -945,6 +1435,8 @@ class _MockConnection(object):
 
     def commit(self, project, commit_request, transaction_id):
         self._commit_cw.append((project, commit_request, transaction_id))
+        if self._commit_error is not None:
+            raise self._commit_error
         response, self._commit = self._commit[0], self._commit[1:]
         return self._index_updates, response
 
@@ -954,6 +1446,38 @@ class _MockConnection(object):
         return [_KeyPB(i) for i in list(range(num_pbs))]
 
 
+class _LookupConnection(object):
+
+    credentials = None
+
+    def __init__(self, missing_ids=(), defer_ids=()):
+        import threading
+        self._lock = threading.Lock()
+        self._missing_ids = set(missing_ids)
+        self._defer_ids = set(defer_ids)
+        self.requested = []
+
+    def lookup(self, project, key_pbs, eventual=False, transaction_id=None):
+        from google.cloud.datastore._generated import entity_pb2
+        results, missing, deferred = [], [], []
+        with self._lock:
+            self.requested.append([key_pb.path[0].id for key_pb in key_pbs])
+            for key_pb in key_pbs:
+                id_ = key_pb.path[0].id
+                if id_ in self._defer_ids:
+                    self._defer_ids.remove(id_)
+                    deferred.append(key_pb)
+                    continue
+                entity_pb = entity_pb2.Entity()
+                entity_pb.key.CopyFrom(key_pb)
+                if id_ in self._missing_ids:
+                    missing.append(entity_pb)
+                else:
+                    results.append(entity_pb)
+        # The backend returns entities in no particular order.
+        return results[::-1], missing, deferred
+
+
 class _NoCommitBatch(object):
 
     def __init__(self, client):
@@ -988,6 +1512,47 @@ class _NoCommitTransaction(object):
         self._client._pop_batch()
 
 
+class _RetriedTransaction(object):
+
+    committed = False
+
+    def __init__(self, commit_error):
+        self._commit_error = commit_error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            if self._commit_error is not None:
+                raise self._commit_error
+            self.committed = True
+
+
+class _Clock(object):
+
+    def __init__(self, step=0.0):
+        self.now = 0.0
+        self.step = step
+        self.sleeps = []
+
+    def time(self):
+        now = self.now
+        self.now += self.step
+        return now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _MaxRandom(object):
+
+    @staticmethod
+    def uniform(low, high):
+        return high
+
+
 class _Entity(dict):
     key = None
     exclude_from_indexes = ()
@@ -1002,13 +1567,20 @@ class _Key(object):
     _id = 1234
     _stored = None
 
-    def __init__(self, project):
+    def __init__(self, project, namespace=None):
         self.project = project
+        self.namespace = namespace
 
     @property
     def is_partial(self):
         return self._id is None
 
+    @property
+    def flat_path(self):
+        if self._id is None:
+            return (self._kind,)
+        return (self._kind, self._id)
+
     def to_protobuf(self):
         from google.cloud.datastore._generated import entity_pb2
         key = self._key = entity_pb2.Key()
@@ -1022,6 +1594,8 @@ class _Key(object):
 
         return key
 
+    _cached_protobuf = to_protobuf
+
     def completed_key(self, new_id):
         assert self.is_partial
         new_key = self.__class__(self.project)
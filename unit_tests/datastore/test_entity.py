@@ -195,6 +195,136 @@ class TestEntity(unittest.TestCase):
         self.assertEqual(repr(entity), "<Entity/bar/baz {'foo': 'Foo'}>")
 
 
+class TestLazyEntity(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.datastore.entity import LazyEntity
+        return LazyEntity
+
+    def _makeOne(self, key=None):
+        from google.protobuf import struct_pb2
+        from google.cloud.datastore._generated import entity_pb2
+        from google.cloud.datastore.helpers import _new_value_pb
+        entity_pb = entity_pb2.Entity()
+        _new_value_pb(entity_pb, 'name').string_value = u'Ann'
+        age_pb = _new_value_pb(entity_pb, 'age')
+        age_pb.integer_value = 30
+        age_pb.meaning = 7
+        bio_pb = _new_value_pb(entity_pb, 'bio')
+        bio_pb.null_value = struct_pb2.NULL_VALUE
+        bio_pb.exclude_from_indexes = True
+        value_pbs = dict(entity_pb.properties.items())
+        return self._getTargetClass()(key=key, value_pbs=value_pbs)
+
+    def test_ctor_defaults(self):
+        entity = self._getTargetClass()()
+        self.assertIsNone(entity.key)
+        self.assertEqual(len(entity), 0)
+        self.assertEqual(dict(entity), {})
+
+    def test_lookup_decodes_one(self):
+        entity = self._makeOne()
+        self.assertEqual(len(entity), 3)
+        self.assertIn('bio', entity)
+        self.assertNotIn('nope', entity)
+        self.assertEqual(entity['age'], 30)
+        self.assertEqual(entity.get('name'), u'Ann')
+        self.assertEqual(entity.get('nope', 'X'), 'X')
+        self.assertEqual(sorted(entity._value_pbs), ['bio'])
+        self.assertEqual(entity._meanings, {'age': (7, 30)})
+        self.assertEqual(len(entity), 3)
+        with self.assertRaises(KeyError):
+            entity['nope']
+
+    def test_whole_entity_decodes_all(self):
+        entity = self._makeOne()
+        self.assertEqual(entity.exclude_from_indexes, frozenset(['bio']))
+        self.assertEqual(entity._value_pbs, {})
+        for method in ('keys', 'values', 'items', 'copy', '__iter__'):
+            entity = self._makeOne()
+            getattr(entity, method)()
+            self.assertEqual(entity._value_pbs, {}, method)
+        self.assertEqual(dict(self._makeOne()),
+                         {'name': u'Ann', 'age': 30, 'bio': None})
+        self.assertEqual(sorted(self._makeOne()), ['age', 'bio', 'name'])
+
+    def test___eq__(self):
+        from google.cloud.datastore.entity import Entity
+        entity = Entity(exclude_from_indexes=['bio'])
+        entity.update({'name': u'Ann', 'age': 30, 'bio': None})
+        entity._meanings['age'] = (7, 30)
+        self.assertEqual(self._makeOne(), entity)
+        self.assertEqual(entity, self._makeOne())
+        self.assertEqual(self._makeOne(), self._makeOne())
+        self.assertNotEqual(self._makeOne(), self._makeOne(key=_Key()))
+
+    def test_mutation(self):
+        entity = self._makeOne()
+        entity['bio'] = u'Writer'
+        self.assertIn('bio', entity.exclude_from_indexes)
+        self.assertEqual(entity['bio'], u'Writer')
+        del entity['name']
+        self.assertNotIn('name', entity)
+        self.assertEqual(entity.setdefault('age', 40), 30)
+        self.assertEqual(entity.pop('age'), 30)
+        self.assertIsNone(entity.pop('nope', None))
+        self.assertEqual(entity.popitem(), ('bio', u'Writer'))
+        self.assertEqual(len(entity), 0)
+
+    def test_update(self):
+        entity = self._makeOne()
+        entity.update(name=u'Bob')
+        self.assertEqual(entity['name'], u'Bob')
+        self.assertEqual(entity['age'], 30)
+
+    def test_clear(self):
+        entity = self._makeOne()
+        entity['age']
+        entity.clear()
+        self.assertEqual(len(entity), 0)
+        self.assertNotIn('name', entity)
+
+    def test_to_entity(self):
+        from google.cloud.datastore.entity import Entity
+        key = _Key()
+        entity = self._makeOne(key=key)
+        entity['name']
+        plain = entity.to_entity()
+        self.assertIs(type(plain), Entity)
+        self.assertIs(plain.key, key)
+        self.assertEqual(dict(plain),
+                         {'name': u'Ann', 'age': 30, 'bio': None})
+        self.assertEqual(plain._meanings, {'age': (7, 30)})
+        self.assertEqual(plain.exclude_from_indexes, frozenset(['bio']))
+
+    def test_pickle(self):
+        import pickle
+        from google.cloud.datastore.entity import Entity
+        from google.cloud.datastore.key import Key
+        key = Key('Person', 1234, project=_PROJECT)
+        entity = self._makeOne(key=key)
+        entity['age']
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(entity, protocol))
+            self.assertIs(type(restored), Entity)
+            self.assertEqual(restored.key, key)
+            self.assertEqual(restored, entity)
+
+    def test_copy(self):
+        import copy
+        from google.cloud.datastore.entity import Entity
+        entity = self._makeOne()
+        for copied in (copy.copy(entity), copy.deepcopy(entity)):
+            self.assertIs(type(copied), Entity)
+            self.assertEqual(copied, entity)
+
+    def test___repr__(self):
+        entity = self._makeOne()
+        del entity['name']
+        del entity['bio']
+        self.assertEqual(repr(entity), "<Entity {'age': 30}>")
+
+
 class _Key(object):
     _MARKER = object()
     _key = 'KEY'
@@ -0,0 +1,90 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class TestFuture(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.datastore.future import Future
+        return Future
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor(self):
+        future = self._makeOne()
+        self.assertFalse(future.done())
+        self.assertEqual(repr(future), '<Future pending>')
+
+    def test_set_result(self):
+        future = self._makeOne()
+        future.set_result(42)
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), 42)
+        self.assertIsNone(future.exception())
+        self.assertEqual(repr(future), '<Future returned 42>')
+
+    def test_set_exception(self):
+        future = self._makeOne()
+        error = KeyError('oops')
+        future.set_exception(error)
+        self.assertTrue(future.done())
+        self.assertIs(future.exception(), error)
+        with self.assertRaises(KeyError):
+            future.result()
+        self.assertEqual(repr(future), '<Future raised %r>' % (error,))
+
+    def test_set_twice(self):
+        future = self._makeOne()
+        future.set_result(1)
+        with self.assertRaises(ValueError):
+            future.set_result(2)
+        with self.assertRaises(ValueError):
+            future.set_exception(KeyError('oops'))
+        self.assertEqual(future.result(), 1)
+
+    def test_result_timeout(self):
+        from google.cloud.datastore.future import TimeoutError
+        future = self._makeOne()
+        with self.assertRaises(TimeoutError):
+            future.result(timeout=0.01)
+        with self.assertRaises(TimeoutError):
+            future.exception(timeout=0)
+
+    def test_result_from_other_thread(self):
+        import threading
+        future = self._makeOne()
+        thread = threading.Thread(target=future.set_result, args=('done',))
+        thread.start()
+        self.assertEqual(future.result(timeout=5), 'done')
+        thread.join()
+
+    def test_add_done_callback_pending(self):
+        future = self._makeOne()
+        called = []
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [])
+        future.set_result(1)
+        self.assertEqual(called, [future])
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [future, future])
+
+    def test_add_done_callback_done(self):
+        future = self._makeOne()
+        future.set_exception(KeyError('oops'))
+        called = []
+        future.add_done_callback(called.append)
+        self.assertEqual(called, [future])
@@ -58,9 +58,29 @@ class Test__property_tuples(unittest.TestCase):
 
 class Test_entity_from_protobuf(unittest.TestCase):
 
-    def _callFUT(self, val):
+    def _callFUT(self, val, **kw):
         from google.cloud.datastore.helpers import entity_from_protobuf
-        return entity_from_protobuf(val)
+        return entity_from_protobuf(val, **kw)
+
+    def test_lazy(self):
+        from google.cloud.datastore._generated import entity_pb2
+        from google.cloud.datastore.entity import LazyEntity
+        from google.cloud.datastore.helpers import _new_value_pb
+
+        entity_pb = entity_pb2.Entity()
+        entity_pb.key.partition_id.project_id = 'PROJECT'
+        entity_pb.key.path.add(kind='KIND', id=1234)
+        value_pb = _new_value_pb(entity_pb, 'foo')
+        value_pb.string_value = 'Foo'
+        value_pb.meaning = 9
+        array_pb = _new_value_pb(entity_pb, 'bar').array_value.values
+        array_pb.add(integer_value=10, exclude_from_indexes=True)
+
+        entity = self._callFUT(entity_pb, lazy=True)
+        self.assertIsInstance(entity, LazyEntity)
+        self.assertEqual(entity.key.id, 1234)
+        self.assertEqual(sorted(entity._value_pbs), ['bar', 'foo'])
+        self.assertEqual(entity, self._callFUT(entity_pb))
 
     def test_it(self):
         from google.cloud.datastore._generated import entity_pb2
@@ -288,6 +288,73 @@ class TestKey(unittest.TestCase):
                             hash(_KIND) + hash(_NAME) +
                             hash(_PROJECT) + hash(None))
 
+    def test___hash___cached(self):
+        key = self._makeOne('KIND', 1234, project=self._DEFAULT_PROJECT)
+        self.assertIsNone(key._hash)
+        first = hash(key)
+        self.assertIsNotNone(key._hash)
+        self.assertEqual(hash(key), first)
+        self.assertEqual(
+            hash(self._makeOne('KIND', 1234, project=self._DEFAULT_PROJECT)),
+            first)
+
+    def test_slots(self):
+        key = self._makeOne('KIND', 1234, project=self._DEFAULT_PROJECT)
+        self.assertFalse(hasattr(key, '__dict__'))
+        with self.assertRaises(AttributeError):
+            key.extra = 'value'
+
+    def test_copy_is_self(self):
+        import copy
+        key = self._makeOne('KIND', 1234, project=self._DEFAULT_PROJECT)
+        self.assertIs(copy.copy(key), key)
+        self.assertIs(copy.deepcopy(key), key)
+        self.assertIs(copy.deepcopy({'key': key})['key'], key)
+
+    def test_pickle(self):
+        from six.moves import cPickle
+        parent = self._makeOne('PARENT', 'a', project=self._DEFAULT_PROJECT,
+                               namespace='NS')
+        key = self._makeOne('KIND', 1234, parent=parent)
+        hash(key)
+        key.to_protobuf()
+        for protocol in range(cPickle.HIGHEST_PROTOCOL + 1):
+            clone = cPickle.loads(cPickle.dumps(key, protocol))
+            self.assertEqual(clone, key)
+            self.assertIsNone(clone._pb)
+            self.assertEqual(hash(clone), hash(key))
+            self.assertEqual(clone.parent, parent)
+            self.assertEqual(clone.to_protobuf(), key.to_protobuf())
+
+    def test_intern_strings(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import key as MUT
+        klass = self._getTargetClass()
+        # Built at run time, so that the strings are not shared already.
+        kind = ''.join(['KI', 'ND'])
+        other_kind = ''.join(['KI', 'ND'])
+        namespace = ''.join(['NAME', 'SPACE'])
+        other_namespace = ''.join(['NAME', 'SPACE'])
+        self.assertIsNot(kind, other_kind)
+
+        plain = self._makeOne(kind, 1, project=self._DEFAULT_PROJECT)
+        self.assertIs(plain.kind, kind)
+        with _Monkey(MUT, _INTERNED={}):
+            with _Monkey(klass, intern_strings=True):
+                first = self._makeOne(kind, 1, 'CHILD',
+                                      namespace=namespace,
+                                      project=self._DEFAULT_PROJECT)
+                second = self._makeOne(other_kind, 2,
+                                       namespace=other_namespace,
+                                       project=self._DEFAULT_PROJECT)
+                no_namespace = self._makeOne(other_kind, 3,
+                                             project=self._DEFAULT_PROJECT)
+        self.assertIs(second.kind, first.flat_path[0])
+        self.assertIs(no_namespace.kind, first.flat_path[0])
+        self.assertIs(second.namespace, first.namespace)
+        self.assertIsNone(no_namespace.namespace)
+        self.assertEqual(first.flat_path, ('KIND', 1, 'CHILD'))
+
     def test_completed_key_on_partial_w_id(self):
         key = self._makeOne('KIND', project=self._DEFAULT_PROJECT)
         _ID = 1234
@@ -304,6 +371,13 @@ class TestKey(unittest.TestCase):
         self.assertIsNone(new_key.id)
         self.assertEqual(new_key.name, _NAME)
 
+    def test_completed_key_shares_parent(self):
+        parent = self._makeOne('PARENT', 1, project=self._DEFAULT_PROJECT)
+        key = self._makeOne('KIND', parent=parent)
+        new_key = key.completed_key(1234)
+        self.assertIs(new_key.parent, parent)
+        self.assertEqual(new_key.flat_path, ('PARENT', 1, 'KIND', 1234))
+
     def test_completed_key_on_partial_w_invalid(self):
         key = self._makeOne('KIND', project=self._DEFAULT_PROJECT)
         self.assertRaises(ValueError, key.completed_key, object())
@@ -362,14 +436,36 @@ class TestKey(unittest.TestCase):
         self.assertEqual(elems[1].id, _ID)
 
     def test_to_protobuf_w_no_kind(self):
-        key = self._makeOne('KIND', project=self._DEFAULT_PROJECT)
-        # Force the 'kind' to be unset. Maybe `to_protobuf` should fail
-        # on this? The backend certainly will.
-        key._path[-1].pop('kind')
+        # Keys are immutable, so the 'kind' can only be unset by passing
+        # an empty one. Maybe `to_protobuf` should fail on this? The
+        # backend certainly will.
+        key = self._makeOne('', project=self._DEFAULT_PROJECT)
         pb = key.to_protobuf()
         # Unset values are False-y.
         self.assertEqual(pb.path[0].kind, '')
 
+    def test_to_protobuf_cached(self):
+        key = self._makeOne('KIND', 1234, project=self._DEFAULT_PROJECT)
+        pb = key.to_protobuf()
+        pb.path[0].id = 5678
+        self.assertIsNot(key._pb, pb)
+        self.assertEqual(key.to_protobuf().path[0].id, 1234)
+
+    def test_path_partial(self):
+        key = self._makeOne('KIND1', 1234, 'KIND2',
+                            project=self._DEFAULT_PROJECT)
+        path = key.path
+        self.assertEqual(path, [{'kind': 'KIND1', 'id': 1234},
+                                {'kind': 'KIND2'}])
+        path[0]['id'] = 5678
+        self.assertEqual(key.path[0]['id'], 1234)
+        self.assertEqual(key.kind, 'KIND2')
+
+    def test_kind_w_id(self):
+        key = self._makeOne('KIND1', 'a', 'KIND2', 1234,
+                            project=self._DEFAULT_PROJECT)
+        self.assertEqual(key.kind, 'KIND2')
+
     def test_is_partial_no_name_or_id(self):
         key = self._makeOne('KIND', project=self._DEFAULT_PROJECT)
         self.assertTrue(key.is_partial)
@@ -328,6 +328,174 @@ class TestQuery(unittest.TestCase):
         self.assertIs(iterator._client, other_client)
         self.assertEqual(iterator._limit, 7)
         self.assertEqual(iterator._offset, 8)
+        self.assertFalse(iterator._prefetch)
+
+    def test_fetch_w_prefetch(self):
+        query = self._makeOne(self._makeClient())
+        iterator = query.fetch(prefetch=True)
+        self.assertTrue(iterator._prefetch)
+        self.assertFalse(iterator._lazy)
+
+    def test_fetch_lazy(self):
+        query = self._makeOne(self._makeClient())
+        iterator = query.fetch(lazy=True)
+        self.assertTrue(iterator._lazy)
+
+    def test_fetch_async(self):
+        connection = _Connection()
+        query = self._makeOne(self._makeClient(), kind='Kind')
+        self._addSample(connection, [1, 2])
+        other_client = self._makeClient(connection)
+
+        future = query.fetch_async(limit=2, client=other_client)
+
+        self.assertEqual([entity.key.id for entity in future.result()],
+                         [1, 2])
+        self.assertEqual(connection._called_with[0]['query_pb'].limit.value,
+                         2)
+
+    def test_fetch_async_background(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import _bulk
+        connection = _Connection()
+        connection.credentials = object()
+        worker = _Connection()
+        self._addSample(worker, [1])
+        query = self._makeOne(self._makeClient(connection), kind='Kind')
+
+        with _Monkey(_bulk, _worker_connection=lambda conn: worker):
+            future = query.fetch_async(lazy=True)
+            entities = future.result(timeout=5)
+
+        self.assertEqual([entity.key.id for entity in entities], [1])
+        self.assertEqual(connection._called_with, [])
+
+    def _addSample(self, connection, ids):
+        connection._results.append(
+            ([_key_only_pb(self._PROJECT, id_) for id_ in ids], b'',
+             _finished(), None))
+
+    def test_split_invalid(self):
+        client = self._makeClient()
+        with self.assertRaises(ValueError):
+            self._makeOne(client, kind='Kind').split(0)
+        with self.assertRaises(ValueError):
+            self._makeOne(client).split(2)
+        with self.assertRaises(ValueError):
+            self._makeOne(client, kind='Kind', order=['name']).split(2)
+        with self.assertRaises(ValueError):
+            self._makeOne(client, kind='Kind',
+                          filters=[('age', '>', 30)]).split(2)
+
+    def test_split_one(self):
+        connection = _Connection()
+        client = self._makeClient(connection)
+        query = self._makeOne(client, kind='Kind',
+                              filters=[('name', '=', u'Ann')],
+                              projection=['name'])
+        queries = query.split(1)
+        self.assertEqual(len(queries), 1)
+        self.assertIsNot(queries[0], query)
+        self.assertEqual(queries[0].filters, query.filters)
+        self.assertEqual(queries[0].projection, ['name'])
+        self.assertEqual(connection._called_with, [])
+
+    def test_split(self):
+        from google.cloud.datastore.key import Key
+        connection = _Connection()
+        client = self._makeClient(connection)
+        ancestor = Key('Parent', 1, project=self._PROJECT)
+        query = self._makeOne(client, kind='Kind', ancestor=ancestor,
+                              filters=[('name', '=', u'Ann')])
+        self._addSample(connection, [8, 3, 6, 1, 5, 2, 7, 4])
+
+        queries = query.split(4)
+
+        sample_pb = connection._called_with[0]['query_pb']
+        self.assertEqual(sample_pb.limit.value, 128)
+        self.assertEqual([order.property.name for order in sample_pb.order],
+                         ['__scatter__'])
+        self.assertEqual(
+            [projection.property.name for projection in sample_pb.projection],
+            ['__key__'])
+        # The sample keeps the ancestor, but not other filters.
+        self.assertEqual(
+            len(sample_pb.filter.composite_filter.filters), 1)
+
+        def _bound(id_):
+            return Key('Kind', id_, project=self._PROJECT)
+
+        name_filter = ('name', '=', u'Ann')
+        self.assertEqual(
+            [sub_query.filters for sub_query in queries],
+            [[name_filter, ('__key__', '<', _bound(3))],
+             [name_filter, ('__key__', '>=', _bound(3)),
+              ('__key__', '<', _bound(5))],
+             [name_filter, ('__key__', '>=', _bound(5)),
+              ('__key__', '<', _bound(7))],
+             [name_filter, ('__key__', '>=', _bound(7))]])
+        for sub_query in queries:
+            self.assertEqual(sub_query.ancestor, ancestor)
+        self.assertEqual(query.filters, [name_filter])
+
+    def test_split_few_keys(self):
+        from google.cloud.datastore.key import Key
+        connection = _Connection()
+        client = self._makeClient(connection)
+        query = self._makeOne(client, kind='Kind')
+        self._addSample(connection, [2, 1])
+        queries = query.split(4)
+        bound = Key('Kind', 2, project=self._PROJECT)
+        self.assertEqual([sub_query.filters for sub_query in queries],
+                         [[('__key__', '<', bound)],
+                          [('__key__', '>=', bound)]])
+
+    def test_split_no_keys(self):
+        connection = _Connection()
+        query = self._makeOne(self._makeClient(connection), kind='Kind')
+        self._addSample(connection, [])
+        queries = query.split(4)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0].filters, [])
+
+    def test_fetch_parallel(self):
+        connection = _Connection()
+        client = self._makeClient(connection)
+        query = self._makeOne(client, kind='Kind')
+        self._addSample(connection, [1, 2, 3, 4])
+        for ids in ([1, 2], [3, 4]):
+            self._addSample(connection, ids)
+
+        entities = list(query.fetch_parallel(2, max_workers=2))
+
+        self.assertEqual([entity.key.id for entity in entities],
+                         [1, 2, 3, 4])
+        self.assertEqual(len(connection._called_with), 3)
+
+    def test_fetch_parallel_w_transaction(self):
+        client = self._makeClient()
+        other_client = self._makeClient()
+        other_client.current_transaction = object()
+        query = self._makeOne(client, kind='Kind')
+        with self.assertRaises(ValueError):
+            query.fetch_parallel(2, client=other_client)
+
+
+class Test__key_order(unittest.TestCase):
+
+    def _callFUT(self, key):
+        from google.cloud.datastore.query import _key_order
+        return _key_order(key)
+
+    def test_it(self):
+        from google.cloud.datastore.key import Key
+        keys = [Key('B', 1, project='PROJECT'),
+                Key('A', 'a', project='PROJECT'),
+                Key('A', 10, 'C', 1, project='PROJECT'),
+                Key('A', 2, project='PROJECT'),
+                Key('A', 10, project='PROJECT')]
+        self.assertEqual(sorted(keys, key=self._callFUT),
+                         [keys[3], keys[4], keys[2], keys[1], keys[0]])
 
 
 class TestIterator(unittest.TestCase):
@@ -485,6 +653,70 @@ class TestIterator(unittest.TestCase):
         }
         self.assertEqual(connection._called_with, [EXPECTED])
 
+    def test_next_page_lazy(self):
+        from google.cloud.datastore.entity import LazyEntity
+        connection = _Connection()
+        client = self._makeClient(connection)
+        query = _Query(client, self._KIND, self._PROJECT, self._NAMESPACE)
+        self._addQueryResults(connection, cursor=b'')
+        iterator = self._makeOne(query, client, lazy=True)
+        entities, _, _ = iterator.next_page()
+        self.assertIsInstance(entities[0], LazyEntity)
+        self.assertEqual(entities[0]['foo'], u'Foo')
+
+    def _next_page_w_cache(self, iterator_kw=(), transaction=None,
+                           during_request=None, **query_kw):
+        from google.cloud.datastore.cache import EntityCache
+        from google.cloud.datastore.key import Key
+        connection = _Connection()
+        client = self._makeClient(connection)
+        client.cache = EntityCache()
+        client.current_transaction = transaction
+        query_kw.setdefault('ancestor',
+                            Key('Parent', 1, project=self._PROJECT))
+        query = _Query(client, self._KIND, self._PROJECT, **query_kw)
+        self._addQueryResults(connection, cursor=b'')
+        key = Key(self._KIND, self._ID, project=self._PROJECT)
+        if during_request is not None:
+            run_query = connection.run_query
+
+            def _run_query(**kw):
+                during_request(client.cache, key)
+                return run_query(**kw)
+
+            connection.run_query = _run_query
+        iterator = self._makeOne(query, client, **dict(iterator_kw))
+        iterator.next_page()
+        return client, key
+
+    def test_next_page_w_cache(self):
+        client, key = self._next_page_w_cache()
+        self.assertEqual(client.cache.get(key)['foo'], u'Foo')
+
+    def test_next_page_w_cache_wo_ancestor(self):
+        client, key = self._next_page_w_cache(ancestor=None)
+        self.assertIsNone(client.cache.get(key))
+
+    def test_next_page_w_cache_invalidated_during_request(self):
+
+        def _invalidate(cache, key):
+            cache.invalidate([key])
+
+        client, key = self._next_page_w_cache(during_request=_invalidate)
+        self.assertIsNone(client.cache.get(key))
+
+    def test_next_page_w_cache_projection(self):
+        client, key = self._next_page_w_cache(projection=['foo'])
+        self.assertIsNone(client.cache.get(key))
+
+    def test_next_page_w_cache_lazy(self):
+        client, key = self._next_page_w_cache(iterator_kw={'lazy': True})
+        self.assertIsNone(client.cache.get(key))
+
+    def test_next_page_w_cache_in_transaction(self):
+        client, key = self._next_page_w_cache(transaction=_Transaction())
+        self.assertIsNone(client.cache.get(key))
+
     def test_next_page_w_cursors_w_bogus_more(self):
         connection = _Connection()
         client = self._makeClient(connection)
@@ -610,6 +842,61 @@ class TestIterator(unittest.TestCase):
         self.assertEqual(connection._called_with[1], EXPECTED2)
         self.assertEqual(connection._called_with[2], EXPECTED3)
 
+    def _iterate_w_prefetch(self, connection):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import query as MUT
+
+        client = self._makeClient(connection)
+        query = _Query(client, self._KIND, self._PROJECT, self._NAMESPACE)
+        self._addQueryResults(connection, more=True, skipped_results=4,
+                              no_entity=True)
+        self._addQueryResults(connection, more=True)
+        self._addQueryResults(connection)
+        iterator = self._makeOne(query, client, limit=3, offset=4,
+                                 prefetch=True)
+        prefetch_connections = []
+
+        def _worker_connection(conn):
+            prefetch_connections.append(conn)
+            return conn
+
+        with _Monkey(MUT, _worker_connection=_worker_connection):
+            entities = list(iterator)
+
+        self.assertEqual(len(entities), 2)
+        requests = [(kw['query_pb'].limit.value, kw['query_pb'].offset)
+                    for kw in connection._called_with]
+        self.assertEqual(requests, [(3, 4), (3, 0), (2, 0)])
+        return prefetch_connections
+
+    def test___iter___w_prefetch(self):
+        connection = _Connection()
+        connection.credentials = object()
+        prefetch_connections = self._iterate_w_prefetch(connection)
+        # One connection is made, for all the pages prefetched.
+        self.assertEqual(prefetch_connections, [connection])
+
+    def test___iter___w_prefetch_wo_credentials(self):
+        prefetch_connections = self._iterate_w_prefetch(_Connection())
+        self.assertEqual(prefetch_connections, [])
+
+    def test___iter___w_prefetch_error(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.datastore import query as MUT
+
+        connection = _Connection()
+        connection.credentials = object()
+        client = self._makeClient(connection)
+        query = _Query(client, self._KIND, self._PROJECT, self._NAMESPACE)
+        self._addQueryResults(connection, more=True)
+        iterator = self._makeOne(query, client, prefetch=True)
+        # No result is queued for the second page:  its request fails.
+        with _Monkey(MUT, _worker_connection=lambda conn: conn):
+            entities = iter(iterator)
+            next(entities)
+            with self.assertRaises(IndexError):
+                next(entities)
+
 
 class Test__pb_from_query(unittest.TestCase):
 
@@ -731,8 +1018,22 @@ class _Query(object):
         self.distinct_on = distinct_on
 
 
+def _key_only_pb(project, id_):
+    from google.cloud.datastore._generated import entity_pb2
+    entity_pb = entity_pb2.Entity()
+    entity_pb.key.partition_id.project_id = project
+    entity_pb.key.path.add(kind='Kind', id=id_)
+    return entity_pb
+
+
+def _finished():
+    from google.cloud.datastore._generated import query_pb2
+    return query_pb2.QueryResultBatch.NO_MORE_RESULTS
+
+
 class _Connection(object):
 
+    credentials = None
     _called_with = None
     _cursor = b'\x00'
     _skipped = 0
@@ -747,13 +1048,17 @@ class _Connection(object):
         return result
 
 
+class _Transaction(object):
+
+    id = b'TRANSACTION'
+
+
 class _Client(object):
 
     def __init__(self, project, connection, namespace=None):
         self.project = project
         self.connection = connection
         self.namespace = namespace
-
-    @property
-    def current_transaction(self):
-        pass
+        self.current_transaction = None
+        self.current_batch = None
+        self.cache = None
@@ -228,6 +228,7 @@ class _Client(object):
         self.project = project
         self.connection = connection
         self.namespace = namespace
+        self.cache = None
         self._batches = []
 
     def _push_batch(self, batch):
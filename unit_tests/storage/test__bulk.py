@@ -0,0 +1,384 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class Test__chunks(unittest.TestCase):
+
+    def _callFUT(self, items, size):
+        from google.cloud.storage._bulk import _chunks
+        return _chunks(items, size)
+
+    def test_empty(self):
+        self.assertEqual(list(self._callFUT([], 3)), [])
+
+    def test_exact(self):
+        self.assertEqual(list(self._callFUT(range(6), 3)),
+                         [[0, 1, 2], [3, 4, 5]])
+
+    def test_short_last(self):
+        self.assertEqual(list(self._callFUT(range(4), 3)),
+                         [[0, 1, 2], [3]])
+
+    def test_lazy(self):
+        consumed = []
+
+        def _items():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        chunks = self._callFUT(_items(), 3)
+        self.assertEqual(next(chunks), [0, 1, 2])
+        self.assertEqual(consumed, [0, 1, 2])
+
+
+class Test__worker_connection(unittest.TestCase):
+
+    def _callFUT(self, connection):
+        from google.cloud.storage._bulk import _worker_connection
+        return _worker_connection(connection)
+
+    def test_wo_credentials(self):
+        connection = _Connection()
+        self.assertIsNone(self._callFUT(connection))
+
+    def test_w_credentials(self):
+        from google.cloud.storage.connection import Connection
+        credentials = object()
+        connection = _Connection(credentials=credentials)
+        worker_connection = self._callFUT(connection)
+        self.assertIsInstance(worker_connection, Connection)
+        self.assertIsNot(worker_connection, connection)
+        self.assertIs(worker_connection.credentials, credentials)
+
+
+class Test__worker_client(unittest.TestCase):
+
+    def _callFUT(self, client):
+        from google.cloud.storage._bulk import _worker_client
+        return _worker_client(client)
+
+    def test_wo_credentials(self):
+        client = _Client(_Connection(), project='PROJECT')
+        self.assertIsNone(self._callFUT(client))
+
+    def test_w_credentials(self):
+        credentials = object()
+        client = _Client(_Connection(credentials=credentials),
+                         project='PROJECT')
+        worker_client = self._callFUT(client)
+        self.assertIsInstance(worker_client, _Client)
+        self.assertIsNot(worker_client, client)
+        self.assertEqual(worker_client.project, 'PROJECT')
+        self.assertIsNot(worker_client._connection, client._connection)
+        self.assertIs(worker_client._connection.credentials, credentials)
+
+
+class Test__send_batch(unittest.TestCase):
+
+    def _callFUT(self, *args):
+        from google.cloud.storage._bulk import _send_batch
+        return _send_batch(*args)
+
+    def test_success_and_failure(self):
+        from google.cloud.exceptions import NotFound
+        connection = _Connection(missing=('/b/b/o/two',))
+        client = _Client(connection)
+        applied = []
+        failures = self._callFUT(client, connection, ['one', 'two', 'three'],
+                                 _delete_request, _applier(applied))
+        self.assertEqual(len(failures), 1)
+        item, exc = failures[0]
+        self.assertEqual(item, 'two')
+        self.assertIsInstance(exc, NotFound)
+        self.assertEqual(applied, [('one', {'name': 'one'}),
+                                   ('three', {'name': 'three'})])
+        self.assertEqual(len(connection._batches), 1)
+        self.assertEqual(connection._batches[0],
+                         [('DELETE', '/b/b/o/one'),
+                          ('DELETE', '/b/b/o/two'),
+                          ('DELETE', '/b/b/o/three')])
+
+    def test_w_send_error(self):
+        connection = _Connection(error=IOError('network'))
+        client = _Client(connection)
+        applied = []
+        failures = self._callFUT(client, connection, ['one', 'two'],
+                                 _delete_request, _applier(applied))
+        self.assertEqual([item for item, _ in failures], ['one', 'two'])
+        for _, exc in failures:
+            self.assertIs(exc, connection._error)
+        self.assertEqual(applied, [])
+
+    def test_w_missing_responses(self):
+        connection = _Connection(drop=1)
+        client = _Client(connection)
+        applied = []
+        failures = self._callFUT(client, connection, ['one', 'two'],
+                                 _delete_request, _applier(applied))
+        self.assertEqual([item for item, _ in failures], ['one', 'two'])
+        for _, exc in failures:
+            self.assertIsInstance(exc, ValueError)
+        self.assertEqual(applied, [])
+
+
+class Test_run_batches(unittest.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.storage._bulk import run_batches
+        return run_batches(*args, **kw)
+
+    def _names(self, count):
+        return ['blob-%04d' % (index,) for index in range(count)]
+
+    def test_w_invalid_max_workers(self):
+        client = _Client(_Connection())
+        with self.assertRaises(ValueError):
+            self._callFUT(client, [], _delete_request, _applier([]),
+                          max_workers=0)
+
+    def test_empty(self):
+        connection = _Connection(credentials=object())
+        client = _Client(connection)
+        self.assertEqual(self._callFUT(client, iter(()), _delete_request,
+                                       _applier([])), [])
+        self.assertEqual(connection._batches, [])
+
+    def test_serial_wo_credentials(self):
+        from google.cloud.storage import _bulk as MUT
+        from unit_tests._testing import _Monkey
+        names = self._names(5)
+        connection = _Connection(missing=('/b/b/o/blob-0003',))
+        client = _Client(connection)
+        applied = []
+        with _Monkey(MUT.Batch, _MAX_BATCH_SIZE=2):
+            failures = self._callFUT(client, iter(names), _delete_request,
+                                     _applier(applied), max_workers=4)
+        self.assertEqual([item for item, _ in failures], ['blob-0003'])
+        self.assertEqual([item for item, _ in applied],
+                         ['blob-0000', 'blob-0001', 'blob-0002',
+                          'blob-0004'])
+        self.assertEqual([len(batch) for batch in connection._batches],
+                         [2, 2, 1])
+
+    def test_concurrent(self):
+        from google.cloud.storage import _bulk as MUT
+        from unit_tests._testing import _Monkey
+        names = self._names(2500)
+        missing = ('/b/b/o/blob-0007', '/b/b/o/blob-2400')
+        connection = _Connection(credentials=object())
+        worker_connections = []
+
+        def _make_connection(credentials):
+            worker_connection = _Connection(credentials=credentials,
+                                            missing=missing)
+            worker_connections.append(worker_connection)
+            return worker_connection
+
+        client = _Client(connection)
+        applied = []
+        with _Monkey(MUT, Connection=_make_connection):
+            failures = self._callFUT(client, iter(names), _delete_request,
+                                     _applier(applied), max_workers=3)
+
+        self.assertEqual(sorted(item for item, _ in failures),
+                         ['blob-0007', 'blob-2400'])
+        self.assertEqual(len(applied), 2498)
+        self.assertEqual(connection._batches, [])
+        # One connection probed, plus one per worker.
+        self.assertEqual(len(worker_connections), 4)
+        batches = []
+        for worker_connection in worker_connections:
+            batches.extend(worker_connection._batches)
+        self.assertEqual(sorted(len(batch) for batch in batches),
+                         [500, 1000, 1000])
+        sent = sorted(path for batch in batches for _, path in batch)
+        self.assertEqual(sent, ['/b/b/o/' + name for name in names])
+
+    def test_concurrent_w_error_in_worker(self):
+        from google.cloud.storage import _bulk as MUT
+        from unit_tests._testing import _Monkey
+        connection = _Connection(credentials=object())
+        client = _Client(connection)
+
+        def _response(item, payload):
+            raise KeyError(item)
+
+        with _Monkey(MUT, Connection=lambda credentials: _Connection()):
+            with _Monkey(MUT.Batch, _MAX_BATCH_SIZE=2):
+                with self.assertRaises(KeyError):
+                    self._callFUT(client, iter(self._names(20)),
+                                  _delete_request, _response, max_workers=2)
+
+
+class Test_run_concurrently(unittest.TestCase):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.storage._bulk import run_concurrently
+        return run_concurrently(*args, **kw)
+
+    def test_w_invalid_max_workers(self):
+        client = _Client(_Connection())
+        with self.assertRaises(ValueError):
+            self._callFUT(client, [], _Recorder(), max_workers=0)
+
+    def test_serial_wo_credentials(self):
+        client = _Client(_Connection())
+        func = _Recorder(missing=('two',), broken=('three',))
+        failures = self._callFUT(client, iter(['one', 'two', 'three']), func,
+                                 max_workers=4)
+        self.assertEqual([item for item, _ in failures], ['two', 'three'])
+        self.assertIsInstance(failures[1][1], IOError)
+        self.assertEqual(func._calls, [('one', client), ('two', client),
+                                       ('three', client)])
+
+    def test_concurrent(self):
+        from google.cloud.exceptions import NotFound
+        client = _Client(_Connection(credentials=object()))
+        func = _Recorder(missing=('item-7',))
+        items = ['item-%d' % (index,) for index in range(50)]
+        failures = self._callFUT(client, iter(items), func, max_workers=3)
+        (item, exc), = failures
+        self.assertEqual(item, 'item-7')
+        self.assertIsInstance(exc, NotFound)
+        self.assertEqual(sorted(item for item, _ in func._calls),
+                         sorted(items))
+        clients = set(id(used) for _, used in func._calls)
+        self.assertNotIn(id(client), clients)
+        self.assertTrue(len(clients) <= 3)
+
+    def test_concurrent_w_unexpected_error(self):
+        client = _Client(_Connection(credentials=object()))
+
+        def _func(item, worker_client):
+            raise KeyError(item)
+
+        with self.assertRaises(KeyError):
+            self._callFUT(client, iter(range(20)), _func, max_workers=2)
+
+    def test_concurrent_w_error_making_worker(self):
+        import threading
+        from google.cloud.storage import _bulk as MUT
+        from unit_tests._testing import _Monkey
+        client = _Client(_Connection(credentials=object()))
+        func = _Recorder()
+        queued = threading.Event()
+
+        def _worker_client(client):
+            queued.wait(5)
+            raise KeyError('no client')
+
+        def _items():
+            # Fill the queue before the workers fail, then keep going:
+            # the failed workers must still drain it.
+            yield 0
+            yield 1
+            queued.set()
+            for item in range(2, 100):
+                yield item
+
+        with _Monkey(MUT, _worker_client=_worker_client):
+            with self.assertRaises(KeyError):
+                self._callFUT(client, _items(), func, max_workers=2)
+        self.assertEqual(func._calls, [])
+
+
+class _Recorder(object):
+
+    def __init__(self, missing=(), broken=()):
+        import threading
+        self._missing = missing
+        self._broken = broken
+        self._calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, item, client):
+        from google.cloud.exceptions import NotFound
+        with self._lock:
+            self._calls.append((item, client))
+        if item in self._missing:
+            raise NotFound(item)
+        if item in self._broken:
+            raise IOError(item)
+
+
+def _delete_request(batch, name):
+    batch.api_request(method='DELETE', path='/b/b/o/' + name,
+                      _target_object=None)
+
+
+def _applier(applied):
+
+    def _response(item, payload):
+        applied.append((item, payload))
+
+    return _response
+
+
+class _Client(object):
+
+    def __init__(self, connection=None, project=None, credentials=None):
+        if connection is None:
+            connection = _Connection(credentials=credentials)
+        self._connection = connection
+        self.project = project
+
+
+class _Response(dict):
+
+    def __init__(self, status=200, **kw):
+        self.status = status
+        super(_Response, self).__init__(**kw)
+
+
+class _Connection(object):
+    """Answer batch requests, one sub-response per sub-request."""
+
+    def __init__(self, credentials=None, missing=(), error=None, drop=0):
+        self.credentials = credentials
+        self._missing = missing
+        self._error = error
+        self._drop = drop
+        self._batches = []
+
+    def _make_request(self, method, url, data=None, headers=None):
+        import json
+        import re
+        from six.moves.urllib.parse import urlsplit
+        if self._error is not None:
+            raise self._error
+        self.method, self.url = method, url
+        subrequests = re.findall(r'^(\w+) (\S+) HTTP/1.1',
+                                 data.decode('utf-8'), re.M)
+        subrequests = [(sub_method, urlsplit(uri).path[len('/storage/v1'):])
+                       for sub_method, uri in subrequests]
+        self._batches.append(subrequests)
+        lines = []
+        for _, path in subrequests[self._drop:]:
+            lines.extend(['--DEADBEEF=', 'Content-Type: application/http',
+                          ''])
+            if path in self._missing:
+                body = json.dumps({'error': {'message': 'Not Found'}})
+                lines.append('HTTP/1.1 404 Not Found')
+            else:
+                body = json.dumps({'name': path.rsplit('/', 1)[-1]})
+                lines.append('HTTP/1.1 200 OK')
+            lines.extend(['Content-Type: application/json; charset=UTF-8',
+                          'Content-Length: %d' % (len(body),), '', body, ''])
+        lines.append('--DEADBEEF=--')
+        response = _Response(
+            **{'content-type': 'multipart/mixed; boundary="DEADBEEF="'})
+        return response, '\n'.join(lines).encode('utf-8')
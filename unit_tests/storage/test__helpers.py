@@ -169,6 +169,287 @@ class Test__base64_md5hash(unittest.TestCase):
         self.assertEqual(MD5.hash_obj._blocks, [BYTES_TO_SIGN])
 
 
+class Test__Crc32c(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage._helpers import _Crc32c
+        return _Crc32c
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_empty(self):
+        crc = self._makeOne()
+        self.assertEqual(crc.digest(), b'\x00\x00\x00\x00')
+
+    def test_check_value(self):
+        crc = self._makeOne(b'123456789')
+        self.assertEqual(crc.digest(), b'\xe3\x06\x92\x83')
+
+    def test_update_incremental(self):
+        crc = self._makeOne(b'1234')
+        crc.update(b'')
+        crc.update(b'56789')
+        self.assertEqual(crc.digest(), b'\xe3\x06\x92\x83')
+
+
+class Test__crc32c_hash(unittest.TestCase):
+
+    def _callFUT(self):
+        from google.cloud.storage._helpers import _crc32c_hash
+        return _crc32c_hash()
+
+    def test_wo_crcmod(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.storage import _helpers as MUT
+
+        with _Monkey(MUT, crcmod=None):
+            self.assertFalse(MUT._has_fast_crc32c())
+            crc = self._callFUT()
+
+        self.assertIsInstance(crc, MUT._Crc32c)
+
+    def test_w_crcmod_wo_extension(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.storage import _helpers as MUT
+
+        class _CrcModule(object):
+            _usingExtension = False
+
+        class _Crcmod(object):
+            crcmod = _CrcModule()
+
+        with _Monkey(MUT, crcmod=_Crcmod()):
+            self.assertFalse(MUT._has_fast_crc32c())
+            crc = self._callFUT()
+
+        self.assertIsInstance(crc, MUT._Crc32c)
+
+
+class Test__HashingStream(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage._helpers import _HashingStream
+        return _HashingStream
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_read_hashes_each_byte_once(self):
+        import hashlib
+        from io import BytesIO
+        DATA = b'ABCDEFGHIJ'
+        md5 = hashlib.md5()
+        stream = self._makeOne(BytesIO(DATA), {'md5': md5})
+        self.assertEqual(stream.read(6), DATA[:6])
+        stream.seek(0)
+        self.assertEqual(stream.read(2), DATA[:2])
+        stream.seek(3)
+        self.assertEqual(stream.tell(), 3)
+        self.assertEqual(stream.read(), DATA[3:])
+        self.assertTrue(stream.complete)
+        self.assertEqual(md5.digest(), hashlib.md5(DATA).digest())
+
+    def test_read_starts_at_current_position(self):
+        import hashlib
+        from io import BytesIO
+        DATA = b'ABCDEFGHIJ'
+        buf = BytesIO(DATA)
+        buf.seek(4)
+        md5 = hashlib.md5()
+        stream = self._makeOne(buf, {'md5': md5})
+        self.assertEqual(stream.read(), DATA[4:])
+        self.assertEqual(md5.digest(), hashlib.md5(DATA[4:]).digest())
+
+    def test_read_w_skipped_bytes(self):
+        from io import BytesIO
+        stream = self._makeOne(BytesIO(b'ABCDEFGHIJ'), {})
+        stream.seek(2)
+        stream.read(2)
+        self.assertFalse(stream.complete)
+
+    def test_write(self):
+        import base64
+        import hashlib
+        from io import BytesIO
+        buf = BytesIO()
+        stream = self._makeOne(buf, {'md5': hashlib.md5()})
+        stream.write(b'abc')
+        stream.write(b'')
+        stream.write(b'def')
+        self.assertEqual(buf.getvalue(), b'abcdef')
+        expected = base64.b64encode(hashlib.md5(b'abcdef').digest())
+        self.assertEqual(stream.b64_digests(),
+                         {'md5': expected.decode('ascii')})
+
+    def test_wo_tell(self):
+        import hashlib
+
+        class _Unseekable(object):
+
+            def __init__(self):
+                self._written = []
+
+            def write(self, data):
+                self._written.append(data)
+
+        wrapped = _Unseekable()
+        md5 = hashlib.md5()
+        stream = self._makeOne(wrapped, {'md5': md5})
+        stream.write(b'abc')
+        self.assertEqual(wrapped._written, [b'abc'])
+        self.assertIs(stream._written, wrapped._written)
+        self.assertEqual(md5.digest(), hashlib.md5(b'abc').digest())
+
+
+class Test__parse_goog_hash(unittest.TestCase):
+
+    def _callFUT(self, header_value):
+        from google.cloud.storage._helpers import _parse_goog_hash
+        return _parse_goog_hash(header_value)
+
+    def test_none(self):
+        self.assertEqual(self._callFUT(None), {})
+
+    def test_both(self):
+        VALUE = 'crc32c=n03x6A==, md5=Ojk9c3dhfxgoKVVHYwFbHQ=='
+        self.assertEqual(self._callFUT(VALUE),
+                         {'crc32c': 'n03x6A==',
+                          'md5': 'Ojk9c3dhfxgoKVVHYwFbHQ=='})
+
+    def test_malformed(self):
+        self.assertEqual(self._callFUT('crc32c'), {})
+
+
+class Test__verify_checksums(unittest.TestCase):
+
+    def _callFUT(self, hashing_stream, expected):
+        from google.cloud.storage._helpers import _verify_checksums
+        return _verify_checksums(hashing_stream, expected)
+
+    def test_incomplete_stream(self):
+        from io import BytesIO
+        from google.cloud.storage._helpers import _HashingStream
+        stream = _HashingStream(BytesIO(b'ABCDEF'),
+                                {'md5': _MD5Hash(b'DIGEST')})
+        stream.seek(2)
+        stream.read()
+        # Skipped bytes mean the hash cannot be compared: no error.
+        self.assertIsNone(self._callFUT(stream, {'md5': 'WRONG'}))
+
+    def test_missing_expected(self):
+        from io import BytesIO
+        from google.cloud.storage._helpers import _HashingStream
+        stream = _HashingStream(BytesIO(b'ABCDEF'),
+                                {'md5': _MD5Hash(b'DIGEST')})
+        stream.read()
+        self.assertIsNone(self._callFUT(stream, {'md5': None}))
+
+
+class Test__GzipStream(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage._helpers import _GzipStream
+        return _GzipStream
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_read_in_blocks(self):
+        import os
+        import zlib
+        from io import BytesIO
+        data = os.urandom(1000) * 200  # Compresses well, in many blocks.
+        stream = self._makeOne(BytesIO(data))
+        stream._READ_SIZE = 4096
+        self.assertFalse(stream.seekable())
+        chunks = []
+        while True:
+            chunk = stream.read(1000)
+            chunks.append(chunk)
+            self.assertEqual(stream.tell(), 1000 * (len(chunks) - 1) +
+                             len(chunk))
+            if len(chunk) < 1000:
+                break
+        self.assertEqual(stream.read(1000), b'')
+        compressed = b''.join(chunks)
+        self.assertLess(len(compressed), len(data) // 10)
+        self.assertEqual(zlib.decompress(compressed, 16 + zlib.MAX_WBITS),
+                         data)
+
+    def test_read_all_w_size(self):
+        import zlib
+        from io import BytesIO
+        source = BytesIO(b'ABCDEF')
+        stream = self._makeOne(source, size=4)
+        compressed = stream.read()
+        self.assertEqual(zlib.decompress(compressed, 16 + zlib.MAX_WBITS),
+                         b'ABCD')
+        self.assertEqual(source.read(), b'EF')
+
+    def test_seek(self):
+        import os
+        from io import BytesIO
+        stream = self._makeOne(BytesIO(b'ABCDEF'))
+        stream.read(5)
+        stream.seek(5)
+        stream.seek(0, os.SEEK_CUR)
+        self.assertEqual(stream.tell(), 5)
+        with self.assertRaises(IOError):
+            stream.seek(0)
+        with self.assertRaises(IOError):
+            stream.seek(0, os.SEEK_END)
+
+
+class Test__GunzipStream(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage._helpers import _GunzipStream
+        return _GunzipStream
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _write(self, *chunks):
+        from io import BytesIO
+        target = BytesIO()
+        stream = self._makeOne(target)
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.finish()
+        return target.getvalue()
+
+    def test_compressed(self):
+        data = _gzip(b'ABCDEF' * 100)
+        # Split inside the magic number, and byte by byte.
+        chunks = [data[:1], b''] + [data[i:i + 1]
+                                    for i in range(1, len(data))]
+        self.assertEqual(self._write(*chunks), b'ABCDEF' * 100)
+
+    def test_concatenated_members(self):
+        first, second = _gzip(b'ABC'), _gzip(b'DEF')
+        self.assertEqual(self._write(first + second[:5], second[5:]),
+                         b'ABCDEF')
+        self.assertEqual(self._write(first, second), b'ABCDEF')
+
+    def test_not_compressed(self):
+        self.assertEqual(self._write(b'AB', b'CDEF'), b'ABCDEF')
+        self.assertEqual(self._write(b'A'), b'A')
+        self.assertEqual(self._write(), b'')
+
+    def test_invalid(self):
+        import zlib
+        with self.assertRaises(zlib.error):
+            self._write(b'\x1f\x8bNOT GZIP')
+
+
+def _gzip(data):
+    import zlib
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
 class _Connection(object):
 
     def __init__(self, *responses):
@@ -0,0 +1,285 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+_NAMES = sorted([
+    'a.txt',
+    'a/1', 'a/2', 'a/3',
+    'b/1', 'b/sub/1', 'b/sub/2',
+    'c',
+    'd/1', 'd/2',
+    'e/1',
+])
+
+
+class Test_discover_split_points(unittest.TestCase):
+
+    def _callFUT(self, bucket, prefix, delimiter, max_points, client):
+        from google.cloud.storage._listing import discover_split_points
+        return discover_split_points(bucket, prefix, delimiter, max_points,
+                                     client)
+
+    def test_wo_prefix(self):
+        client = _Client(credentials=_Credentials(page_size=2))
+        points = self._callFUT(_makeBucket(), None, '/', 10, client)
+        self.assertEqual(points, ['a/', 'b/', 'd/', 'e/'])
+        first = client.store.requests[0]
+        self.assertEqual(first, {'delimiter': '/',
+                                 'fields': 'prefixes,nextPageToken'})
+
+    def test_w_prefix(self):
+        client = _Client(credentials=_Credentials())
+        points = self._callFUT(_makeBucket(), 'b/', '/', 10, client)
+        self.assertEqual(points, ['b/sub/'])
+        self.assertEqual(client.store.requests[0]['prefix'], 'b/')
+
+    def test_stops_after_max_pages(self):
+        client = _Client(credentials=_Credentials(page_size=1))
+        points = self._callFUT(_makeBucket(), None, '/', 10, client)
+        # Only the default three pages are read, one entry each.
+        self.assertEqual(len(client.store.requests), 3)
+        self.assertEqual(points, ['a/', 'b/'])
+
+    def test_w_max_pages(self):
+        from google.cloud.storage._listing import discover_split_points
+        client = _Client(credentials=_Credentials(page_size=1))
+        points = discover_split_points(_makeBucket(), None, '/', 10, client,
+                                       max_pages=1)
+        self.assertEqual(len(client.store.requests), 1)
+        self.assertEqual(points, [])
+
+    def test_thinned(self):
+        client = _Client(credentials=_Credentials())
+        points = self._callFUT(_makeBucket(), None, '/', 3, client)
+        self.assertEqual(points, ['a/', 'b/', 'd/'])
+        points = self._callFUT(_makeBucket(), None, '/', 2, client)
+        self.assertEqual(points, ['a/', 'd/'])
+
+
+class Test_split_ranges(unittest.TestCase):
+
+    def _callFUT(self, split_points):
+        from google.cloud.storage._listing import split_ranges
+        return split_ranges(split_points)
+
+    def test_empty(self):
+        self.assertEqual(self._callFUT([]), [(None, None)])
+
+    def test_it(self):
+        self.assertEqual(self._callFUT(['b', 'd']),
+                         [(None, 'b'), ('b', 'd'), ('d', None)])
+
+    def test_not_increasing(self):
+        with self.assertRaises(ValueError):
+            self._callFUT(['b', 'b'])
+        with self.assertRaises(ValueError):
+            self._callFUT(['b', 'a'])
+
+
+class Test_iter_shards(unittest.TestCase):
+
+    _SHARDS = [(None, 'a/'), ('a/', 'b/'), ('b/', 'd/'), ('d/', 'e/'),
+               ('e/', None)]
+
+    def _callFUT(self, shards, extra_params, ordered, max_workers, client):
+        from google.cloud.storage._listing import iter_shards
+        return iter_shards(_makeBucket(), shards, extra_params, ordered,
+                           max_workers, client)
+
+    def _names(self, blobs):
+        return [blob.name for blob in blobs]
+
+    def test_invalid_max_workers(self):
+        client = _Client(credentials=_Credentials())
+        with self.assertRaises(ValueError):
+            list(self._callFUT(self._SHARDS, {}, True, 0, client))
+
+    def test_serial_wo_credentials(self):
+        credentials = _Credentials(page_size=2)
+        client = _Client(credentials=None, store=credentials)
+        blobs = list(self._callFUT(self._SHARDS, {'projection': 'noAcl'},
+                                   True, 4, client))
+        self.assertEqual(self._names(blobs), _NAMES)
+        self.assertEqual(credentials.requests[0], {'projection': 'noAcl',
+                                                   'endOffset': 'a/'})
+        self.assertEqual(credentials.requests[-1], {'projection': 'noAcl',
+                                                    'startOffset': 'e/'})
+
+    def test_ordered(self):
+        client = _Client(credentials=_Credentials(page_size=1))
+        blobs = list(self._callFUT(self._SHARDS, {}, True, 3, client))
+        self.assertEqual(self._names(blobs), _NAMES)
+        for blob in blobs:
+            self.assertEqual(blob.bucket.name, 'bucket')
+
+    def test_unordered(self):
+        client = _Client(credentials=_Credentials(page_size=1))
+        blobs = list(self._callFUT(self._SHARDS, {'prefix': 'b/'}, False, 3,
+                                   client))
+        self.assertEqual(sorted(self._names(blobs)),
+                         ['b/1', 'b/sub/1', 'b/sub/2'])
+
+    def test_error(self):
+        from google.cloud.exceptions import NotFound
+        for ordered in (True, False):
+            credentials = _Credentials(page_size=1, broken=('b/',))
+            client = _Client(credentials=credentials)
+            blobs = self._callFUT(self._SHARDS, {}, ordered, 2, client)
+            with self.assertRaises(NotFound):
+                list(blobs)
+
+    def test_error_making_worker(self):
+        from google.cloud.storage import _listing as MUT
+        from unit_tests._testing import _Monkey
+
+        def _worker_client(client):
+            raise ValueError(client)
+
+        for ordered in (True, False):
+            client = _Client(credentials=_Credentials(page_size=1))
+            with _Monkey(MUT, _worker_client=_worker_client):
+                blobs = self._callFUT(self._SHARDS, {}, ordered, 2, client)
+                with self.assertRaises(ValueError):
+                    list(blobs)
+
+    def test_error_making_second_worker(self):
+        import threading
+        from google.cloud.storage import _listing as MUT
+        from unit_tests._testing import _Monkey
+
+        second_shard = threading.Event()
+
+        class _Requests(list):
+
+            def append(self, params):
+                if params.get('startOffset') == 'a/':
+                    second_shard.set()
+                super(_Requests, self).append(params)
+
+        made = []
+
+        def _worker_client(client):
+            made.append(client)
+            if len(made) == 1:
+                return client
+            # Fail only once the first shard has been listed.
+            second_shard.wait()
+            raise ValueError(client)
+
+        credentials = _Credentials(page_size=1)
+        credentials.requests = _Requests()
+        client = _Client(credentials=credentials)
+        with _Monkey(MUT, _worker_client=_worker_client):
+            blobs = self._callFUT(self._SHARDS, {}, True, 2, client)
+            self.assertEqual(next(blobs).name, 'a.txt')
+            with self.assertRaises(ValueError):
+                list(blobs)
+
+    def test_closed_early(self):
+        import threading
+        before = set(threading.enumerate())
+        credentials = _Credentials(page_size=1)
+        client = _Client(credentials=credentials)
+        blobs = self._callFUT(self._SHARDS, {}, True, 2, client)
+        self.assertEqual(next(blobs).name, 'a.txt')
+        blobs.close()
+        for thread in set(threading.enumerate()) - before:
+            thread.join()
+        # Both workers block on full buffers before the last two shards.
+        started = set(params.get('startOffset')
+                      for params in credentials.requests)
+        self.assertFalse(started & set(['d/', 'e/']))
+
+
+def _makeBucket():
+    from google.cloud.storage.bucket import Bucket
+    return Bucket(client=None, name='bucket')
+
+
+class _Credentials(object):
+    """Hold a key space (as a stand-in for credentials) for workers."""
+
+    def __init__(self, names=_NAMES, page_size=1000, broken=()):
+        import threading
+        self.names = names
+        self.page_size = page_size
+        self.broken = broken
+        self.requests = []
+        self.lock = threading.Lock()
+
+
+class _Client(object):
+
+    def __init__(self, project=None, credentials=None, store=None):
+        self.project = project
+        self.store = store or credentials
+        self._connection = _Connection(credentials, self.store)
+        self.connection = self._connection
+
+
+class _Connection(object):
+    """Answer listing requests from a sorted list of names."""
+
+    def __init__(self, credentials, store):
+        self.credentials = credentials
+        self._store = store
+
+    def api_request(self, method, path, query_params):
+        from google.cloud.exceptions import NotFound
+        assert method == 'GET' and path == '/b/bucket/o'
+        store = self._store
+        params = dict(query_params)
+        token = int(params.pop('pageToken', 0))
+        with store.lock:
+            store.requests.append(params)
+        start = params.get('startOffset')
+        if start in store.broken:
+            raise NotFound(start)
+        entries = self._entries(store.names, params)
+        page = entries[token:token + store.page_size]
+        response = {
+            'items': [{'name': name} for kind, name in page if kind == 'item'],
+            'prefixes': [name for kind, name in page if kind == 'prefix'],
+        }
+        if 'items' not in params.get('fields', 'items'):
+            del response['items']
+        if token + store.page_size < len(entries):
+            response['nextPageToken'] = str(token + store.page_size)
+        return response
+
+    @staticmethod
+    def _entries(names, params):
+        prefix = params.get('prefix', '')
+        start = params.get('startOffset')
+        end = params.get('endOffset')
+        delimiter = params.get('delimiter')
+        entries = []
+        for name in names:
+            if not name.startswith(prefix):
+                continue
+            if start is not None and name < start:
+                continue
+            if end is not None and name >= end:
+                continue
+            rest = name[len(prefix):]
+            if delimiter and delimiter in rest:
+                entry = ('prefix', prefix + rest.split(delimiter)[0] +
+                         delimiter)
+                if entry not in entries:
+                    entries.append(entry)
+            else:
+                entries.append(('item', name))
+        return entries
@@ -292,6 +292,7 @@ class TestBatch(unittest.TestCase):
         self.assertEqual(headers['MIME-Version'], '1.0')
 
         divider = '--' + boundary[len('boundary="'):-1]
+        body = body.decode('utf-8')
         chunks = body.split(divider)[1:-1]  # discard prolog / epilog
         self.assertEqual(len(chunks), 3)
 
@@ -350,12 +351,43 @@ class TestBatch(unittest.TestCase):
         self.assertEqual(headers['MIME-Version'], '1.0')
 
         divider = '--' + boundary[len('boundary="'):-1]
+        body = body.decode('utf-8')
         chunks = body.split(divider)[1:-1]  # discard prolog / epilog
         self.assertEqual(len(chunks), 2)
 
         self._check_subrequest_payload(chunks[0], 'GET', URL, {})
         self._check_subrequest_payload(chunks[1], 'GET', URL, {})
 
+    def test__send_w_explicit_connection(self):
+        URL = 'http://api.example.com/other_api'
+        expected = _Response()
+        expected['content-type'] = 'multipart/mixed; boundary="DEADBEEF="'
+        client_http = _HTTP()
+        http = _HTTP((expected, _TWO_PART_MIME_RESPONSE_WITH_FAIL))
+        client = _Client(_Connection(http=client_http))
+        connection = _Connection(http=http)
+        batch = self._makeOne(client)
+        batch.API_BASE_URL = 'http://api.example.com'
+        target1 = _MockObject()
+        target2 = _MockObject()
+        batch._do_request('GET', URL, {}, None, target1)
+        batch._do_request('GET', URL, {}, None, target2)
+        target1_future_before = target1._properties
+
+        responses = batch._send(connection)
+
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(responses[0][0].status, 200)
+        self.assertEqual(responses[0][1], {'foo': 1, 'bar': 2})
+        self.assertEqual(responses[1][0].status, 404)
+        # Futures are left for the caller.
+        self.assertIs(target1._properties, target1_future_before)
+        self.assertEqual(client_http._requests, [])
+        self.assertEqual(len(http._requests), 1)
+        method, uri, _, _ = http._requests[0]
+        self.assertEqual(method, 'POST')
+        self.assertEqual(uri, 'http://api.example.com/batch')
+
     def test_finish_nonempty_non_multipart_response(self):
         URL = 'http://api.example.com/other_api'
         expected = _Response()
@@ -444,6 +476,242 @@ class TestBatch(unittest.TestCase):
         self.assertIsInstance(target3._properties, _FutureDict)
 
 
+class Test__encode_subrequest(unittest.TestCase):
+
+    def _callFUT(self, method, uri, headers, body):
+        from google.cloud.storage.batch import _encode_subrequest
+        return _encode_subrequest(method, uri, headers, body)
+
+    def test_body_None(self):
+        encoded = self._callFUT('DELETE', '/path/to/api', {}, None)
+        self.assertEqual(encoded, b'DELETE /path/to/api HTTP/1.1\r\n\r\n')
+
+    def test_body_str(self):
+        headers = {'Content-Length': 3, 'Content-Type': 'text/plain'}
+        encoded = self._callFUT('GET', '/path/to/api', headers, u'ABC')
+        self.assertEqual(encoded, b'GET /path/to/api HTTP/1.1\r\n'
+                                  b'Content-Length: 3\r\n'
+                                  b'Content-Type: text/plain\r\n'
+                                  b'\r\n'
+                                  b'ABC')
+
+    def test_body_bytes(self):
+        encoded = self._callFUT('POST', '/path/to/api', {}, b'\xff\x00')
+        self.assertEqual(encoded,
+                         b'POST /path/to/api HTTP/1.1\r\n\r\n\xff\x00')
+
+    def test_body_dict(self):
+        headers = {}
+        encoded = self._callFUT('PATCH', '/path/to/api', headers,
+                                {'foo': 'bar'})
+        self.assertEqual(encoded, b'PATCH /path/to/api HTTP/1.1\r\n'
+                                  b'Content-Length: 14\r\n'
+                                  b'Content-Type: application/json\r\n'
+                                  b'\r\n'
+                                  b'{"foo": "bar"}')
+        self.assertEqual(headers, {'Content-Length': 14,
+                                   'Content-Type': 'application/json'})
+
+    def test_matches_mime_application_http(self):
+        from google.cloud.storage.batch import MIMEApplicationHTTP
+        encoded = self._callFUT('PATCH', '/path/to/api', {}, {'foo': 'bar'})
+        legacy = MIMEApplicationHTTP('PATCH', '/path/to/api', {},
+                                     {'foo': 'bar'})
+        self.assertEqual(encoded.decode('utf-8'), legacy.get_payload())
+
+
+class Test__make_boundary(unittest.TestCase):
+
+    def _callFUT(self, parts):
+        from google.cloud.storage.batch import _make_boundary
+        return _make_boundary(parts)
+
+    def test_email_style(self):
+        boundary = self._callFUT([b'ABC'])
+        self.assertTrue(boundary.startswith('=' * 15))
+        self.assertTrue(boundary.endswith('=='))
+        self.assertEqual(len(boundary), 36)
+
+    def test_avoids_collision(self):
+        from google.cloud.storage import batch as MUT
+        from unit_tests._testing import _Monkey
+        values = [1, 2]
+        parts = [b'ABC', b'--===============0000000000000000001==']
+        with _Monkey(MUT.random, randrange=lambda _: values.pop(0)):
+            boundary = self._callFUT(parts)
+        self.assertEqual(boundary, '===============0000000000000000002==')
+        self.assertEqual(values, [])
+
+
+class Test__encode_multipart(unittest.TestCase):
+
+    def _callFUT(self, parts):
+        from google.cloud.storage.batch import _encode_multipart
+        return _encode_multipart(parts)
+
+    def test_it(self):
+        from google.cloud.storage import batch as MUT
+        from unit_tests._testing import _Monkey
+        with _Monkey(MUT, _make_boundary=lambda parts: 'DEADBEEF='):
+            content_type, body = self._callFUT([b'ONE', b'TWO'])
+        self.assertEqual(content_type, 'multipart/mixed; boundary="DEADBEEF="')
+        self.assertEqual(body, b'--DEADBEEF=\r\n'
+                               b'Content-Type: application/http\r\n'
+                               b'MIME-Version: 1.0\r\n'
+                               b'\r\n'
+                               b'ONE\r\n'
+                               b'--DEADBEEF=\r\n'
+                               b'Content-Type: application/http\r\n'
+                               b'MIME-Version: 1.0\r\n'
+                               b'\r\n'
+                               b'TWO\r\n'
+                               b'--DEADBEEF=--\r\n')
+
+    def test_parsed_by_email_package(self):
+        from email.parser import Parser
+        from google.cloud.storage.batch import _encode_subrequest
+        parts = [
+            _encode_subrequest('PATCH', '/b/name', {}, {'foo': 'bar'}),
+            _encode_subrequest('DELETE', '/b/name/o/blob', {}, None),
+        ]
+        content_type, body = self._callFUT(parts)
+        message = Parser().parsestr(
+            'Content-Type: %s\n\n%s' % (content_type, body.decode('utf-8')))
+        self.assertTrue(message.is_multipart())
+        subrequests = message.get_payload()
+        self.assertEqual(len(subrequests), 2)
+        for subrequest, part in zip(subrequests, parts):
+            self.assertEqual(subrequest.get_content_type(), 'application/http')
+            self.assertEqual(subrequest.get_payload(), part.decode('utf-8'))
+
+
+class Test__get_boundary(unittest.TestCase):
+
+    def _callFUT(self, content_type):
+        from google.cloud.storage.batch import _get_boundary
+        return _get_boundary(content_type)
+
+    def test_quoted(self):
+        self.assertEqual(
+            self._callFUT('multipart/mixed; boundary="DEADBEEF="'),
+            b'DEADBEEF=')
+
+    def test_unquoted_bytes(self):
+        self.assertEqual(
+            self._callFUT(b'Multipart/Mixed; charset=UTF-8; Boundary=batch_1'),
+            b'batch_1')
+
+    def test_not_multipart(self):
+        with self.assertRaises(ValueError):
+            self._callFUT('text/plain; boundary="DEADBEEF="')
+
+    def test_wo_boundary(self):
+        with self.assertRaises(ValueError):
+            self._callFUT('multipart/mixed')
+
+
+class Test__split_multipart(unittest.TestCase):
+
+    def _callFUT(self, content, boundary):
+        from google.cloud.storage.batch import _split_multipart
+        return _split_multipart(content, boundary)
+
+    def test_lf(self):
+        content = b'preamble\n--XX\nONE\n\n--XX\nTWO\n--XX--\nepilogue'
+        self.assertEqual(list(self._callFUT(content, b'XX')),
+                         [b'\nONE\n', b'\nTWO'])
+
+    def test_crlf(self):
+        content = b'--XX\r\nONE\r\n--XX \r\nTWO\r\n--XX--'
+        self.assertEqual(list(self._callFUT(content, b'XX')),
+                         [b'\r\nONE', b' \r\nTWO'])
+
+    def test_wo_line_breaks(self):
+        self.assertEqual(list(self._callFUT(b'--XXONE--XX--', b'XX')),
+                         [b'ONE'])
+
+    def test_empty(self):
+        self.assertEqual(list(self._callFUT(b'--XX--\r\n', b'XX')), [])
+
+    def test_wo_delimiter(self):
+        with self.assertRaises(ValueError):
+            list(self._callFUT(b'NOT A MIME RESPONSE', b'XX'))
+
+    def test_unterminated(self):
+        parts = self._callFUT(b'--XX\r\nONE\r\n--XX\r\nTWO', b'XX')
+        self.assertEqual(next(parts), b'\r\nONE')
+        with self.assertRaises(ValueError):
+            next(parts)
+
+
+class Test__parse_headers(unittest.TestCase):
+
+    def _callFUT(self, data, pos):
+        from google.cloud.storage.batch import _parse_headers
+        return _parse_headers(data, pos)
+
+    def test_to_empty_line(self):
+        data = b'XXFoo: bar\r\nX-Folded: one\r\n\ttwo\r\n\r\nBODY'
+        headers, pos = self._callFUT(data, 2)
+        self.assertEqual(headers, {'Foo': 'bar', 'X-Folded': 'one two'})
+        self.assertEqual(data[pos:], b'BODY')
+
+    def test_to_end(self):
+        data = b'Foo: bar\nSpam:eggs'
+        headers, pos = self._callFUT(data, 0)
+        self.assertEqual(headers, {'Foo': 'bar', 'Spam': 'eggs'})
+        self.assertEqual(data[pos:], b'')
+
+    def test_leading_whitespace(self):
+        headers, _ = self._callFUT(b' Foo: bar\n', 0)
+        self.assertEqual(headers, {'Foo': 'bar'})
+
+
+class Test__parse_subresponse(unittest.TestCase):
+
+    def _callFUT(self, part):
+        from google.cloud.storage.batch import _parse_subresponse
+        return _parse_subresponse(part)
+
+    def test_json(self):
+        part = (b'\r\nContent-Type: application/http\r\n\r\n'
+                b'HTTP/1.1 200 OK\r\n'
+                b'Content-Type: application/json; charset=UTF-8\r\n'
+                b'\r\n'
+                b'{"name": "\xc3\xa9"}')
+        headers, payload = self._callFUT(part)
+        self.assertEqual(headers.status, 200)
+        self.assertEqual(headers['content-type'],
+                         'application/json; charset=UTF-8')
+        self.assertEqual(payload, {'name': u'\xe9'})
+
+    def test_json_lower_case_header(self):
+        part = (b'\r\nContent-Type: application/http\r\n\r\n'
+                b'HTTP/1.1 200 OK\r\n'
+                b'content-type: application/json\r\n'
+                b'\r\n'
+                b'{"a": 1}')
+        headers, payload = self._callFUT(part)
+        self.assertEqual(headers['content-type'], 'application/json')
+        self.assertEqual(payload, {'a': 1})
+
+    def test_text(self):
+        part = (b'\nContent-Type: application/http\n\n'
+                b'HTTP/1.1 404 Not Found\n'
+                b'Content-Type: text/plain\n'
+                b'\n'
+                b'Not Found')
+        headers, payload = self._callFUT(part)
+        self.assertEqual(headers.status, 404)
+        self.assertEqual(payload, u'Not Found')
+
+    def test_status_line_only(self):
+        part = b'\nContent-Type: application/http\n\nHTTP/1.1 204 No Content'
+        headers, payload = self._callFUT(part)
+        self.assertEqual(headers.status, 204)
+        self.assertEqual(payload, u'')
+
+
 class Test__unpack_batch_response(unittest.TestCase):
 
     def _callFUT(self, response, content):
@@ -478,6 +746,26 @@ class Test__unpack_batch_response(unittest.TestCase):
         CONTENT = _THREE_PART_MIME_RESPONSE.decode('utf-8')
         self._unpack_helper(RESPONSE, CONTENT)
 
+    def test_crlf(self):
+        RESPONSE = {'content-type': 'multipart/mixed; boundary="DEADBEEF="'}
+        CONTENT = _THREE_PART_MIME_RESPONSE.replace(b'\n', b'\r\n')
+        self._unpack_helper(RESPONSE, CONTENT)
+
+    def test_lazy(self):
+        RESPONSE = {'content-type': 'multipart/mixed; boundary="DEADBEEF="'}
+        CONTENT = _THREE_PART_MIME_RESPONSE.replace(
+            b'{"foo": 1, "bar": 3}', b'{"foo": ')
+        responses = self._callFUT(RESPONSE, CONTENT)
+        headers, payload = next(responses)
+        self.assertEqual(headers.status, 200)
+        self.assertEqual(payload, {u'foo': 1, u'bar': 2})
+        self.assertRaises(ValueError, next, responses)
+
+    def test_not_multipart(self):
+        RESPONSE = {'content-type': 'text/plain'}
+        with self.assertRaises(ValueError):
+            list(self._callFUT(RESPONSE, 'NOT A MIME_RESPONSE'))
+
 
 _TWO_PART_MIME_RESPONSE_WITH_FAIL = b"""\
 --DEADBEEF=
@@ -348,6 +348,73 @@ class Test_Blob(unittest.TestCase):
     def test_download_to_file_with_chunk_size(self):
         self._download_to_file_helper(chunk_size=3)
 
+    def _download_w_checksum_helper(self, properties=None, info=None,
+                                    checksum='md5'):
+        from six.moves.http_client import OK
+        from io import BytesIO
+        BLOB_NAME = 'blob-name'
+        response = {'status': OK, 'content-range': 'bytes 0-5/6'}
+        response.update(info or {})
+        connection = _Connection((response, b'abcdef'))
+        client = _Client(connection)
+        bucket = _Bucket(client)
+        MEDIA_LINK = 'http://example.com/media/'
+        blob_properties = {'mediaLink': MEDIA_LINK}
+        blob_properties.update(properties or {})
+        blob = self._makeOne(BLOB_NAME, bucket=bucket,
+                             properties=blob_properties)
+        fh = BytesIO()
+        blob.download_to_file(fh, checksum=checksum)
+        return fh.getvalue()
+
+    def test_download_to_file_w_md5_match(self):
+        properties = {'md5Hash': _b64_md5(b'abcdef')}
+        found = self._download_w_checksum_helper(properties=properties)
+        self.assertEqual(found, b'abcdef')
+
+    def test_download_to_file_w_md5_mismatch(self):
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        properties = {'md5Hash': _b64_md5(b'ghijkl')}
+        with self.assertRaises(ChecksumMismatchError) as exc_info:
+            self._download_w_checksum_helper(properties=properties)
+        self.assertEqual(exc_info.exception.checksum, 'md5')
+        self.assertEqual(exc_info.exception.expected, _b64_md5(b'ghijkl'))
+        self.assertEqual(exc_info.exception.actual, _b64_md5(b'abcdef'))
+
+    def test_download_to_file_w_hash_header_mismatch(self):
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        # The header describes what was served, and wins over properties.
+        properties = {'md5Hash': _b64_md5(b'abcdef')}
+        info = {'x-goog-hash': 'crc32c=AAAAAA==,md5=%s' % _b64_md5(b'ghi')}
+        with self.assertRaises(ChecksumMismatchError):
+            self._download_w_checksum_helper(properties=properties,
+                                             info=info)
+
+    def test_download_to_file_w_crc32c_hash_header_match(self):
+        import base64
+        from google.cloud.storage._helpers import _Crc32c
+        crc32c = base64.b64encode(_Crc32c(b'abcdef').digest())
+        info = {'x-goog-hash': 'crc32c=%s' % crc32c.decode('ascii')}
+        found = self._download_w_checksum_helper(info=info,
+                                                 checksum='crc32c')
+        self.assertEqual(found, b'abcdef')
+
+    def test_download_to_file_w_checksum_None(self):
+        properties = {'md5Hash': _b64_md5(b'ghijkl')}
+        found = self._download_w_checksum_helper(properties=properties,
+                                                 checksum=None)
+        self.assertEqual(found, b'abcdef')
+
+    def test_download_to_file_w_gzip_content_encoding(self):
+        properties = {'md5Hash': _b64_md5(b'ghijkl'),
+                      'contentEncoding': 'gzip'}
+        found = self._download_w_checksum_helper(properties=properties)
+        self.assertEqual(found, b'abcdef')
+
+    def test_download_to_file_w_invalid_checksum(self):
+        with self.assertRaises(ValueError):
+            self._download_w_checksum_helper(checksum='sha1')
+
     def test_download_to_filename(self):
         import os
         import time
@@ -428,6 +495,25 @@ class Test_Blob(unittest.TestCase):
         self.assertEqual(wrote, b'abcdef')
         self.assertEqual(mtime, updatedTime)
 
+    def test_download_to_filename_w_cache(self):
+        bucket = _Bucket(_Client(_Connection()))
+        blob = self._makeOne('blob-name', bucket=bucket)
+        cache = _Cache()
+        client = object()
+        blob.download_to_filename('/tmp/target', client=client, cache=cache,
+                                  checksum='md5')
+        self.assertEqual(cache._downloaded,
+                         [(blob, '/tmp/target', client, 'md5')])
+
+    def test_download_to_filename_w_cache_and_key(self):
+        bucket = _Bucket(_Client(_Connection()))
+        blob = self._makeOne('blob-name', bucket=bucket)
+        cache = _Cache()
+        with self.assertRaises(ValueError):
+            blob.download_to_filename('/tmp/target', cache=cache,
+                                      encryption_key='a' * 32)
+        self.assertEqual(cache._downloaded, [])
+
     def test_download_as_string(self):
         from six.moves.http_client import OK
         from six.moves.http_client import PARTIAL_CONTENT
@@ -450,6 +536,48 @@ class Test_Blob(unittest.TestCase):
         fetched = blob.download_as_string()
         self.assertEqual(fetched, b'abcdef')
 
+    def test_download_as_string_w_decompress(self):
+        from six.moves.http_client import OK
+        DATA = b'abcdef' * 100
+        response = {'status': OK, 'content-encoding': 'gzip'}
+        connection = _Connection((response, _gzip(DATA)))
+        client = _Client(connection)
+        bucket = _Bucket(client)
+        properties = {'mediaLink': 'http://example.com/media/',
+                      'contentEncoding': 'gzip'}
+        blob = self._makeOne('blob-name', bucket=bucket,
+                             properties=properties)
+        self.assertEqual(blob.download_as_string(decompress=True), DATA)
+
+    def test_download_as_string_w_observer(self):
+        from six.moves.http_client import OK
+        from six.moves.http_client import PARTIAL_CONTENT
+        connection = _Connection(
+            ({'status': PARTIAL_CONTENT, 'content-range': 'bytes 0-2/6'},
+             b'abc'),
+            ({'status': OK, 'content-range': 'bytes 3-5/6'}, b'def'),
+        )
+        bucket = _Bucket(_Client(connection))
+        properties = {'mediaLink': 'http://example.com/media/'}
+        blob = self._makeOne('blob-name', bucket=bucket, properties=properties)
+        blob._CHUNK_SIZE_MULTIPLE = 1
+        blob.chunk_size = 3
+        observer = _Observer()
+        self.assertEqual(blob.download_as_string(observer=observer),
+                         b'abcdef')
+        self.assertEqual([num_bytes for num_bytes, _ in observer._chunks],
+                         [3, 3])
+
+    def test_upload_from_string_w_observer(self):
+        from six.moves.http_client import OK
+        connection = _Connection(({'status': OK}, b'{}'))
+        blob = self._makeOne('blob-name', bucket=_Bucket(_Client(connection)))
+        observer = _Observer()
+        blob.upload_from_string(b'ABCDEF', observer=observer)
+        self.assertEqual([num_bytes for num_bytes, _ in observer._chunks],
+                         [6])
+        self.assertEqual(observer._retries, [])
+
     def test_upload_from_file_size_failure(self):
         BLOB_NAME = 'blob-name'
         connection = _Connection()
@@ -602,6 +730,62 @@ class Test_Blob(unittest.TestCase):
             'redirections': 5,
         })
 
+    def _upload_gzip_helper(self, data, size=None):
+        import json
+        from io import BytesIO
+        from six.moves.http_client import OK
+        from six.moves.urllib.parse import parse_qsl
+        from six.moves.urllib.parse import urlsplit
+
+        UPLOAD_URL = 'http://example.com/upload/name/key'
+        compressed = _gzip(data if size is None else data[:size])
+        loc_response = {'status': OK, 'location': UPLOAD_URL}
+        final = {'contentEncoding': 'gzip', 'md5Hash': _b64_md5(compressed)}
+        connection = _Connection(
+            (loc_response, b''),
+            ({'status': OK}, json.dumps(final).encode('utf-8')),
+        )
+        client = _Client(connection)
+        blob = self._makeOne('blob-name', bucket=_Bucket(client))
+        blob.upload_from_file(BytesIO(data), size=size,
+                              content_type='text/csv',
+                              content_encoding='gzip', checksum='md5')
+        self.assertEqual(blob.content_encoding, 'gzip')
+
+        rq = connection.http._requested
+        self.assertEqual(len(rq), 2)
+        headers = dict(
+            (x.title(), str(y)) for x, y in rq[0]['headers'].items())
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        self.assertEqual(headers['X-Upload-Content-Type'], 'text/csv')
+        self.assertNotIn('X-Upload-Content-Length', headers)
+        self.assertEqual(json.loads(rq[0]['body']),
+                         {'contentEncoding': 'gzip'})
+        self.assertEqual(dict(parse_qsl(urlsplit(rq[0]['uri']).query)),
+                         {'uploadType': 'resumable', 'name': 'blob-name'})
+        return rq[1]['body']
+
+    def test_upload_from_file_w_gzip(self):
+        import zlib
+        DATA = b'a,b,c\n' * 1000
+        body = self._upload_gzip_helper(DATA)
+        self.assertLess(len(body), len(DATA))
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS), DATA)
+
+    def test_upload_from_file_w_gzip_and_size(self):
+        import zlib
+        body = self._upload_gzip_helper(b'ABCDEF', size=3)
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS), b'ABC')
+
+    def test_upload_from_file_w_unsupported_content_encoding(self):
+        from io import BytesIO
+        blob = self._makeOne('blob-name', bucket=_Bucket(_Client(None)))
+        with self.assertRaises(ValueError):
+            blob.upload_from_file(BytesIO(b'ABC'), content_encoding='br')
+        with self.assertRaises(ValueError):
+            blob.upload_from_file(BytesIO(b'ABC'), content_encoding='gzip',
+                                  resumable_state=object())
+
     def test_upload_from_file_simple(self):
         self._upload_from_file_simple_test_helper(
             expected_content_type='application/octet-stream')
@@ -612,6 +796,43 @@ class Test_Blob(unittest.TestCase):
         with self.assertRaises(NotFound):
             self._upload_from_file_simple_test_helper(status=NOT_FOUND)
 
+    def _upload_from_string_w_checksum_helper(self, response_properties,
+                                              checksum='auto'):
+        import json
+        from six.moves.http_client import OK
+        BLOB_NAME = 'blob-name'
+        DATA = b'ABCDEF'
+        connection = _Connection(
+            ({'status': OK}, json.dumps(response_properties).encode('utf-8')),
+        )
+        client = _Client(connection)
+        bucket = _Bucket(client)
+        blob = self._makeOne(BLOB_NAME, bucket=bucket)
+        blob.upload_from_string(DATA, checksum=checksum)
+        return blob
+
+    def test_upload_from_string_w_md5_match(self):
+        MD5 = _b64_md5(b'ABCDEF')
+        blob = self._upload_from_string_w_checksum_helper({'md5Hash': MD5})
+        self.assertEqual(blob.md5_hash, MD5)
+
+    def test_upload_from_string_w_md5_mismatch(self):
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        MD5 = _b64_md5(b'ABCDEG')
+        with self.assertRaises(ChecksumMismatchError) as exc_info:
+            self._upload_from_string_w_checksum_helper({'md5Hash': MD5},
+                                                       checksum='md5')
+        self.assertEqual(exc_info.exception.expected, MD5)
+        self.assertEqual(exc_info.exception.actual, _b64_md5(b'ABCDEF'))
+
+    def test_upload_from_string_w_crc32c_mismatch(self):
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        with self.assertRaises(ChecksumMismatchError) as exc_info:
+            self._upload_from_string_w_checksum_helper(
+                {'crc32c': 'AAAAAA==', 'md5Hash': _b64_md5(b'ABCDEF')},
+                checksum='crc32c')
+        self.assertEqual(exc_info.exception.checksum, 'crc32c')
+
     def test_upload_from_file_simple_w_chunk_size_None(self):
         self._upload_from_file_simple_test_helper(
             expected_content_type='application/octet-stream',
@@ -721,6 +942,112 @@ class Test_Blob(unittest.TestCase):
             'redirections': 5,
         })
 
+    def test_upload_from_filename_w_resumable_state(self):
+        import os
+        from six.moves.http_client import OK
+        from unit_tests._testing import _NamedTemporaryFile
+
+        BLOB_NAME = 'blob-name'
+        UPLOAD_URL = 'http://example.com/upload/name/key'
+        DATA = b'ABCDEF'
+        loc_response = {'status': OK, 'location': UPLOAD_URL}
+        chunk_response = {'status': OK}
+        connection = _Connection(
+            (loc_response, b''),
+            (chunk_response, b'{}'),
+        )
+        client = _Client(connection)
+        bucket = _Bucket(client)
+        blob = self._makeOne(BLOB_NAME, bucket=bucket)
+        store = _SessionStore()
+
+        with _NamedTemporaryFile() as temp:
+            with open(temp.name, 'wb') as file_obj:
+                file_obj.write(DATA)
+            blob.upload_from_filename(temp.name, checksum=None,
+                                      resumable_state=store)
+            filename = os.path.abspath(temp.name)
+
+        rq = connection.http._requested
+        self.assertEqual(len(rq), 2)
+        self.assertEqual(rq[0]['method'], 'POST')
+        self.assertIn('uploadType=resumable', rq[0]['uri'])
+        self.assertEqual(rq[1]['method'], 'PUT')
+        self.assertEqual(rq[1]['uri'], UPLOAD_URL)
+        self.assertEqual(rq[1]['body'], DATA)
+
+        key = 'name/' + BLOB_NAME
+        self.assertEqual(store._states, {})
+        self.assertEqual(len(store._saved), 1)
+        saved_key, saved = store._saved[0]
+        self.assertEqual(saved_key, key)
+        self.assertEqual(saved['url'], UPLOAD_URL)
+        self.assertEqual(saved['offset'], 0)
+        self.assertEqual(saved['filename'], filename)
+        self.assertEqual(saved['size'], len(DATA))
+        self.assertEqual(store._deleted, [key])
+
+    def test_upload_from_filename_w_resumable_state_resumed(self):
+        import os
+        from six.moves.http_client import OK
+        from unit_tests._testing import _NamedTemporaryFile
+        from google.cloud.streaming import http_wrapper
+
+        BLOB_NAME = 'blob-name'
+        UPLOAD_URL = 'http://example.com/upload/name/key'
+        DATA = b'ABCDEF'
+        refresh_response = {'status': http_wrapper.RESUME_INCOMPLETE,
+                            'range': 'bytes 0-2'}
+        chunk_response = {'status': OK}
+        connection = _Connection(
+            (refresh_response, b''),
+            (chunk_response, b'{}'),
+        )
+        client = _Client(connection)
+        bucket = _Bucket(client)
+        blob = self._makeOne(BLOB_NAME, bucket=bucket)
+        store = _SessionStore()
+        key = 'name/' + BLOB_NAME
+
+        with _NamedTemporaryFile() as temp:
+            with open(temp.name, 'wb') as file_obj:
+                file_obj.write(DATA)
+            store._states[key] = {
+                'bucket': 'name',
+                'name': BLOB_NAME,
+                'filename': os.path.abspath(temp.name),
+                'size': len(DATA),
+                'mtime': os.stat(temp.name).st_mtime,
+                'url': UPLOAD_URL,
+                'offset': 3,
+            }
+            blob.upload_from_filename(temp.name, resumable_state=store)
+
+        rq = connection.http._requested
+        self.assertEqual(len(rq), 2)
+        self.assertEqual(rq[0]['method'], 'PUT')
+        self.assertEqual(rq[0]['uri'], UPLOAD_URL)
+        self.assertEqual(rq[0]['headers']['Content-Range'], 'bytes */*')
+        headers = dict(
+            [(x.title(), str(y)) for x, y in rq[1]['headers'].items()])
+        self.assertEqual(headers['Content-Range'], 'bytes 3-5/6')
+        self.assertEqual(rq[1]['method'], 'PUT')
+        self.assertEqual(rq[1]['uri'], UPLOAD_URL)
+        self.assertEqual(rq[1]['body'], DATA[3:])
+        self.assertEqual(store._saved, [])
+        self.assertEqual(store._states, {})
+
+    def test_upload_from_file_w_resumable_state_wo_file(self):
+        from io import BytesIO
+        connection = _Connection()
+        client = _Client(connection)
+        bucket = _Bucket(client)
+        blob = self._makeOne('blob-name', bucket=bucket)
+        stream = BytesIO(b'ABCDEF')
+        with self.assertRaises(ValueError):
+            blob.upload_from_file(stream, resumable_state=_SessionStore())
+        self.assertEqual(connection.http._requested, [])
+
     def test_upload_from_file_resumable_w_error(self):
         from six.moves.http_client import NOT_FOUND
         from six.moves.urllib.parse import parse_qsl
@@ -930,11 +1257,38 @@ class Test_Blob(unittest.TestCase):
             [(x.title(), str(y)) for x, y in rq[0]['headers'].items()])
         self.assertEqual(headers['Content-Length'], '6')
         self.assertEqual(headers['Content-Type'], expected_content_type)
+        # Not memory-mapped, unless asked to.
+        self.assertEqual(rq[0]['body'], DATA)
 
     def test_upload_from_filename(self):
         self._upload_from_filename_test_helper(
             expected_content_type='image/jpeg')
 
+    def test_upload_from_filename_verifies_mapped_data(self):
+        import base64
+        import hashlib
+        import json
+        from six.moves.http_client import OK
+        from unit_tests._testing import _NamedTemporaryFile
+
+        DATA = b'ABCDEFGH'
+        md5_hash = base64.b64encode(hashlib.md5(DATA).digest()).decode()
+        connection = _Connection(
+            ({'status': OK}, json.dumps({'md5Hash': md5_hash})),
+        )
+        blob = self._makeOne('blob-name', bucket=_Bucket(_Client(connection)))
+
+        with _NamedTemporaryFile() as temp:
+            with open(temp.name, 'wb') as file_obj:
+                file_obj.write(DATA)
+            blob.upload_from_filename(temp.name, checksum='md5',
+                                      memory_map=True)
+
+        rq = connection.http._requested
+        self.assertIsInstance(rq[0]['body'], memoryview)
+        self.assertEqual(bytes(rq[0]['body']), DATA)
+        self.assertEqual(blob.md5_hash, md5_hash)
+
     def test_upload_from_filename_with_content_type(self):
         EXPECTED_CONTENT_TYPE = 'foo/bar'
         self._upload_from_filename_test_helper(
@@ -1102,6 +1456,95 @@ class Test_Blob(unittest.TestCase):
         self.assertEqual(kw[0]['data'], {'acl': permissive})
         self.assertEqual(kw[0]['query_params'], {'projection': 'full'})
 
+    def test_rewrite_other_bucket_not_done(self):
+        from six.moves.http_client import OK
+        SOURCE_BLOB = 'source'
+        DEST_BLOB = 'dest'
+        DEST_BUCKET = 'other-bucket'
+        TOKEN = 'TOKEN'
+        RESPONSE = {
+            'totalBytesRewritten': '33',
+            'objectSize': '42',
+            'done': False,
+            'rewriteToken': TOKEN,
+            'resource': {'etag': 'DEADBEEF'},
+        }
+        connection = _Connection(({'status': OK}, RESPONSE))
+        client = _Client(connection)
+        source_bucket = _Bucket(client=client)
+        source_blob = self._makeOne(SOURCE_BLOB, bucket=source_bucket)
+        dest_bucket = _Bucket(client=client, name=DEST_BUCKET)
+        dest_blob = self._makeOne(DEST_BLOB, bucket=dest_bucket)
+        dest_blob.content_type = 'text/plain'
+
+        token, rewritten, size = dest_blob.rewrite(source_blob)
+
+        self.assertEqual(token, TOKEN)
+        self.assertEqual(rewritten, 33)
+        self.assertEqual(size, 42)
+        self.assertIsNone(dest_blob.etag)
+
+        kw, = connection._requested
+        self.assertEqual(kw['method'], 'POST')
+        PATH = '/b/name/o/%s/rewriteTo/b/%s/o/%s' % (
+            SOURCE_BLOB, DEST_BUCKET, DEST_BLOB)
+        self.assertEqual(kw['path'], PATH)
+        self.assertEqual(kw['query_params'], {})
+        self.assertEqual(kw['data'], {'contentType': 'text/plain'})
+        self.assertIsNone(kw['_target_object'])
+
+    def test_rewrite_same_name_w_token_done(self):
+        from six.moves.http_client import OK
+        BLOB_NAME = 'blob'
+        TOKEN = 'TOKEN'
+        RESOURCE = {'name': BLOB_NAME, 'etag': 'DEADBEEF'}
+        RESPONSE = {
+            'totalBytesRewritten': '42',
+            'objectSize': '42',
+            'done': True,
+            'resource': RESOURCE,
+        }
+        connection = _Connection(({'status': OK}, RESPONSE))
+        client = _Client(connection)
+        bucket = _Bucket(client=client)
+        blob = self._makeOne(BLOB_NAME, bucket=bucket)
+        blob.content_type = 'text/plain'
+
+        token, rewritten, size = blob.rewrite(blob, token=TOKEN)
+
+        self.assertIsNone(token)
+        self.assertEqual(rewritten, 42)
+        self.assertEqual(size, 42)
+        self.assertEqual(blob.etag, 'DEADBEEF')
+        self.assertEqual(blob._changes, set())
+
+        kw, = connection._requested
+        PATH = '/b/name/o/%s/rewriteTo/b/name/o/%s' % (BLOB_NAME, BLOB_NAME)
+        self.assertEqual(kw['path'], PATH)
+        self.assertEqual(kw['query_params'], {'rewriteToken': TOKEN})
+
+    def test_rewrite_in_batch(self):
+        from six.moves.http_client import OK
+        RESPONSE = {
+            'totalBytesRewritten': '42',
+            'objectSize': '42',
+            'done': True,
+            'resource': {'etag': 'DEADBEEF'},
+        }
+        connection = _Connection(({'status': OK}, RESPONSE))
+        client = _Client(connection)
+        client.current_batch = batch = _Connection()
+        bucket = _Bucket(client=client)
+        source_blob = self._makeOne('source', bucket=bucket)
+        dest_blob = self._makeOne('dest', bucket=bucket)
+
+        token, _, _ = dest_blob.rewrite(source_blob)
+
+        self.assertIsNone(token)
+        self.assertEqual(dest_blob.etag, 'DEADBEEF')
+        self.assertEqual(len(connection._requested), 1)
+        self.assertEqual(batch._requested, [])
+
     def test_cache_control_getter(self):
         BLOB_NAME = 'blob-name'
         bucket = _Bucket()
@@ -1401,6 +1844,19 @@ class Test_Blob(unittest.TestCase):
         self.assertIsNone(blob.updated)
 
 
+def _gzip(data):
+    import zlib
+    compressor = zlib.compressobj(
+        zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _b64_md5(data):
+    import base64
+    import hashlib
+    return base64.b64encode(hashlib.md5(data).digest()).decode('ascii')
+
+
 class _Responder(object):
 
     def __init__(self, *responses):
@@ -1454,15 +1910,25 @@ class _HTTP(_Responder):
                              body=body, **kw)
 
 
+class _Cache(object):
+
+    def __init__(self):
+        self._downloaded = []
+
+    def download_to_filename(self, blob, filename, client=None,
+                             checksum='auto'):
+        self._downloaded.append((blob, filename, client, checksum))
+
+
 class _Bucket(object):
-    path = '/b/name'
-    name = 'name'
 
-    def __init__(self, client=None):
+    def __init__(self, client=None, name='name'):
         if client is None:
             connection = _Connection()
             client = _Client(connection)
         self.client = client
+        self.name = name
+        self.path = '/b/' + name
         self._blobs = {}
         self._copied = []
         self._deleted = []
@@ -1472,6 +1938,25 @@ class _Bucket(object):
         self._deleted.append((blob_name, client))
 
 
+class _SessionStore(object):
+
+    def __init__(self):
+        self._states = {}
+        self._saved = []
+        self._deleted = []
+
+    def load(self, key):
+        return self._states.get(key)
+
+    def save(self, key, state):
+        self._saved.append((key, dict(state)))
+        self._states[key] = dict(state)
+
+    def delete(self, key):
+        self._deleted.append(key)
+        self._states.pop(key, None)
+
+
 class _Signer(object):
 
     def __init__(self):
@@ -1483,13 +1968,30 @@ class _Signer(object):
                 '&Expiration=%s' % kwargs.get('expiration'))
 
 
+class _Observer(object):
+
+    def __init__(self):
+        self._chunks = []
+        self._retries = []
+
+    def on_chunk(self, transfer, num_bytes, elapsed):
+        self._chunks.append((num_bytes, elapsed))
+
+    def on_retry(self, transfer, exc):
+        self._retries.append(exc)
+
+
 class _Client(object):
 
+    current_batch = None
+
     def __init__(self, connection):
         self._connection = connection
 
     @property
     def connection(self):
+        if self.current_batch is not None:
+            return self.current_batch
         return self._connection
 
 
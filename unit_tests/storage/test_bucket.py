@@ -341,6 +341,53 @@ class Test_Bucket(unittest.TestCase):
         self.assertEqual(kw['path'], '/b/%s/o' % NAME)
         self.assertEqual(kw['query_params'], {'projection': 'noAcl'})
 
+    def _list_blobs_parallel(self, bucket, **kw):
+        from google.cloud.storage import bucket as MUT
+        from unit_tests._testing import _Monkey
+        discovered = []
+        listed = []
+
+        def _discover(*args):
+            discovered.append(args)
+            return ['a/', 'b/']
+
+        def _iter_shards(*args):
+            listed.append(args)
+            return iter(['BLOB'])
+
+        with _Monkey(MUT, discover_split_points=_discover,
+                     iter_shards=_iter_shards):
+            blobs = list(bucket.list_blobs_parallel(**kw))
+        self.assertEqual(blobs, ['BLOB'])
+        return discovered, listed
+
+    def test_list_blobs_parallel_defaults(self):
+        client = _Client(None)
+        bucket = self._makeOne(client=client, name='name')
+        discovered, listed = self._list_blobs_parallel(bucket)
+        self.assertEqual(discovered, [(bucket, None, '/', 32, client)])
+        self.assertEqual(listed, [(
+            bucket, [(None, 'a/'), ('a/', 'b/'), ('b/', None)],
+            {'projection': 'noAcl'}, True, 8, client)])
+
+    def test_list_blobs_parallel_w_split_points(self):
+        client = _Client(None)
+        bucket = self._makeOne(name='name')
+        discovered, listed = self._list_blobs_parallel(
+            bucket, prefix='logs/', split_points=['logs/2016-07'],
+            ordered=False, versions=True, projection='full',
+            fields='items/name,nextPageToken', max_workers=3, client=client)
+        self.assertEqual(discovered, [])
+        self.assertEqual(listed, [(
+            bucket, [(None, 'logs/2016-07'), ('logs/2016-07', None)],
+            {'prefix': 'logs/', 'versions': True, 'projection': 'full',
+             'fields': 'items/name,nextPageToken'}, False, 3, client)])
+
+    def test_list_blobs_parallel_w_unsorted_split_points(self):
+        bucket = self._makeOne(client=_Client(None), name='name')
+        with self.assertRaises(ValueError):
+            bucket.list_blobs_parallel(split_points=['b', 'a'])
+
     def test_delete_miss(self):
         from google.cloud.exceptions import NotFound
         NAME = 'name'
@@ -520,7 +567,7 @@ class Test_Bucket(unittest.TestCase):
             name = BLOB_NAME
             path = '/b/%s/o/%s' % (SOURCE, BLOB_NAME)
 
-        connection = _Connection({})
+        connection = _Connection(_rewrite_response(BLOB_NAME))
         client = _Client(connection)
         source = self._makeOne(client=client, name=SOURCE)
         dest = self._makeOne(client=client, name=DEST)
@@ -528,9 +575,10 @@ class Test_Bucket(unittest.TestCase):
         new_blob = source.copy_blob(blob, dest)
         self.assertIs(new_blob.bucket, dest)
         self.assertEqual(new_blob.name, BLOB_NAME)
+        self.assertEqual(new_blob.generation, 1)
         kw, = connection._requested
-        COPY_PATH = '/b/%s/o/%s/copyTo/b/%s/o/%s' % (SOURCE, BLOB_NAME,
-                                                     DEST, BLOB_NAME)
+        COPY_PATH = '/b/%s/o/%s/rewriteTo/b/%s/o/%s' % (SOURCE, BLOB_NAME,
+                                                        DEST, BLOB_NAME)
         self.assertEqual(kw['method'], 'POST')
         self.assertEqual(kw['path'], COPY_PATH)
 
@@ -544,7 +592,7 @@ class Test_Bucket(unittest.TestCase):
             name = BLOB_NAME
             path = '/b/%s/o/%s' % (SOURCE, BLOB_NAME)
 
-        connection = _Connection({})
+        connection = _Connection(_rewrite_response(NEW_NAME))
         client = _Client(connection)
         source = self._makeOne(client=client, name=SOURCE)
         dest = self._makeOne(client=client, name=DEST)
@@ -553,18 +601,74 @@ class Test_Bucket(unittest.TestCase):
         self.assertIs(new_blob.bucket, dest)
         self.assertEqual(new_blob.name, NEW_NAME)
         kw, = connection._requested
-        COPY_PATH = '/b/%s/o/%s/copyTo/b/%s/o/%s' % (SOURCE, BLOB_NAME,
-                                                     DEST, NEW_NAME)
+        COPY_PATH = '/b/%s/o/%s/rewriteTo/b/%s/o/%s' % (SOURCE, BLOB_NAME,
+                                                        DEST, NEW_NAME)
         self.assertEqual(kw['method'], 'POST')
         self.assertEqual(kw['path'], COPY_PATH)
 
+    def test_copy_blob_w_tokens_and_callback(self):
+        SOURCE = 'source'
+        DEST = 'dest'
+        BLOB_NAME = 'blob-name'
+        NOT_DONE_1 = {'totalBytesRewritten': '10', 'objectSize': '30',
+                      'done': False, 'rewriteToken': 'TOKEN1'}
+        NOT_DONE_2 = {'totalBytesRewritten': '20', 'objectSize': '30',
+                      'done': False, 'rewriteToken': 'TOKEN2'}
+        connection = _Connection(NOT_DONE_1, NOT_DONE_2,
+                                 _rewrite_response(BLOB_NAME, size=30))
+        client = _Client(connection)
+        source = self._makeOne(client=client, name=SOURCE)
+        dest = self._makeOne(client=client, name=DEST)
+        blob = source.blob(BLOB_NAME)
+        progress = []
+
+        def _callback(new_blob, rewritten, total):
+            progress.append((new_blob, rewritten, total))
+
+        new_blob = source.copy_blob(blob, dest, callback=_callback)
+
+        self.assertEqual(progress, [(new_blob, 10, 30), (new_blob, 20, 30),
+                                    (new_blob, 30, 30)])
+        self.assertEqual(new_blob.size, 30)
+        self.assertEqual(
+            [kw['query_params'] for kw in connection._requested],
+            [{}, {'rewriteToken': 'TOKEN1'}, {'rewriteToken': 'TOKEN2'}])
+
+    def test_copy_blobs(self):
+        from google.cloud.exceptions import NotFound
+        from google.cloud.storage import bucket as MUT
+        from unit_tests._testing import _Monkey
+        connection = _Connection(_rewrite_response('one'))
+        client = _Client(connection)
+        source = self._makeOne(client=client, name='source')
+        dest = self._makeOne(client=client, name='dest')
+        progress = []
+
+        def _callback(new_blob, rewritten, total):
+            progress.append((new_blob.name, rewritten, total))
+
+        run_concurrently = _RunConcurrently()
+        with _Monkey(MUT, run_concurrently=run_concurrently):
+            failures = source.copy_blobs(iter(['one', 'two']), dest,
+                                         max_workers=4, callback=_callback)
+
+        self.assertIs(run_concurrently._client, client)
+        self.assertEqual(run_concurrently._max_workers, 4)
+        self.assertEqual(progress, [('one', 42, 42)])
+        (blob, exc), = failures
+        self.assertEqual(blob.name, 'two')
+        self.assertIsInstance(exc, NotFound)
+        self.assertEqual([kw['path'] for kw in connection._requested], [
+            '/b/source/o/one/rewriteTo/b/dest/o/one',
+            '/b/source/o/two/rewriteTo/b/dest/o/two',
+        ])
+
     def test_rename_blob(self):
         BUCKET_NAME = 'BUCKET_NAME'
         BLOB_NAME = 'blob-name'
         NEW_BLOB_NAME = 'new-blob-name'
 
-        DATA = {'name': NEW_BLOB_NAME}
-        connection = _Connection(DATA)
+        connection = _Connection(_rewrite_response(NEW_BLOB_NAME))
         client = _Client(connection)
         bucket = self._makeOne(client=client, name=BUCKET_NAME)
 
@@ -584,6 +688,30 @@ class Test_Bucket(unittest.TestCase):
         self.assertEqual(renamed_blob.name, NEW_BLOB_NAME)
         self.assertEqual(blob._deleted, [client])
 
+    def test_rename_blob_in_batch(self):
+        from google.cloud.storage.batch import Batch
+        from google.cloud.storage.blob import Blob
+        from google.cloud.storage.client import Client
+        client = Client(project='PROJECT', http=object())
+        bucket = self._makeOne(client=client, name='name')
+        blob = Blob('blob-name', bucket=bucket)
+        batch = Batch(client)
+        client._push_batch(batch)
+        try:
+            new_blob = bucket.rename_blob(blob, 'new-name')
+        finally:
+            client._pop_batch()
+
+        (copy_method, copy_url, _, _), (delete_method, delete_url, _, _) = (
+            batch._requests)
+        self.assertEqual(copy_method, 'POST')
+        self.assertTrue(copy_url.endswith(
+            '/b/name/o/blob-name/copyTo/b/name/o/new-name'))
+        self.assertEqual(delete_method, 'DELETE')
+        self.assertTrue(delete_url.endswith('/b/name/o/blob-name'))
+        self.assertIs(batch._target_objects[0], new_blob)
+        self.assertEqual(new_blob.name, 'new-name')
+
     def test_etag(self):
         ETAG = 'ETAG'
         properties = {'etag': ETAG}
@@ -989,6 +1117,181 @@ class Test_Bucket(unittest.TestCase):
         bucket._MAX_OBJECTS_FOR_ITERATION = 1
         self.assertRaises(ValueError, bucket.make_public, recursive=True)
 
+    def _bulk_helper(self, method_name, *args, **kw):
+        from google.cloud.storage import bucket as MUT
+        from unit_tests._testing import _Monkey
+        payloads = kw.pop('payloads', ())
+        client = _Client(_Connection())
+        bucket = self._makeOne(client=client, name='name')
+        run_batches = _RunBatches(payloads, failures=['FAILURES'])
+        with _Monkey(MUT, run_batches=run_batches):
+            failures = getattr(bucket, method_name)(*args, **kw)
+        self.assertEqual(failures, ['FAILURES'])
+        self.assertIs(run_batches._client, client)
+        return bucket, run_batches
+
+    def test_bulk_delete(self):
+        from google.cloud.storage.blob import Blob
+        blob = Blob('two', bucket=None)
+        blob.bucket = self._makeOne(name='name')
+        bucket, run_batches = self._bulk_helper(
+            'bulk_delete', iter(['one', blob]), max_workers=3)
+        self.assertEqual(run_batches._max_workers, 3)
+        self.assertEqual(run_batches._items[0].name, 'one')
+        self.assertIs(run_batches._items[0].bucket, bucket)
+        self.assertIs(run_batches._items[1], blob)
+        self.assertEqual(run_batches._requested, [
+            {'method': 'DELETE', 'path': '/b/name/o/one',
+             '_target_object': None},
+            {'method': 'DELETE', 'path': '/b/name/o/two',
+             '_target_object': None},
+        ])
+
+    def test_bulk_patch_w_properties(self):
+        from google.cloud.storage._bulk import DEFAULT_MAX_WORKERS
+        properties = {'metadata': {'retain': 'false'}}
+        payloads = [{'name': 'one', 'generation': '1'},
+                    {'name': 'two', 'generation': '2'}]
+        _, run_batches = self._bulk_helper(
+            'bulk_patch', ['one', 'two'], properties, payloads=payloads)
+        self.assertEqual(run_batches._max_workers, DEFAULT_MAX_WORKERS)
+        self.assertEqual(run_batches._requested, [
+            {'method': 'PATCH', 'path': '/b/name/o/one', 'data': properties,
+             'query_params': {'projection': 'full'}, '_target_object': None},
+            {'method': 'PATCH', 'path': '/b/name/o/two', 'data': properties,
+             'query_params': {'projection': 'full'}, '_target_object': None},
+        ])
+        blob1, blob2 = run_batches._items
+        self.assertEqual(blob1.generation, 1)
+        self.assertEqual(blob2.generation, 2)
+
+    def test_bulk_patch_w_changes(self):
+        from google.cloud.storage.blob import Blob
+        bucket = self._makeOne(name='name')
+        blob = Blob('one', bucket=bucket)
+        blob.content_type = 'text/plain'
+        payload = {'name': 'one', 'contentType': 'text/plain'}
+        _, run_batches = self._bulk_helper(
+            'bulk_patch', [blob], payloads=[payload])
+        self.assertEqual(run_batches._requested, [
+            {'method': 'PATCH', 'path': '/b/name/o/one',
+             'data': {'contentType': 'text/plain'},
+             'query_params': {'projection': 'full'}, '_target_object': None},
+        ])
+        self.assertEqual(blob._changes, set())
+        self.assertEqual(blob.content_type, 'text/plain')
+
+    def test_bulk_save_acl_w_predefined(self):
+        permissive = [{'entity': 'allUsers', 'role': 'READER'}]
+        _, run_batches = self._bulk_helper(
+            'bulk_save_acl', ['one'], predefined='public-read',
+            payloads=[{'acl': permissive}])
+        self.assertEqual(run_batches._requested, [
+            {'method': 'PATCH', 'path': '/b/name/o/one', 'data': {'acl': []},
+             'query_params': {'projection': 'full',
+                              'predefinedAcl': 'publicRead'},
+             '_target_object': None},
+        ])
+        blob, = run_batches._items
+        self.assertTrue(blob.acl.loaded)
+        self.assertEqual(list(blob.acl), permissive)
+
+    def test_bulk_save_acl_w_acl(self):
+        from google.cloud.storage.acl import ObjectACL
+        acl = ObjectACL(_Bucket())
+        acl.loaded = True
+        acl.user('phred@example.com').grant_read()
+        expected = [{'entity': 'user-phred@example.com', 'role': 'READER'}]
+        _, run_batches = self._bulk_helper(
+            'bulk_save_acl', ['one'], acl=acl, payloads=[{}])
+        self.assertEqual(run_batches._requested, [
+            {'method': 'PATCH', 'path': '/b/name/o/one',
+             'data': {'acl': expected},
+             'query_params': {'projection': 'full'}, '_target_object': None},
+        ])
+        blob, = run_batches._items
+        self.assertTrue(blob.acl.loaded)
+        self.assertEqual(list(blob.acl), [])
+
+    def test_bulk_save_acl_w_blob_acls(self):
+        from google.cloud.storage.blob import Blob
+        bucket = self._makeOne(name='name')
+        blob = Blob('one', bucket=bucket)
+        blob.acl.loaded = True
+        blob.acl.all().grant_read()
+        permissive = [{'entity': 'allUsers', 'role': 'READER'}]
+        _, run_batches = self._bulk_helper(
+            'bulk_save_acl', [blob], payloads=[{'acl': permissive}])
+        self.assertEqual(run_batches._requested, [
+            {'method': 'PATCH', 'path': '/b/name/o/one',
+             'data': {'acl': permissive},
+             'query_params': {'projection': 'full'}, '_target_object': None},
+        ])
+        self.assertEqual(list(blob.acl), permissive)
+
+    def test_bulk_save_acl_w_acl_and_predefined(self):
+        bucket = self._makeOne(name='name')
+        with self.assertRaises(ValueError):
+            bucket.bulk_save_acl(['one'], acl=[], predefined='publicRead')
+
+    def test_bulk_save_acl_w_invalid_predefined(self):
+        bucket = self._makeOne(name='name')
+        with self.assertRaises(ValueError):
+            bucket.bulk_save_acl(['one'], predefined='bogus')
+
+    def test_bulk_set_storage_class(self):
+        from google.cloud.storage.blob import Blob
+        from google.cloud.storage import bucket as MUT
+        from unit_tests._testing import _Monkey
+        connection = _Connection(_rewrite_response('one'))
+        client = _Client(connection)
+        bucket = self._makeOne(client=client, name='name')
+        blob = Blob('one', bucket=bucket)
+        blob._set_properties({'name': 'one', 'generation': '1'})
+        run_concurrently = _RunConcurrently()
+        with _Monkey(MUT, run_concurrently=run_concurrently):
+            failures = bucket.bulk_set_storage_class([blob], 'NEARLINE',
+                                                     max_workers=2)
+        self.assertEqual(failures, [])
+        self.assertEqual(run_concurrently._max_workers, 2)
+        self.assertEqual(blob.generation, 1)
+        self.assertEqual(blob._changes, set())
+        kw, = connection._requested
+        self.assertEqual(kw['method'], 'POST')
+        self.assertEqual(kw['path'], '/b/name/o/one/rewriteTo/b/name/o/one')
+        self.assertEqual(kw['data'], {'storageClass': 'NEARLINE'})
+
+    def test_bulk_set_storage_class_keeps_properties(self):
+        from google.cloud.storage import bucket as MUT
+        from unit_tests._testing import _Monkey
+        PROPERTIES = {
+            'cacheControl': 'no-cache',
+            'contentDisposition': 'attachment',
+            'contentEncoding': 'gzip',
+            'contentLanguage': 'en',
+            'contentType': 'text/plain',
+            'metadata': {'owner': 'me'},
+        }
+        resource = {'name': 'one', 'generation': '1', 'size': '42',
+                    'storageClass': 'STANDARD'}
+        resource.update(PROPERTIES)
+        connection = _Connection(resource, _rewrite_response('one'))
+        client = _Client(connection)
+        bucket = self._makeOne(client=client, name='name')
+        with _Monkey(MUT, run_concurrently=_RunConcurrently()):
+            failures = bucket.bulk_set_storage_class(['one'], 'NEARLINE')
+        self.assertEqual(failures, [])
+        reload_kw, rewrite_kw = connection._requested
+        self.assertEqual(reload_kw['method'], 'GET')
+        self.assertEqual(reload_kw['path'], '/b/name/o/one')
+        expected = dict(PROPERTIES, storageClass='NEARLINE')
+        self.assertEqual(rewrite_kw['data'], expected)
+
+    def test_bulk_set_storage_class_invalid(self):
+        bucket = self._makeOne(name='name')
+        with self.assertRaises(ValueError):
+            bucket.bulk_set_storage_class(['one'], 'BOGUS')
+
 
 class _Connection(object):
     _delete_bucket = False
@@ -1034,6 +1337,61 @@ class _Bucket(object):
 
 class _Client(object):
 
+    current_batch = None
+
     def __init__(self, connection, project=None):
-        self.connection = connection
+        self.connection = self._connection = connection
         self.project = project
+
+
+class _Batch(object):
+
+    def __init__(self):
+        self._requested = []
+
+    def api_request(self, **kw):
+        self._requested.append(kw)
+
+
+class _RunBatches(object):
+
+    def __init__(self, payloads, failures):
+        self._payloads = payloads
+        self._failures = failures
+
+    def __call__(self, client, items, request_func, response_func,
+                 max_workers):
+        self._client = client
+        self._max_workers = max_workers
+        self._items = list(items)
+        batch = _Batch()
+        for item in self._items:
+            request_func(batch, item)
+        self._requested = batch._requested
+        for item, payload in zip(self._items, self._payloads):
+            response_func(item, payload)
+        return self._failures
+
+
+class _RunConcurrently(object):
+
+    def __call__(self, client, items, func, max_workers):
+        from google.cloud.exceptions import GoogleCloudError
+        self._client = client
+        self._max_workers = max_workers
+        failures = []
+        for item in items:
+            try:
+                func(item, client)
+            except GoogleCloudError as exc:
+                failures.append((item, exc))
+        return failures
+
+
+def _rewrite_response(name, size=42):
+    return {
+        'totalBytesRewritten': str(size),
+        'objectSize': str(size),
+        'done': True,
+        'resource': {'name': name, 'generation': '1', 'size': str(size)},
+    }
@@ -0,0 +1,464 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class _TempDirMixin(object):
+
+    def _makeTempDir(self):
+        import shutil
+        import tempfile
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        return temp_dir
+
+
+class Test__cache_key(unittest.TestCase):
+
+    def _callFUT(self, *parts):
+        from google.cloud.storage.cache import _cache_key
+        return _cache_key(*parts)
+
+    def test_it(self):
+        key = self._callFUT('bucket', 'name', '1')
+        self.assertEqual(key, self._callFUT(u'bucket', u'name', u'1'))
+        self.assertEqual(len(key), 40)
+        self.assertNotEqual(key, self._callFUT('bucket', 'name', '2'))
+        self.assertNotEqual(self._callFUT('a', 'bc'), self._callFUT('ab', 'c'))
+
+
+class Test__FileLock(unittest.TestCase, _TempDirMixin):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.cache import _FileLock
+        return _FileLock
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_exclusive(self):
+        import os
+        path = os.path.join(self._makeTempDir(), 'lock')
+        with self._makeOne(path):
+            self.assertTrue(os.path.exists(path))
+            other = self._makeOne(path)
+            self.assertFalse(other.acquire(blocking=False))
+            self.assertFalse(self._makeOne(path, shared=True).acquire(
+                blocking=False))
+        self.assertTrue(other.acquire(blocking=False))
+        other.release()
+
+    def test_shared(self):
+        import os
+        path = os.path.join(self._makeTempDir(), 'lock')
+        with self._makeOne(path, shared=True):
+            other = self._makeOne(path, shared=True)
+            self.assertTrue(other.acquire(blocking=False))
+            other.release()
+            self.assertFalse(self._makeOne(path).acquire(blocking=False))
+
+    def test_lock_file_removed_while_waiting(self):
+        import os
+        from google.cloud.storage import cache as MUT
+        from unit_tests._testing import _Monkey
+        path = os.path.join(self._makeTempDir(), 'lock')
+        fcntl = _EvictingFcntl(path)
+        lock = self._makeOne(path)
+        with _Monkey(MUT, fcntl=fcntl):
+            self.assertTrue(lock.acquire())
+        self.assertEqual(fcntl.calls, 2)
+        self.assertEqual(os.fstat(lock._file.fileno()).st_ino,
+                         os.stat(path).st_ino)
+        lock.release()
+
+    def test_blocking_error(self):
+        import os
+        from google.cloud.storage import cache as MUT
+        from unit_tests._testing import _Monkey
+        path = os.path.join(self._makeTempDir(), 'lock')
+        with _Monkey(MUT, fcntl=_BrokenFcntl()):
+            with self.assertRaises(IOError):
+                self._makeOne(path).acquire()
+
+
+class TestBlobCache(unittest.TestCase, _TempDirMixin):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.cache import BlobCache
+        return BlobCache
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _read(self, cache, blob, client=None):
+        from io import BytesIO
+        buf = BytesIO()
+        cache.download_to_file(blob, buf, client=client)
+        return buf.getvalue()
+
+    def _entries(self, cache):
+        import os
+        return sorted(name for name in os.listdir(cache.directory)
+                      if name.endswith('.data'))
+
+    def test_ctor(self):
+        import os
+        directory = os.path.join(self._makeTempDir(), 'a', 'b')
+        cache = self._makeOne(directory, max_bytes=10, ttl=5)
+        self.assertTrue(os.path.isdir(directory))
+        self.assertEqual((cache.directory, cache.max_bytes, cache.ttl),
+                         (directory, 10, 5))
+        # An existing directory is fine.
+        self._makeOne(directory)
+
+    def test_read_through(self):
+        cache = self._makeOne(self._makeTempDir())
+        server = _Server(b'ONE')
+        blob = _Blob(server)
+        client = object()
+        self.assertEqual(self._read(cache, blob, client), b'ONE')
+        self.assertEqual(self._read(cache, blob), b'ONE')
+        self.assertEqual(server.downloads, 1)
+        self.assertEqual(server.reloads, [client, None])
+        self.assertEqual(len(self._entries(cache)), 1)
+
+        server.put(b'TWO')
+        self.assertEqual(self._read(cache, blob), b'TWO')
+        self.assertEqual(server.downloads, 2)
+        self.assertEqual(len(self._entries(cache)), 2)
+
+        # Other blobs (and buckets) get their own entries.
+        other = _Blob(_Server(b'ONE'), bucket_name='other')
+        self.assertEqual(self._read(cache, other), b'ONE')
+        self.assertEqual(len(self._entries(cache)), 3)
+
+    def test_download_pinned_to_generation(self):
+        cache = self._makeOne(self._makeTempDir())
+        server = _Server(b'ONE')
+        blob = _Blob(server)
+        reload = blob.reload
+
+        def _reload(client=None):
+            reload(client)
+            server.put(b'TWO')  # Overwritten after the check.
+
+        blob.reload = _reload
+        self.assertEqual(self._read(cache, blob), b'ONE')
+        self.assertEqual(server.media_links,
+                         ['https://example.com/download/name?'
+                          'alt=media&generation=1'])
+        with open(cache._entry_paths(blob, 1)[0], 'rb') as file_obj:
+            self.assertEqual(file_obj.read(), b'ONE')
+        # The blob's own media link is unchanged.
+        self.assertEqual(blob.media_link,
+                         'https://example.com/download/name?alt=media')
+
+    def test_ttl(self):
+        from google.cloud.storage import cache as MUT
+        from unit_tests._testing import _Monkey
+        cache = self._makeOne(self._makeTempDir(), ttl=60)
+        server = _Server(b'ONE')
+        clock = _Clock(1000.0)
+        with _Monkey(MUT, time=clock):
+            self.assertEqual(self._read(cache, _Blob(server)), b'ONE')
+            server.put(b'TWO')
+            clock.now += 60
+            # Trusted:  no request at all.
+            self.assertEqual(self._read(cache, _Blob(server)), b'ONE')
+            self.assertEqual(len(server.reloads), 1)
+            clock.now += 1
+            self.assertEqual(self._read(cache, _Blob(server)), b'TWO')
+            self.assertEqual(len(server.reloads), 2)
+            self.assertEqual(server.downloads, 2)
+
+    def test_ttl_w_evicted_entry(self):
+        import os
+        cache = self._makeOne(self._makeTempDir(), ttl=60)
+        server = _Server(b'ONE')
+        self._read(cache, _Blob(server))
+        for name in self._entries(cache):
+            os.remove(os.path.join(cache.directory, name))
+        self.assertEqual(self._read(cache, _Blob(server)), b'ONE')
+        self.assertEqual((len(server.reloads), server.downloads), (2, 2))
+
+    def test_ttl_w_corrupt_ref(self):
+        import os
+        cache = self._makeOne(self._makeTempDir(), ttl=60)
+        server = _Server(b'ONE')
+        blob = _Blob(server)
+        self._read(cache, blob)
+        with open(cache._ref_path(blob), 'w') as file_obj:
+            file_obj.write('{')
+        self.assertEqual(self._read(cache, blob), b'ONE')
+        self.assertEqual((len(server.reloads), server.downloads), (2, 1))
+        self.assertFalse([name for name in os.listdir(cache.directory)
+                          if name.startswith('.tmp-')])
+
+    def test_download_failure(self):
+        import os
+        from google.cloud.exceptions import NotFound
+        cache = self._makeOne(self._makeTempDir())
+        server = _Server(b'ONE', error=NotFound('gone'))
+        with self.assertRaises(NotFound):
+            self._read(cache, _Blob(server))
+        self.assertEqual(self._entries(cache), [])
+        self.assertFalse([name for name in os.listdir(cache.directory)
+                          if name.startswith('.tmp-')])
+
+    def test_shared_download(self):
+        import threading
+        cache = self._makeOne(self._makeTempDir())
+        server = _Server(b'DATA', gate=threading.Event())
+        results = []
+
+        def _reader():
+            results.append(self._read(cache, _Blob(server)))
+
+        readers = [threading.Thread(target=_reader) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        server.started.wait()
+        server.gate.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(results, [b'DATA'] * 4)
+        self.assertEqual(server.downloads, 1)
+
+    def test_evicted_before_read(self):
+        import os
+        cache = self._makeOne(self._makeTempDir())
+        server = _Server(b'DATA')
+        fetch = cache._fetch
+        evicted = []
+
+        def _fetch(blob, client, checksum):
+            data_path, lock_path = fetch(blob, client, checksum)
+            if not evicted:  # Another process evicts it, just once.
+                evicted.append(data_path)
+                os.remove(data_path)
+            return data_path, lock_path
+
+        cache._fetch = _fetch
+        self.assertEqual(self._read(cache, _Blob(server)), b'DATA')
+        self.assertEqual(server.downloads, 2)
+        self.assertEqual(len(evicted), 1)
+
+    def test_download_w_checksum(self):
+        from io import BytesIO
+        cache = self._makeOne(self._makeTempDir())
+        server = _Server(b'DATA')
+        for _ in range(2):
+            buf = BytesIO()
+            cache.download_to_file(_Blob(server), buf, checksum='md5')
+            self.assertEqual(buf.getvalue(), b'DATA')
+        # Only the download filling the cache is verified.
+        self.assertEqual(server.checksums, ['md5'])
+
+    def test_download_to_filename(self):
+        import datetime
+        import os
+        import time
+        cache = self._makeOne(self._makeTempDir())
+        updated = datetime.datetime(2016, 6, 1, 12)
+        target = os.path.join(self._makeTempDir(), 'target')
+        cache.download_to_filename(_Blob(_Server(b'DATA', updated=updated)),
+                                   target)
+        with open(target, 'rb') as file_obj:
+            self.assertEqual(file_obj.read(), b'DATA')
+        self.assertEqual(os.path.getmtime(target),
+                         time.mktime(updated.timetuple()))
+
+        cache.download_to_filename(_Blob(_Server(b'OTHER'), name='other'),
+                                   target)
+        with open(target, 'rb') as file_obj:
+            self.assertEqual(file_obj.read(), b'OTHER')
+
+    def test_evict_lru(self):
+        import os
+        cache = self._makeOne(self._makeTempDir(), max_bytes=8)
+        blobs = [_Blob(_Server(b'DATA'), name=name) for name in 'abc']
+        self._read(cache, blobs[0])
+        self._read(cache, blobs[1])
+        data_a = cache._entry_paths(blobs[0], 1)[0]
+        data_b = cache._entry_paths(blobs[1], 1)[0]
+        os.utime(data_a, (1000, 1000))
+        os.utime(data_b, (2000, 2000))
+        self.assertEqual(len(self._entries(cache)), 2)
+        self._read(cache, blobs[2])  # Evicts 'a', the least recently used.
+        self.assertFalse(os.path.exists(data_a))
+        self.assertTrue(os.path.exists(data_b))
+        # Lock files go with their entries.
+        self.assertEqual(
+            sorted(name for name in os.listdir(cache.directory)
+                   if name.endswith('.lock')),
+            sorted(os.path.basename(cache._entry_paths(blob, 1)[1])
+                   for blob in blobs[1:]))
+
+        # The entry just read is never evicted.
+        cache.max_bytes = 0
+        self._read(cache, blobs[0])
+        self.assertEqual(self._entries(cache),
+                         [os.path.basename(cache._entry_paths(blobs[0],
+                                                              1)[0])])
+
+    def test_evict_skips_entries_being_read(self):
+        import os
+        from google.cloud.storage.cache import _FileLock
+        cache = self._makeOne(self._makeTempDir(), max_bytes=4)
+        first, second = _Blob(_Server(b'DATA'), 'a'), _Blob(_Server(b'DATA'))
+        self._read(cache, first)
+        data_path, lock_path = cache._entry_paths(first, 1)
+        os.utime(data_path, (1000, 1000))
+        with _FileLock(lock_path, shared=True):
+            self._read(cache, second)
+        self.assertTrue(os.path.exists(data_path))
+        self.assertEqual(len(self._entries(cache)), 2)
+
+    def test_evict_expired_refs(self):
+        import os
+        import time
+        cache = self._makeOne(self._makeTempDir(), max_bytes=100, ttl=60)
+        old, new = _Blob(_Server(b'OLD'), 'old'), _Blob(_Server(b'NEW'))
+        self._read(cache, old)
+        old_ref = cache._ref_path(old)
+        expired = time.time() - 61
+        os.utime(old_ref, (expired, expired))
+        self._read(cache, new)
+        self.assertFalse(os.path.exists(old_ref))
+        self.assertTrue(os.path.exists(cache._ref_path(new)))
+
+    def test_evict_wo_ttl_removes_refs(self):
+        import os
+        cache = self._makeOne(self._makeTempDir(), max_bytes=100)
+        ref_path = cache._ref_path(_Blob(_Server(b'DATA')))
+        with open(ref_path, 'w') as file_obj:
+            file_obj.write('{}')
+        self._read(cache, _Blob(_Server(b'DATA')))
+        self.assertFalse(os.path.exists(ref_path))
+
+    def test_evict_races(self):
+        import os
+        cache = self._makeOne(self._makeTempDir(), max_bytes=0)
+        # Entries removed by other processes while evicting.
+        os.symlink(os.path.join(cache.directory, 'missing'),
+                   os.path.join(cache.directory, 'dangling.data'))
+        os.mkdir(os.path.join(cache.directory, 'undeletable.data'))
+        os.mkdir(os.path.join(cache.directory, 'undeletable.ref'))
+        self.assertEqual(self._read(cache, _Blob(_Server(b'DATA'))), b'DATA')
+
+
+class _BrokenFcntl(object):
+    LOCK_SH = 1
+    LOCK_EX = 2
+    LOCK_NB = 4
+
+    @staticmethod
+    def flock(fileno, flags):
+        raise IOError('nope')
+
+
+class _EvictingFcntl(object):
+    """Removes the lock file while the first lock is waited for."""
+    LOCK_SH = 1
+    LOCK_EX = 2
+    LOCK_NB = 4
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = 0
+
+    def flock(self, fileno, flags):
+        import os
+        self.calls += 1
+        if self.calls == 1:
+            os.remove(self.path)
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class _Server(object):
+    """The current generation of an object, as seen by the back-end."""
+
+    def __init__(self, data, updated=None, error=None, gate=None):
+        import threading
+        self.generation = 1
+        self.versions = {1: data}
+        self.updated = updated
+        self.error = error
+        self.gate = gate
+        self.started = threading.Event()
+        self.reloads = []
+        self.downloads = 0
+        self.media_links = []
+        self.checksums = []
+
+    def put(self, data):
+        self.generation += 1
+        self.versions[self.generation] = data
+
+
+class _Bucket(object):
+
+    def __init__(self, name):
+        self.name = name
+
+
+class _Blob(object):
+
+    def __init__(self, server, name='name', bucket_name='bucket'):
+        self._server = server
+        self.name = name
+        self.bucket = _Bucket(bucket_name)
+        self.generation = None
+        self.updated = None
+        self._properties = {}
+
+    @property
+    def media_link(self):
+        return self._properties.get('mediaLink')
+
+    def reload(self, client=None):
+        self._server.reloads.append(client)
+        self.generation = self._server.generation
+        self.updated = self._server.updated
+        self._properties = {
+            'generation': str(self.generation),
+            'mediaLink': 'https://example.com/download/%s?alt=media' % (
+                self.name,),
+        }
+
+    def download_to_file(self, file_obj, client=None, checksum='auto'):
+        from six.moves.urllib.parse import parse_qs
+        from six.moves.urllib.parse import urlsplit
+        server = self._server
+        server.downloads += 1
+        server.checksums.append(checksum)
+        server.started.set()
+        if server.gate is not None:
+            server.gate.wait()
+        query = parse_qs(urlsplit(self.media_link).query)
+        self._server.media_links.append(self.media_link)
+        data = server.versions[int(query['generation'][0])]
+        file_obj.write(data[:1])
+        if server.error is not None:
+            raise server.error
+        file_obj.write(data[1:])
@@ -0,0 +1,298 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.resumable_state import SessionStore
+        return SessionStore
+
+    def _makeOne(self):
+        return self._getTargetClass()()
+
+    def test_load(self):
+        store = self._makeOne()
+        self.assertRaises(NotImplementedError, store.load, 'key')
+
+    def test_save(self):
+        store = self._makeOne()
+        self.assertRaises(NotImplementedError, store.save, 'key', {})
+
+    def test_delete(self):
+        store = self._makeOne()
+        self.assertRaises(NotImplementedError, store.delete, 'key')
+
+
+class _StoreTestsMixin(object):
+
+    FILENAME = None
+
+    def setUp(self):
+        import tempfile
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tempdir)
+
+    def _makeOne(self):
+        import os
+        path = os.path.join(self.tempdir, self.FILENAME)
+        return self._getTargetClass()(path)
+
+    def test_load_miss(self):
+        store = self._makeOne()
+        self.assertIsNone(store.load('bucket/name'))
+
+    def test_save_then_load(self):
+        STATE = {'url': 'http://example.com/upload', 'offset': 5}
+        store = self._makeOne()
+        store.save('bucket/name', STATE)
+        self.assertEqual(store.load('bucket/name'), STATE)
+        self.assertIsNone(store.load('bucket/other'))
+
+    def test_save_replaces(self):
+        store = self._makeOne()
+        store.save('bucket/name', {'offset': 0})
+        store.save('bucket/name', {'offset': 5})
+        self.assertEqual(store.load('bucket/name'), {'offset': 5})
+
+    def test_save_shared_between_instances(self):
+        store = self._makeOne()
+        store.save('bucket/name', {'offset': 5})
+        other = self._makeOne()
+        self.assertEqual(other.load('bucket/name'), {'offset': 5})
+
+    def test_delete(self):
+        store = self._makeOne()
+        store.save('bucket/name', {'offset': 0})
+        store.save('bucket/other', {'offset': 1})
+        store.delete('bucket/name')
+        self.assertIsNone(store.load('bucket/name'))
+        self.assertEqual(store.load('bucket/other'), {'offset': 1})
+
+    def test_delete_miss(self):
+        store = self._makeOne()
+        store.delete('bucket/name')
+        self.assertIsNone(store.load('bucket/name'))
+
+
+class TestFileSessionStore(_StoreTestsMixin, unittest.TestCase):
+
+    FILENAME = 'sessions.json'
+
+    def _getTargetClass(self):
+        from google.cloud.storage.resumable_state import FileSessionStore
+        return FileSessionStore
+
+    def test_ctor(self):
+        import os
+        store = self._makeOne()
+        path = os.path.join(self.tempdir, 'sessions.json')
+        self.assertEqual(store.path, path)
+        self.assertFalse(os.path.exists(store.path))
+
+    def test_save_leaves_no_temp_file(self):
+        import os
+        store = self._makeOne()
+        store.save('bucket/name', {'offset': 0})
+        self.assertEqual(os.listdir(self.tempdir), ['sessions.json'])
+
+
+class TestSQLiteSessionStore(_StoreTestsMixin, unittest.TestCase):
+
+    FILENAME = 'sessions.db'
+
+    def _getTargetClass(self):
+        from google.cloud.storage.resumable_state import SQLiteSessionStore
+        return SQLiteSessionStore
+
+    def test_ctor(self):
+        import os
+        store = self._makeOne()
+        path = os.path.join(self.tempdir, 'sessions.db')
+        self.assertEqual(store.path, path)
+        self.assertTrue(os.path.exists(store.path))
+
+
+class Test_ResumableSession(unittest.TestCase):
+
+    UPLOAD_URL = 'http://example.com/upload/name/key'
+
+    def setUp(self):
+        import tempfile
+        temp = tempfile.NamedTemporaryFile(delete=False)
+        temp.write(b'ABCDEF')
+        temp.close()
+        self.filename = temp.name
+
+    def tearDown(self):
+        import os
+        os.remove(self.filename)
+
+    def _getTargetClass(self):
+        from google.cloud.storage.resumable_state import _ResumableSession
+        return _ResumableSession
+
+    def _makeOne(self, store):
+        with open(self.filename, 'rb') as file_obj:
+            return self._getTargetClass()(store, _Blob(), file_obj)
+
+    def _identity(self):
+        import os
+        stat = os.stat(self.filename)
+        return {
+            'bucket': 'bucket',
+            'name': 'name',
+            'filename': os.path.abspath(self.filename),
+            'size': 6,
+            'mtime': stat.st_mtime,
+        }
+
+    def test_ctor(self):
+        store = _Store()
+        session = self._makeOne(store)
+        self.assertEqual(session.key, 'bucket/name')
+        self.assertEqual(session._identity, self._identity())
+        self.assertIs(session._store, store)
+
+    def test_ctor_wo_name(self):
+        klass = self._getTargetClass()
+        with open(self.filename, 'rb') as file_obj:
+            session = klass(_Store(), _Blob(), _Unnamed(file_obj))
+        self.assertIsNone(session._identity['filename'])
+        self.assertEqual(session._identity['size'], 6)
+
+    def test_ctor_wo_file(self):
+        import io
+        klass = self._getTargetClass()
+        self.assertRaises(ValueError, klass, _Store(), _Blob(),
+                          io.BytesIO(b'ABCDEF'))
+
+    def test_resume_wo_state(self):
+        session = self._makeOne(_Store())
+        upload = _Upload()
+        self.assertFalse(session.resume(upload, object()))
+        self.assertEqual(upload._resumed, [])
+
+    def test_resume_w_changed_file(self):
+        state = dict(self._identity(), size=3, url=self.UPLOAD_URL, offset=0)
+        store = _Store({'bucket/name': state})
+        session = self._makeOne(store)
+        upload = _Upload()
+        self.assertFalse(session.resume(upload, object()))
+        self.assertEqual(upload._resumed, [])
+        self.assertEqual(store._states, {})
+
+    def test_resume_w_http_error(self):
+        state = dict(self._identity(), url=self.UPLOAD_URL, offset=0)
+        store = _Store({'bucket/name': state})
+        session = self._makeOne(store)
+        upload = _Upload(fail=True)
+        http = object()
+        self.assertFalse(session.resume(upload, http))
+        self.assertEqual(upload._resumed, [(self.UPLOAD_URL, http)])
+        self.assertEqual(store._states, {})
+
+    def test_resume(self):
+        state = dict(self._identity(), url=self.UPLOAD_URL, offset=3)
+        store = _Store({'bucket/name': state})
+        session = self._makeOne(store)
+        upload = _Upload()
+        http = object()
+        self.assertTrue(session.resume(upload, http))
+        self.assertEqual(upload._resumed, [(self.UPLOAD_URL, http)])
+        self.assertEqual(session._state, state)
+        self.assertEqual(store._states, {'bucket/name': state})
+
+    def test_start(self):
+        store = _Store()
+        session = self._makeOne(store)
+        upload = _Upload(url=self.UPLOAD_URL)
+        session.start(upload)
+        expected = dict(self._identity(), url=self.UPLOAD_URL, offset=0)
+        self.assertEqual(store._states, {'bucket/name': expected})
+
+    def test_record_incomplete(self):
+        import io
+        store = _Store()
+        session = self._makeOne(store)
+        upload = _Upload(url=self.UPLOAD_URL)
+        session.start(upload)
+        upload.stream = io.BytesIO(b'ABCDEF')
+        upload.stream.seek(4)
+        session.record(object(), upload)
+        expected = dict(self._identity(), url=self.UPLOAD_URL, offset=4)
+        self.assertEqual(store._states, {'bucket/name': expected})
+
+    def test_record_complete(self):
+        store = _Store()
+        session = self._makeOne(store)
+        upload = _Upload(url=self.UPLOAD_URL)
+        session.start(upload)
+        upload.complete = True
+        session.record(object(), upload)
+        self.assertEqual(store._states, {})
+
+
+class _Store(object):
+
+    def __init__(self, states=None):
+        self._states = dict(states or {})
+
+    def load(self, key):
+        return self._states.get(key)
+
+    def save(self, key, state):
+        self._states[key] = dict(state)
+
+    def delete(self, key):
+        self._states.pop(key, None)
+
+
+class _Unnamed(object):
+
+    def __init__(self, file_obj):
+        self._file_obj = file_obj
+
+    def fileno(self):
+        return self._file_obj.fileno()
+
+
+class _Bucket(object):
+    name = 'bucket'
+
+
+class _Blob(object):
+    name = 'name'
+    bucket = _Bucket()
+
+
+class _Upload(object):
+    complete = False
+    stream = None
+
+    def __init__(self, url=None, fail=False):
+        self.url = url
+        self._fail = fail
+        self._resumed = []
+
+    def resume_upload(self, url, http):
+        from google.cloud.streaming.exceptions import HttpError
+        self._resumed.append((url, http))
+        if self._fail:
+            raise HttpError({'status': 404}, b'', url)
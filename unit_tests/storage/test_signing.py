@@ -0,0 +1,285 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+_KEYS = []
+
+
+def _make_key():
+    """Return a (small, hence fast) RSA key pair, made once."""
+    import rsa
+    if not _KEYS:
+        _KEYS.extend(rsa.newkeys(512))
+    public_key, private_key = _KEYS
+    return public_key, private_key.save_pkcs1()
+
+
+def _parse_url(url):
+    from six.moves.urllib.parse import parse_qs
+    from six.moves.urllib.parse import urlsplit
+    parts = urlsplit(url)
+    query = dict((key, values[0])
+                 for key, values in parse_qs(parts.query).items())
+    return parts.path, query
+
+
+class Test__KeyCredentials(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.signing import _KeyCredentials
+        return _KeyCredentials
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_sign_blob(self):
+        import rsa
+        public_key, private_key_pem = _make_key()
+        credentials = self._makeOne('sa@example.com', private_key_pem)
+        self.assertEqual(credentials.service_account_email, 'sa@example.com')
+        key_id, signature = credentials.sign_blob(b'DATA')
+        self.assertIsNone(key_id)
+        self.assertEqual(rsa.verify(b'DATA', signature, public_key), 'SHA-256')
+
+
+class Test__sign_in_worker(unittest.TestCase):
+
+    def _callFUT(self, request):
+        from google.cloud.storage.signing import _sign_in_worker
+        return _sign_in_worker(request)
+
+    def test_it(self):
+        import base64
+        import rsa
+        from google.cloud.storage import signing as MUT
+        from unit_tests._testing import _Monkey
+        public_key, private_key_pem = _make_key()
+        options = ('GET', None, None, None, None, None)
+        with _Monkey(MUT, _WORKER_CREDENTIALS=None):
+            MUT._init_worker('sa@example.com', private_key_pem)
+            url = self._callFUT(('/bucket/name', 1000, options))
+        path, query = _parse_url(url)
+        self.assertEqual(path, '/bucket/name')
+        self.assertEqual(query['GoogleAccessId'], 'sa@example.com')
+        self.assertEqual(query['Expires'], '1000')
+        signature = base64.b64decode(query['Signature'])
+        rsa.verify(b'GET\n\n\n1000\n/bucket/name', signature, public_key)
+
+
+class TestURLSigner(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.signing import URLSigner
+        return URLSigner
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_defaults(self):
+        from google.cloud.storage.signing import DEFAULT_MAX_CACHED
+        credentials = _Credentials()
+        signer = self._makeOne(credentials)
+        self.assertIs(signer._credentials, credentials)
+        self.assertIsNone(signer.granularity)
+        self.assertIsNone(signer.processes)
+        self.assertEqual(signer.max_cached, DEFAULT_MAX_CACHED)
+        self.assertIsNone(signer._pool_args)
+
+    def test_ctor_w_processes(self):
+        credentials = _Credentials(private_key_pem='PEM')
+        signer = self._makeOne(credentials, granularity=60, processes=2,
+                               max_cached=10)
+        self.assertEqual((signer.granularity, signer.processes,
+                          signer.max_cached), (60, 2, 10))
+        self.assertEqual(signer._pool_args, ('sa@example.com', 'PEM'))
+
+    def test_ctor_w_processes_wo_key(self):
+        with self.assertRaises(ValueError):
+            self._makeOne(_Credentials(), processes=2)
+
+    def test_sign(self):
+        from google.cloud.storage.blob import _API_ACCESS_ENDPOINT
+        credentials = _Credentials()
+        signer = self._makeOne(credentials)
+        url = signer.sign('/bucket/name', 1000, method='PUT',
+                          content_md5='MD5', content_type='text/plain',
+                          response_type='text/html',
+                          response_disposition='inline', generation='7')
+        self.assertTrue(url.startswith(_API_ACCESS_ENDPOINT + '/bucket/name?'))
+        _, query = _parse_url(url)
+        self.assertEqual(query['Expires'], '1000')
+        self.assertEqual(query['response-content-type'], 'text/html')
+        self.assertEqual(query['response-content-disposition'], 'inline')
+        self.assertEqual(query['generation'], '7')
+        self.assertEqual(credentials._signed,
+                         ['PUT\nMD5\ntext/plain\n1000\n/bucket/name'])
+
+    def test_sign_many(self):
+        credentials = _Credentials()
+        signer = self._makeOne(credentials)
+        blob = _Blob('bucket', 'a b')
+        urls = signer.sign_many([
+            (blob, 1000),
+            ('/bucket/other', 1000),
+            ('/bucket/a%20b', 1000),
+            (blob, 2000),
+        ])
+        self.assertEqual([_parse_url(url)[0] for url in urls],
+                         ['/bucket/a%20b', '/bucket/other',
+                          '/bucket/a%20b', '/bucket/a%20b'])
+        self.assertEqual(urls[0], urls[2])
+        self.assertNotEqual(urls[0], urls[3])
+        self.assertEqual(len(credentials._signed), 3)
+
+        # Memoized:  no more signatures.
+        self.assertEqual(signer.sign_many([(blob, 1000)]), urls[:1])
+        self.assertEqual(len(credentials._signed), 3)
+        # ... unless the options differ.
+        signer.sign(blob, 1000, method='HEAD')
+        self.assertEqual(len(credentials._signed), 4)
+
+    def test_sign_many_w_granularity(self):
+        import datetime
+        credentials = _Credentials()
+        signer = self._makeOne(credentials, granularity=300)
+        urls = signer.sign_many([
+            ('/bucket/name', 1),
+            ('/bucket/name', 300),
+            ('/bucket/name', 301),
+            ('/bucket/name', datetime.datetime(1970, 1, 1, 0, 5, 30)),
+        ])
+        self.assertEqual([_parse_url(url)[1]['Expires'] for url in urls],
+                         ['300', '300', '600', '600'])
+        self.assertEqual(len(credentials._signed), 2)
+
+    def test_sign_many_w_bad_expiration(self):
+        signer = self._makeOne(_Credentials())
+        with self.assertRaises(TypeError):
+            signer.sign_many([('/bucket/name', 'tomorrow')])
+
+    def test_cache_full(self):
+        from google.cloud.storage import signing as MUT
+        from unit_tests._testing import _Monkey
+        credentials = _Credentials()
+        signer = self._makeOne(credentials, max_cached=2)
+        with _Monkey(MUT, time=_Clock(1500)):
+            signer.sign_many([('/bucket/a', 1000), ('/bucket/b', 2000)])
+            # The expired URL is forgotten.
+            signer.sign_many([('/bucket/c', 2000)])
+            self.assertEqual(sorted(key[0] for key in signer._cache),
+                             ['/bucket/b', '/bucket/c'])
+            # None expired:  start over.
+            signer.sign_many([('/bucket/d', 2000)])
+            self.assertEqual([key[0] for key in signer._cache],
+                             ['/bucket/d'])
+            # Too many to memoize at all.
+            signer.sign_many([('/bucket/e', 2000), ('/bucket/f', 2000),
+                              ('/bucket/g', 2000)])
+            self.assertEqual(signer._cache, {})
+
+    def test_sign_many_w_processes(self):
+        from google.cloud.storage import signing as MUT
+        from unit_tests._testing import _Monkey
+        _, private_key_pem = _make_key()
+        credentials = _Credentials(private_key_pem=private_key_pem)
+        pools = []
+
+        def _make_pool(processes, initializer, initargs):
+            pools.append(_Pool(processes, initializer, initargs))
+            return pools[-1]
+
+        with _Monkey(MUT, _Pool=_make_pool, _POOL_CHUNK_SIZE=2,
+                     _WORKER_CREDENTIALS=None):
+            with self._makeOne(credentials, processes=3) as signer:
+                # Too few to bother the pool.
+                signer.sign_many([('/bucket/a', 1000)])
+                self.assertEqual(pools, [])
+                self.assertEqual(len(credentials._signed), 1)
+
+                urls = signer.sign_many([('/bucket/b', 1000),
+                                         ('/bucket/c', 1000)])
+                signer.sign_many([('/bucket/d', 1000),
+                                  ('/bucket/e', 1000)])
+            self.assertIsNone(signer._pool)
+            signer.close()  # Closing twice is harmless.
+
+        self.assertEqual(len(credentials._signed), 1)
+        self.assertEqual([_parse_url(url)[0] for url in urls],
+                         ['/bucket/b', '/bucket/c'])
+        pool, = pools
+        self.assertEqual(pool.processes, 3)
+        self.assertEqual(pool.mapped, [2, 2])
+        self.assertTrue(pool.joined)
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class _Credentials(object):
+
+    service_account_email = 'sa@example.com'
+
+    def __init__(self, private_key_pem=None):
+        if private_key_pem is not None:
+            self._private_key_pkcs8_pem = private_key_pem
+        self._signed = []
+
+    def sign_blob(self, blob):
+        self._signed.append(blob)
+        return None, ('SIGNED:' + blob).encode('utf-8')
+
+
+class _Pool(object):
+
+    def __init__(self, processes, initializer, initargs):
+        self.processes = processes
+        self.mapped = []
+        self.joined = False
+        initializer(*initargs)
+
+    def map(self, func, iterable, chunksize):
+        self.mapped.append(chunksize)
+        return [func(item) for item in iterable]
+
+    def close(self):
+        pass
+
+    def join(self):
+        self.joined = True
+
+
+class _Bucket(object):
+
+    def __init__(self, name):
+        self.name = name
+
+
+class _Blob(object):
+
+    def __init__(self, bucket_name, name):
+        self.bucket = _Bucket(bucket_name)
+        self.name = name
+
+    @property
+    def _signed_resource(self):
+        from six.moves.urllib.parse import quote
+        return '/%s/%s' % (self.bucket.name, quote(self.name, safe=''))
@@ -0,0 +1,458 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+_OLD = 1400000000.0
+_NEW = 1500000000.0
+
+
+class _TempDirMixin(object):
+
+    def _makeTempDir(self):
+        import shutil
+        import tempfile
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        return temp_dir
+
+    @staticmethod
+    def _writeFile(root, relative, data, mtime):
+        import os
+        path = os.path.join(root, *relative.split('/'))
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(path, 'wb') as file_obj:
+            file_obj.write(data)
+        os.utime(path, (mtime, mtime))
+        return path
+
+
+class Test__normalize_prefix(unittest.TestCase):
+
+    def _callFUT(self, prefix):
+        from google.cloud.storage.sync import _normalize_prefix
+        return _normalize_prefix(prefix)
+
+    def test_empty(self):
+        self.assertEqual(self._callFUT(''), '')
+
+    def test_wo_slash(self):
+        self.assertEqual(self._callFUT('www'), 'www/')
+
+    def test_w_slash(self):
+        self.assertEqual(self._callFUT('www/'), 'www/')
+
+
+class Test__local_files(unittest.TestCase, _TempDirMixin):
+
+    def _callFUT(self, local_dir):
+        from google.cloud.storage.sync import _local_files
+        return _local_files(local_dir)
+
+    def test_it(self):
+        from google.cloud.storage.sync import _TEMP_PREFIX
+        root = self._makeTempDir()
+        top = self._writeFile(root, 'top.txt', b'ABC', _OLD)
+        nested = self._writeFile(root, 'a/b/nested.txt', b'ABCDE', _NEW)
+        self._writeFile(root, 'a/' + _TEMP_PREFIX + 'xyz', b'PARTIAL', _NEW)
+        found = self._callFUT(root)
+        self.assertEqual(sorted(found), ['a/b/nested.txt', 'top.txt'])
+        self.assertEqual(found['top.txt'], (top, 3, _OLD))
+        self.assertEqual(found['a/b/nested.txt'], (nested, 5, _NEW))
+
+    def test_missing_dir(self):
+        import os
+        root = self._makeTempDir()
+        self.assertEqual(self._callFUT(os.path.join(root, 'missing')), {})
+
+
+class Test__relative_name(unittest.TestCase):
+
+    def _callFUT(self, name, prefix):
+        from google.cloud.storage.sync import _relative_name
+        return _relative_name(_listed(name, b''), prefix)
+
+    def test_valid(self):
+        self.assertEqual(self._callFUT('www/a/b.txt', 'www/'), 'a/b.txt')
+
+    def test_placeholder(self):
+        self.assertIsNone(self._callFUT('www/a/', 'www/'))
+
+    def test_unsafe(self):
+        self.assertIsNone(self._callFUT('www/../etc/passwd', 'www/'))
+        self.assertIsNone(self._callFUT('www/./a', 'www/'))
+        self.assertIsNone(self._callFUT('www/a//b', 'www/'))
+
+
+class Test__is_changed(unittest.TestCase, _TempDirMixin):
+
+    def _callFUT(self, local, blob, checksum, upload):
+        from google.cloud.storage.sync import _is_changed
+        return _is_changed(local, blob, checksum, upload)
+
+    def _makeLocal(self, data, mtime):
+        from google.cloud.storage.sync import _LocalFile
+        path = self._writeFile(self._makeTempDir(), 'file', data, mtime)
+        return _LocalFile(path, len(data), mtime)
+
+    def test_size_differs(self):
+        local = self._makeLocal(b'ABC', _OLD)
+        blob = _listed('file', b'ABCD', _OLD)
+        self.assertTrue(self._callFUT(local, blob, False, True))
+        self.assertTrue(self._callFUT(local, blob, True, False))
+
+    def test_mtime_upload(self):
+        blob = _listed('file', b'ABC', _OLD)
+        newer = self._makeLocal(b'ABC', _OLD + 1)
+        self.assertTrue(self._callFUT(newer, blob, False, True))
+        same = self._makeLocal(b'ABC', _OLD + 0.5)
+        self.assertFalse(self._callFUT(same, blob, False, True))
+        older = self._makeLocal(b'ABC', _OLD - 1)
+        self.assertFalse(self._callFUT(older, blob, False, True))
+
+    def test_mtime_download(self):
+        blob = _listed('file', b'ABC', _OLD)
+        older = self._makeLocal(b'ABC', _OLD - 1)
+        self.assertTrue(self._callFUT(older, blob, False, False))
+        same = self._makeLocal(b'ABC', _OLD)
+        self.assertFalse(self._callFUT(same, blob, False, False))
+        newer = self._makeLocal(b'ABC', _OLD + 1)
+        self.assertFalse(self._callFUT(newer, blob, False, False))
+
+    def test_checksum_md5(self):
+        local = self._makeLocal(b'ABC', _NEW)
+        self.assertFalse(self._callFUT(local, _listed('file', b'ABC', _OLD),
+                                       True, True))
+        self.assertTrue(self._callFUT(local, _listed('file', b'XYZ', _NEW),
+                                      True, True))
+
+    def test_checksum_crc32c(self):
+        local = self._makeLocal(b'ABC', _NEW)
+        blob = _listed('file', b'ABC', _OLD, md5=False)
+        self.assertFalse(self._callFUT(local, blob, True, True))
+        blob = _listed('file', b'XYZ', _OLD, md5=False)
+        self.assertTrue(self._callFUT(local, blob, True, True))
+
+    def test_checksum_unavailable(self):
+        local = self._makeLocal(b'ABC', _NEW)
+        blob = _listed('file', b'ABC', _OLD, md5=False, crc32c=False)
+        self.assertTrue(self._callFUT(local, blob, True, False))
+
+
+class Test_sync_to_bucket(unittest.TestCase, _TempDirMixin):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.storage.sync import sync_to_bucket
+        return sync_to_bucket(*args, **kw)
+
+    def _makeTree(self):
+        root = self._makeTempDir()
+        self._writeFile(root, 'same.txt', b'SAME', _OLD)
+        self._writeFile(root, 'changed.txt', b'CHANGED', _NEW)
+        self._writeFile(root, 'sub/new.txt', b'NEW', _NEW)
+        bucket = _Bucket([
+            _listed('www/', b''),
+            _listed('www/changed.txt', b'CHANGE', _OLD),
+            _listed('www/gone.txt', b'GONE', _OLD),
+            _listed('www/same.txt', b'SAME', _OLD + 10),
+        ])
+        return root, bucket
+
+    def test_dry_run(self):
+        import os
+        from google.cloud.storage.sync import DELETE
+        from google.cloud.storage.sync import SyncAction
+        from google.cloud.storage.sync import UPLOAD
+        root, bucket = self._makeTree()
+        actions, failures = self._callFUT(root, bucket, prefix='www',
+                                          delete=True, dry_run=True)
+        self.assertEqual(failures, [])
+        self.assertEqual(actions, [
+            SyncAction(UPLOAD, 'www/changed.txt',
+                       os.path.join(root, 'changed.txt'), 7, _NEW),
+            SyncAction(DELETE, 'www/gone.txt', None, 0, None),
+            SyncAction(UPLOAD, 'www/sub/new.txt',
+                       os.path.join(root, 'sub', 'new.txt'), 3, _NEW),
+        ])
+        self.assertEqual(bucket._listed, [('www/', bucket.client)])
+        self.assertEqual(bucket._deleted, [])
+
+    def test_wo_delete(self):
+        root, bucket = self._makeTree()
+        actions, _ = self._callFUT(root, bucket, prefix='www/', dry_run=True)
+        self.assertEqual([action.name for action in actions],
+                         ['www/changed.txt', 'www/sub/new.txt'])
+
+    def test_execute(self):
+        from google.cloud.exceptions import NotFound
+        from google.cloud.storage import sync as MUT
+        from unit_tests._testing import _Monkey
+        root, bucket = self._makeTree()
+        bucket._missing = ('www/gone.txt',)
+        transfers = _Transfers(missing=('www/sub/new.txt',))
+        done = []
+        client = _Client()
+        with _Monkey(MUT, Blob=transfers):
+            actions, failures = self._callFUT(
+                root, bucket, prefix='www', delete=True, max_workers=3,
+                callback=done.append, client=client)
+        self.assertEqual(transfers._uploaded,
+                         [('www/changed.txt', b'CHANGED', client)])
+        self.assertEqual(bucket._deleted, [(['www/gone.txt'], 3, client)])
+        self.assertEqual(done, [actions[0]])
+        self.assertEqual([action for action, _ in failures],
+                         [actions[2], actions[1]])
+        self.assertIsInstance(failures[0][1], NotFound)
+        self.assertIsInstance(failures[1][1], NotFound)
+
+
+class Test_sync_from_bucket(unittest.TestCase, _TempDirMixin):
+
+    def _callFUT(self, *args, **kw):
+        from google.cloud.storage.sync import sync_from_bucket
+        return sync_from_bucket(*args, **kw)
+
+    def _makeTree(self):
+        root = self._makeTempDir()
+        self._writeFile(root, 'same.txt', b'SAME', _OLD)
+        self._writeFile(root, 'changed.txt', b'CHANGE', _OLD)
+        self._writeFile(root, 'extra.txt', b'EXTRA', _OLD)
+        bucket = _Bucket([
+            _listed('changed.txt', b'CHANGED', _NEW),
+            _listed('dir/', b''),
+            _listed('dir/new.txt', b'NEW', _NEW),
+            _listed('same.txt', b'SAME', _OLD),
+        ])
+        return root, bucket
+
+    def test_dry_run(self):
+        import os
+        from google.cloud.storage.sync import DELETE
+        from google.cloud.storage.sync import DOWNLOAD
+        from google.cloud.storage.sync import SyncAction
+        root, bucket = self._makeTree()
+        actions, failures = self._callFUT(bucket, root, delete=True,
+                                          dry_run=True)
+        self.assertEqual(failures, [])
+        self.assertEqual(actions, [
+            SyncAction(DOWNLOAD, 'changed.txt',
+                       os.path.join(root, 'changed.txt'), 7, _NEW),
+            SyncAction(DOWNLOAD, 'dir/new.txt',
+                       os.path.join(root, 'dir', 'new.txt'), 3, _NEW),
+            SyncAction(DELETE, 'extra.txt',
+                       os.path.join(root, 'extra.txt'), 0, None),
+        ])
+        self.assertEqual(bucket._listed, [('', bucket.client)])
+
+    def test_execute(self):
+        import os
+        from google.cloud.storage import sync as MUT
+        from unit_tests._testing import _Monkey
+        root, bucket = self._makeTree()
+        transfers = _Transfers({
+            'changed.txt': b'CHANGED',
+            'dir/new.txt': b'NEW',
+        })
+        done = []
+        with _Monkey(MUT, Blob=transfers):
+            actions, failures = self._callFUT(bucket, root, delete=True,
+                                              callback=done.append)
+        self.assertEqual(failures, [])
+        self.assertEqual(done, actions)
+        self.assertEqual(sorted(os.listdir(root)),
+                         ['changed.txt', 'dir', 'same.txt'])
+        for relative, data in [('changed.txt', b'CHANGED'),
+                               ('dir/new.txt', b'NEW'),
+                               ('same.txt', b'SAME')]:
+            path = os.path.join(root, *relative.split('/'))
+            with open(path, 'rb') as file_obj:
+                self.assertEqual(file_obj.read(), data)
+        self.assertEqual(os.path.getmtime(os.path.join(root, 'changed.txt')),
+                         _NEW)
+
+        # Now in sync, in both directions.
+        from google.cloud.storage.sync import sync_to_bucket
+        bucket._blobs = [_listed(name, data, _NEW) for name, data in [
+            ('changed.txt', b'CHANGED'), ('dir/new.txt', b'NEW')]]
+        bucket._blobs.append(_listed('same.txt', b'SAME', _OLD))
+        self.assertEqual(self._callFUT(bucket, root, dry_run=True),
+                         ([], []))
+        self.assertEqual(sync_to_bucket(root, bucket, dry_run=True),
+                         ([], []))
+
+
+class Test__download(unittest.TestCase, _TempDirMixin):
+
+    def _callFUT(self, bucket, action, client):
+        from google.cloud.storage.sync import _download
+        return _download(bucket, action, client)
+
+    def _makeAction(self, path):
+        from google.cloud.storage.sync import DOWNLOAD
+        from google.cloud.storage.sync import SyncAction
+        return SyncAction(DOWNLOAD, 'name', path, 4, _NEW)
+
+    def test_failure_removes_temp_file(self):
+        import os
+        from google.cloud.exceptions import NotFound
+        from google.cloud.storage import sync as MUT
+        from unit_tests._testing import _Monkey
+        root = self._makeTempDir()
+        path = self._writeFile(root, 'name', b'OLD', _OLD)
+        transfers = _Transfers({'name': b'DATA'}, missing=('name',))
+        with _Monkey(MUT, Blob=transfers):
+            with self.assertRaises(NotFound):
+                self._callFUT(_Bucket([]), self._makeAction(path), None)
+        self.assertEqual(os.listdir(root), ['name'])
+        with open(path, 'rb') as file_obj:
+            self.assertEqual(file_obj.read(), b'OLD')
+
+    def test_directory_is_a_file(self):
+        import os
+        root = self._makeTempDir()
+        self._writeFile(root, 'file', b'', _OLD)
+        action = self._makeAction(os.path.join(root, 'file', 'name'))
+        with self.assertRaises(OSError):
+            self._callFUT(_Bucket([]), action, None)
+
+
+class Test__execute(unittest.TestCase, _TempDirMixin):
+
+    def _callFUT(self, bucket, actions, max_workers, callback, client):
+        from google.cloud.storage.sync import _execute
+        return _execute(bucket, actions, max_workers, callback, client)
+
+    def test_upload_wo_callback(self):
+        from google.cloud.storage import sync as MUT
+        from google.cloud.storage.sync import SyncAction
+        from google.cloud.storage.sync import UPLOAD
+        from unit_tests._testing import _Monkey
+        path = self._writeFile(self._makeTempDir(), 'name', b'DATA', _NEW)
+        action = SyncAction(UPLOAD, 'name', path, 4, _NEW)
+        transfers = _Transfers()
+        client = _Client()
+        with _Monkey(MUT, Blob=transfers):
+            failures = self._callFUT(_Bucket([]), [action], 1, None, client)
+        self.assertEqual(failures, [])
+        self.assertEqual(transfers._uploaded, [('name', b'DATA', client)])
+
+    def test_local_delete_failure(self):
+        import os
+        from google.cloud.storage.sync import DELETE
+        from google.cloud.storage.sync import SyncAction
+        root = self._makeTempDir()
+        action = SyncAction(DELETE, 'gone', os.path.join(root, 'gone'), 0,
+                            None)
+        failures = self._callFUT(_Bucket([]), [action], 1, None, _Client())
+        (failed, exc), = failures
+        self.assertIs(failed, action)
+        self.assertIsInstance(exc, OSError)
+
+
+def _listed(name, data, updated=_OLD, md5=True, crc32c=True):
+    import base64
+    import datetime
+    import hashlib
+    from google.cloud._helpers import _datetime_to_rfc3339
+    from google.cloud.storage._helpers import _Crc32c
+    from google.cloud.storage.blob import Blob
+    blob = Blob(name, bucket=None)
+    properties = {
+        'name': name,
+        'size': str(len(data)),
+        'updated': _datetime_to_rfc3339(
+            datetime.datetime.utcfromtimestamp(updated)),
+    }
+    if md5:
+        properties['md5Hash'] = base64.b64encode(
+            hashlib.md5(data).digest()).decode('ascii')
+    if crc32c:
+        properties['crc32c'] = base64.b64encode(
+            _Crc32c(data).digest()).decode('ascii')
+    blob._set_properties(properties)
+    return blob
+
+
+class _Connection(object):
+    credentials = None
+
+
+class _Client(object):
+
+    def __init__(self):
+        self._connection = _Connection()
+
+
+class _Bucket(object):
+
+    def __init__(self, blobs, missing=()):
+        self._blobs = blobs
+        self._missing = missing
+        self._listed = []
+        self._deleted = []
+        self.client = _Client()
+
+    def _require_client(self, client):
+        if client is None:
+            client = self.client
+        return client
+
+    def list_blobs(self, prefix, client):
+        self._listed.append((prefix, client))
+        return iter(self._blobs)
+
+    def bulk_delete(self, names, max_workers, client):
+        from google.cloud.exceptions import NotFound
+        from google.cloud.storage.blob import Blob
+        self._deleted.append((names, max_workers, client))
+        return [(Blob(name, bucket=self), NotFound(name))
+                for name in names if name in self._missing]
+
+
+class _Transfers(object):
+    """Stand in for the ``Blob`` class, recording transfers."""
+
+    def __init__(self, contents=None, missing=()):
+        self._contents = contents or {}
+        self._missing = missing
+        self._uploaded = []
+
+    def __call__(self, name, bucket):
+        return _Blob(self, name)
+
+
+class _Blob(object):
+
+    def __init__(self, transfers, name):
+        self._transfers = transfers
+        self.name = name
+
+    def upload_from_filename(self, filename, client=None):
+        from google.cloud.exceptions import NotFound
+        if self.name in self._transfers._missing:
+            raise NotFound(self.name)
+        with open(filename, 'rb') as file_obj:
+            self._transfers._uploaded.append(
+                (self.name, file_obj.read(), client))
+
+    def download_to_file(self, file_obj, client=None):
+        from google.cloud.exceptions import NotFound
+        data = self._transfers._contents[self.name]
+        file_obj.write(data[:1])
+        if self.name in self._transfers._missing:
+            raise NotFound(self.name)
+        file_obj.write(data[1:])
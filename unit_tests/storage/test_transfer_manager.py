@@ -0,0 +1,500 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class Test__is_retryable(unittest.TestCase):
+
+    def _callFUT(self, exc):
+        from google.cloud.storage.transfer_manager import _is_retryable
+        return _is_retryable(exc)
+
+    def test_google_cloud_errors(self):
+        from google.cloud.exceptions import InternalServerError
+        from google.cloud.exceptions import NotFound
+        from google.cloud.exceptions import ServiceUnavailable
+        from google.cloud.exceptions import TooManyRequests
+        self.assertFalse(self._callFUT(NotFound('gone')))
+        self.assertTrue(self._callFUT(TooManyRequests('slow down')))
+        self.assertTrue(self._callFUT(InternalServerError('oops')))
+        self.assertTrue(self._callFUT(ServiceUnavailable('busy')))
+
+    def test_http_errors(self):
+        from google.cloud.streaming.exceptions import HttpError
+        for status, expected in [('404', False), ('429', True),
+                                 ('503', True)]:
+            exc = HttpError({'status': status}, b'', 'http://example.com')
+            self.assertEqual(self._callFUT(exc), expected)
+
+    def test_environment_errors(self):
+        import errno
+        import socket
+        self.assertFalse(self._callFUT(
+            IOError(errno.ENOENT, 'No such file', '/tmp/missing')))
+        self.assertTrue(self._callFUT(socket.error(errno.ECONNRESET,
+                                                   'reset')))
+
+    def test_transfer_errors(self):
+        from six.moves import http_client
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        from google.cloud.streaming.exceptions import TransferRetryError
+        self.assertTrue(self._callFUT(TransferRetryError('empty')))
+        self.assertTrue(self._callFUT(ChecksumMismatchError('md5', 'a', 'b')))
+        self.assertTrue(self._callFUT(http_client.IncompleteRead(b'')))
+        self.assertFalse(self._callFUT(ValueError('bad')))
+
+
+class Test__RateLimiter(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.transfer_manager import _RateLimiter
+        return _RateLimiter
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_invalid(self):
+        with self.assertRaises(ValueError):
+            self._makeOne(0)
+
+    def test_consume(self):
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        clock = _Clock(100.0)
+        with _Monkey(MUT, time=clock):
+            limiter = self._makeOne(1000)
+            limiter.consume(600)  # Within the burst allowance.
+            self.assertEqual(clock.slept, [])
+            limiter.consume(600)
+            self.assertEqual(clock.slept, [0.2])
+            clock.now += 1.0  # A second's allowance, less the debt.
+            limiter.consume(900)
+            self.assertEqual(clock.slept, [0.2, 0.1])
+            clock.now += 10.0  # The allowance is capped at a second's worth.
+            limiter.consume(1000)
+            self.assertEqual(clock.slept, [0.2, 0.1])
+
+
+class Test__ThrottledStream(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.transfer_manager import _ThrottledStream
+        return _ThrottledStream
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_read_write(self):
+        from io import BytesIO
+        limiter = _Limiter()
+        recorded = []
+        buf = BytesIO(b'ABCDEF')
+        stream = self._makeOne(buf, [limiter], recorded.append)
+        self.assertEqual(stream.read(4), b'ABCD')
+        self.assertEqual(stream.tell(), 4)
+        stream.write(b'XYZ')
+        self.assertEqual(buf.getvalue(), b'ABCDXYZ')
+        self.assertEqual(limiter.consumed, [4, 3])
+        self.assertEqual(recorded, [4, 3])
+
+
+class TestTransferJob(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.transfer_manager import TransferJob
+        return TransferJob
+
+    def test_ctor(self):
+        from google.cloud.storage.transfer_manager import UPLOAD
+        blob = _Blob('name')
+        job = self._getTargetClass()(UPLOAD, blob, '/tmp/file')
+        self.assertIs(job.blob, blob)
+        self.assertIsNone(job.size)
+        self.assertIsNone(job.mode)
+        self.assertIsNone(job.error)
+        self.assertFalse(job.done)
+        self.assertEqual(repr(job), '<TransferJob: upload name /tmp/file>')
+
+
+class TestTransferManager(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.storage.transfer_manager import TransferManager
+        return TransferManager
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def _makeTempDir(self):
+        import shutil
+        import tempfile
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        return temp_dir
+
+    def _writeFile(self, data, name='source'):
+        import os
+        path = os.path.join(self._makeTempDir(), name)
+        with open(path, 'wb') as file_obj:
+            file_obj.write(data)
+        return path
+
+    def _read(self, path):
+        with open(path, 'rb') as file_obj:
+            return file_obj.read()
+
+    def test_ctor_defaults(self):
+        from google.cloud.storage._bulk import DEFAULT_MAX_WORKERS
+        client = _Client()
+        manager = self._makeOne(client)
+        self.assertIs(manager._client, client)
+        self.assertEqual(manager._max_workers, DEFAULT_MAX_WORKERS)
+        self.assertIsNone(manager._limiter)
+        self.assertEqual(manager.jobs, [])
+        self.assertEqual(tuple(manager.progress), (0, 0, 0, 0))
+
+    def test_upload(self):
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        small = _Blob('small')
+        large = _Blob('large', content_type='text/csv')
+        progress = []
+        client = _Client()
+        manager = self._makeOne(client, callback=progress.append)
+        small_job = manager.upload(small, self._writeFile(b'ABC', 'a.txt'))
+        large_job = manager.upload(large, self._writeFile(b'ABCDEF'))
+        self.assertEqual(manager.jobs, [small_job, large_job])
+        with _Monkey(MUT, RESUMABLE_UPLOAD_THRESHOLD=4):
+            self.assertEqual(manager.run(), [])
+        self.assertEqual(small.uploaded, [(b'ABC', 3, 'text/plain', client)])
+        self.assertEqual(large.uploaded, [(b'ABCDEF', 6, 'text/csv', client)])
+        self.assertEqual((small_job.mode, large_job.mode),
+                         (MUT.SIMPLE, MUT.RESUMABLE))
+        self.assertTrue(small_job.done and large_job.done)
+        self.assertEqual(small_job.attempts, 1)
+        self.assertEqual(tuple(manager.progress), (9, 9, 2, 2))
+        self.assertEqual(tuple(progress[-1]), (9, 9, 2, 2))
+        self.assertEqual(tuple(progress[0]), (3, 9, 0, 2))
+
+    def test_upload_missing_file(self):
+        import os
+        blob = _Blob('name')
+        manager = self._makeOne(_Client())
+        job = manager.upload(blob, os.path.join(self._makeTempDir(), 'nope'))
+        (failed, exc), = manager.run()
+        self.assertIs(failed, job)
+        self.assertIsInstance(exc, EnvironmentError)
+        self.assertEqual(blob.uploaded, [])
+
+    def test_upload_w_retries(self):
+        from google.cloud.exceptions import NotFound
+        from google.cloud.exceptions import ServiceUnavailable
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        flaky = _Blob('flaky', errors=[ServiceUnavailable('busy')])
+        broken = _Blob('broken', errors=[ServiceUnavailable('busy')] * 3)
+        missing = _Blob('missing', errors=[NotFound('gone')])
+        manager = self._makeOne(_Client(), num_retries=2)
+        jobs = [manager.upload(blob, self._writeFile(b'ABC'))
+                for blob in (flaky, broken, missing)]
+        waits = []
+
+        def _wait(attempt):
+            waits.append(attempt)
+            return 0
+
+        with _Monkey(MUT, calculate_wait_for_retry=_wait):
+            failures = manager.run()
+        self.assertEqual([job for job, _ in failures], jobs[1:])
+        self.assertIsInstance(failures[0][1], ServiceUnavailable)
+        self.assertIsInstance(failures[1][1], NotFound)
+        self.assertEqual([job.attempts for job in jobs], [2, 3, 1])
+        self.assertEqual(waits, [1, 1, 2])
+        # Bytes sent by failed attempts are not counted.
+        self.assertEqual([job.bytes_transferred for job in jobs], [3, 0, 0])
+
+        # Failed jobs are tried again by the next run;  done ones are not.
+        failures = manager.run()
+        self.assertEqual(failures, [])
+        self.assertEqual([len(blob.uploaded) for blob in (flaky, broken)],
+                         [1, 1])
+        self.assertEqual(tuple(manager.progress), (9, 9, 3, 3))
+
+    def test_bandwidth_limits(self):
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        clock = _Clock(0.0)
+        with _Monkey(MUT, time=clock):
+            manager = self._makeOne(_Client(), max_bandwidth=4,
+                                    job_bandwidth=2)
+            manager.upload(_Blob('one'), self._writeFile(b'ABC'))
+            manager.upload(_Blob('two'), self._writeFile(b'ABCD'))
+            self.assertEqual(manager.run(), [])
+        # Global:  3 bytes (within allowance), then 4 (3 over the allowance).
+        # Per job:  3 bytes (1 over), then 4 bytes (2 over).
+        self.assertEqual(clock.slept, [0.5, 0.75, 1.0])
+
+    def test_download(self):
+        import datetime
+        import os
+        blob = _Blob('name', data=b'DATA', size=None,
+                     updated=datetime.datetime(2016, 6, 1, 12))
+        target = os.path.join(self._makeTempDir(), 'target')
+        client = _Client()
+        manager = self._makeOne(client)
+        job = manager.download(blob, target)
+        self.assertEqual(manager.run(), [])
+        self.assertEqual(blob.reloaded, [client])
+        self.assertEqual(job.mode, 'simple')
+        self.assertEqual(self._read(target), b'DATA')
+        self.assertEqual(os.listdir(os.path.dirname(target)), ['target'])
+        self.assertEqual(os.path.getmtime(target),
+                         _mktime(datetime.datetime(2016, 6, 1, 12)))
+        self.assertEqual(tuple(manager.progress), (4, 4, 1, 1))
+
+    def test_download_w_retry(self):
+        import os
+        from google.cloud.exceptions import ServiceUnavailable
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        blob = _Blob('name', data=b'DATA', errors=[ServiceUnavailable('x')])
+        target = os.path.join(self._makeTempDir(), 'target')
+        manager = self._makeOne(_Client())
+        job = manager.download(blob, target)
+        with _Monkey(MUT, calculate_wait_for_retry=lambda attempt: 0):
+            self.assertEqual(manager.run(), [])
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(self._read(target), b'DATA')
+        self.assertEqual(os.listdir(os.path.dirname(target)), ['target'])
+        self.assertEqual(tuple(manager.progress), (4, 4, 1, 1))
+
+    def test_download_failures(self):
+        import os
+        from google.cloud.exceptions import NotFound
+        target_dir = self._makeTempDir()
+        unknown = _Blob('unknown', size=None, reload_error=NotFound('x'))
+        missing = _Blob('missing', data=b'DATA', errors=[NotFound('gone')])
+        manager = self._makeOne(_Client())
+        manager.download(unknown, os.path.join(target_dir, 'unknown'))
+        manager.download(missing, os.path.join(target_dir, 'missing'))
+        failures = manager.run()
+        self.assertEqual([job.blob for job, _ in failures],
+                         [unknown, missing])
+        self.assertEqual(os.listdir(target_dir), [])
+
+    def test_download_sliced(self):
+        import os
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        data = b'ABCDEFGHIJ'
+        blob = _Blob('name', data=data)
+        gzipped = _Blob('gzipped', data=data, content_encoding='gzip')
+        target_dir = self._makeTempDir()
+        client = _Client()
+        manager = self._makeOne(client, sliced_threshold=10, slice_size=4)
+        job = manager.download(blob, os.path.join(target_dir, 'target'))
+        gzip_job = manager.download(gzipped, os.path.join(target_dir, 'gz'))
+        with _Monkey(MUT, Download=_Download):
+            self.assertEqual(manager.run(), [])
+        self.assertEqual((job.mode, gzip_job.mode), ('sliced', 'simple'))
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual(self._read(os.path.join(target_dir, 'target')), data)
+        self.assertEqual(sorted(os.listdir(target_dir)), ['gz', 'target'])
+        self.assertEqual(tuple(manager.progress), (20, 20, 2, 2))
+        ranges = [download.ranges[0] for download in _Download.created[-3:]]
+        self.assertEqual(sorted(ranges), [(0, 3), (4, 7), (8, 9)])
+        for download in _Download.created[-3:]:
+            self.assertEqual(download.url, 'http://example.com/name')
+            self.assertIs(download.http, client._connection.http)
+            self.assertEqual(download.total_size, 10)
+
+    def test_download_sliced_checksum_mismatch(self):
+        import os
+        from google.cloud.storage import transfer_manager as MUT
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        from unit_tests._testing import _Monkey
+        blob = _Blob('name', data=b'ABCDEFGHIJ')
+        blob.md5_hash = blob.crc32c = 'AAAAAA=='
+        target = self._writeFile(b'OLD')
+        manager = self._makeOne(_Client(), sliced_threshold=10, slice_size=4)
+        manager.download(blob, target)
+        with _Monkey(MUT, Download=_Download):
+            (_, exc), = manager.run()
+        self.assertIsInstance(exc, ChecksumMismatchError)
+        self.assertEqual(os.listdir(os.path.dirname(target)), ['source'])
+        self.assertEqual(self._read(target), b'OLD')
+
+    def test_download_sliced_slice_failure(self):
+        import os
+        from google.cloud.exceptions import Forbidden
+        from google.cloud.storage import transfer_manager as MUT
+        from unit_tests._testing import _Monkey
+        blob = _Blob('name', data=b'ABCDEFGHIJ')
+        target_dir = self._makeTempDir()
+        manager = self._makeOne(_Client(), sliced_threshold=10, slice_size=4)
+        job = manager.download(blob, os.path.join(target_dir, 'target'))
+        with _Monkey(MUT, Download=_Download):
+            _Download.errors = [Forbidden('no')]
+            (_, exc), = manager.run()
+        self.assertIsInstance(exc, Forbidden)
+        self.assertEqual(job.attempts, 1)  # The other slices were skipped.
+        self.assertEqual(os.listdir(target_dir), [])
+
+    def test_download_sliced_wo_directory(self):
+        import os
+        blob = _Blob('name', data=b'ABCDEFGHIJ')
+        target = os.path.join(self._makeTempDir(), 'missing', 'target')
+        manager = self._makeOne(_Client(), sliced_threshold=10, slice_size=4)
+        manager.download(blob, target)
+        (_, exc), = manager.run()
+        self.assertIsInstance(exc, EnvironmentError)
+
+    def test_run_concurrently(self):
+        import os
+        target_dir = self._makeTempDir()
+        client = _Client(credentials=object())
+        manager = self._makeOne(client, max_workers=4)
+        blobs = [_Blob('blob-%d' % (index,), data=b'DATA%d' % (index,))
+                 for index in range(6)]
+        for blob in blobs:
+            manager.download(blob, os.path.join(target_dir, blob.name))
+        self.assertEqual(manager.run(), [])
+        for blob in blobs:
+            self.assertEqual(
+                self._read(os.path.join(target_dir, blob.name)), blob.data)
+            self.assertIsNot(blob.clients[0], client)
+            self.assertIsInstance(blob.clients[0], _Client)
+
+
+def _mktime(value):
+    import time
+    return time.mktime(value.timetuple())
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 6))
+
+    @staticmethod
+    def mktime(value):
+        return _mktime(value)
+
+
+class _Limiter(object):
+
+    def __init__(self):
+        self.consumed = []
+
+    def consume(self, num_bytes):
+        self.consumed.append(num_bytes)
+
+
+class _Connection(object):
+
+    def __init__(self, credentials=None):
+        self.credentials = credentials
+        self.http = object()
+
+
+class _Client(object):
+
+    def __init__(self, project=None, credentials=None):
+        self.project = project
+        self._connection = _Connection(credentials)
+
+
+class _Blob(object):
+
+    def __init__(self, name, data=b'', size=0, content_type=None,
+                 content_encoding=None, updated=None, errors=(),
+                 reload_error=None):
+        import base64
+        import hashlib
+        self.name = name
+        self.data = data
+        self._properties = {}
+        if content_type is not None:
+            self._properties['contentType'] = content_type
+        self.size = len(data) if size is not None else None
+        self.media_link = 'http://example.com/' + name
+        self.content_encoding = content_encoding
+        self.updated = updated
+        self.md5_hash = base64.b64encode(
+            hashlib.md5(data).digest()).decode('ascii')
+        self.crc32c = None
+        self._errors = list(errors)
+        self._reload_error = reload_error
+        self.uploaded = []
+        self.reloaded = []
+        self.clients = []
+
+    def reload(self, client=None):
+        self.reloaded.append(client)
+        if self._reload_error is not None:
+            raise self._reload_error
+        self.size = len(self.data)
+
+    def _maybe_fail(self):
+        if self._errors:
+            raise self._errors.pop(0)
+
+    def upload_from_file(self, file_obj, size=None, content_type=None,
+                         client=None):
+        data = file_obj.read()
+        self._maybe_fail()
+        self.uploaded.append((data, size, content_type, client))
+
+    def download_to_file(self, file_obj, client=None):
+        self.clients.append(client)
+        file_obj.write(self.data[:2])
+        self._maybe_fail()
+        file_obj.write(self.data[2:])
+
+
+class _Download(object):
+
+    created = []
+    errors = []
+
+    def __init__(self, stream, total_size):
+        self.stream = stream
+        self.total_size = total_size
+        self.ranges = []
+        self.created.append(self)
+
+    @classmethod
+    def from_stream(cls, stream, auto_transfer=True, total_size=None):
+        assert not auto_transfer
+        return cls(stream, total_size)
+
+    def initialize_download(self, http_request, http):
+        self.url = http_request.url
+        self.http = http
+
+    def get_range(self, start, end):
+        self.ranges.append((start, end))
+        if self.errors:
+            raise self.errors.pop(0)
+        # Slices are fetched from the blob the test set up.
+        data = b'ABCDEFGHIJ'
+        self.stream.write(data[start:end + 1])
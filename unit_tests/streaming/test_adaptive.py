@@ -0,0 +1,138 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+_KB = 1024
+_MB = 1024 * _KB
+
+
+class TestAdaptiveChunkSizer(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.streaming.adaptive import AdaptiveChunkSizer
+        return AdaptiveChunkSizer
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor_defaults(self):
+        sizer = self._makeOne()
+        self.assertEqual(sizer.size, 1 * _MB)
+        self.assertEqual(sizer.minimum, 256 * _KB)
+        self.assertEqual(sizer.maximum, 64 * _MB)
+        self.assertEqual(sizer.target_seconds, 2.0)
+        self.assertEqual(sizer.chunks, 0)
+        self.assertEqual(sizer.errors, 0)
+        self.assertEqual(sizer.error_rate, 0.0)
+
+    def test_ctor_explicit(self):
+        sizer = self._makeOne(initial=3 * _MB, minimum=512 * _KB,
+                              maximum=8 * _MB, target_seconds=1.0)
+        self.assertEqual(sizer.size, 3 * _MB)
+        self.assertEqual(sizer.minimum, 512 * _KB)
+        self.assertEqual(sizer.maximum, 8 * _MB)
+        self.assertEqual(sizer.target_seconds, 1.0)
+
+    def test_ctor_aligns_initial(self):
+        sizer = self._makeOne(initial=1 * _MB + 1)
+        self.assertEqual(sizer.size, 1 * _MB)
+
+    def test_ctor_bounds_initial(self):
+        self.assertEqual(self._makeOne(initial=1).size, 256 * _KB)
+        sizer = self._makeOne(initial=100 * _MB, maximum=4 * _MB)
+        self.assertEqual(sizer.size, 4 * _MB)
+
+    def test_ctor_w_unaligned_bounds(self):
+        self.assertRaises(ValueError, self._makeOne, minimum=1000)
+        self.assertRaises(ValueError, self._makeOne, maximum=_MB + 1)
+        self.assertRaises(ValueError, self._makeOne, minimum=0)
+
+    def test_ctor_w_minimum_gt_maximum(self):
+        self.assertRaises(ValueError, self._makeOne,
+                          minimum=2 * _MB, maximum=1 * _MB)
+
+    def test___repr__(self):
+        sizer = self._makeOne()
+        self.assertEqual(repr(sizer),
+                         'Adaptive chunk size %d (%d-%d bytes)' % (
+                             _MB, 256 * _KB, 64 * _MB))
+
+    def test_record_chunk_grows_at_most_double(self):
+        sizer = self._makeOne(initial=1 * _MB)
+        # 1MB in 0.1s:  2s would take 20MB, but growth is capped.
+        sizer.record_chunk(1 * _MB, 0.1)
+        self.assertEqual(sizer.size, 2 * _MB)
+        self.assertEqual(sizer.chunks, 1)
+
+    def test_record_chunk_grows_toward_target(self):
+        sizer = self._makeOne(initial=1 * _MB)
+        # 1MB in 1.5s:  2s would take ~1.33MB, aligned down to 1.25MB.
+        sizer.record_chunk(1 * _MB, 1.5)
+        self.assertEqual(sizer.size, 1 * _MB + 256 * _KB)
+
+    def test_record_chunk_shrinks_at_most_half(self):
+        sizer = self._makeOne(initial=4 * _MB)
+        sizer.record_chunk(4 * _MB, 60.0)
+        self.assertEqual(sizer.size, 2 * _MB)
+
+    def test_record_chunk_respects_maximum(self):
+        sizer = self._makeOne(initial=2 * _MB, maximum=3 * _MB)
+        sizer.record_chunk(2 * _MB, 0.1)
+        self.assertEqual(sizer.size, 3 * _MB)
+
+    def test_record_chunk_respects_minimum(self):
+        sizer = self._makeOne(initial=512 * _KB)
+        sizer.record_chunk(512 * _KB, 100.0)
+        self.assertEqual(sizer.size, 256 * _KB)
+        sizer.record_chunk(256 * _KB, 100.0)
+        self.assertEqual(sizer.size, 256 * _KB)
+
+    def test_record_chunk_wo_bytes_or_time(self):
+        sizer = self._makeOne(initial=1 * _MB)
+        sizer.record_chunk(0, 1.0)
+        sizer.record_chunk(1 * _MB, 0.0)
+        self.assertEqual(sizer.size, 1 * _MB)
+        self.assertEqual(sizer.chunks, 2)
+
+    def test_record_error(self):
+        sizer = self._makeOne(initial=4 * _MB)
+        sizer.record_error()
+        self.assertEqual(sizer.size, 2 * _MB)
+        self.assertEqual(sizer.errors, 1)
+        sizer.record_error()
+        self.assertEqual(sizer.size, 1 * _MB)
+        self.assertEqual(sizer.errors, 2)
+
+    def test_record_error_respects_minimum(self):
+        sizer = self._makeOne(initial=256 * _KB)
+        sizer.record_error()
+        self.assertEqual(sizer.size, 256 * _KB)
+
+    def test_record_chunk_after_error_does_not_grow(self):
+        sizer = self._makeOne(initial=4 * _MB)
+        sizer.record_error()
+        sizer.record_chunk(2 * _MB, 0.1)
+        self.assertEqual(sizer.size, 2 * _MB)
+        sizer.record_chunk(2 * _MB, 0.1)
+        self.assertEqual(sizer.size, 4 * _MB)
+
+    def test_error_rate(self):
+        sizer = self._makeOne()
+        sizer.record_error()
+        sizer.record_chunk(1 * _MB, 1.0)
+        sizer.record_chunk(1 * _MB, 1.0)
+        sizer.record_chunk(1 * _MB, 1.0)
+        self.assertEqual(sizer.error_rate, 0.25)
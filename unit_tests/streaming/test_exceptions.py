@@ -42,6 +42,26 @@ class Test_HttpError(unittest.TestCase):
         self.assertEqual(exception.url, URL)
 
 
+class Test_ChecksumMismatchError(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.streaming.exceptions import ChecksumMismatchError
+        return ChecksumMismatchError
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor(self):
+        from google.cloud.streaming.exceptions import TransferError
+        exception = self._makeOne('crc32c', 'AAAAAA==', 'n03x6A==')
+        self.assertIsInstance(exception, TransferError)
+        self.assertEqual(exception.checksum, 'crc32c')
+        self.assertEqual(exception.expected, 'AAAAAA==')
+        self.assertEqual(exception.actual, 'n03x6A==')
+        self.assertEqual(str(exception),
+                         'crc32c mismatch: expected AAAAAA==, got n03x6A==')
+
+
 class Test_RetryAfterError(unittest.TestCase):
 
     def _getTargetClass(self):
@@ -404,6 +404,30 @@ class Test_make_api_request(unittest.TestCase):
             self.assertEqual(attempt, ((HTTP, REQUEST), expected_kw))
         self.assertEqual(_checked, [])  # not called by '_wo_exception'
 
+    def test_w_exceptions_w_on_retry(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import http_wrapper as MUT
+        HTTP, RESPONSE = object(), object()
+        REQUEST = _Request()
+        _counter = [None] * 2
+        _retried = []
+
+        def _wo_exception(*args, **kw):
+            if _counter:
+                _counter.pop()
+                raise ValueError('Retryable')
+            return RESPONSE
+
+        with _Monkey(MUT, calculate_wait_for_retry=lambda *ignored: 0,
+                     _make_api_request_no_retry=_wo_exception):
+            response = self._callFUT(HTTP, REQUEST, retries=3,
+                                     on_retry=_retried.append)
+
+        self.assertIs(response, RESPONSE)
+        self.assertEqual(len(_retried), 2)
+        for exc in _retried:
+            self.assertIsInstance(exc, ValueError)
+
     def test_w_exceptions_gt_max_retries(self):
         from unit_tests._testing import _Monkey
         from google.cloud.streaming import http_wrapper as MUT
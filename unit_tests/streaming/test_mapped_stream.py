@@ -0,0 +1,124 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+def _make_file(content):
+    import tempfile
+    file_obj = tempfile.TemporaryFile()
+    file_obj.write(content)
+    file_obj.flush()
+    file_obj.seek(0)
+    return file_obj
+
+
+class Test_map_file(unittest.TestCase):
+
+    def _callFUT(self, file_obj):
+        from google.cloud.streaming.mapped_stream import map_file
+        return map_file(file_obj)
+
+    def test_w_file(self):
+        file_obj = _make_file(b'CONTENT')
+        file_obj.seek(3)
+        stream = self._callFUT(file_obj)
+        self.assertTrue(stream.memory_mapped)
+        self.assertEqual(stream.tell(), 3)
+        self.assertEqual(stream.read().tobytes(), b'TENT')
+        stream.close()
+
+    def test_w_buffer(self):
+        import io
+        self.assertIsNone(self._callFUT(io.BytesIO(b'CONTENT')))
+
+    def test_w_closed_file(self):
+        file_obj = _make_file(b'CONTENT')
+        file_obj.close()
+        self.assertIsNone(self._callFUT(file_obj))
+
+    def test_w_empty_file(self):
+        file_obj = _make_file(b'')
+        self.assertIsNone(self._callFUT(file_obj))
+        file_obj.close()
+
+    def test_w_pipe(self):
+        import os
+        read_fd, write_fd = os.pipe()
+        os.close(write_fd)
+        with os.fdopen(read_fd, 'rb') as file_obj:
+            self.assertIsNone(self._callFUT(file_obj))
+
+
+class TestMappedStream(unittest.TestCase):
+
+    CONTENT = b'ABCDEFGHIJ'
+
+    def _makeOne(self):
+        from google.cloud.streaming.mapped_stream import map_file
+        stream = map_file(_make_file(self.CONTENT))
+        self.addCleanup(stream.close)
+        return stream
+
+    def test_attributes(self):
+        stream = self._makeOne()
+        self.assertEqual(stream.length, len(self.CONTENT))
+        self.assertTrue(stream.seekable())
+        self.assertFalse(stream.closed)
+        self.assertEqual(stream.fileno(), stream._file_obj.fileno())
+        self.assertTrue(repr(stream).endswith('at position 0/10'))
+
+    def test_read(self):
+        stream = self._makeOne()
+        chunk = stream.read(4)
+        self.assertIsInstance(chunk, memoryview)
+        self.assertEqual(chunk.tobytes(), b'ABCD')
+        self.assertEqual(stream.read(100).tobytes(), b'EFGHIJ')
+        self.assertEqual(stream.tell(), len(self.CONTENT))
+        self.assertEqual(stream.read(4).tobytes(), b'')
+
+    def test_read_all(self):
+        stream = self._makeOne()
+        stream.read(2)
+        self.assertEqual(stream.read(-1).tobytes(), self.CONTENT[2:])
+
+    def test_seek(self):
+        import os
+        stream = self._makeOne()
+        self.assertEqual(stream.seek(4), 4)
+        self.assertEqual(stream.seek(2, os.SEEK_CUR), 6)
+        self.assertEqual(stream.read(1).tobytes(), b'G')
+        self.assertEqual(stream.seek(-3, os.SEEK_END), 7)
+        self.assertEqual(stream.read().tobytes(), b'HIJ')
+        stream.seek(20)
+        self.assertEqual(stream.read().tobytes(), b'')
+        with self.assertRaises(ValueError):
+            stream.seek(-1)
+
+    def test_close(self):
+        stream = self._makeOne()
+        stream.close()
+        self.assertTrue(stream.closed)
+        self.assertTrue(stream._file_obj.closed)
+        with self.assertRaises(ValueError):
+            stream.read()
+        stream.close()  # Closing twice is harmless.
+
+    def test_close_w_outstanding_view(self):
+        stream = self._makeOne()
+        chunk = stream.read(4)
+        stream.close()
+        self.assertTrue(stream.closed)
+        # The view remains readable, until released.
+        self.assertEqual(chunk.tobytes(), b'ABCD')
@@ -0,0 +1,166 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class TestChunkPrefetcher(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.streaming.prefetch import ChunkPrefetcher
+        return ChunkPrefetcher
+
+    def _makeOne(self, *args, **kw):
+        prefetcher = self._getTargetClass()(*args, **kw)
+        self.addCleanup(prefetcher.close)
+        return prefetcher
+
+    def test_ctor_w_invalid_depth(self):
+        from io import BytesIO
+        klass = self._getTargetClass()
+        self.assertRaises(ValueError, klass, BytesIO(b'ABC'), 2, 0)
+
+    def test___repr__(self):
+        from io import BytesIO
+        stream = BytesIO(b'')
+        prefetcher = self._makeOne(stream, 2, 1)
+        self.assertTrue(repr(prefetcher).startswith(
+            'Prefetcher of stream %s' % (stream,)))
+
+    def test_get_short_last_chunk(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEFGHIJ')
+        prefetcher = self._makeOne(stream, 4, 2)
+        self.assertEqual(prefetcher.get(), (b'ABCD', False))
+        self.assertEqual(prefetcher.get(), (b'EFGH', False))
+        self.assertEqual(prefetcher.get(), (b'IJ', True))
+        prefetcher.close()
+        self.assertEqual(stream.tell(), 10)
+
+    def test_get_empty_last_chunk(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEFGH')
+        prefetcher = self._makeOne(stream, 4, 1)
+        self.assertEqual(prefetcher.get(), (b'ABCD', False))
+        self.assertEqual(prefetcher.get(), (b'EFGH', False))
+        self.assertEqual(prefetcher.get(), (b'', True))
+
+    def test_get_from_current_position(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEFGHIJ')
+        stream.seek(3)
+        prefetcher = self._makeOne(stream, 4, 1)
+        self.assertEqual(prefetcher.get(), (b'DEFG', False))
+        self.assertEqual(prefetcher.get(), (b'HIJ', True))
+
+    def test_get_w_limit(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEFGHIJ')
+        prefetcher = self._makeOne(stream, 4, 3, limit=8)
+        self.assertEqual(prefetcher.get(), (b'ABCD', False))
+        self.assertEqual(prefetcher.get(), (b'EFGH', True))
+        prefetcher.close()
+        self.assertEqual(stream.tell(), 8)
+
+    def test_get_w_limit_reached(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEF')
+        stream.seek(6)
+        prefetcher = self._makeOne(stream, 4, 1, limit=6)
+        self.assertEqual(prefetcher.get(), (b'', True))
+
+    def test_get_w_chunksize_changed(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEFGHIJ')
+        prefetcher = self._makeOne(stream, 2, 1)
+        self.assertEqual(prefetcher.get(), (b'AB', False))
+        prefetcher.chunksize = 4
+        # At most two chunks were read at the old size.
+        chunks = [prefetcher.get()]
+        while not chunks[-1][1]:
+            chunks.append(prefetcher.get())
+        data = b''.join(chunk for chunk, _ in chunks)
+        self.assertEqual(data, b'CDEFGHIJ')
+        sizes = [len(chunk) for chunk, _ in chunks]
+        self.assertIn(4, sizes)
+        self.assertTrue(max(sizes) <= 4)
+
+    def test_get_w_read_error(self):
+        stream = _FailingStream(b'ABCDEFGH', fail_after=1)
+        prefetcher = self._makeOne(stream, 4, 2)
+        self.assertEqual(prefetcher.get(), (b'ABCD', False))
+        self.assertRaises(IOError, prefetcher.get)
+
+    def test_reads_bounded_ahead(self):
+        stream = _BlockingStream(b'ABCDEFGHIJKLMNOPQRST')
+        prefetcher = self._makeOne(stream, 2, 2)
+        # One chunk handed over, two buffered, one blocked in ``put``.
+        self.assertEqual(prefetcher.get(), (b'AB', False))
+        stream.wait_for_reads(4)
+        self.assertEqual(stream.reads, 4)
+        prefetcher.close()
+        self.assertEqual(stream.tell(), 8)
+
+    def test_close_twice(self):
+        from io import BytesIO
+        stream = BytesIO(b'ABCDEFGHIJ')
+        prefetcher = self._makeOne(stream, 2, 1)
+        prefetcher.close()
+        prefetcher.close()
+        self.assertFalse(prefetcher._thread.is_alive())
+
+
+class _FailingStream(object):
+
+    def __init__(self, data, fail_after):
+        from io import BytesIO
+        self._stream = BytesIO(data)
+        self._fail_after = fail_after
+
+    def tell(self):
+        return self._stream.tell()
+
+    def read(self, size):
+        if self._fail_after == 0:
+            raise IOError('Disk error')
+        self._fail_after -= 1
+        return self._stream.read(size)
+
+
+class _BlockingStream(object):
+
+    def __init__(self, data):
+        import threading
+        from io import BytesIO
+        self._stream = BytesIO(data)
+        self._condition = threading.Condition()
+        self.reads = 0
+
+    def tell(self):
+        return self._stream.tell()
+
+    def read(self, size):
+        with self._condition:
+            self.reads += 1
+            self._condition.notify_all()
+        return self._stream.read(size)
+
+    def wait_for_reads(self, count):
+        import time
+        # Wait for the expected reads, then give the reader thread a
+        # chance to (wrongly) read further.
+        with self._condition:
+            while self.reads < count:
+                self._condition.wait()
+        time.sleep(0.05)
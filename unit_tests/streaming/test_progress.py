@@ -0,0 +1,130 @@
+# Copyright 2016 Google Inc. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+
+class Test_TransferObserver(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.streaming.progress import TransferObserver
+        return TransferObserver
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_noops(self):
+        observer = self._makeOne()
+        self.assertIsNone(observer.on_chunk(_Transfer(), 10, 1.0))
+        self.assertIsNone(observer.on_retry(_Transfer(), ValueError()))
+
+
+class Test_ProgressMonitor(unittest.TestCase):
+
+    def _getTargetClass(self):
+        from google.cloud.streaming.progress import ProgressMonitor
+        return ProgressMonitor
+
+    def _makeOne(self, *args, **kw):
+        return self._getTargetClass()(*args, **kw)
+
+    def test_ctor(self):
+        monitor = self._makeOne()
+        self.assertIsNone(monitor.callback)
+        self.assertEqual(monitor.bytes_done, 0)
+        self.assertIsNone(monitor.total_bytes)
+        self.assertEqual(monitor.retries, 0)
+        self.assertEqual(list(monitor.chunks), [])
+        self.assertIsNone(monitor.rate)
+        self.assertIsNone(monitor.average_rate)
+        self.assertIsNone(monitor.eta)
+        self.assertEqual(monitor.idle_seconds, 0.0)
+        self.assertEqual(repr(monitor), 'Progress 0/??? bytes, 0 retries')
+
+    def test_on_chunk(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import progress as MUT
+        from google.cloud.streaming.progress import ChunkTiming
+        reports = []
+        monitor = self._makeOne(callback=reports.append, window=2)
+        transfer = _Transfer(total_size=1000)
+        clock = _Clock(100.0)
+        with _Monkey(MUT, time=clock):
+            monitor.on_chunk(transfer, 100, 2.0)
+            self.assertEqual(monitor.started, 98.0)
+            self.assertEqual(monitor.rate, 50.0)
+            self.assertEqual(monitor.average_rate, 50.0)
+            self.assertEqual(monitor.eta, 18.0)
+
+            clock.now = 101.0
+            monitor.on_chunk(transfer, 200, 1.0)
+            self.assertEqual(monitor.rate, 200.0)
+            self.assertEqual(monitor.average_rate, 100.0)
+            self.assertEqual(monitor.eta, 7.0)
+
+            clock.now = 103.5
+            self.assertEqual(monitor.idle_seconds, 2.5)
+            monitor.on_chunk(transfer, 0, 0.0)
+            self.assertIsNone(monitor.rate)
+
+        self.assertEqual(monitor.bytes_done, 300)
+        self.assertEqual(monitor.total_bytes, 1000)
+        self.assertEqual(list(monitor.chunks),
+                         [ChunkTiming(200, 1.0), ChunkTiming(0, 0.0)])
+        self.assertEqual(reports, [monitor] * 3)
+        self.assertEqual(repr(monitor), 'Progress 300/1000 bytes, 0 retries')
+
+    def test_on_retry(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import progress as MUT
+        monitor = self._makeOne()
+        with _Monkey(MUT, time=_Clock(100.0)):
+            monitor.on_retry(_Transfer(), ValueError())
+        self.assertEqual(monitor.retries, 1)
+        self.assertEqual(monitor.started, 100.0)
+        self.assertEqual(monitor.updated, 100.0)
+        # No time has passed, so no rate yet.
+        self.assertIsNone(monitor.average_rate)
+
+    def test_eta_wo_total_size(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import progress as MUT
+        monitor = self._makeOne()
+        with _Monkey(MUT, time=_Clock(100.0)):
+            monitor.on_chunk(_Transfer(), 100, 1.0)
+        self.assertEqual(monitor.average_rate, 100.0)
+        self.assertIsNone(monitor.eta)
+
+    def test_eta_past_total_size(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import progress as MUT
+        monitor = self._makeOne()
+        with _Monkey(MUT, time=_Clock(100.0)):
+            monitor.on_chunk(_Transfer(total_size=50), 100, 1.0)
+        self.assertEqual(monitor.eta, 0.0)
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class _Transfer(object):
+
+    def __init__(self, total_size=None):
+        self.total_size = total_size
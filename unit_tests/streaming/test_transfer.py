@@ -24,6 +24,8 @@ class Test__Transfer(unittest.TestCase):
         self.assertEqual(xfer.num_retries, 5)
         self.assertIsNone(xfer.url)
         self.assertFalse(xfer.initialized)
+        self.assertIsNone(xfer.chunk_sizer)
+        self.assertIsNone(xfer.observer)
 
     def test_ctor_explicit(self):
         stream = _Stream()
@@ -44,6 +46,56 @@ class Test__Transfer(unittest.TestCase):
         self.assertIs(xfer.http, HTTP)
         self.assertEqual(xfer.num_retries, NUM_RETRIES)
 
+    def test_ctor_w_chunk_sizer(self):
+        stream = _Stream()
+        sizer = _ChunkSizer(1 << 19)
+        xfer = self._makeOne(stream, chunksize=1 << 18, chunk_sizer=sizer)
+        self.assertIs(xfer.chunk_sizer, sizer)
+        self.assertEqual(xfer.chunksize, 1 << 19)
+
+    def test__record_chunk_wo_chunk_sizer(self):
+        xfer = self._makeOne(_Stream(), chunksize=1 << 18)
+        xfer._record_chunk(1 << 18, 0.0)
+        self.assertEqual(xfer.chunksize, 1 << 18)
+
+    def test__record_chunk_w_chunk_sizer(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        sizer = _ChunkSizer(1 << 18, 1 << 19)
+        xfer = self._makeOne(_Stream(), chunk_sizer=sizer)
+        with _Monkey(MUT, time=_Clock(12.5)):
+            xfer._record_chunk(1 << 18, 10.0)
+        self.assertEqual(sizer._chunks, [(1 << 18, 2.5)])
+        self.assertEqual(xfer.chunksize, 1 << 19)
+
+    def test__record_chunk_w_observer(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        observer = _Observer()
+        xfer = self._makeOne(_Stream(), observer=observer)
+        with _Monkey(MUT, time=_Clock(12.5)):
+            xfer._record_chunk(1 << 18, 10.0)
+        self.assertEqual(observer._chunks, [(xfer, 1 << 18, 2.5)])
+
+    def test__record_retry_w_observer(self):
+        observer = _Observer()
+        xfer = self._makeOne(_Stream(), observer=observer)
+        exc = ValueError()
+        xfer._record_retry(exc)
+        self.assertEqual(observer._retries, [(xfer, exc)])
+
+    def test__record_retry_wo_chunk_sizer(self):
+        xfer = self._makeOne(_Stream(), chunksize=1 << 18)
+        xfer._record_retry(ValueError())
+        self.assertEqual(xfer.chunksize, 1 << 18)
+
+    def test__record_retry_w_chunk_sizer(self):
+        sizer = _ChunkSizer(1 << 19, 1 << 18)
+        xfer = self._makeOne(_Stream(), chunk_sizer=sizer)
+        xfer._record_retry(ValueError())
+        self.assertEqual(sizer._errors, 1)
+        self.assertEqual(xfer.chunksize, 1 << 18)
+
     def test_bytes_http_fallback_to_http(self):
         stream = _Stream()
         HTTP = object()
@@ -163,6 +215,7 @@ class Test_Download(unittest.TestCase):
         self.assertEqual(download.progress, 0)
         self.assertIsNone(download.total_size)
         self.assertIsNone(download.encoding)
+        self.assertIsNone(download.hash_header)
 
     def test_ctor_w_kwds(self):
         stream = _Stream()
@@ -315,6 +368,76 @@ class Test_Download(unittest.TestCase):
         self.assertTrue(len(requester._requested), 1)
         self.assertIs(requester._requested[0][0], request)
 
+    def test_initialize_download_w_autotransfer_timed(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        CONTENT = b'ABCDEFGHIJ'
+        LEN = len(CONTENT)
+        RESP_RANGE = 'bytes 0-%d/%d' % (LEN - 1, LEN)
+        request = _Request()
+        http = object()
+        observer = _Observer()
+        stream = _Stream()
+        download = self._makeOne(stream, auto_transfer=True,
+                                 observer=observer)
+        exc = ValueError('retried')
+        response = _makeResponse(http_client.OK,
+                                 {'content-range': RESP_RANGE}, CONTENT)
+        clock = _Clock(0.0)
+
+        def _make_api_request(http, request, **kw):
+            kw['on_retry'](exc)
+            clock._now += 0.5  # The request takes half a second.
+            return response
+
+        with _Monkey(MUT, make_api_request=_make_api_request, time=clock):
+            download.initialize_download(request, http)
+
+        self.assertEqual(stream._written, [CONTENT])
+        self.assertEqual(observer._retries, [(download, exc)])
+        self.assertEqual(observer._chunks, [(download, LEN, 1.5)])
+
+    def test_initialize_download_w_autotransfer_w_chunk_sizer(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.adaptive import AdaptiveChunkSizer
+        CHUNK = 1 << 20
+        TOTAL = 3 * CHUNK
+        request = _Request()
+        http = object()
+        sizer = AdaptiveChunkSizer(initial=CHUNK, target_seconds=2.0)
+        download = self._makeOne(_Stream(), auto_transfer=True,
+                                 chunk_sizer=sizer)
+        responses = [
+            _makeResponse(
+                http_client.PARTIAL_CONTENT,
+                {'content-range': 'bytes 0-%d/%d' % (CHUNK - 1, TOTAL)},
+                b'x' * CHUNK),
+            _makeResponse(
+                http_client.PARTIAL_CONTENT,
+                {'content-range': 'bytes %d-%d/%d' % (
+                    CHUNK, TOTAL - 1, TOTAL)},
+                b'x' * (TOTAL - CHUNK)),
+        ]
+        ranges = []
+        clock = _Clock(0.0)
+
+        def _make_api_request(http, request, **kw):
+            ranges.append(request.headers['range'])
+            clock._now += 1.0  # Each request takes two seconds.
+            return responses.pop(0)
+
+        with _Monkey(MUT, Request=_Request, time=clock,
+                     make_api_request=_make_api_request):
+            download.initialize_download(request, http)
+
+        # The first chunk took the target time, so the size is unchanged.
+        self.assertEqual(ranges, ['bytes=0-%d' % (CHUNK - 1,),
+                                  'bytes=%d-%d' % (CHUNK, 2 * CHUNK - 1)])
+        self.assertEqual(download.progress, TOTAL)
+
     def test__normalize_start_end_w_end_w_start_lt_0(self):
         from google.cloud.streaming.exceptions import TransferInvalidError
         download = self._makeOne(_Stream())
@@ -476,6 +599,16 @@ class Test_Download(unittest.TestCase):
         self.assertEqual(download.progress, 7)
         self.assertEqual(download.encoding, 'blah')
 
+    def test__process_response_w_OK_w_hash_header(self):
+        from six.moves import http_client
+        stream = _Stream()
+        download = self._makeOne(stream)
+        HASHES = 'crc32c=n03x6A==,md5=Ojk9c3dhfxgoKVVHYwFbHQ=='
+        info = {'x-goog-hash': HASHES}
+        response = _makeResponse(http_client.OK, info, 'OK')
+        download._process_response(response)
+        self.assertEqual(download.hash_header, HASHES)
+
     def test__process_response_w_REQUESTED_RANGE_NOT_SATISFIABLE(self):
         from six.moves import http_client
         stream = _Stream()
@@ -515,7 +648,8 @@ class Test_Download(unittest.TestCase):
         RESP_RANGE = 'bytes 0-%d/%d' % (LEN - 1, LEN)
         http = object()
         stream = _Stream()
-        download = self._makeOne(stream)
+        observer = _Observer()
+        download = self._makeOne(stream, observer=observer)
         download._initialize(http, self.URL)
         info = {'content-range': RESP_RANGE}
         response = _makeResponse(http_client.OK, info, CONTENT)
@@ -523,7 +657,8 @@ class Test_Download(unittest.TestCase):
 
         with _Monkey(MUT,
                      Request=_Request,
-                     make_api_request=requester):
+                     make_api_request=requester,
+                     time=_Clock(0.0)):
             download.get_range(0, LEN)
 
         self.assertTrue(len(requester._requested), 1)
@@ -531,6 +666,7 @@ class Test_Download(unittest.TestCase):
         self.assertEqual(request.headers, {'range': REQ_RANGE})
         self.assertEqual(stream._written, [CONTENT])
         self.assertEqual(download.total_size, LEN)
+        self.assertEqual(observer._chunks, [(download, LEN, 1.0)])
 
     def test_get_range_wo_total_size_wo_end(self):
         from six.moves import http_client
@@ -702,6 +838,7 @@ class Test_Download(unittest.TestCase):
         info = {'content-range': RESP_RANGE}
         download._initial_response = _makeResponse(
             http_client.OK, info, CONTENT)
+        download._initial_started = 0.0
         http = object()
         download._initialize(http, _Request.URL)
 
@@ -726,6 +863,7 @@ class Test_Download(unittest.TestCase):
         info_1 = {'content-range': RESP_RANGE_1}
         download._initial_response = _makeResponse(
             http_client.PARTIAL_CONTENT, info_1, CONTENT[:CHUNK_SIZE])
+        download._initial_started = 0.0
         info_2 = {'content-range': RESP_RANGE_2}
         response_2 = _makeResponse(
             http_client.OK, info_2, CONTENT[CHUNK_SIZE:])
@@ -777,6 +915,49 @@ class Test_Download(unittest.TestCase):
         self.assertEqual(stream._written, [CONTENT])
         self.assertEqual(download.total_size, LEN)
 
+    def test_stream_file_w_chunk_sizer_and_callback(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        CONTENT = b'ABCDEFGHIJ'
+        stream = _Stream()
+        http = object()
+        sizer = _ChunkSizer(3, 4, 4)
+        download = self._makeOne(stream, chunk_sizer=sizer)
+        response_1 = _makeResponse(http_client.PARTIAL_CONTENT,
+                                   {'content-range': 'bytes 0-2/10'},
+                                   CONTENT[:3])
+        response_2 = _makeResponse(http_client.PARTIAL_CONTENT,
+                                   {'content-range': 'bytes 3-6/10'},
+                                   CONTENT[3:7])
+        response_3 = _makeResponse(http_client.PARTIAL_CONTENT,
+                                   {'content-range': 'bytes 7-9/10'},
+                                   CONTENT[7:])
+        requester = _MakeRequest(response_1, response_2, response_3)
+        download._initialize(http, _Request.URL)
+        called = []
+
+        def _callback(response, download):
+            called.append((response, download.progress, download.chunksize))
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester,
+                     time=_Clock(0.0)):
+            download.stream_file(callback=_callback)
+
+        ranges = [request.headers['range']
+                  for request, _, _ in requester._requested]
+        self.assertEqual(ranges, ['bytes=0-2', 'bytes=3-6', 'bytes=7-9'])
+        for _, _, kw in requester._requested:
+            self.assertEqual(kw['on_retry'], download._record_retry)
+        self.assertEqual(sizer._chunks, [(3, 1.0), (4, 1.0), (3, 1.0)])
+        self.assertEqual(called, [(response_1, 3, 4),
+                                  (response_2, 7, 4),
+                                  (response_3, 10, 4)])
+        self.assertEqual(stream._written,
+                         [CONTENT[:3], CONTENT[3:7], CONTENT[7:]])
+
 
 class Test_Upload(unittest.TestCase):
     URL = "http://example.com/api"
@@ -841,6 +1022,20 @@ class Test_Upload(unittest.TestCase):
             self.assertEqual(upload.mime_type, 'text/plain')
             self.assertTrue(upload.auto_transfer)
             self.assertEqual(upload.total_size, len(CONTENT))
+            self.assertFalse(hasattr(upload.stream, 'memory_mapped'))
+            upload._stream.close()
+
+    def test_from_file_w_memory_map(self):
+        import os
+        klass = self._getTargetClass()
+        CONTENT = b'EXISTING FILE'
+        with _tempdir() as tempdir:
+            filename = os.path.join(tempdir, 'file.txt')
+            with open(filename, 'wb') as fileobj:
+                fileobj.write(CONTENT)
+            upload = klass.from_file(filename, memory_map=True)
+            self.assertTrue(upload.stream.memory_mapped)
+            self.assertEqual(bytes(upload.stream.read()), CONTENT)
             upload._stream.close()
 
     def test_from_file_w_mimetype_w_auto_transfer_w_kwds(self):
@@ -1071,6 +1266,24 @@ class Test_Upload(unittest.TestCase):
         self.assertEqual(app_msg._payload, CONTENT.decode('ascii'))
         self.assertTrue(b'<media body>' in request.loggable_body)
 
+    def test_configure_request_w_simple_w_body_w_mapped_stream(self):
+        from google.cloud._helpers import _to_bytes
+        from google.cloud.streaming.transfer import SIMPLE_UPLOAD
+        CONTENT = b'CONTENT'
+        config = _UploadConfig()
+        request = _Request(body=b'BODY')
+        request.headers['content-type'] = 'text/plain'
+        url_builder = _Dummy(query_params={})
+        upload = self._makeOne(_MappedStream(CONTENT))
+        upload.strategy = SIMPLE_UPLOAD
+
+        upload.configure_request(config, request, url_builder)
+
+        boundary = request.headers['content-type'].split('"')[1]
+        chunks = request.body.split(b'--' + _to_bytes(boundary))[1:-1]
+        app_msg = _email_chunk_parser()(chunks[1].strip())
+        self.assertEqual(app_msg._payload, CONTENT.decode('ascii'))
+
     def test_configure_request_w_resumable_wo_total_size(self):
         from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
         CONTENT = b'CONTENT'
@@ -1250,6 +1463,54 @@ class Test_Upload(unittest.TestCase):
             with self.assertRaises(HttpError):
                 upload.refresh_upload_state()
 
+    def test_resume_upload(self):
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, total_size=len(CONTENT))
+        info = {'range': '0-3'}
+        response = _makeResponse(RESUME_INCOMPLETE, info)
+        requester = _MakeRequest(response)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            upload.resume_upload(self.UPLOAD_URL, http)
+
+        self.assertEqual(upload.strategy, RESUMABLE_UPLOAD)
+        self.assertTrue(upload.initialized)
+        self.assertIs(upload.http, http)
+        self.assertEqual(upload.url, self.UPLOAD_URL)
+        self.assertEqual(stream.tell(), 4)
+        request = requester._requested[0][0]
+        self.assertEqual(request.url, self.UPLOAD_URL)
+        self.assertEqual(request.headers, {'Content-Range': 'bytes */*'})
+
+    def test_resume_upload_w_error(self):
+        from six.moves import http_client
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.exceptions import HttpError
+        from unit_tests._testing import _Monkey
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, total_size=len(CONTENT))
+        response = _makeResponse(http_client.NOT_FOUND)
+        requester = _MakeRequest(response)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            with self.assertRaises(HttpError):
+                upload.resume_upload(self.UPLOAD_URL, http)
+
+        self.assertFalse(upload.initialized)
+        self.assertEqual(stream.tell(), 0)
+
     def test__get_range_header_miss(self):
         upload = self._makeOne(_Stream())
         response = _makeResponse(None)
@@ -1522,6 +1783,274 @@ class Test_Upload(unittest.TestCase):
                           'Content-Type': self.MIME_TYPE})
         self.assertEqual(request_2.body, CONTENT[6:])
 
+    def test_stream_file_w_callback(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, chunksize=6)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._server_chunk_granularity = 6
+        upload._initialize(http, self.UPLOAD_URL)
+
+        info_1 = {'content-length': '0', 'range': 'bytes=0-5'}
+        response_1 = _makeResponse(RESUME_INCOMPLETE, info_1)
+        response_2 = _makeResponse(http_client.OK)
+        requester = _MakeRequest(response_1, response_2)
+        called = []
+
+        def _callback(response, upload):
+            called.append((response, upload.complete, upload.stream.tell()))
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            response = upload.stream_file(callback=_callback)
+
+        self.assertIs(response, response_2)
+        self.assertEqual(called, [(response_1, False, 6),
+                                  (response_2, True, 10)])
+
+    def test_stream_file_w_prefetch_unknown_size(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, chunksize=6)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._server_chunk_granularity = 6
+        upload._initialize(http, self.UPLOAD_URL)
+
+        info_1 = {'content-length': '0', 'range': 'bytes=0-5'}
+        response_1 = _makeResponse(RESUME_INCOMPLETE, info_1)
+        info_2 = {'content-length': '0', 'range': 'bytes=6-9'}
+        response_2 = _makeResponse(http_client.OK, info_2)
+        requester = _MakeRequest(response_1, response_2)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            response = upload.stream_file(prefetch_chunks=2)
+
+        self.assertIs(response, response_2)
+        self.assertTrue(upload.complete)
+        self.assertEqual(upload.total_size, 10)
+        self.assertIsNone(upload._prefetcher)
+        self.assertEqual(len(requester._requested), 2)
+
+        request_1 = requester._requested[0][0]
+        self.assertEqual(request_1.headers,
+                         {'Content-Range': 'bytes 0-5/*',
+                          'Content-Type': self.MIME_TYPE})
+        self.assertEqual(request_1.body, CONTENT[:6])
+        self.assertEqual(request_1.loggable_body, '<media body>')
+
+        request_2 = requester._requested[1][0]
+        self.assertEqual(request_2.headers,
+                         {'Content-Range': 'bytes 6-9/10',
+                          'Content-Type': self.MIME_TYPE})
+        self.assertEqual(request_2.body, CONTENT[6:])
+
+    def test_stream_file_w_prefetch_known_size(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJKL'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, total_size=12, chunksize=4)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._server_chunk_granularity = 4
+        upload._initialize(http, self.UPLOAD_URL)
+
+        response_1 = _makeResponse(RESUME_INCOMPLETE, {'range': 'bytes=0-3'})
+        response_2 = _makeResponse(RESUME_INCOMPLETE, {'range': 'bytes=0-7'})
+        response_3 = _makeResponse(http_client.OK)
+        requester = _MakeRequest(response_1, response_2, response_3)
+        called = []
+
+        def _callback(response, upload):
+            called.append((response, upload.progress))
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            response = upload.stream_file(callback=_callback,
+                                          prefetch_chunks=1)
+
+        self.assertIs(response, response_3)
+        self.assertEqual(called, [(response_1, 3), (response_2, 7),
+                                  (response_3, 7)])
+        self.assertEqual(stream.tell(), 12)
+        ranges = [request.headers['Content-Range']
+                  for request, _, _ in requester._requested]
+        self.assertEqual(ranges, ['bytes 0-3/12', 'bytes 4-7/12',
+                                  'bytes 8-11/12'])
+        bodies = [request.body for request, _, _ in requester._requested]
+        self.assertEqual(bodies, [b'ABCD', b'EFGH', b'IJKL'])
+
+    def test_stream_file_w_prefetch_w_transfer_error(self):
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.exceptions import CommunicationError
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, total_size=10, chunksize=6)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._server_chunk_granularity = 6
+        upload._initialize(http, self.UPLOAD_URL)
+
+        info = {
+            'content-length': '0',
+            'range': 'bytes=0-4',  # simulate error, s.b. '0-5'
+        }
+        response = _makeResponse(RESUME_INCOMPLETE, info)
+        requester = _MakeRequest(response)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            with self.assertRaises(CommunicationError):
+                upload.stream_file(prefetch_chunks=2)
+
+        self.assertIsNone(upload._prefetcher)
+        self.assertEqual(len(requester._requested), 1)
+        self.assertEqual(stream.tell(), 4)
+
+    def test_stream_file_w_prefetch_w_http_error(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.exceptions import HttpError
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        upload = self._makeOne(stream, total_size=10, chunksize=2)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._server_chunk_granularity = 2
+        upload._initialize(http, self.UPLOAD_URL)
+
+        response_1 = _makeResponse(http_client.FORBIDDEN)
+        response_2 = _makeResponse(RESUME_INCOMPLETE)
+        requester = _MakeRequest(response_1, response_2)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester):
+            with self.assertRaises(HttpError):
+                upload.stream_file(prefetch_chunks=3)
+
+        self.assertIsNone(upload._prefetcher)
+        self.assertEqual(len(requester._requested), 2)
+        refresh_request = requester._requested[1][0]
+        self.assertEqual(refresh_request.headers,
+                         {'Content-Range': 'bytes */*'})
+        # The refresh rewound the stream to the committed offset.
+        self.assertEqual(upload.progress, 0)
+        self.assertEqual(stream.tell(), 0)
+
+    def test_stream_file_w_prefetch_already_complete(self):
+        from six.moves import http_client
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        stream.seek(10)
+        response = _makeResponse(http_client.OK)
+        upload = self._makeOne(stream, total_size=10, chunksize=6)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._server_chunk_granularity = 6
+        upload._initialize(http, self.UPLOAD_URL)
+        upload._final_response = response
+        upload._complete = True
+        self.assertIs(upload.stream_file(prefetch_chunks=2), response)
+        self.assertIsNone(upload._prefetcher)
+
+    def test_stream_file_w_chunk_sizer(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.http_wrapper import RESUME_INCOMPLETE
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        sizer = _ChunkSizer(4, 6, 6)
+        upload = self._makeOne(stream, chunk_sizer=sizer)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._initialize(http, self.UPLOAD_URL)
+
+        response_1 = _makeResponse(RESUME_INCOMPLETE, {'range': 'bytes=0-3'})
+        response_2 = _makeResponse(http_client.OK)
+        requester = _MakeRequest(response_1, response_2)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester,
+                     time=_Clock(0.0)):
+            response = upload.stream_file()
+
+        self.assertIs(response, response_2)
+        ranges = [request.headers['Content-Range']
+                  for request, _, _ in requester._requested]
+        self.assertEqual(ranges, ['bytes 0-3/*', 'bytes 4-9/*'])
+        for _, _, kw in requester._requested:
+            self.assertEqual(kw['on_retry'], upload._record_retry)
+        self.assertEqual(sizer._chunks, [(4, 1.0), (6, 1.0)])
+        self.assertEqual(upload.chunksize, 6)
+
+    def test_stream_file_w_chunk_sizer_w_prefetch(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        http = object()
+        stream = _Stream(CONTENT)
+        sizer = _ChunkSizer(16, 32)
+        upload = self._makeOne(stream, chunk_sizer=sizer)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._initialize(http, self.UPLOAD_URL)
+
+        response = _makeResponse(http_client.OK)
+        requester = _MakeRequest(response)
+
+        with _Monkey(MUT,
+                     Request=_Request,
+                     make_api_request=requester,
+                     time=_Clock(0.0)):
+            self.assertIs(upload.stream_file(prefetch_chunks=1), response)
+
+        request = requester._requested[0][0]
+        self.assertEqual(request.headers['Content-Range'], 'bytes 0-9/10')
+        self.assertEqual(sizer._chunks, [(10, 1.0)])
+        self.assertEqual(upload.total_size, 10)
+        self.assertEqual(upload.chunksize, 32)
+
+    def test__adapt_chunksize_w_prefetcher(self):
+        sizer = _ChunkSizer(1 << 18)
+        upload = self._makeOne(_Stream(), chunk_sizer=sizer)
+        prefetcher = upload._prefetcher = _Dummy(chunksize=1 << 18)
+        sizer.size = 1 << 19
+        upload._adapt_chunksize()
+        self.assertEqual(upload.chunksize, 1 << 19)
+        self.assertEqual(prefetcher.chunksize, 1 << 19)
+
     def test_stream_file_incomplete_w_transfer_error(self):
         from unit_tests._testing import _Monkey
         from google.cloud.streaming import transfer as MUT
@@ -1628,6 +2157,33 @@ class Test_Upload(unittest.TestCase):
                          {'Content-Range': 'bytes */*'})
         self.assertIs(second_http, http)
 
+    def test__send_media_request_w_error_w_unseekable_stream(self):
+        from six.moves import http_client
+        from unit_tests._testing import _Monkey
+        from google.cloud.streaming import transfer as MUT
+        from google.cloud.streaming.exceptions import HttpError
+        from google.cloud.streaming.transfer import RESUMABLE_UPLOAD
+        CONTENT = b'ABCDEFGHIJ'
+        stream = _StreamWithSeekableMethod(CONTENT, seekable=False)
+        upload = self._makeOne(stream)
+        upload.strategy = RESUMABLE_UPLOAD
+        upload._initialize(object(), self.UPLOAD_URL)
+        upload.bytes_http = object()
+
+        headers = {'Content-Range': 'bytes 0-9/10',
+                   'Content-Type': self.MIME_TYPE}
+        request = _Request(self.UPLOAD_URL, 'PUT', CONTENT, headers)
+        response = _makeResponse(http_client.FORBIDDEN,
+                                 {'content-length': '0'})
+        requester = _MakeRequest(response)
+
+        with _Monkey(MUT, Request=_Request, make_api_request=requester):
+            with self.assertRaises(HttpError):
+                upload._send_media_request(request, 9)
+
+        # The upload state is not refreshed, as the stream cannot seek.
+        self.assertEqual(len(requester._requested), 1)
+
     def test__send_media_body_not_initialized(self):
         from google.cloud.streaming.exceptions import TransferInvalidError
         upload = self._makeOne(_Stream())
@@ -1696,6 +2252,26 @@ class Test_Upload(unittest.TestCase):
                           'Content-Range': 'bytes */%d' % (SIZE,)})
         self.assertEqual(end, SIZE)
 
+    def test__send_media_body_w_mapped_stream(self):
+        CONTENT = b'ABCDEFGHIJ'
+        SIZE = len(CONTENT)
+        stream = _MappedStream(CONTENT)
+        stream.seek(3)
+        upload = self._makeOne(stream, total_size=SIZE)
+        upload._initialize(object(), self.UPLOAD_URL)
+        streamer = _MediaStreamer(object())
+        upload._send_media_request = streamer
+
+        upload._send_media_body(3)
+
+        request, end = streamer._called_with
+        self.assertIsInstance(request.body, memoryview)
+        self.assertEqual(request.body.tobytes(), CONTENT[3:])
+        self.assertEqual(request.headers['content-length'], '%d' % (SIZE - 3))
+        self.assertEqual(request.headers['Content-Range'],
+                         'bytes 3-%d/%d' % (SIZE - 1, SIZE))
+        self.assertEqual(end, SIZE)
+
     def test__send_chunk_not_initialized(self):
         from google.cloud.streaming.exceptions import TransferInvalidError
         upload = self._makeOne(_Stream())
@@ -1815,6 +2391,32 @@ class Test_Upload(unittest.TestCase):
                           'Content-Range': 'bytes */%d' % (SIZE,)})
         self.assertEqual(end, SIZE)
 
+    def test__send_chunk_w_total_size_w_mapped_stream(self):
+        CONTENT = b'ABCDEFGHIJ'
+        SIZE = len(CONTENT)
+        upload = self._makeOne(_MappedStream(CONTENT), total_size=SIZE,
+                               chunksize=4)
+        upload._initialize(object(), self.UPLOAD_URL)
+        streamer = _MediaStreamer(object())
+        upload._send_media_request = streamer
+
+        upload._send_chunk(0)
+
+        request, end = streamer._called_with
+        self.assertIsInstance(request.body, memoryview)
+        self.assertEqual(request.body.tobytes(), b'ABCD')
+        self.assertEqual(request.headers['content-length'], '4')
+        self.assertEqual(end, 4)
+
+    def test__send_chunk_w_total_size_w_short_mapped_stream(self):
+        from six.moves import http_client
+        upload = self._makeOne(_MappedStream(b'ABC'), total_size=10,
+                               chunksize=4)
+        upload._initialize(object(), self.UPLOAD_URL)
+
+        with self.assertRaises(http_client.IncompleteRead):
+            upload._send_chunk(0)
+
 
 def _email_chunk_parser():
     import six
@@ -1841,6 +2443,49 @@ class _UploadConfig(object):
     simple_path = '/upload/endpoint'
 
 
+class _ChunkSizer(object):
+
+    def __init__(self, size, *sizes):
+        self.size = size
+        self._sizes = list(sizes)
+        self._chunks = []
+        self._errors = 0
+
+    def record_chunk(self, num_bytes, elapsed):
+        self._chunks.append((num_bytes, elapsed))
+        if self._sizes:
+            self.size = self._sizes.pop(0)
+
+    def record_error(self):
+        self._errors += 1
+        if self._sizes:
+            self.size = self._sizes.pop(0)
+
+
+class _Observer(object):
+
+    def __init__(self):
+        self._chunks = []
+        self._retries = []
+
+    def on_chunk(self, transfer, num_bytes, elapsed):
+        self._chunks.append((transfer, num_bytes, elapsed))
+
+    def on_retry(self, transfer, exc):
+        self._retries.append((transfer, exc))
+
+
+class _Clock(object):
+
+    def __init__(self, now):
+        self._now = now
+
+    def time(self):
+        now = self._now
+        self._now += 1.0
+        return now
+
+
 class _Stream(object):
     _closed = False
 
@@ -1877,6 +2522,13 @@ class _StreamWithSeekableMethod(_Stream):
         return self._seekable
 
 
+class _MappedStream(_Stream):
+    memory_mapped = True
+
+    def read(self, size=None):
+        return memoryview(super(_MappedStream, self).read(size))
+
+
 class _Request(object):
     __slots__ = ('url', 'http_method', 'body', 'headers', 'loggable_body')
     URL = 'http://example.com/api'